@@ -31,15 +31,21 @@ class BaseAgent(ABC):
         pass
 
     @abstractmethod
-    async def chat(self, thread_id: str, message: str, db: AsyncSession) -> str:
-        """Process a message and return a response."""
+    async def chat(
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
+    ) -> str:
+        """Process a message and return a response.
+
+        `system_context` carries instructions from a delegating agent. Agents treat it as
+        system-level guidance and never store it in the conversation history.
+        """
         pass
 
     @abstractmethod
     async def chat_stream(
-        self, thread_id: str, message: str, db: AsyncSession
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
     ) -> AsyncIterator[str]:
-        """Process a message and yield response chunks."""
+        """Process a message and yield response chunks (see `chat` for system_context)."""
         # Empty generator for abstract method
         if False:
             yield ""  # pyright: ignore[reportUnreachable]
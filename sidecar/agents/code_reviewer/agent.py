@@ -1,8 +1,9 @@
 """Code Reviewer Agent - Provides Socratic feedback on code submissions."""
 
+import hashlib
 import logging
-from collections.abc import AsyncIterator
-from typing import Any, AsyncContextManager
+from collections.abc import AsyncIterator, Callable
+from typing import Any, AsyncContextManager, cast
 
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
@@ -12,22 +13,37 @@ from langgraph.graph.state import CompiledStateGraph
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing_extensions import override
 
+from agents import prompts
 from agents.base import BaseAgent
+from agents.streaming import iter_tokens
 from core.config import settings
 from database.session import DBSessionManager
+from schemas.lesson import LessonContext
 from services.gemini_service import GeminiService
 from services.lesson_service import LessonContextService
 
+from .incremental import ReviewDiff
 from .nodes import (
     code_analysis_node,
     context_enrichment_node,
+    guardrail_gate_node,
     guardrail_node,
     socratic_review_node,
+    static_analysis_node,
+    triage_node,
+)
+from .state import (
+    CodeReviewerFinding,
+    CodeReviewerState,
+    PartialCodeReviewerState,
+    ReviewOutcome,
 )
-from .state import CodeReviewerState
 
 logger = logging.getLogger(__name__)
 
+# Bump when node logic changes what a review produces, to stop replaying cached reviews
+REVIEW_PIPELINE_VERSION = 1
+
 
 class CodeReviewerAgent(BaseAgent):
     """Agent that reviews code through Socratic questioning."""
@@ -43,23 +59,94 @@ class CodeReviewerAgent(BaseAgent):
         db_manager: DBSessionManager,
         lesson_service: LessonContextService,
         model_name: str = settings.GEMINI_MODEL,
+        parallel_guardrail: bool = settings.REVIEW_PARALLEL_GUARDRAIL,
+        fused_analysis: bool = settings.REVIEW_FUSED_ANALYSIS,
+        analysis_chunk_tokens: int = settings.REVIEW_ANALYSIS_CHUNK_TOKENS,
+        analysis_concurrency: int = settings.REVIEW_ANALYSIS_CONCURRENCY,
+        guardrail_classifier: bool = settings.GUARDRAIL_CLASSIFIER_ENABLED,
     ) -> None:
+        """Initialize the code reviewer.
+
+        Args:
+            gemini_service: Injected Gemini service.
+            db_manager: Injected database session manager.
+            lesson_service: Injected lesson context service.
+            model_name: Model name to use.
+            parallel_guardrail: Run the guardrail and the analysis concurrently instead of
+                one after the other.
+            fused_analysis: Run the guardrail and the analysis as a single structured call.
+                Takes precedence over parallel_guardrail.
+            analysis_chunk_tokens: Estimated size above which code is analyzed in chunks
+                of about this many tokens. 0 always analyzes the whole file at once.
+            analysis_concurrency: Maximum chunks analyzed at the same time.
+            guardrail_classifier: Settle obvious submissions with the local classifier
+                instead of the LLM guardrail.
+        """
         super().__init__(gemini_service, db_manager, lesson_service)
         self.model_name: str = model_name
+        self.parallel_guardrail: bool = parallel_guardrail
+        self.fused_analysis: bool = fused_analysis
+        self.analysis_chunk_tokens: int = analysis_chunk_tokens
+        self.analysis_concurrency: int = analysis_concurrency
+        self.guardrail_classifier: bool = guardrail_classifier
+        self.prompt_fingerprint: str = self._fingerprint()
+
+    def _fingerprint(self) -> str:
+        """Identify everything besides the code and lesson that shapes a review.
+
+        Cached reviews are only replayed while this is unchanged, so editing a prompt,
+        switching models or layouts invalidates them.
+        """
+        parts = [
+            str(REVIEW_PIPELINE_VERSION),
+            self.model_name,
+            "fused" if self.fused_analysis else "split",
+            prompts.CODE_REVIEWER_SYSTEM,
+            prompts.GUARDRAIL_SYSTEM,
+            prompts.GUARDRAIL_USER_TEMPLATE,
+            prompts.REVIEW_ANALYSIS_TEMPLATE,
+            prompts.REVIEW_CHUNK_TEMPLATE,
+            prompts.REVIEW_TRIAGE_SYSTEM,
+            prompts.REVIEW_TRIAGE_USER_TEMPLATE,
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
 
     def _create_builder(self) -> StateGraph[CodeReviewerState, Any, Any, Any]:  # pyright: ignore[reportExplicitAny]
         workflow = StateGraph(CodeReviewerState)
 
+        if self.fused_analysis:
+            _ = workflow.add_node("enrichment", context_enrichment_node)  # pyright: ignore[reportUnknownMemberType]
+            _ = workflow.add_node("static", static_analysis_node)  # pyright: ignore[reportUnknownMemberType]
+            _ = workflow.add_node("triage", triage_node)  # pyright: ignore[reportUnknownMemberType]
+            _ = workflow.add_node("reviewer", socratic_review_node)  # pyright: ignore[reportUnknownMemberType]
+            _ = workflow.set_entry_point("enrichment")
+            _ = workflow.add_edge("enrichment", "static")
+            _ = workflow.add_edge("static", "triage")
+            _ = workflow.add_edge("triage", "reviewer")
+            _ = workflow.add_edge("reviewer", END)
+            return workflow
+
         _ = workflow.add_node("enrichment", context_enrichment_node)  # pyright: ignore[reportUnknownMemberType]
+        _ = workflow.add_node("static", static_analysis_node)  # pyright: ignore[reportUnknownMemberType]
         _ = workflow.add_node("guardrail", guardrail_node)  # pyright: ignore[reportUnknownMemberType]
         _ = workflow.add_node("analysis", code_analysis_node)  # pyright: ignore[reportUnknownMemberType]
         _ = workflow.add_node("reviewer", socratic_review_node)  # pyright: ignore[reportUnknownMemberType]
 
         _ = workflow.set_entry_point("enrichment")
+        _ = workflow.add_edge("enrichment", "static")
 
-        _ = workflow.add_edge("enrichment", "guardrail")
-        _ = workflow.add_edge("guardrail", "analysis")
-        _ = workflow.add_edge("analysis", "reviewer")
+        if self.parallel_guardrail:
+            # Fan out after the static pass; the gate waits for both branches and discards
+            # the analysis if the guardrail fired
+            _ = workflow.add_node("gate", guardrail_gate_node)  # pyright: ignore[reportUnknownMemberType]
+            _ = workflow.add_edge("static", "guardrail")
+            _ = workflow.add_edge("static", "analysis")
+            _ = workflow.add_edge(["guardrail", "analysis"], "gate")
+            _ = workflow.add_edge("gate", "reviewer")
+        else:
+            _ = workflow.add_edge("static", "guardrail")
+            _ = workflow.add_edge("guardrail", "analysis")
+            _ = workflow.add_edge("analysis", "reviewer")
         _ = workflow.add_edge("reviewer", END)
 
         return workflow
@@ -70,7 +157,7 @@ class CodeReviewerAgent(BaseAgent):
             return
 
         try:
-            db_path = settings.BASE_DIR / "code_reviewer_checkpoints.db"
+            db_path = settings.BASE_DIR / settings.REVIEW_CHECKPOINT_DB_PATH
             self._checkpointer_cm = AsyncSqliteSaver.from_conn_string(str(db_path))
             self._checkpointer = await self._checkpointer_cm.__aenter__()
 
@@ -82,20 +169,23 @@ class CodeReviewerAgent(BaseAgent):
             raise
 
     @override
-    async def chat(self, thread_id: str, message: str, db: AsyncSession) -> str:
+    async def chat(
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
+    ) -> str:
         """Collect tokens from chat_stream and return as a single string."""
         tokens: list[str] = []
-        async for token in self.chat_stream(thread_id, message, db):
+        async for token in self.chat_stream(thread_id, message, db, system_context):
             tokens.append(token)
         return "".join(tokens) or "No response generated."
 
     @override
     async def chat_stream(
-        self, thread_id: str, message: str, db: AsyncSession
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
     ) -> AsyncIterator[str]:
         """Wrapper for review() to satisfy BaseAgent interface.
 
-        Uses ReviewService to ensure persistence.
+        Uses ReviewService to ensure persistence. The message is reviewed as code; the
+        review prompts define the reviewer's role, so system_context is not used.
         """
         from services.review_service import ReviewService
 
@@ -109,10 +199,80 @@ class CodeReviewerAgent(BaseAgent):
             yield token
 
     async def review(
-        self, review_id: str, lesson_id: str, code: str, language: str, db: AsyncSession
+        self,
+        review_id: str,
+        lesson_id: str,
+        code: str,
+        language: str,
+        db: AsyncSession,
+        baseline: ReviewDiff | None = None,
     ) -> AsyncIterator[str]:
-        """Specific method for code review streaming."""
-        state: CodeReviewerState = {
+        """Specific method for code review streaming.
+
+        With a `baseline` (the diff against the previous review of this lesson), only the
+        changed hunks are analyzed and the earlier findings are carried forward.
+        """
+        state = self._initial_state(review_id, lesson_id, code, language)
+        if baseline is not None and not self.fused_analysis:
+            state["changed_hunks"] = baseline.hunks
+            state["carried_findings"] = baseline.carried_findings
+            state["revisited_findings"] = baseline.revisited_findings
+
+        if self._workflow is None:
+            raise RuntimeError("Agent not initialized")
+
+        # The reviewer node writes every client-visible token, including static
+        # guardrail and error replies, to the custom stream
+        config = self._run_config(review_id, db)
+        stream = self._workflow.astream(state, config=config, stream_mode="custom")  # pyright: ignore[reportUnknownMemberType]
+        async for token in iter_tokens(stream):
+            yield token
+
+    async def review_detached(
+        self,
+        review_id: str,
+        lesson: LessonContext,
+        code: str,
+        language: str,
+        on_token: Callable[[str], None] | None = None,
+    ) -> ReviewOutcome:
+        """Run a review without touching the database and return its outcome.
+
+        The lesson is passed in instead of loaded, and nothing is written: the caller
+        persists the outcome. Batch reviews use this to run many reviews concurrently
+        and store all results in one transaction.
+        """
+        if self._workflow is None:
+            raise RuntimeError("Agent not initialized")
+
+        state = self._initial_state(review_id, lesson.lesson_id, code, language)
+
+        tokens: list[str] = []
+        findings: list[CodeReviewerFinding] = []
+        completed = False
+        config = self._run_config(review_id, None, persist=False, lesson=lesson)
+        stream = self._workflow.astream(state, config=config, stream_mode=["custom", "updates"])  # pyright: ignore[reportUnknownMemberType]
+        async for mode, chunk in stream:
+            if mode == "custom":
+                token = cast(dict[str, object], chunk).get("token")
+                if isinstance(token, str) and token:
+                    tokens.append(token)
+                    if on_token is not None:
+                        on_token(token)
+                continue
+            # Later updates win, e.g. the gate clearing findings after the guardrail fired
+            for update in cast(dict[str, PartialCodeReviewerState | None], chunk).values():
+                if update and "findings" in update:
+                    findings = update["findings"]
+                if update and update.get("review_completed"):
+                    completed = True
+        return ReviewOutcome("".join(tokens), findings, completed)
+
+    @staticmethod
+    def _initial_state(
+        review_id: str, lesson_id: str, code: str, language: str
+    ) -> CodeReviewerState:
+        return {
             "messages": [HumanMessage(content=f"Please review my {language} code.")],
             "lesson_id": lesson_id,
             "review_id": review_id,
@@ -124,48 +284,28 @@ class CodeReviewerAgent(BaseAgent):
             "guardrail_triggered": False,
         }
 
-        config: RunnableConfig = {
+    def _run_config(
+        self,
+        review_id: str,
+        db: AsyncSession | None,
+        persist: bool = True,
+        lesson: LessonContext | None = None,
+    ) -> RunnableConfig:
+        return {
             "configurable": {
                 "thread_id": review_id,
                 "gemini_service": self.gemini_service,
                 "lesson_service": self.lesson_service,
                 "db_session": db,
+                "persist": persist,
+                "lesson": lesson,
                 "model_name": self.model_name,
+                "analysis_chunk_tokens": self.analysis_chunk_tokens,
+                "analysis_concurrency": self.analysis_concurrency,
+                "guardrail_classifier": self.guardrail_classifier,
             }
         }
 
-        if self._workflow is None:
-            raise RuntimeError("Agent not initialized")
-
-        has_streamed = False
-        # In LangGraph v2, we stream events
-        async for event in self._workflow.astream_events(state, config=config, version="v2"):
-            if event["event"] == "on_custom_event" and event["name"] == "review_token":
-                data = event.get("data", {})
-                if data:
-                    token = data.get("token")
-                    if token and isinstance(token, str):
-                        has_streamed = True
-                        yield str(token)
-
-            # Fallback for static messages (e.g. guardrails or errors)
-            # Filter specifically for the 'reviewer' node
-            # to avoid duplicate yields from graph root events
-            elif (
-                event["event"] == "on_chain_end"
-                and event.get("name") == "reviewer"
-                and not has_streamed
-            ):
-                # The final output is in event["data"]["output"]
-                output = event.get("data", {}).get("output", {})
-                if isinstance(output, dict) and "messages" in output:
-                    messages = output["messages"]  # pyright: ignore[reportUnknownVariableType]
-                    if messages:
-                        last_msg = messages[-1]  # pyright: ignore[reportUnknownVariableType]
-                        content = getattr(last_msg, "content", "")  # pyright: ignore[reportUnknownArgumentType]
-                        if content:
-                            yield str(content)
-
     @override
     async def close(self) -> None:
         if self._checkpointer_cm is not None:
@@ -0,0 +1,111 @@
+"""Split large submissions into chunks that can be analyzed independently.
+
+Python code is cut between top-level definitions, so a function or class is never split
+unless it alone exceeds the budget. Other languages, and Python that does not parse,
+are cut at blank lines. Chunks cover every line of the file exactly once.
+"""
+
+import ast
+from dataclasses import dataclass
+
+from core.tokens import estimate_tokens
+
+
+@dataclass(frozen=True)
+class CodeChunk:
+    """A contiguous range of lines of the submission (1-based, inclusive)."""
+
+    start_line: int
+    end_line: int
+    text: str
+
+    def numbered(self) -> str:
+        """The chunk's lines prefixed with their line numbers in the whole file."""
+        width = len(str(self.end_line))
+        return "\n".join(
+            f"{self.start_line + offset:>{width}} | {line}"
+            for offset, line in enumerate(self.text.split("\n"))
+        )
+
+
+def _node_start(node: ast.stmt) -> int:
+    decorators: list[ast.expr] = getattr(node, "decorator_list", [])
+    return min([node.lineno, *(d.lineno for d in decorators)])
+
+
+def _python_boundaries(code: str, lines: list[str], token_budget: int) -> list[int] | None:
+    """Line indexes where a Python chunk may start: top-level statements, and the
+    members of classes too large for one chunk."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    boundaries: list[int] = []
+    for node in tree.body:
+        boundaries.append(_node_start(node) - 1)
+        end = node.end_lineno or node.lineno
+        if isinstance(node, ast.ClassDef):
+            size = estimate_tokens("\n".join(lines[_node_start(node) - 1 : end]))
+            if size > token_budget:
+                boundaries.extend(_node_start(member) - 1 for member in node.body[1:])
+    return boundaries
+
+
+def _text_boundaries(lines: list[str]) -> list[int]:
+    """Line indexes that follow a blank line."""
+    return [i for i in range(1, len(lines)) if not lines[i - 1].strip() and lines[i].strip()]
+
+
+def chunk_code(code: str, language: str, token_budget: int) -> list[CodeChunk]:
+    """Split `code` into chunks of at most about `token_budget` estimated tokens.
+
+    A single definition (or blank-line-separated block) larger than the budget is cut
+    at line boundaries.
+    """
+    lines = code.replace("\r\n", "\n").split("\n")
+    boundaries = None
+    if language.lower() == "python":
+        boundaries = _python_boundaries(code, lines, token_budget)
+    if boundaries is None:
+        boundaries = _text_boundaries(lines)
+
+    # Pieces between consecutive boundaries; leading comments and imports join the first
+    starts = sorted({0, *(b for b in boundaries if 0 < b < len(lines))})
+    pieces = [(start, end) for start, end in zip(starts, [*starts[1:], len(lines)])]
+
+    chunks: list[CodeChunk] = []
+    current_start, current_tokens = 0, 0
+    for start, end in pieces:
+        size = estimate_tokens("\n".join(lines[start:end]))
+        if current_tokens and current_tokens + size > token_budget:
+            chunks.append(_make_chunk(lines, current_start, start))
+            current_start, current_tokens = start, 0
+        if size > token_budget:
+            # Oversized piece: flush whatever precedes it, then cut it by lines
+            if current_start < start:
+                chunks.append(_make_chunk(lines, current_start, start))
+            chunks.extend(_split_lines(lines, start, end, token_budget))
+            current_start, current_tokens = end, 0
+            continue
+        current_tokens += size
+    if current_start < len(lines):
+        chunks.append(_make_chunk(lines, current_start, len(lines)))
+    return chunks
+
+
+def _make_chunk(lines: list[str], start: int, end: int) -> CodeChunk:
+    return CodeChunk(start_line=start + 1, end_line=end, text="\n".join(lines[start:end]))
+
+
+def _split_lines(lines: list[str], start: int, end: int, token_budget: int) -> list[CodeChunk]:
+    chunks: list[CodeChunk] = []
+    chunk_start, tokens = start, 0
+    for index in range(start, end):
+        size = estimate_tokens(lines[index])
+        if tokens and tokens + size > token_budget:
+            chunks.append(_make_chunk(lines, chunk_start, index))
+            chunk_start, tokens = index, 0
+        tokens += size
+    chunks.append(_make_chunk(lines, chunk_start, end))
+    return chunks
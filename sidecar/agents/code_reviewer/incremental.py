@@ -0,0 +1,115 @@
+"""Line diff between a resubmission and the previously reviewed version of the code.
+
+Lets a re-review analyze only what changed: findings on untouched lines are carried
+forward with remapped line numbers, and only the changed hunks go to the model.
+"""
+
+import difflib
+from dataclasses import dataclass, field
+
+from .state import CodeReviewerFinding
+
+# Unchanged lines shown around each change
+CONTEXT_LINES = 2
+
+# Above this share of changed lines a full review is about as cheap and sees more
+MAX_CHANGED_RATIO = 0.5
+
+
+@dataclass
+class ReviewDiff:
+    """What changed since the previous review, in the new file's line numbers."""
+
+    hunks: str
+    carried_findings: list[CodeReviewerFinding] = field(default_factory=list)
+    # Earlier findings on lines that changed (old line numbers); they may be fixed
+    revisited_findings: list[CodeReviewerFinding] = field(default_factory=list)
+    changed_lines: int = 0
+    total_lines: int = 0
+
+    @property
+    def changed_ratio(self) -> float:
+        return self.changed_lines / self.total_lines if self.total_lines else 0.0
+
+
+def _render_hunks(new_lines: list[str], changes: list[tuple[int, int, int]], context: int) -> str:
+    """Render changed regions as numbered lines.
+
+    `changes` holds (start, end, removed) ranges of new-file indexes; `removed` counts old
+    lines deleted at `start`. Changed lines are marked with "+".
+    """
+    changed: set[int] = set()
+    removed_at: dict[int, int] = {}
+    windows: list[list[int]] = []
+    for start, end, removed in changes:
+        changed.update(range(start, end))
+        if removed and start == end:
+            removed_at[start] = removed_at.get(start, 0) + removed
+        low, high = max(start - context, 0), min(end + context, len(new_lines))
+        if windows and low <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], high)
+        else:
+            windows.append([low, high])
+
+    width = len(str(len(new_lines)))
+    blocks: list[str] = []
+    for low, high in windows:
+        rendered = [f"@@ lines {low + 1}-{max(high, low + 1)} @@"]
+        for index in range(low, high + 1):
+            if index in removed_at:
+                rendered.append(f"- {'':>{width}} | ({removed_at[index]} line(s) removed)")
+            if index < high:
+                marker = "+" if index in changed else " "
+                rendered.append(f"{marker} {index + 1:>{width}} | {new_lines[index]}")
+        blocks.append("\n".join(rendered))
+    return "\n".join(blocks)
+
+
+def diff_code(
+    old_code: str,
+    new_code: str,
+    old_findings: list[CodeReviewerFinding],
+    context: int = CONTEXT_LINES,
+) -> ReviewDiff:
+    """Diff two versions of a submission and remap the old findings (blocking)."""
+    old_lines = old_code.replace("\r\n", "\n").splitlines()
+    new_lines = new_code.replace("\r\n", "\n").splitlines()
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    line_map: dict[int, int] = {}
+    changes: list[tuple[int, int, int]] = []
+    changed_lines = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            line_map.update({i1 + k + 1: j1 + k + 1 for k in range(i2 - i1)})
+            continue
+        changes.append((j1, j2, i2 - i1 if tag == "delete" else 0))
+        changed_lines += max(i2 - i1, j2 - j1)
+
+    carried: list[CodeReviewerFinding] = []
+    revisited: list[CodeReviewerFinding] = []
+    for finding in old_findings:
+        line = finding["line_number"]
+        if line is None:
+            carried.append(finding)
+        elif line in line_map:
+            carried.append({**finding, "line_number": line_map[line]})
+        else:
+            revisited.append(finding)
+
+    return ReviewDiff(
+        hunks=_render_hunks(new_lines, changes, context),
+        carried_findings=carried,
+        revisited_findings=revisited,
+        changed_lines=changed_lines,
+        total_lines=max(len(old_lines), len(new_lines)),
+    )
+
+
+def findings_summary(findings: list[CodeReviewerFinding]) -> str:
+    """One line per finding, for prompts that only need to recall earlier issues."""
+    return "\n".join(
+        f"- line {f['line_number'] if f['line_number'] is not None else '-'} "
+        + f"({f['category']}): {f['observation']}"
+        for f in findings
+    )
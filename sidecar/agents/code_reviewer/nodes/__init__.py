@@ -1,11 +1,17 @@
 from .analysis import code_analysis_node
 from .enrichment import context_enrichment_node
+from .gate import guardrail_gate_node
 from .guardrails import guardrail_node
 from .socratic import socratic_review_node
+from .static import static_analysis_node
+from .triage import triage_node
 
 __all__ = [
     "code_analysis_node",
     "context_enrichment_node",
+    "guardrail_gate_node",
     "guardrail_node",
     "socratic_review_node",
+    "static_analysis_node",
+    "triage_node",
 ]
@@ -1,17 +1,32 @@
-import json
+import asyncio
 import logging
+import time
+from collections.abc import Sequence
 from typing import TypedDict
 
 from langchain_core.runnables import RunnableConfig
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models import CodeReviewFinding
+from agents.prompts import (
+    REVIEW_ANALYSIS_TEMPLATE,
+    REVIEW_CHUNK_TEMPLATE,
+    REVIEW_INCREMENTAL_TEMPLATE,
+)
+from core.tokens import estimate_tokens
+from schemas.domain import ReviewAnalysisStructure, ReviewFindingStructure
 from services.gemini_service import GeminiService
+from services.rate_limiter import RequestPriority
 
+from ..chunking import CodeChunk, chunk_code
+from ..incremental import findings_summary
 from ..state import CodeReviewerState, PartialCodeReviewerState
+from ..static_analysis import static_findings_block
 
 logger = logging.getLogger(__name__)
 
+# Findings kept from a chunked analysis, so the Socratic review stays focused
+MAX_CHUNKED_FINDINGS = 8
+SEVERITY_ORDER = {"Security": 0, "Performance": 1, "Best Practices": 2}
+
 
 class AnalysisFinding(TypedDict):
     """Typed structure for a single code finding."""
@@ -22,79 +37,160 @@ class AnalysisFinding(TypedDict):
     socratic_question: str
 
 
-class AnalysisResponse(TypedDict):
-    """Typed structure for the analysis LLM response."""
+def to_analysis_finding(finding: ReviewFindingStructure) -> AnalysisFinding:
+    """Convert a finding parsed from a structured response to its state form."""
+    return AnalysisFinding(
+        line_number=finding.line_number,
+        category=finding.category,
+        observation=finding.observation,
+        socratic_question=finding.socratic_question,
+    )
+
 
-    findings: list[AnalysisFinding]
+def merge_findings(*groups: Sequence[AnalysisFinding]) -> list[AnalysisFinding]:
+    """Concatenate finding lists, dropping repeats of the same observation on a line."""
+    seen: set[tuple[int | None, str]] = set()
+    merged: list[AnalysisFinding] = []
+    for group in groups:
+        for finding in group:
+            key = (finding.get("line_number"), finding.get("observation", "").strip().lower())
+            if key not in seen:
+                seen.add(key)
+                merged.append(finding)
+    return merged
 
 
 async def code_analysis_node(
     state: CodeReviewerState, config: RunnableConfig
 ) -> PartialCodeReviewerState:
-    """Analyze the code and identify issues (internally, before Socratic feedback)."""
+    """Analyze the code and identify issues (internally, before Socratic feedback).
+
+    Local static findings are passed to the model so it only looks for other issues, and
+    merged with its findings; the reviewer node stores them all once the review is done.
+    For a revision of reviewed code only the changed hunks are sent, and the earlier
+    findings on unchanged lines are carried forward. Code that does not parse is not sent
+    to the model at all, but still keeps the carried findings. Code larger than
+    `analysis_chunk_tokens` is split into chunks that are analyzed concurrently.
+    """
     configurable = config.get("configurable", {})
     gemini: GeminiService | None = configurable.get("gemini_service")
-    db: AsyncSession | None = configurable.get("db_session")
 
     if not gemini:
         logger.error("No gemini_service found in config['configurable']")
         raise RuntimeError("gemini_service dependency is required")
 
-    if not db:
-        logger.error("No db_session found in config['configurable']")
-        raise RuntimeError("db_session dependency is required")
-
-    analysis_prompt = f"""
-    Analyze the following code for a student working on: {state["lesson_name"]}
-    Objectives: {state["objectives"]}
-    
-    CODE:
-    ```{state["language"]}
-    {state["code_content"]}
-    ```
-    
-    Identify 2-3 specific areas for improvement (Security, Performance, or Best Practices).
-    For each, provide:
-    1. The line number (if applicable)
-    2. The category
-    3. The observation (what's wrong)
-    4. A Socratic question to help the student find the issue.
-    
-    Return ONLY JSON:
-    {{
-        "findings": [
-            {{
-                "line_number": 5,
-                "category": "Security",
-                "observation": "Hardcoded secret",
-                "socratic_question": "What happens if this key is pushed to a public repo?"
-            }}
-        ]
-    }}
-    """
+    static_findings: list[AnalysisFinding] = list(state.get("static_findings", []))
+    carried: list[AnalysisFinding] = list(state.get("carried_findings", []))
+    if state.get("syntax_error"):
+        return {"findings": merge_findings(carried, static_findings)}
+
+    hunks = state.get("changed_hunks")
+    if hunks is not None and not hunks.strip():
+        # Nothing changed line by line since the last review
+        return {"findings": merge_findings(carried, static_findings)}
+
+    code = state["code_content"]
+    chunk_tokens: int = configurable.get("analysis_chunk_tokens") or 0
+    if hunks is None and chunk_tokens and estimate_tokens(code) > chunk_tokens:
+        concurrency: int = configurable.get("analysis_concurrency") or 1
+        findings = await _analyze_chunks(gemini, state, static_findings, chunk_tokens, concurrency)
+        return {"findings": merge_findings(static_findings, findings)}
+
+    if hunks is not None:
+        analysis_prompt = REVIEW_INCREMENTAL_TEMPLATE.format(
+            lesson_name=state["lesson_name"],
+            objectives=state["objectives"],
+            language=state["language"],
+            hunks=hunks,
+            revisited_findings=findings_summary(state.get("revisited_findings", [])) or "None",
+            static_findings=static_findings_block(static_findings),
+        )
+    else:
+        scope = f"up to {max(3 - len(static_findings), 1)} other" if static_findings else "2-3"
+        analysis_prompt = REVIEW_ANALYSIS_TEMPLATE.format(
+            lesson_name=state["lesson_name"],
+            objectives=state["objectives"],
+            language=state["language"],
+            code=code,
+            static_findings=static_findings_block(static_findings),
+            scope=scope,
+        )
+
+    findings = await _request_findings(gemini, analysis_prompt)
+    return {"findings": merge_findings(carried, static_findings, findings)}
 
+
+async def _request_findings(gemini: GeminiService, prompt: str) -> list[AnalysisFinding]:
     try:
-        response = await gemini.generate_content(
-            prompt=analysis_prompt, response_mime_type="application/json"
+        # The student is waiting on this result, so it shares the guardrail class
+        analysis = await gemini.generate_structured(
+            prompt=prompt,
+            schema=ReviewAnalysisStructure,
+            priority=RequestPriority.GUARDRAIL,
         )
-        data: AnalysisResponse = json.loads(response)  # pyright: ignore[reportAny]
-        findings = data.get("findings", [])
-
-        # Persist findings to DB
-        review_id = state["review_id"]
-
-        for f in findings:
-            finding = CodeReviewFinding(
-                review_id=review_id,
-                line_number=f.get("line_number"),
-                category=f.get("category", "General"),
-                observation=f.get("observation", ""),
-                socratic_question=f.get("socratic_question", ""),
-            )
-            db.add(finding)
-
-        await db.commit()
-        return {"findings": findings}
+        return [to_analysis_finding(f) for f in analysis.findings]
     except Exception as e:
         logger.error(f"Analysis node error: {e}")
-        return {"findings": []}
+        return []
+
+
+def _to_file_line(line: int | None, chunk: CodeChunk) -> int | None:
+    """Map a line reported for a chunk to the whole file.
+
+    Chunks are numbered as in the file, but a number that only fits the chunk counted
+    from 1 is taken as relative. Anything else cannot be placed.
+    """
+    if line is None or chunk.start_line <= line <= chunk.end_line:
+        return line
+    if 1 <= line <= chunk.end_line - chunk.start_line + 1:
+        return chunk.start_line + line - 1
+    return None
+
+
+async def _analyze_chunks(
+    gemini: GeminiService,
+    state: CodeReviewerState,
+    static_findings: list[AnalysisFinding],
+    chunk_tokens: int,
+    concurrency: int,
+) -> list[AnalysisFinding]:
+    """Map: analyze each chunk of a large file, at most `concurrency` at a time.
+    Reduce: merge the findings with file line numbers, keeping the most severe."""
+    code = state["code_content"]
+    chunks = await asyncio.to_thread(chunk_code, code, state["language"], chunk_tokens)
+    total_lines = chunks[-1].end_line
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze(chunk: CodeChunk) -> list[AnalysisFinding]:
+        known = [
+            f
+            for f in static_findings
+            if f["line_number"] is not None
+            and chunk.start_line <= f["line_number"] <= chunk.end_line
+        ]
+        prompt = REVIEW_CHUNK_TEMPLATE.format(
+            lesson_name=state["lesson_name"],
+            objectives=state["objectives"],
+            language=state["language"],
+            start_line=chunk.start_line,
+            end_line=chunk.end_line,
+            total_lines=total_lines,
+            code=chunk.numbered(),
+            static_findings=static_findings_block(known),
+        )
+        async with semaphore:
+            found = await _request_findings(gemini, prompt)
+        return [{**f, "line_number": _to_file_line(f.get("line_number"), chunk)} for f in found]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(analyze(chunk) for chunk in chunks))
+    logger.info(
+        f"Analyzed {len(chunks)} chunks of {total_lines} lines "
+        + f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+    )
+
+    findings = merge_findings(*results)
+    findings.sort(
+        key=lambda f: (SEVERITY_ORDER.get(f.get("category", ""), 99), f.get("line_number") or 0)
+    )
+    return findings[: max(MAX_CHUNKED_FINDINGS - len(static_findings), 1)]
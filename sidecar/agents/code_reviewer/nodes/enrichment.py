@@ -3,6 +3,7 @@ import logging
 from langchain_core.runnables import RunnableConfig
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from schemas.lesson import LessonContext
 from services.lesson_service import LessonContextService
 
 from ..state import CodeReviewerState, PartialCodeReviewerState
@@ -13,8 +14,12 @@ logger = logging.getLogger(__name__)
 async def context_enrichment_node(
     state: CodeReviewerState, config: RunnableConfig
 ) -> PartialCodeReviewerState:
-    """Fetch lesson details and objectives."""
+    """Fetch lesson details and objectives, unless the caller already loaded the lesson."""
     configurable = config.get("configurable", {})
+    lesson: LessonContext | None = configurable.get("lesson")
+    if lesson is not None:
+        return {"lesson_name": lesson.name, "objectives": lesson.objectives}
+
     db: AsyncSession | None = configurable.get("db_session")
 
     if not db:
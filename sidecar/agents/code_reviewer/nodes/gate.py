@@ -0,0 +1,19 @@
+import logging
+
+from ..state import CodeReviewerState, PartialCodeReviewerState
+
+logger = logging.getLogger(__name__)
+
+
+async def guardrail_gate_node(state: CodeReviewerState) -> PartialCodeReviewerState:
+    """Join the parallel guardrail and analysis branches.
+
+    Analysis runs speculatively alongside the guardrail. When the guardrail fires, the
+    findings are dropped, so a refused submission leaves no analysis behind. Nothing has
+    been stored yet at this point: the reviewer node writes the review at the end.
+    """
+    if not state.get("guardrail_triggered"):
+        return {}
+
+    logger.info(f"Guardrail fired; discarded speculative analysis for review {state['review_id']}")
+    return {"findings": []}
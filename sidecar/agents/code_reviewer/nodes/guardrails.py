@@ -1,21 +1,19 @@
-import json
 import logging
-from typing import TypedDict
 
 from langchain_core.runnables import RunnableConfig
 
+from agents.guardrail_classifier import GuardrailVerdict, get_guardrail_classifier
 from agents.prompts import GUARDRAIL_SYSTEM, GUARDRAIL_USER_TEMPLATE
+from schemas.domain import GuardrailStructure
 from services.gemini_service import GeminiService
+from services.rate_limiter import RequestPriority
 
 from ..state import CodeReviewerState, PartialCodeReviewerState
 
 logger = logging.getLogger(__name__)
 
-
-class GuardrailResponse(TypedDict):
-    """Typed structure for guardrail LLM response."""
-
-    triggered: bool
+# Characters of a code submission sent to the LLM guardrail; the local screen sees it all
+GUARDRAIL_CODE_CHARS = 2000
 
 
 async def guardrail_node(
@@ -32,22 +30,32 @@ async def guardrail_node(
     # Prioritize checking the code content itself if available
     code_content = state.get("code_content", "")
     if code_content:
-        content_to_check = f"Code submission: {code_content[:2000]}"
+        content_to_check = f"Code submission: {code_content}"
+        llm_content = f"Code submission: {code_content[:GUARDRAIL_CODE_CHARS]}"
     else:
         messages = state.get("messages", [])
         if not messages:
             return {"guardrail_triggered": False}
         last_message = messages[-1]
         content_to_check = str(last_message.content)  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType]
+        llm_content = content_to_check
+
+    # Obvious cases are settled locally; the linear model is trained on chat messages,
+    # so code submissions are only screened by the patterns
+    classifier = get_guardrail_classifier(config)
+    if classifier is not None:
+        result = classifier.classify(content_to_check, use_model=not code_content)
+        if result.verdict != GuardrailVerdict.ESCALATE:
+            return {"guardrail_triggered": result.verdict == GuardrailVerdict.BLOCK}
 
     try:
-        response = await gemini.generate_content(
-            prompt=GUARDRAIL_USER_TEMPLATE.format(message=content_to_check),
+        verdict = await gemini.generate_structured(
+            prompt=GUARDRAIL_USER_TEMPLATE.format(message=llm_content),
+            schema=GuardrailStructure,
             system_instruction=GUARDRAIL_SYSTEM,
-            response_mime_type="application/json",
+            priority=RequestPriority.GUARDRAIL,
         )
-        data: GuardrailResponse = json.loads(response)  # pyright: ignore[reportAny]
-        return {"guardrail_triggered": bool(data.get("triggered", False))}
+        return {"guardrail_triggered": verdict.triggered}
     except Exception as e:
         logger.error(f"Guardrail error: {e}")
         return {"guardrail_triggered": False}
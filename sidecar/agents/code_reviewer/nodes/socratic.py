@@ -1,26 +1,32 @@
 import json
 import logging
 
-from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
-from sqlalchemy import select
+from langgraph.types import StreamWriter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from agents.prompts import CODE_REVIEWER_SYSTEM
+from agents.streaming import emit_token
 from core.types import CodeReviewStatus
-from database.models import CodeReview
 from services.gemini_service import GeminiService
+from services.rate_limiter import RequestPriority
 
+from ..persistence import save_review
 from ..state import CodeReviewerState, PartialCodeReviewerState
 
 logger = logging.getLogger(__name__)
 
 
 async def socratic_review_node(
-    state: CodeReviewerState, config: RunnableConfig
+    state: CodeReviewerState, config: RunnableConfig, writer: StreamWriter
 ) -> PartialCodeReviewerState:
-    """Generate the Socratic feedback response."""
+    """Generate the Socratic feedback response and store the review.
+
+    The findings and the feedback are written together in one transaction. If the
+    response fails, the findings are still stored. A refused submission stores the
+    refusal as its feedback and is marked failed, as batch reviews do.
+    """
     configurable = config.get("configurable", {})
     gemini: GeminiService | None = configurable.get("gemini_service")
     db: AsyncSession | None = configurable.get("db_session")
@@ -29,35 +35,47 @@ async def socratic_review_node(
         logger.error("No gemini_service found in config['configurable']")
         raise RuntimeError("gemini_service dependency is required")
 
-    if not db:
+    # Detached runs (batch reviews) leave persistence to the caller
+    detached = configurable.get("persist") is False
+    if not detached and not db:
         logger.error("No db_session found in config['configurable']")
         raise RuntimeError("db_session dependency is required")
+    if detached:
+        db = None
 
     if state.get("guardrail_triggered"):
-        return {
-            "messages": [
-                AIMessage(
-                    content="""
+        refusal = """
                     I can't just give you the answer!
                     Let's look at your code together.
                     What part are you most unsure about?"""
-                )
-            ]
-        }
+        emit_token(writer, refusal)
+        if db is not None:
+            await _save(db, state, refusal, CodeReviewStatus.FAILED)
+        return {"messages": [AIMessage(content=refusal)]}
 
     # Format the findings for the reviewer prompt
     findings_str = json.dumps(state["findings"], indent=2)
 
     system_instruction = CODE_REVIEWER_SYSTEM.format(lesson_name=state["lesson_name"])
 
+    hunks = state.get("changed_hunks")
+    if hunks:
+        # A revision of reviewed code: review the changes, the findings cover the rest
+        submission = f"""Student's Revision (changed parts only, numbered as in the revised file):
+    ```{state["language"]}
+    {hunks}
+    ```"""
+    else:
+        submission = f"""Student's Submission:
+    ```{state["language"]}
+    {state["code_content"]}
+    ```"""
+
     full_prompt = f"""
     Internal Analysis Findings:
     {findings_str}
     
-    Student's Submission:
-    ```{state["language"]}
-    {state["code_content"]}
-    ```
+    {submission}
     
     Based on these findings, provide your Socratic review.
     """
@@ -67,25 +85,35 @@ async def socratic_review_node(
         async for chunk in gemini.generate_content_stream(
             prompt=full_prompt,
             system_instruction=system_instruction,
+            priority=RequestPriority.INTERACTIVE,
         ):
-            await adispatch_custom_event("review_token", {"token": chunk}, config=config)
+            emit_token(writer, chunk)
 
             response_text += chunk
 
-        # Update the CodeReview record in DB
-        review_id = state["review_id"]
-
-        stmt = select(CodeReview).where(CodeReview.id == review_id)
-        result = await db.execute(stmt)
-        review = result.scalar_one_or_none()
-        if review:
-            review.feedback = response_text
-            review.status = CodeReviewStatus.COMPLETED
-            await db.commit()
+        if db is not None:
+            await _save(db, state, response_text)
 
-        return {"messages": [AIMessage(content=response_text)]}
+        return {"messages": [AIMessage(content=response_text)], "review_completed": True}
     except Exception as e:
         logger.error(f"Reviewer node error: {e}")
-        return {
-            "messages": [AIMessage(content="I encountered an error while reviewing your code.")]
-        }
+        error_message = "I encountered an error while reviewing your code."
+        # Only surface the error if the student has not already seen partial feedback
+        if not response_text:
+            emit_token(writer, error_message)
+        if db is not None:
+            await _save(db, state, None)
+        return {"messages": [AIMessage(content=error_message)]}
+
+
+async def _save(
+    db: AsyncSession,
+    state: CodeReviewerState,
+    feedback: str | None,
+    status: CodeReviewStatus = CodeReviewStatus.COMPLETED,
+) -> None:
+    try:
+        await save_review(db, state["review_id"], state["findings"], feedback, status)
+    except Exception as e:
+        logger.error(f"Failed to persist review {state['review_id']}: {e}")
+        await db.rollback()
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+import time
+
+from ..state import CodeReviewerState, PartialCodeReviewerState
+from ..static_analysis import analyze_python
+
+logger = logging.getLogger(__name__)
+
+
+async def static_analysis_node(state: CodeReviewerState) -> PartialCodeReviewerState:
+    """Run the local ast checks on Python submissions in a worker thread.
+
+    The findings go to the model step that follows, the fused triage node or the
+    separate analysis node, which tells the model about them and makes no call at all
+    when the code does not parse. The reviewer node stores them with the model's findings
+    once the review is done.
+    """
+    if state["language"].lower() != "python":
+        return {}
+
+    start = time.perf_counter()
+    try:
+        report = await asyncio.to_thread(analyze_python, state["code_content"])
+    except Exception as e:
+        # e.g. RecursionError on pathologically nested code; the model step still runs
+        logger.error(f"Static analysis failed: {e}")
+        return {}
+
+    logger.info(
+        f"Static analysis found {len(report.findings)} issues "
+        + f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
+    return {"static_findings": report.findings, "syntax_error": report.syntax_error}
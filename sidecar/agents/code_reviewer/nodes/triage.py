@@ -0,0 +1,71 @@
+import logging
+
+from langchain_core.runnables import RunnableConfig
+
+from agents.guardrail_classifier import GuardrailVerdict, get_guardrail_classifier
+from agents.prompts import REVIEW_TRIAGE_SYSTEM, REVIEW_TRIAGE_USER_TEMPLATE
+from schemas.domain import ReviewTriageStructure
+from services.gemini_service import GeminiService
+from services.rate_limiter import RequestPriority
+
+from ..state import CodeReviewerState, PartialCodeReviewerState
+from ..static_analysis import static_findings_block
+from .analysis import AnalysisFinding, to_analysis_finding
+
+logger = logging.getLogger(__name__)
+
+
+async def triage_node(state: CodeReviewerState, config: RunnableConfig) -> PartialCodeReviewerState:
+    """Guardrail and analysis in one schema-constrained call.
+
+    Replaces the separate guardrail and analysis round trips. The local classifier still
+    blocks obvious bypass attempts without any call, and code that does not parse only
+    gets its static syntax finding. Like the separate nodes it fails open: an error or an
+    invalid response yields no guardrail and no model findings.
+    """
+    configurable = config.get("configurable", {})
+    gemini: GeminiService | None = configurable.get("gemini_service")
+
+    if not gemini:
+        logger.error("No gemini_service found in config['configurable']")
+        raise RuntimeError("gemini_service dependency is required")
+
+    code_content = state["code_content"]
+    classifier = get_guardrail_classifier(config)
+    if classifier is not None:
+        result = classifier.classify(f"Code submission: {code_content}", use_model=False)
+        if result.verdict == GuardrailVerdict.BLOCK:
+            return {"guardrail_triggered": True, "findings": []}
+
+    static_findings: list[AnalysisFinding] = list(state.get("static_findings", []))
+    if state.get("syntax_error"):
+        return _passed(static_findings)
+
+    prompt = REVIEW_TRIAGE_USER_TEMPLATE.format(
+        lesson_name=state["lesson_name"],
+        objectives=state["objectives"],
+        language=state["language"],
+        code=code_content,
+        static_findings=static_findings_block(static_findings),
+    )
+
+    try:
+        triage = await gemini.generate_structured(
+            prompt=prompt,
+            schema=ReviewTriageStructure,
+            system_instruction=REVIEW_TRIAGE_SYSTEM,
+            priority=RequestPriority.GUARDRAIL,
+        )
+    except Exception as e:
+        logger.error(f"Triage node error: {e}")
+        return _passed(static_findings)
+
+    if triage.triggered:
+        return {"guardrail_triggered": True, "findings": []}
+
+    findings = static_findings + [to_analysis_finding(f) for f in triage.findings]
+    return _passed(findings)
+
+
+def _passed(findings: list[AnalysisFinding]) -> PartialCodeReviewerState:
+    return {"guardrail_triggered": False, "findings": findings}
@@ -0,0 +1,54 @@
+"""Write the outcome of a review to the database in one transaction.
+
+The nodes before the Socratic review only pass findings along in the graph state; the
+review is stored once, at the end of the pipeline, with one multi-row INSERT for its
+findings and one UPDATE for its feedback.
+"""
+
+from collections.abc import Sequence
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.types import CodeReviewStatus
+from database.models import CodeReview, CodeReviewFinding
+
+from .state import CodeReviewerFinding
+
+
+def finding_rows(
+    review_id: str, findings: Sequence[CodeReviewerFinding]
+) -> list[dict[str, object]]:
+    """Insert parameters for the findings of a review, defaulting missing fields."""
+    return [
+        {
+            "review_id": review_id,
+            "line_number": f.get("line_number"),
+            "category": f.get("category", "General"),
+            "observation": f.get("observation", ""),
+            "socratic_question": f.get("socratic_question", ""),
+        }
+        for f in findings
+    ]
+
+
+async def save_review(
+    db: AsyncSession,
+    review_id: str,
+    findings: Sequence[CodeReviewerFinding],
+    feedback: str | None,
+    status: CodeReviewStatus = CodeReviewStatus.COMPLETED,
+) -> None:
+    """Store a review's findings, its feedback and `status`; then commit.
+
+    Without feedback the review failed: the findings are kept and it is marked failed.
+    """
+    if findings:
+        _ = await db.execute(insert(CodeReviewFinding).values(finding_rows(review_id, findings)))
+    values: dict[str, object] = (
+        {"status": CodeReviewStatus.FAILED}
+        if feedback is None
+        else {"feedback": feedback, "status": status}
+    )
+    _ = await db.execute(update(CodeReview).where(CodeReview.id == review_id).values(values))
+    await db.commit()
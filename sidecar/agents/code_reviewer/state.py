@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Annotated, TypedDict
+from typing import Annotated, NamedTuple, NotRequired, TypedDict
 
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
@@ -32,6 +32,18 @@ class CodeReviewerState(TypedDict):
     findings: list[CodeReviewerFinding]
     guardrail_triggered: bool
 
+    # Local static analysis (Python only)
+    static_findings: NotRequired[list[CodeReviewerFinding]]
+    syntax_error: NotRequired[bool]
+
+    # Incremental re-review, set when the code is a revision of a reviewed submission
+    changed_hunks: NotRequired[str]
+    carried_findings: NotRequired[list[CodeReviewerFinding]]
+    revisited_findings: NotRequired[list[CodeReviewerFinding]]
+
+    # Set by the reviewer once the Socratic feedback was generated in full
+    review_completed: NotRequired[bool]
+
 
 class PartialCodeReviewerState(TypedDict, total=False):
     """Partial state for Code Reviewer nodes."""
@@ -45,3 +57,17 @@ class PartialCodeReviewerState(TypedDict, total=False):
     objectives: list[str]
     findings: list[CodeReviewerFinding]
     guardrail_triggered: bool
+    static_findings: list[CodeReviewerFinding]
+    syntax_error: bool
+    changed_hunks: str
+    carried_findings: list[CodeReviewerFinding]
+    revisited_findings: list[CodeReviewerFinding]
+    review_completed: bool
+
+
+class ReviewOutcome(NamedTuple):
+    """Result of a review run without persistence."""
+
+    feedback: str
+    findings: list[CodeReviewerFinding]
+    completed: bool  # False when the guardrail refused or the feedback failed
@@ -0,0 +1,286 @@
+"""Local ast-based checks that run on Python submissions before any model call.
+
+Everything here is pure and synchronous so it can run in a worker thread. Findings use
+the same shape as the model's findings, with exact line numbers.
+"""
+
+import ast
+import json
+import re
+from dataclasses import dataclass, field
+
+from .state import CodeReviewerFinding
+
+# Reported issues per rule, so a file full of one mistake does not flood the prompt
+MAX_FINDINGS_PER_RULE = 3
+
+# Control-flow blocks nested deeper than this are reported
+MAX_NESTING_DEPTH = 4
+
+SECRET_NAME_PATTERN: re.Pattern[str] = re.compile(
+    r"(password|passwd|secret|api_?key|access_?key|private_?key|auth_?token|token)$",
+    re.IGNORECASE,
+)
+
+_NESTING_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try)
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_MUTABLE_LITERALS = (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)
+
+
+@dataclass
+class StaticReport:
+    """Outcome of the static pass."""
+
+    findings: list[CodeReviewerFinding] = field(default_factory=list)
+    syntax_error: bool = False
+
+
+def _finding(
+    line: int | None, category: str, observation: str, question: str
+) -> CodeReviewerFinding:
+    return CodeReviewerFinding(
+        line_number=line, category=category, observation=observation, socratic_question=question
+    )
+
+
+def _loaded_names(tree: ast.AST) -> set[str]:
+    """Names read anywhere in `tree`, including the roots of attribute chains."""
+    return {
+        node.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+    }
+
+
+def _check_unused_imports(tree: ast.Module) -> list[CodeReviewerFinding]:
+    loaded = _loaded_names(tree)
+    # Names re-exported through __all__ count as used
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets
+        ):
+            loaded.update(
+                c.value
+                for c in ast.walk(node.value)
+                if isinstance(c, ast.Constant) and isinstance(c.value, str)
+            )
+
+    findings: list[CodeReviewerFinding] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            continue
+        if not isinstance(node, ast.Import | ast.ImportFrom):
+            continue
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            if name != "*" and name not in loaded:
+                findings.append(
+                    _finding(
+                        node.lineno,
+                        "Best Practices",
+                        f"`{name}` is imported but never used",
+                        f"Which part of your code needs `{name}`?",
+                    )
+                )
+    return findings
+
+
+def _assigned_names(function: ast.FunctionDef | ast.AsyncFunctionDef) -> dict[str, int]:
+    """Local names bound by assignments and loops in `function`, with their first line."""
+    declared: set[str] = set()
+    assigned: dict[str, int] = {}
+    for node in ast.walk(function):
+        if isinstance(node, ast.Global | ast.Nonlocal):
+            declared.update(node.names)
+        targets: list[ast.expr] = []
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        elif isinstance(node, ast.For | ast.AsyncFor):
+            targets = [node.target]
+        for target in targets:
+            for name in ast.walk(target):
+                if isinstance(name, ast.Name) and isinstance(name.ctx, ast.Store):
+                    _ = assigned.setdefault(name.id, name.lineno)
+    return {name: line for name, line in assigned.items() if name not in declared}
+
+
+def _check_unused_variables(tree: ast.Module) -> list[CodeReviewerFinding]:
+    findings: list[CodeReviewerFinding] = []
+    for function in ast.walk(tree):
+        if not isinstance(function, _FUNCTION_NODES):
+            continue
+        loaded = _loaded_names(function)
+        for name, line in _assigned_names(function).items():
+            if name.startswith("_") or name in loaded:
+                continue
+            findings.append(
+                _finding(
+                    line,
+                    "Best Practices",
+                    f"`{name}` is assigned in `{function.name}` but never used",
+                    f"What did you intend to do with `{name}` after setting it?",
+                )
+            )
+    return findings
+
+
+def _check_bare_excepts(tree: ast.Module) -> list[CodeReviewerFinding]:
+    return [
+        _finding(
+            node.lineno,
+            "Best Practices",
+            "Bare `except:` catches every exception, including KeyboardInterrupt",
+            "Which specific errors do you expect here, and what should happen to the others?",
+        )
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ExceptHandler) and node.type is None
+    ]
+
+
+def _secret_target(target: ast.expr | str | None) -> str | None:
+    if isinstance(target, ast.Name):
+        name = target.id
+    elif isinstance(target, ast.Attribute):
+        name = target.attr
+    elif isinstance(target, str):
+        name = target
+    else:
+        return None
+    return name if SECRET_NAME_PATTERN.search(name) else None
+
+
+def _check_hardcoded_secrets(tree: ast.Module) -> list[CodeReviewerFinding]:
+    findings: list[CodeReviewerFinding] = []
+    for node in ast.walk(tree):
+        pairs: list[tuple[ast.expr | str | None, ast.expr | None]] = []
+        if isinstance(node, ast.Assign):
+            pairs = [(target, node.value) for target in node.targets]
+        elif isinstance(node, ast.AnnAssign):
+            pairs = [(node.target, node.value)]
+        elif isinstance(node, ast.keyword):
+            pairs = [(node.arg, node.value)]
+        for target, value in pairs:
+            name = _secret_target(target)
+            if (
+                name
+                and isinstance(value, ast.Constant)
+                and isinstance(value.value, str)
+                and len(value.value) >= 4
+            ):
+                findings.append(
+                    _finding(
+                        value.lineno,
+                        "Security",
+                        f"`{name}` is set to a hardcoded string",
+                        f"What could happen if this file, including `{name}`, were shared?",
+                    )
+                )
+    return findings
+
+
+def _is_mutable_default(node: ast.expr | None) -> bool:
+    if isinstance(node, _MUTABLE_LITERALS):
+        return True
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in ("list", "dict", "set")
+    )
+
+
+def _check_mutable_defaults(tree: ast.Module) -> list[CodeReviewerFinding]:
+    findings: list[CodeReviewerFinding] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (*_FUNCTION_NODES, ast.Lambda)):
+            continue
+        for default in [*node.args.defaults, *node.args.kw_defaults]:
+            if default is not None and _is_mutable_default(default):
+                findings.append(
+                    _finding(
+                        default.lineno,
+                        "Best Practices",
+                        "Mutable default argument is shared between calls",
+                        "What does this default contain the second time the function is called?",
+                    )
+                )
+    return findings
+
+
+def _check_nesting(tree: ast.Module) -> list[CodeReviewerFinding]:
+    findings: list[CodeReviewerFinding] = []
+
+    def visit(node: ast.AST, depth: int) -> None:
+        for child in ast.iter_child_nodes(node):
+            # Each function starts its own nesting count
+            if isinstance(child, (*_FUNCTION_NODES, ast.ClassDef)):
+                visit(child, 0)
+                continue
+            child_depth = depth + 1 if isinstance(child, _NESTING_NODES) else depth
+            if child_depth > MAX_NESTING_DEPTH and depth == MAX_NESTING_DEPTH:
+                findings.append(
+                    _finding(
+                        getattr(child, "lineno", None),
+                        "Best Practices",
+                        f"Code is nested {child_depth} blocks deep",
+                        "Could part of this block become its own function or return early?",
+                    )
+                )
+                continue
+            visit(child, child_depth)
+
+    visit(tree, 0)
+    return findings
+
+
+_RULES = (
+    _check_hardcoded_secrets,
+    _check_mutable_defaults,
+    _check_bare_excepts,
+    _check_nesting,
+    _check_unused_imports,
+    _check_unused_variables,
+)
+
+
+def analyze_python(code: str) -> StaticReport:
+    """Run every static check on a Python submission (blocking).
+
+    A submission that does not parse yields a single syntax finding and
+    `syntax_error=True`; no other rule can run on it.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return StaticReport(
+            findings=[
+                _finding(
+                    e.lineno,
+                    "Syntax",
+                    f"Python cannot parse this code: {e.msg}",
+                    f"What does Python expect to see on line {e.lineno}?"
+                    if e.lineno
+                    else "Which part of the code does Python fail to read?",
+                )
+            ],
+            syntax_error=True,
+        )
+
+    findings: list[CodeReviewerFinding] = []
+    for rule in _RULES:
+        findings.extend(rule(tree)[:MAX_FINDINGS_PER_RULE])
+    findings.sort(key=lambda f: f["line_number"] or 0)
+    return StaticReport(findings=findings)
+
+
+def static_findings_block(findings: list[CodeReviewerFinding]) -> str:
+    """Prompt section listing the local findings so the model does not repeat them."""
+    if not findings:
+        return ""
+    return (
+        "Static analysis already found these issues (exact line numbers). "
+        + "Do not repeat them:\n"
+        + json.dumps(findings, indent=2)
+        + "\n"
+    )
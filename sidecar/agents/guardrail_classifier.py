@@ -0,0 +1,193 @@
+"""Local fast-path classifier that screens messages before the LLM guardrail.
+
+Obvious small talk and obvious bypass attempts are decided in-process from regex
+patterns shipped in resources/guardrail_classifier.json, next to a small linear model.
+The model only lets through messages it is confident are legitimate: everything else,
+including messages it scores as bypass attempts, escalates to the Gemini guardrail, so
+a false positive of the model never refuses a student by itself.
+"""
+
+import json
+import logging
+import math
+import re
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import TypedDict, cast
+
+from langchain_core.runnables import RunnableConfig
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = Path(__file__).parent.parent / "resources" / "guardrail_classifier.json"
+
+TOKEN_PATTERN: re.Pattern[str] = re.compile(r"[a-z0-9']+")
+
+
+class GuardrailVerdict(StrEnum):
+    """Outcome of the local pre-classification."""
+
+    ALLOW = "allow"
+    BLOCK = "block"
+    ESCALATE = "escalate"
+
+
+class GuardrailModel(TypedDict):
+    """On-disk format of the classifier resource."""
+
+    version: int
+    allow_patterns: list[str]
+    block_patterns: list[str]
+    bias: float
+    weights: dict[str, float]
+
+
+@dataclass(frozen=True)
+class ClassifierResult:
+    """A verdict with the model probability that produced it (1.0/0.0 for patterns)."""
+
+    verdict: GuardrailVerdict
+    probability: float
+    source: str
+
+
+@dataclass
+class GuardrailClassifierStats:
+    """Counters for local decisions versus LLM escalations."""
+
+    allowed: int = 0
+    blocked: int = 0
+    escalated: int = 0
+    pattern_decisions: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.allowed + self.blocked + self.escalated
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalated / self.total if self.total else 0.0
+
+    def record(self, result: ClassifierResult) -> None:
+        if result.verdict == GuardrailVerdict.ALLOW:
+            self.allowed += 1
+        elif result.verdict == GuardrailVerdict.BLOCK:
+            self.blocked += 1
+        else:
+            self.escalated += 1
+            return
+        if result.source == "pattern":
+            self.pattern_decisions += 1
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "escalated": self.escalated,
+            "pattern_decisions": self.pattern_decisions,
+            "total": self.total,
+            "escalation_rate": round(self.escalation_rate, 4),
+        }
+
+
+def extract_features(text: str) -> list[str]:
+    """Lowercased word unigrams and bigrams."""
+    tokens: list[str] = TOKEN_PATTERN.findall(text.lower())
+    bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return tokens + bigrams
+
+
+class GuardrailClassifier:
+    """Pattern rules backed by a logistic-regression score.
+
+    Only the block patterns block locally; the score can only allow.
+
+    Args:
+        model: Parsed classifier resource.
+        threshold: Minimum confidence that a message is legitimate required to allow it
+            locally. Anything below escalates to the LLM guardrail.
+    """
+
+    def __init__(self, model: GuardrailModel, threshold: float) -> None:
+        self.threshold: float = threshold
+        self.stats: GuardrailClassifierStats = GuardrailClassifierStats()
+        self._allow: list[re.Pattern[str]] = [
+            re.compile(p, re.IGNORECASE) for p in model["allow_patterns"]
+        ]
+        self._block: list[re.Pattern[str]] = [
+            re.compile(p, re.IGNORECASE) for p in model["block_patterns"]
+        ]
+        self._bias: float = model["bias"]
+        self._weights: dict[str, float] = model["weights"]
+
+    def probability(self, text: str) -> float:
+        """Model probability that the message is a bypass attempt."""
+        z = self._bias + sum(self._weights.get(f, 0.0) for f in extract_features(text))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def classify(self, text: str, use_model: bool = True) -> ClassifierResult:
+        """Decide a message locally, or escalate it, and record the outcome.
+
+        Args:
+            text: Message to screen.
+            use_model: Whether to consult the linear model after the patterns. Disable for
+                inputs unlike chat messages (e.g. code), where its scores are meaningless.
+        """
+        result = self._classify(text.strip(), use_model)
+        self.stats.record(result)
+        return result
+
+    def _classify(self, text: str, use_model: bool) -> ClassifierResult:
+        if not text:
+            return ClassifierResult(GuardrailVerdict.ALLOW, 0.0, "pattern")
+        if any(p.search(text) for p in self._block):
+            return ClassifierResult(GuardrailVerdict.BLOCK, 1.0, "pattern")
+        if any(p.match(text) for p in self._allow):
+            return ClassifierResult(GuardrailVerdict.ALLOW, 0.0, "pattern")
+        if not use_model:
+            return ClassifierResult(GuardrailVerdict.ESCALATE, 0.5, "pattern")
+
+        probability = self.probability(text)
+        if 1.0 - probability >= self.threshold:
+            return ClassifierResult(GuardrailVerdict.ALLOW, probability, "model")
+        return ClassifierResult(GuardrailVerdict.ESCALATE, probability, "model")
+
+
+def load_guardrail_classifier(
+    path: Path = DEFAULT_MODEL_PATH,
+) -> GuardrailClassifier | None:
+    """Load the classifier resource using the configured threshold.
+
+    Returns:
+        The classifier, or None when disabled or the resource cannot be read, in which
+        case every message goes to the LLM guardrail as before.
+    """
+    if not settings.GUARDRAIL_CLASSIFIER_ENABLED:
+        return None
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            model = cast(GuardrailModel, json.load(f))
+        return GuardrailClassifier(model, threshold=settings.GUARDRAIL_CLASSIFIER_THRESHOLD)
+    except Exception as e:
+        logger.error(f"Failed to load guardrail classifier from {path}: {e}")
+        return None
+
+
+# Singleton instance
+guardrail_classifier = load_guardrail_classifier()
+
+
+def get_guardrail_classifier(config: RunnableConfig) -> GuardrailClassifier | None:
+    """The shared classifier, unless the run turns it off.
+
+    Agents set `guardrail_classifier` in config['configurable'] to False to send every
+    message to the LLM guardrail.
+    """
+    configurable = config.get("configurable", {})
+    if configurable.get("guardrail_classifier") is False:
+        return None
+    return guardrail_classifier
@@ -5,7 +5,7 @@ from agents.base import BaseAgent
 from core.types import AgentConfig
 from database.session import dbsessionmanager
 from services.gemini_service import gemini_service
-from services.lesson_service import LessonContextService
+from services.lesson_service import lesson_context_service
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +28,6 @@ class AgentManager:
         # Discover agents dynamically
         agent_registry.discover_agents()
 
-        # Initialize shared services
-        lesson_service = LessonContextService()
-
         # Initialize all discovered agents
         initialized_count = 0
         for agent_id in agent_registry.get_all_agent_ids():
@@ -40,7 +37,7 @@ class AgentManager:
             agent_instance = agent_class(
                 gemini_service=gemini_service,
                 db_manager=dbsessionmanager,
-                lesson_service=lesson_service,
+                lesson_service=lesson_context_service,
             )
 
             self._agent_instances[agent_id] = agent_instance
@@ -15,8 +15,10 @@ from agents.manager import agent_manager
 from agents.orchestrator.nodes.command_parser import parse_command_node
 from agents.orchestrator.nodes.delegation_executor import delegate_to_agent_node
 from agents.orchestrator.nodes.delegation_router import route_to_agent_node
+from agents.orchestrator.routing import Route, resolve_route
 from agents.orchestrator.state import OrchestratorState
 from agents.prompt_templates import PromptTemplates
+from core.config import settings
 
 if TYPE_CHECKING:
     from database.session import DBSessionManager
@@ -34,6 +36,7 @@ class OrchestratorAgent(BaseAgent):
     - User messages enter through chat() method
     - State is created with message + db + thread_id
     - Graph routes through: parse_command -> route_agent -> delegate
+    - Streaming routes with the same logic as plain code unless graph_routing is set
     - All context flows through OrchestratorState (no instance vars)
     - Pure functional nodes make testing and debugging easier
     """
@@ -49,8 +52,19 @@ class OrchestratorAgent(BaseAgent):
         gemini_service: "GeminiService",
         db_manager: "DBSessionManager",
         lesson_service: "LessonContextService",
+        graph_routing: bool = settings.ORCHESTRATOR_GRAPH_ROUTING,
     ) -> None:
+        """Initialize the orchestrator.
+
+        Args:
+            gemini_service: Injected Gemini service.
+            db_manager: Injected database session manager.
+            lesson_service: Injected lesson context service.
+            graph_routing: Route streaming requests through the graph instead of the
+                direct dispatcher.
+        """
         super().__init__(gemini_service, db_manager, lesson_service)
+        self.graph_routing: bool = graph_routing
         # Note: graph is not initialized here - it's set in initialize()
         # Type checker knows it will be set before use
 
@@ -93,8 +107,28 @@ class OrchestratorAgent(BaseAgent):
 
         return workflow
 
+    @staticmethod
+    def _initial_state(thread_id: str, message: str, db: AsyncSession) -> OrchestratorState:
+        return {
+            # User input
+            "messages": [],  # TODO: Load conversation history in Phase 5
+            "current_message": message,
+            # Execution context
+            "db": db,
+            "thread_id": thread_id,
+            # Processing state (will be filled by nodes)
+            "detected_command": None,
+            "clean_message": message,
+            "selected_agent_id": None,
+            "delegation_context": {},
+            "delegated_response": None,
+            "final_response": "",
+        }
+
     @override
-    async def chat(self, thread_id: str, message: str, db: AsyncSession) -> str:
+    async def chat(
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
+    ) -> str:
         """Process a message through the orchestrator.
 
         Flow:
@@ -106,27 +140,14 @@ class OrchestratorAgent(BaseAgent):
             thread_id: Conversation thread identifier
             message: User's message (may contain /command)
             db: Database session for delegated agents
+            system_context: Unused; the orchestrator builds its own delegation prompt
 
         Returns:
             Response from the delegated agent
         """
 
         # Create initial state with all context
-        initial_state: OrchestratorState = {
-            # User input
-            "messages": [],  # TODO: Load conversation history in Phase 5
-            "current_message": message,
-            # Execution context
-            "db": db,
-            "thread_id": thread_id,
-            # Processing state (will be filled by nodes)
-            "detected_command": None,
-            "clean_message": message,
-            "selected_agent_id": None,
-            "delegation_context": {},
-            "delegated_response": None,
-            "final_response": "",
-        }
+        initial_state = self._initial_state(thread_id, message, db)
 
         # Run the graph
         result = await self.graph.ainvoke(initial_state)  # pyright: ignore[reportUnknownMemberType]
@@ -136,63 +157,42 @@ class OrchestratorAgent(BaseAgent):
 
     @override
     async def chat_stream(
-        self, thread_id: str, message: str, db: AsyncSession
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
     ) -> AsyncIterator[str]:
         """Process a message and stream response through the delegated agent.
 
-        This implementation:
-        1. Runs the specialized streaming graph which interrupts before delegation.
-        2. Extract the routing result from the interrupted state.
-        3. Calls the delegated agent's chat_stream method manually.
+        Routing is a command parse plus a registry lookup, so by default it runs as plain
+        code (`resolve_route`) rather than compiling a graph run per message. The
+        specialized streaming graph, which interrupts before delegation, is only used
+        when `graph_routing` is enabled for routing policies that need graph state.
+        The delegated agent's chat_stream is then called directly.
         """
-        # Create initial state
-        initial_state: OrchestratorState = {
-            "messages": [],
-            "current_message": message,
-            "db": db,
-            "thread_id": thread_id,
-            "detected_command": None,
-            "clean_message": message,
-            "selected_agent_id": None,
-            "delegation_context": {},
-            "delegated_response": None,
-            "final_response": "",
-        }
-
         try:
-            # Run the graph until the 'delegate' node
-            result = await self.streaming_graph.ainvoke(initial_state)  # pyright: ignore[reportUnknownMemberType]
-            # cast to OrchestratorState as ainvoke returns Any
-            result_state = cast(OrchestratorState, result)
-
-            agent_id = result_state.get("selected_agent_id")
-            clean_message = result_state.get("clean_message", message)
+            if self.graph_routing:
+                route = await self._route_with_graph(thread_id, message, db)
+            else:
+                route = resolve_route(message)
 
-            if not agent_id:
+            if route is None:
                 yield "No agent selected. Please try again."
                 return
 
             # Get the agent instance
-            agent = agent_manager.get_agent(agent_id)
+            agent = agent_manager.get_agent(route.agent_id)
 
             # Get agent configuration for prompt generation
-            config = agent_registry.get_config(agent_id)
+            config = agent_registry.get_config(route.agent_id)
 
-            # Format conversation history
-            messages = result_state.get("messages", [])
-            conversation_history = PromptTemplates.format_conversation_history(messages)
+            # Generate system prompt. The conversation context stays empty: the delegated
+            # agent already loads this thread's history from its own checkpointer.
+            system_prompt = PromptTemplates.generate_delegation_prompt(agent_config=config)
 
-            # Generate system prompt
-            system_prompt = PromptTemplates.generate_delegation_prompt(
-                agent_config=config,
-                user_message=clean_message,
-                conversation_context=conversation_history,
-            )
-
-            # Stream from the delegated agent
-            enhanced_message = f"{system_prompt}\n\nUser request: {clean_message}"
+            # Stream from the delegated agent, keeping the system prompt out of its history
             async for token in agent.chat_stream(
-                thread_id=thread_id, message=enhanced_message, db=db
+                thread_id=thread_id,
+                message=route.clean_message,
+                db=db,
+                system_context=system_prompt,
             ):
                 yield token
 
@@ -200,6 +200,23 @@ class OrchestratorAgent(BaseAgent):
             logger.error(f"Error in orchestrator streaming: {e}")
             yield f"Error processing your request: {str(e)}"
 
+    async def _route_with_graph(
+        self, thread_id: str, message: str, db: AsyncSession
+    ) -> Route | None:
+        """Route by running the streaming graph until the 'delegate' node."""
+        result = await self.streaming_graph.ainvoke(self._initial_state(thread_id, message, db))  # pyright: ignore[reportUnknownMemberType]
+        # cast to OrchestratorState as ainvoke returns Any
+        result_state = cast(OrchestratorState, result)
+
+        agent_id = result_state.get("selected_agent_id")
+        if not agent_id:
+            return None
+        return Route(
+            agent_id=agent_id,
+            command=result_state.get("detected_command"),
+            clean_message=result_state.get("clean_message", message),
+        )
+
     @override
     async def close(self) -> None:
         """Cleanup resources.
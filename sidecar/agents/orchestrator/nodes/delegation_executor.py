@@ -42,7 +42,6 @@ async def delegate_to_agent_node(state: OrchestratorState) -> PartialOrchestrato
         # Generate system prompt
         system_prompt = PromptTemplates.generate_delegation_prompt(
             agent_config=config,
-            user_message=clean_message,
             conversation_context=conversation_history,
         )
 
@@ -50,10 +49,10 @@ async def delegate_to_agent_node(state: OrchestratorState) -> PartialOrchestrato
             f"Delegating to agent '{agent_id}' with context length: {len(conversation_history)}"
         )
 
-        # Call the agent
-        # Note: We'll prepend the system prompt to the message
-        enhanced_message = f"{system_prompt}\n\nUser request: {clean_message}"
-        response = await agent.chat(thread_id=thread_id, message=enhanced_message, db=db)
+        # Call the agent, keeping the system prompt out of its conversation history
+        response = await agent.chat(
+            thread_id=thread_id, message=clean_message, db=db, system_context=system_prompt
+        )
 
         return {"delegated_response": response, "final_response": response}
 
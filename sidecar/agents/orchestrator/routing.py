@@ -0,0 +1,49 @@
+"""Plain-code routing shared by the orchestrator graph nodes and the streaming fast path."""
+
+import logging
+from typing import NamedTuple
+
+from agents.agent_registry import agent_registry
+from agents.command_detector import CommandDetector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AGENT_ID = "teacher"
+
+
+class Route(NamedTuple):
+    """Where a message goes and what is sent there."""
+
+    agent_id: str
+    command: str | None
+    clean_message: str
+    notice: str | None = None  # Set when an unknown command fell back to the default agent
+
+
+def select_agent(command: str | None) -> tuple[str, str | None]:
+    """Pick the agent for a detected command.
+
+    Returns:
+        (agent_id, notice) where notice explains a fallback for unknown commands.
+    """
+    if command:
+        agent_class = agent_registry.get_agent_by_command(command)
+        if agent_class:
+            logger.info(f"Routing to agent '{agent_class.agent_id}' via command '/{command}'")
+            return agent_class.agent_id, None
+
+        logger.warning(f"Unknown command: /{command}")
+        return DEFAULT_AGENT_ID, f"Unknown command '/{command}'. Using general tutor."
+
+    # TODO: Add intent classification here
+    logger.info("No command detected, routing to teacher agent")
+    return DEFAULT_AGENT_ID, None
+
+
+def resolve_route(message: str) -> Route:
+    """Parse and route a message without running the orchestrator graph."""
+    parsed = CommandDetector.parse(message)
+    command = parsed.command if parsed.has_command else None
+    clean_message = (parsed.remaining_message or message) if command else message
+    agent_id, notice = select_agent(command)
+    return Route(agent_id, command, clean_message, notice)
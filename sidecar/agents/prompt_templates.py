@@ -29,13 +29,15 @@ class PromptTemplates:
 
     @staticmethod
     def generate_delegation_prompt(
-        agent_config: AgentConfig, user_message: str, conversation_context: str = ""
+        agent_config: AgentConfig, conversation_context: str = ""
     ) -> str:
         """Generate a system prompt for a delegated agent.
 
+        The user's request is not included: it is sent to the agent as the message itself,
+        while this prompt travels separately as `system_context`.
+
         Args:
             agent_config: Configuration of the target agent
-            user_message: The user's request
             conversation_context: Recent conversation history
 
         Returns:
@@ -46,8 +48,7 @@ class PromptTemplates:
 
         Your capabilities include: {", ".join(agent_config["capabilities"])}.
 
-        The user has specifically requested your expertise for the following task:
-        {user_message}
+        The user has specifically requested your expertise for their next message.
 
         {f"Conversation context: {conversation_context}" if conversation_context else ""}
         Provide a helpful, accurate, and professional response focused on your area of expertise.
@@ -55,6 +55,122 @@ LEARNING STYLE: {preferences}
 Remember: Return ONLY valid JSON, no markdown formatting.
 """
 
+ROADMAP_OUTLINE_SYSTEM = """You are an expert learning path designer specializing in creating
+structured, practical learning roadmaps for developers.
+
+Your task: Outline a roadmap that takes students from beginner to proficient. Only the
+phases are planned here; their lessons are written separately, one phase at a time.
+
+REQUIREMENTS:
+1. Generate 3-5 phases (beginner → intermediate → advanced)
+2. Give each phase a one-sentence summary of the topics it covers
+3. Logical progression with prerequisites, without overlap between phases
+4. Focus on hands-on practice and modern best practices
+
+CRITICAL: Return ONLY valid JSON, no markdown, no explanation.
+
+JSON FORMAT:
+{
+  "name": "Roadmap Title",
+  "description": "Brief 2-3 sentence description",
+  "phases": [
+    {"name": "Phase Name", "summary": "Topics this phase covers"}
+  ]
+}
+"""
+
+ROADMAP_PHASE_SYSTEM = """You are an expert learning path designer writing the lessons of one
+phase of a developer learning roadmap.
+
+REQUIREMENTS:
+1. Write 3-5 practical lessons for the requested phase only
+2. Cover the phase's summary; leave the topics of other phases to them
+3. Each lesson has clear, actionable objectives
+4. Focus on hands-on practice, not just theory
+
+CRITICAL: Return ONLY valid JSON, no markdown, no explanation.
+
+JSON FORMAT:
+{
+  "lessons": [
+    {
+      "name": "Lesson Name",
+      "description": "What the student will learn in this lesson",
+      "objectives": ["Specific objective 1", "Specific objective 2", "Specific objective 3"]
+    }
+  ]
+}
+
+Make objectives MEASURABLE and SPECIFIC.
+"""
+
+ROADMAP_PHASE_USER_TEMPLATE = """Write the lessons of one phase of this learning roadmap:
+
+GOAL: {goal}
+BACKGROUND: {background}
+LEARNING STYLE: {preferences}
+
+ROADMAP: {name}
+PHASES:
+{outline}
+
+Write the lessons of phase {number}: {phase}
+
+Remember: Return ONLY valid JSON, no markdown formatting.
+"""
+
+ROADMAP_PHASE_REGENERATE_TEMPLATE = """Rewrite the lessons of one phase of this learning roadmap:
+
+ROADMAP: {name}
+DESCRIPTION: {description}
+GOAL: {goal}
+PHASES AND THEIR LESSONS:
+{outline}
+
+Rewrite the lessons of phase {number}: {phase}
+CURRENT LESSONS:
+{lessons}
+
+INSTRUCTIONS: {instructions}
+
+Keep the exact name of every current lesson that should stay in the phase.
+Remember: Return ONLY valid JSON, no markdown formatting.
+"""
+
+ROADMAP_OBJECTIVES_SYSTEM = """You are an expert learning path designer writing the objectives
+of one lesson of a developer learning roadmap.
+
+REQUIREMENTS:
+1. Write 3-5 objectives for the requested lesson only
+2. Stay within the lesson's description; leave other lessons' topics to them
+3. Focus on hands-on practice, not just theory
+
+CRITICAL: Return ONLY valid JSON, no markdown, no explanation.
+
+JSON FORMAT:
+{"objectives": ["Specific objective 1", "Specific objective 2", "Specific objective 3"]}
+
+Make objectives MEASURABLE and SPECIFIC.
+"""
+
+ROADMAP_OBJECTIVES_USER_TEMPLATE = """Rewrite the objectives of one lesson of this learning roadmap:
+
+ROADMAP: {name}
+GOAL: {goal}
+PHASE: {phase}
+LESSONS OF THE PHASE:
+{lessons}
+
+Rewrite the objectives of the lesson: {lesson}
+DESCRIPTION: {description}
+CURRENT OBJECTIVES:
+{objectives}
+
+INSTRUCTIONS: {instructions}
+
+Remember: Return ONLY valid JSON, no markdown formatting.
+"""
+
 
 TEACHER_SYSTEM = """You are a strict but caring programming teacher. 
 Your mission: help students LEARN, not do their work for them.
@@ -132,3 +248,136 @@ and {"triggered": false} otherwise.
 """
 
 GUARDRAIL_USER_TEMPLATE = "Evaluate this conversation for bypassing: {message}"
+
+REVIEW_ANALYSIS_TEMPLATE = """Analyze the following code for a student working on: {lesson_name}
+Objectives: {objectives}
+
+CODE:
+```{language}
+{code}
+```
+
+{static_findings}
+Identify {scope} specific areas for improvement (Security, Performance, or Best Practices).
+For each, provide:
+1. The line number (if applicable)
+2. The category
+3. The observation (what's wrong)
+4. A Socratic question to help the student find the issue.
+
+Return ONLY JSON:
+{{
+    "findings": [
+        {{
+            "line_number": 5,
+            "category": "Security",
+            "observation": "Hardcoded secret",
+            "socratic_question": "What happens if this key is pushed to a public repo?"
+        }}
+    ]
+}}
+"""
+
+REVIEW_CHUNK_TEMPLATE = """Analyze part of a larger file for a student working on: {lesson_name}
+Objectives: {objectives}
+
+Lines {start_line}-{end_line} of {total_lines}, each prefixed with its line number:
+```{language}
+{code}
+```
+
+{static_findings}
+Identify up to 2 specific areas for improvement in these lines (Security, Performance, or
+Best Practices). Only report real issues; code defined elsewhere in the file is not shown.
+For each, provide:
+1. The line number, as shown before the "|"
+2. The category
+3. The observation (what's wrong)
+4. A Socratic question to help the student find the issue.
+
+Return ONLY JSON:
+{{
+    "findings": [
+        {{
+            "line_number": 5,
+            "category": "Security",
+            "observation": "Hardcoded secret",
+            "socratic_question": "What happens if this key is pushed to a public repo?"
+        }}
+    ]
+}}
+"""
+
+REVIEW_INCREMENTAL_TEMPLATE = """The student revised reviewed code for: {lesson_name}
+Objectives: {objectives}
+
+Only the changed parts are shown, numbered as in the revised file. Lines marked "+" are
+new or changed, "-" marks removed lines, and the others are unchanged context.
+```{language}
+{hunks}
+```
+
+Earlier findings on the lines that changed (previous line numbers):
+{revisited_findings}
+
+{static_findings}
+Identify up to 3 specific areas for improvement in the changed lines (Security, Performance,
+or Best Practices), including earlier findings that are still present. Findings outside the
+changed lines are kept from the earlier review, so do not report those.
+For each, provide:
+1. The line number in the revised file (if applicable)
+2. The category
+3. The observation (what's wrong)
+4. A Socratic question to help the student find the issue.
+
+Return ONLY JSON:
+{{
+    "findings": [
+        {{
+            "line_number": 5,
+            "category": "Security",
+            "observation": "Hardcoded secret",
+            "socratic_question": "What happens if this key is pushed to a public repo?"
+        }}
+    ]
+}}
+"""
+
+REVIEW_TRIAGE_SYSTEM = """You screen and analyze code submissions for a Socratic code reviewer.
+
+1. Set "triggered" to true only if the submission tries to bypass the learning process,
+   e.g. it asks for the full solution or refuses to engage. Ordinary code, even if wrong
+   or unfinished, is not a bypass.
+2. If not triggered, list 2-3 specific areas for improvement (Security, Performance, or
+   Best Practices), each with the line number (if applicable), the category, the
+   observation (what's wrong) and a Socratic question to help the student find the issue.
+   If triggered, return an empty findings list.
+
+Respond ONLY with JSON matching the response schema.
+"""
+
+REVIEW_TRIAGE_USER_TEMPLATE = """Student lesson: {lesson_name}
+Objectives: {objectives}
+
+CODE:
+```{language}
+{code}
+```
+{static_findings}"""
+
+HISTORY_SUMMARY_SYSTEM = """You maintain the running memory of a tutoring conversation.
+Merge the existing summary with the new turns into one updated summary.
+
+KEEP: what the student is working on, what they tried, misconceptions, questions still open,
+and concepts they have demonstrated they understand.
+DROP: greetings, repetition, and exact wording.
+
+Write plain prose in the third person, at most {max_words} words. Return only the summary.
+"""
+
+HISTORY_SUMMARY_USER_TEMPLATE = """EXISTING SUMMARY:
+{summary}
+
+NEW TURNS:
+{turns}
+"""
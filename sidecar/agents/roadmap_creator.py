@@ -1,30 +1,81 @@
 """Roadmap Creator Agent - Generates learning roadmaps."""
 
+import asyncio
 import json
 import logging
+import time
 import uuid
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
 
 from pydantic import ValidationError
+from sqlalchemy import ColumnElement, delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from agents.prompts import ROADMAP_CREATOR_SYSTEM, ROADMAP_CREATOR_USER_TEMPLATE
+from agents.prompts import (
+    ROADMAP_CREATOR_SYSTEM,
+    ROADMAP_CREATOR_USER_TEMPLATE,
+    ROADMAP_OBJECTIVES_SYSTEM,
+    ROADMAP_OBJECTIVES_USER_TEMPLATE,
+    ROADMAP_OUTLINE_SYSTEM,
+    ROADMAP_PHASE_REGENERATE_TEMPLATE,
+    ROADMAP_PHASE_SYSTEM,
+    ROADMAP_PHASE_USER_TEMPLATE,
+)
+from core.config import settings
+from core.exceptions import StructuredOutputError
+from core.json_stream import JSONStreamParser
 from core.types import (
     LessonStatus,
     RoadmapAIError,
     RoadmapError,
+    RoadmapNotFoundError,
     RoadmapStatus,
     RoadmapValidationError,
 )
-from database.models import Lesson, Phase, Roadmap
-from schemas.domain import RoadmapCreateResult, RoadmapStructure
+from database.models import CodeReview, CodeReviewFinding, Lesson, Phase, ReviewJob, Roadmap
+from schemas.domain import (
+    LessonObjectivesStructure,
+    LessonRead,
+    LessonStructure,
+    PhaseLessonsStructure,
+    PhaseReadDetailed,
+    PhaseStructure,
+    RoadmapCreateResult,
+    RoadmapOutlineStructure,
+    RoadmapStructure,
+)
+from services.checkpoint_maintenance import checkpoint_compactor
 from services.gemini_service import gemini_service
+from services.lesson_service import lesson_context_service
+from services.rate_limiter import RequestPriority
+from services.review_cache import invalidate_review_cache
+from services.roadmap_writer import RoadmapRows, insert_phases, insert_roadmap
 
 logger = logging.getLogger(__name__)
 
+RoadmapEvent = dict[str, object]
+
 
 class RoadmapCreatorAgent:
     """Agent for creating structured learning roadmaps."""
 
+    def __init__(
+        self,
+        phase_expansion: bool = settings.ROADMAP_PHASE_EXPANSION,
+        phase_concurrency: int = settings.ROADMAP_PHASE_CONCURRENCY,
+    ) -> None:
+        """Initialize the roadmap creator.
+
+        Args:
+            phase_expansion: Generate an outline of the phases, then the lessons of each
+                phase concurrently, instead of the whole roadmap in one request.
+            phase_concurrency: Maximum phases expanded at the same time.
+        """
+        self.phase_expansion: bool = phase_expansion
+        self.phase_concurrency: int = phase_concurrency
+
     async def create_roadmap(
         self, goal: str, background: str, preferences: str, db: AsyncSession
     ) -> RoadmapCreateResult:
@@ -42,97 +93,598 @@ class RoadmapCreatorAgent:
         Raises:
             RoadmapError: If inputs are invalid or generation fails
         """
-        # Input Validation
-        if not goal or len(goal.strip()) < 10:
-            raise RoadmapError("Goal must be at least 10 characters long")
-        if not background or len(background.strip()) < 3:
-            raise RoadmapError("Background must be at least 3 characters long")
+        self._validate_inputs(goal, background)
 
-        response = ""
         try:
-            # 1. Generate roadmap structure using Gemini
+            # 1. Generate the roadmap structure, constrained to its schema and validated
             logger.info(f"Generating roadmap for goal: {goal}")
 
-            user_prompt = ROADMAP_CREATOR_USER_TEMPLATE.format(
-                goal=goal, background=background, preferences=preferences
-            )
+            if self.phase_expansion:
+                roadmap_structure = await self._generate_expanded(goal, background, preferences)
+            else:
+                try:
+                    roadmap_structure = await gemini_service.generate_structured(
+                        prompt=self._prompt(goal, background, preferences),
+                        schema=RoadmapStructure,
+                        system_instruction=ROADMAP_CREATOR_SYSTEM,
+                        priority=RequestPriority.BACKGROUND,
+                    )
+                except StructuredOutputError as e:
+                    raise RoadmapValidationError(
+                        "Generated roadmap structure is invalid: "
+                        + f"{e.details.get('validation_error')}"
+                    ) from e
 
-            response = await gemini_service.generate_content(
-                prompt=user_prompt, system_instruction=ROADMAP_CREATOR_SYSTEM
-            )
+            # 2. Insert the roadmap, its phases and its lessons in one transaction
+            roadmap_id, rows = await insert_roadmap(db, roadmap_structure, goal)
+            await db.commit()
+            lesson_context_service.invalidate(*rows.lesson_ids)
+
+            logger.info(f"Successfully created roadmap: {roadmap_id}")
+
+            return RoadmapCreateResult(roadmap_id=roadmap_id, roadmap=roadmap_structure)
+
+        except RoadmapError:
+            await db.rollback()
+            raise
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Unexpected error creating roadmap: {e}")
+            raise RoadmapError(f"An unexpected error occurred: {e}") from e
+
+    async def stream_roadmap(
+        self, goal: str, background: str, preferences: str, db: AsyncSession
+    ) -> AsyncGenerator[RoadmapEvent, None]:
+        """Create a new roadmap, storing each phase as soon as the model has written it.
+
+        The roadmap row is committed with the `generating` status once its name and
+        description are known, then every complete phase is committed with its lessons.
+        With phase expansion they are known from the outline, and phases are stored in
+        the order their lessons finish generating; otherwise the single response is
+        parsed while it streams, and phases are stored in order. Events:
+
+        - `roadmap`: the roadmap was stored (`roadmap_id`, `name`, `description`)
+        - `phase`: a phase and its lessons were stored (`phase`, as read from the API,
+          whose `order_num` is its position in the roadmap)
+        - `done`: the roadmap is active (`roadmap_id`, `phases`, `lessons`)
+
+        If generation fails, or the consumer abandons the stream, whatever was stored is
+        deleted. Roadmaps left `generating` by a crash are deleted at startup by
+        `discard_unfinished`.
+
+        Raises:
+            RoadmapError: If inputs are invalid or generation fails
+        """
+        self._validate_inputs(goal, background)
+        if self.phase_expansion:
+            async with aclosing(self._stream_expanded(goal, background, preferences, db)) as events:
+                async for event in events:
+                    yield event
+            return
 
-            # 2. Robust JSON extraction
-            # Extract the outermost JSON object
-            start = response.find("{")
-            end = response.rfind("}")
-            if start == -1 or end == -1 or end < start:
-                logger.error(f"Could not find JSON delimiters in Gemini response: {response}")
-                raise RoadmapAIError("Failed to find JSON structure in AI response")
+        parser = JSONStreamParser()
+        header: dict[str, str] = {}
+        pending: list[PhaseStructure] = []
+        phases: list[PhaseStructure] = []
+        roadmap: Roadmap | None = None
+        lesson_count = 0
+        try:
+            logger.info(f"Streaming roadmap for goal: {goal}")
+            stream = gemini_service.generate_content_stream(
+                prompt=self._prompt(goal, background, preferences),
+                system_instruction=ROADMAP_CREATOR_SYSTEM,
+                priority=RequestPriority.BACKGROUND,
+                response_schema=RoadmapStructure,
+            )
+            async for chunk in stream:
+                for path, value in parser.feed(chunk):
+                    if path in (("name",), ("description",)) and isinstance(value, str):
+                        header[str(path[0])] = value
+                    elif path == ("phases", len(phases) + len(pending)):
+                        pending.append(self._validate_phase(value))
 
-            response_json = response[start : end + 1]
-            roadmap_data = json.loads(response_json)  # pyright: ignore[reportAny]
+                # The description may be missing or follow the phases
+                if roadmap is None and "name" in header and ("description" in header or pending):
+                    roadmap = await self._store_header(goal, header, db)
+                    yield {
+                        "event": "roadmap",
+                        "roadmap_id": roadmap.id,
+                        "name": roadmap.name,
+                        "description": roadmap.description,
+                    }
+                if roadmap is not None and pending:
+                    rows = await insert_phases(db, roadmap.id, pending, len(phases) + 1)
+                    await db.commit()
+                    lesson_context_service.invalidate(*rows.lesson_ids)
+                    phases.extend(pending)
+                    pending.clear()
+                    lesson_count += len(rows.lessons)
+                    for phase in self._read_phases(rows):
+                        yield {"event": "phase", "roadmap_id": roadmap.id, "phase": phase}
 
-            # 3. Validate with Pydantic
+            if not parser.done:
+                logger.error("Roadmap stream ended before its JSON was complete")
+                raise RoadmapAIError("AI returned an incomplete roadmap")
             try:
-                roadmap_structure = RoadmapStructure.model_validate(roadmap_data)
+                _ = RoadmapStructure.model_validate({**header, "phases": phases})
             except ValidationError as e:
                 logger.error(f"Validation error for generated roadmap: {e}")
                 raise RoadmapValidationError(f"Generated roadmap structure is invalid: {e}") from e
+            assert roadmap is not None
 
-            # 4. Create database records
-            roadmap = Roadmap(
-                id=str(uuid.uuid4()),
-                name=roadmap_structure.name,
-                description=roadmap_structure.description,
-                goal=goal,
-                status=RoadmapStatus.ACTIVE,
-            )
-            db.add(roadmap)
+            roadmap.status = RoadmapStatus.ACTIVE
+            await db.commit()
+            logger.info(f"Successfully streamed roadmap: {roadmap.id}")
+            yield {
+                "event": "done",
+                "roadmap_id": roadmap.id,
+                "phases": len(phases),
+                "lessons": lesson_count,
+            }
 
-            # 5. Create phases and lessons
-            for phase_idx, phase_data in enumerate(roadmap_structure.phases):
-                phase = Phase(
-                    id=str(uuid.uuid4()),
-                    roadmap_id=roadmap.id,
-                    name=phase_data.name,
-                    order_num=phase_idx + 1,
-                    status=LessonStatus.NOT_STARTED,
-                )
-                db.add(phase)
-
-                for lesson_idx, lesson_data in enumerate(phase_data.lessons):
-                    lesson = Lesson(
-                        id=str(uuid.uuid4()),
-                        phase_id=phase.id,
-                        name=lesson_data.name,
-                        description=lesson_data.description,
-                        objectives=lesson_data.objectives,
-                        order_num=lesson_idx + 1,
-                        status=LessonStatus.NOT_STARTED,
-                        metadata_json={},
-                    )
-                    db.add(lesson)
+        except Exception as e:
+            await self._abandon(roadmap, db)
+            if isinstance(e, RoadmapError):
+                raise
+            if isinstance(e, json.JSONDecodeError):
+                logger.error(f"Failed to parse streamed roadmap as JSON: {e}")
+                raise RoadmapAIError("AI returned invalid JSON structure") from e
+            logger.error(f"Unexpected error streaming roadmap: {e}")
+            raise RoadmapError(f"An unexpected error occurred: {e}") from e
+        except BaseException:
+            # The consumer went away mid-stream (disconnect or cancellation)
+            await self._abandon(roadmap, db)
+            raise
 
-            # 6. Commit to database
+    async def discard_unfinished(self, db: AsyncSession) -> int:
+        """Delete every roadmap still `generating`, with its phases and lessons.
+
+        Only call this when no roadmap is being streamed, e.g. at startup: such a
+        roadmap was then left behind by a stream that never finished.
+
+        Returns:
+            The number of roadmaps deleted
+        """
+        deleted = await self._discard(Roadmap.status == RoadmapStatus.GENERATING, db)
+        if deleted:
+            logger.info(f"Deleted {deleted} unfinished roadmap(s)")
+        return deleted
+
+    async def regenerate_phase(
+        self, phase_id: str, db: AsyncSession, instructions: str | None = None
+    ) -> PhaseReadDetailed:
+        """Regenerate the lessons of one phase, with the rest of the roadmap as context.
+
+        The phase is updated in place. A generated lesson named like a current one
+        (ignoring case and surrounding whitespace) updates that lesson, keeping its id
+        and progress; other generated lessons are added and current lessons left out are
+        deleted, together with their reviews and chat history.
+
+        Raises:
+            RoadmapNotFoundError: If the phase does not exist
+            RoadmapError: If generation fails
+        """
+        roadmap = await self._load_roadmap(Phase.id == phase_id, db)
+        phases = sorted(roadmap.phases, key=lambda p: p.order_num)
+        phase = next(p for p in phases if p.id == phase_id)
+        prompt = ROADMAP_PHASE_REGENERATE_TEMPLATE.format(
+            name=roadmap.name,
+            description=roadmap.description,
+            goal=roadmap.goal,
+            outline="\n".join(
+                f"{number}. {p.name}: " + "; ".join(lesson.name for lesson in self._ordered(p))
+                for number, p in enumerate(phases, start=1)
+            ),
+            number=phases.index(phase) + 1,
+            phase=phase.name,
+            lessons=self._lesson_list(self._ordered(phase)),
+            instructions=instructions or "None",
+        )
+
+        try:
+            generated = await gemini_service.generate_structured(
+                prompt=prompt,
+                schema=PhaseLessonsStructure,
+                system_instruction=ROADMAP_PHASE_SYSTEM,
+                priority=RequestPriority.INTERACTIVE,
+            )
+            changed, deleted = self._replace_lessons(phase, generated.lessons)
+            review_ids = await self._delete_reviews(deleted, db)
+            result = PhaseReadDetailed.model_validate(phase)
             await db.commit()
-            await db.refresh(roadmap)
+        except StructuredOutputError as e:
+            await db.rollback()
+            raise RoadmapValidationError(
+                f"Generated lessons of phase '{phase.name}' are invalid: "
+                + f"{e.details.get('validation_error')}"
+            ) from e
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Unexpected error regenerating phase {phase_id}: {e}")
+            raise RoadmapError(f"An unexpected error occurred: {e}") from e
 
-            logger.info(f"Successfully created roadmap: {roadmap.id}")
+        await self._invalidate([i for i in changed if i not in deleted], db)
+        lesson_context_service.invalidate(*deleted)
+        # Chats are threaded by lesson id, review runs by review id
+        _ = await checkpoint_compactor.delete_threads([*deleted, *review_ids])
+        result.lessons.sort(key=lambda lesson: lesson.order_num)
+        logger.info(f"Regenerated phase {phase_id}: {len(changed)} lessons changed")
+        return result
 
-            return RoadmapCreateResult(roadmap_id=roadmap.id, roadmap=roadmap_structure)
+    async def regenerate_objectives(
+        self, lesson_id: str, db: AsyncSession, instructions: str | None = None
+    ) -> LessonRead:
+        """Regenerate the objectives of one lesson, with its phase and roadmap as context.
+
+        Only the objectives change; the lesson keeps its id and progress.
+
+        Raises:
+            RoadmapNotFoundError: If the lesson does not exist
+            RoadmapError: If generation fails
+        """
+        roadmap = await self._load_roadmap(Lesson.id == lesson_id, db)
+        phase = next(p for p in roadmap.phases if any(le.id == lesson_id for le in p.lessons))
+        lesson = next(le for le in phase.lessons if le.id == lesson_id)
+        prompt = ROADMAP_OBJECTIVES_USER_TEMPLATE.format(
+            name=roadmap.name,
+            goal=roadmap.goal,
+            phase=phase.name,
+            lessons=self._lesson_list(self._ordered(phase)),
+            lesson=lesson.name,
+            description=lesson.description,
+            objectives="\n".join(f"- {objective}" for objective in lesson.objectives),
+            instructions=instructions or "None",
+        )
 
-        except json.JSONDecodeError as e:
+        try:
+            generated = await gemini_service.generate_structured(
+                prompt=prompt,
+                schema=LessonObjectivesStructure,
+                system_instruction=ROADMAP_OBJECTIVES_SYSTEM,
+                priority=RequestPriority.INTERACTIVE,
+            )
+            changed = generated.objectives != lesson.objectives
+            lesson.objectives = list(generated.objectives)
+            result = LessonRead.model_validate(lesson)
+            await db.commit()
+        except StructuredOutputError as e:
             await db.rollback()
-            logger.error(f"Failed to parse Gemini response as JSON: {e}")
-            logger.error(f"Raw response: {response}")
-            raise RoadmapAIError("AI returned invalid JSON structure") from e
-        except RoadmapError:
+            raise RoadmapValidationError(
+                f"Generated objectives of lesson '{lesson.name}' are invalid: "
+                + f"{e.details.get('validation_error')}"
+            ) from e
+        except Exception as e:
             await db.rollback()
+            logger.error(f"Unexpected error regenerating objectives of lesson {lesson_id}: {e}")
+            raise RoadmapError(f"An unexpected error occurred: {e}") from e
+
+        await self._invalidate([lesson_id] if changed else [], db)
+        logger.info(f"Regenerated objectives of lesson {lesson_id}")
+        return result
+
+    async def _generate_expanded(
+        self, goal: str, background: str, preferences: str
+    ) -> RoadmapStructure:
+        """Generate the outline, then the lessons of every phase concurrently.
+
+        If a phase fails, the expansion of the others is cancelled.
+        """
+        outline = await self._generate_outline(goal, background, preferences)
+        semaphore = asyncio.Semaphore(max(self.phase_concurrency, 1))
+        prompts = self._phase_prompts(goal, background, preferences, outline)
+
+        start = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._expand_phase(prompt, phase.name, semaphore))
+            for prompt, phase in zip(prompts, outline.phases, strict=True)
+        ]
+        try:
+            phases = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                _ = task.cancel()
+            _ = await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(
+            f"Expanded {len(phases)} phases in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return RoadmapStructure(
+            name=outline.name, description=outline.description, phases=list(phases)
+        )
+
+    async def _stream_expanded(
+        self, goal: str, background: str, preferences: str, db: AsyncSession
+    ) -> AsyncGenerator[RoadmapEvent, None]:
+        """`stream_roadmap` with phase expansion: each phase is stored as its lessons
+        arrive, while the others are still being generated."""
+        roadmap: Roadmap | None = None
+        tasks: list[asyncio.Task[tuple[int, PhaseStructure]]] = []
+        semaphore = asyncio.Semaphore(max(self.phase_concurrency, 1))
+
+        async def expand(index: int, prompt: str, name: str) -> tuple[int, PhaseStructure]:
+            return index, await self._expand_phase(prompt, name, semaphore)
+
+        try:
+            logger.info(f"Expanding roadmap for goal: {goal}")
+            outline = await self._generate_outline(goal, background, preferences)
+            prompts = self._phase_prompts(goal, background, preferences, outline)
+            tasks = [
+                asyncio.create_task(expand(index, prompt, phase.name))
+                for index, (prompt, phase) in enumerate(zip(prompts, outline.phases, strict=True))
+            ]
+
+            header = {"name": outline.name, "description": outline.description}
+            roadmap = await self._store_header(goal, header, db)
+            yield {
+                "event": "roadmap",
+                "roadmap_id": roadmap.id,
+                "name": roadmap.name,
+                "description": roadmap.description,
+            }
+
+            lesson_count = 0
+            for next_phase in asyncio.as_completed(tasks):
+                index, phase_data = await next_phase
+                rows = await insert_phases(db, roadmap.id, [phase_data], index + 1)
+                await db.commit()
+                lesson_context_service.invalidate(*rows.lesson_ids)
+                lesson_count += len(rows.lessons)
+                for phase in self._read_phases(rows):
+                    yield {"event": "phase", "roadmap_id": roadmap.id, "phase": phase}
+
+            roadmap.status = RoadmapStatus.ACTIVE
+            await db.commit()
+            logger.info(f"Successfully expanded roadmap: {roadmap.id}")
+            yield {
+                "event": "done",
+                "roadmap_id": roadmap.id,
+                "phases": len(tasks),
+                "lessons": lesson_count,
+            }
+
+        except RoadmapError:
+            await self._abandon(roadmap, db)
             raise
         except Exception as e:
-            await db.rollback()
-            logger.error(f"Unexpected error creating roadmap: {e}")
+            await self._abandon(roadmap, db)
+            logger.error(f"Unexpected error expanding roadmap: {e}")
             raise RoadmapError(f"An unexpected error occurred: {e}") from e
+        except BaseException:
+            # The consumer went away mid-stream (disconnect or cancellation)
+            await self._abandon(roadmap, db)
+            raise
+        finally:
+            for task in tasks:
+                _ = task.cancel()
+            _ = await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _generate_outline(
+        self, goal: str, background: str, preferences: str
+    ) -> RoadmapOutlineStructure:
+        try:
+            return await gemini_service.generate_structured(
+                prompt=self._prompt(goal, background, preferences),
+                schema=RoadmapOutlineStructure,
+                system_instruction=ROADMAP_OUTLINE_SYSTEM,
+                priority=RequestPriority.BACKGROUND,
+            )
+        except StructuredOutputError as e:
+            raise RoadmapValidationError(
+                f"Generated roadmap outline is invalid: {e.details.get('validation_error')}"
+            ) from e
+
+    @staticmethod
+    async def _expand_phase(prompt: str, name: str, semaphore: asyncio.Semaphore) -> PhaseStructure:
+        try:
+            async with semaphore:
+                phase = await gemini_service.generate_structured(
+                    prompt=prompt,
+                    schema=PhaseLessonsStructure,
+                    system_instruction=ROADMAP_PHASE_SYSTEM,
+                    priority=RequestPriority.BACKGROUND,
+                )
+        except StructuredOutputError as e:
+            raise RoadmapValidationError(
+                f"Generated lessons of phase '{name}' are invalid: "
+                + f"{e.details.get('validation_error')}"
+            ) from e
+        return PhaseStructure(name=name, lessons=phase.lessons)
+
+    @staticmethod
+    def _phase_prompts(
+        goal: str, background: str, preferences: str, outline: RoadmapOutlineStructure
+    ) -> list[str]:
+        """One prompt per phase; each lists the whole outline so phases do not overlap."""
+        phase_list = "\n".join(
+            f"{number}. {phase.name}" + (f": {phase.summary}" if phase.summary else "")
+            for number, phase in enumerate(outline.phases, start=1)
+        )
+        return [
+            ROADMAP_PHASE_USER_TEMPLATE.format(
+                goal=goal,
+                background=background,
+                preferences=preferences,
+                name=outline.name,
+                outline=phase_list,
+                number=number,
+                phase=phase.name,
+            )
+            for number, phase in enumerate(outline.phases, start=1)
+        ]
+
+    @staticmethod
+    async def _load_roadmap(condition: ColumnElement[bool], db: AsyncSession) -> Roadmap:
+        """The roadmap holding the phase or lesson matched by `condition`, with all of its
+        phases and lessons loaded."""
+        result = await db.execute(
+            select(Roadmap)
+            .join(Roadmap.phases)
+            .outerjoin(Phase.lessons)
+            .where(condition)
+            .options(selectinload(Roadmap.phases).selectinload(Phase.lessons))
+        )
+        roadmap = result.unique().scalar_one_or_none()
+        if roadmap is None:
+            raise RoadmapNotFoundError("Phase or lesson not found")
+        return roadmap
+
+    @staticmethod
+    def _ordered(phase: Phase) -> list[Lesson]:
+        return sorted(phase.lessons, key=lambda lesson: lesson.order_num)
+
+    @staticmethod
+    def _lesson_list(lessons: list[Lesson]) -> str:
+        return "\n".join(
+            f"- {lesson.name}" + (f": {lesson.description}" if lesson.description else "")
+            for lesson in lessons
+        )
+
+    @staticmethod
+    def _replace_lessons(
+        phase: Phase, generated: list[LessonStructure]
+    ) -> tuple[list[str], list[str]]:
+        """Make `generated` the lessons of `phase`, reusing current lessons by name.
+
+        Returns:
+            Ids of the lessons that were added, deleted, renamed or given new objectives
+            or descriptions, and ids of the deleted ones
+        """
+        current = {lesson.name.strip().casefold(): lesson for lesson in phase.lessons}
+        changed: list[str] = []
+        for order_num, lesson_data in enumerate(generated, start=1):
+            lesson = current.pop(lesson_data.name.strip().casefold(), None)
+            if lesson is None:
+                lesson = Lesson(
+                    id=str(uuid.uuid4()),
+                    phase_id=phase.id,
+                    name=lesson_data.name,
+                    description=lesson_data.description,
+                    objectives=list(lesson_data.objectives),
+                    order_num=order_num,
+                    status=LessonStatus.NOT_STARTED,
+                    time_spent=0,
+                    metadata_json={},
+                )
+                phase.lessons.append(lesson)
+                changed.append(lesson.id)
+                continue
+            if (lesson.name, lesson.description, lesson.objectives) != (
+                lesson_data.name,
+                lesson_data.description,
+                lesson_data.objectives,
+            ):
+                changed.append(lesson.id)
+            lesson.name = lesson_data.name
+            lesson.description = lesson_data.description
+            lesson.objectives = list(lesson_data.objectives)
+            lesson.order_num = order_num
+        deleted: list[str] = []
+        for lesson in current.values():
+            # delete-orphan removes the row on commit
+            phase.lessons.remove(lesson)
+            changed.append(lesson.id)
+            deleted.append(lesson.id)
+        return changed, deleted
+
+    @staticmethod
+    async def _delete_reviews(lesson_ids: list[str], db: AsyncSession) -> list[str]:
+        """Delete the reviews of deleted lessons with their findings and jobs, without
+        committing.
+
+        Returns:
+            Ids of the deleted reviews
+        """
+        if not lesson_ids:
+            return []
+        result = await db.execute(select(CodeReview.id).where(CodeReview.lesson_id.in_(lesson_ids)))
+        review_ids = list(result.scalars().all())
+        if review_ids:
+            _ = await db.execute(
+                delete(CodeReviewFinding).where(CodeReviewFinding.review_id.in_(review_ids))
+            )
+            _ = await db.execute(delete(ReviewJob).where(ReviewJob.review_id.in_(review_ids)))
+            _ = await db.execute(delete(CodeReview).where(CodeReview.id.in_(review_ids)))
+        return review_ids
+
+    @staticmethod
+    async def _invalidate(lesson_ids: list[str], db: AsyncSession) -> None:
+        """Drop cached contexts and stored reviews that describe the old lessons."""
+        lesson_context_service.invalidate(*lesson_ids)
+        _ = await invalidate_review_cache(db, lesson_ids)
+
+    @staticmethod
+    def _validate_inputs(goal: str, background: str) -> None:
+        if not goal or len(goal.strip()) < 10:
+            raise RoadmapError("Goal must be at least 10 characters long")
+        if not background or len(background.strip()) < 3:
+            raise RoadmapError("Background must be at least 3 characters long")
+
+    @staticmethod
+    def _prompt(goal: str, background: str, preferences: str) -> str:
+        return ROADMAP_CREATOR_USER_TEMPLATE.format(
+            goal=goal, background=background, preferences=preferences
+        )
+
+    @staticmethod
+    def _validate_phase(value: object) -> PhaseStructure:
+        try:
+            return PhaseStructure.model_validate(value)
+        except ValidationError as e:
+            logger.error(f"Validation error for generated phase: {e}")
+            raise RoadmapValidationError(f"Generated phase structure is invalid: {e}") from e
+
+    @staticmethod
+    def _read_phases(rows: RoadmapRows) -> list[dict[str, object]]:
+        """Inserted phases with their lessons, serialized like the roadmap API does."""
+        lessons: dict[object, list[dict[str, object]]] = {}
+        for lesson in rows.lessons:
+            lessons.setdefault(lesson["phase_id"], []).append(lesson)
+        return [
+            PhaseReadDetailed.model_validate(
+                {**phase, "lessons": lessons.get(phase["id"], [])}
+            ).model_dump(mode="json")
+            for phase in rows.phases
+        ]
+
+    @staticmethod
+    async def _store_header(goal: str, header: dict[str, str], db: AsyncSession) -> Roadmap:
+        roadmap = Roadmap(
+            id=str(uuid.uuid4()),
+            name=header["name"],
+            description=header.get("description"),
+            goal=goal,
+            status=RoadmapStatus.GENERATING,
+        )
+        db.add(roadmap)
+        await db.commit()
+        return roadmap
+
+    @classmethod
+    async def _abandon(cls, roadmap: Roadmap | None, db: AsyncSession) -> None:
+        """Roll back and delete whatever of a failed roadmap was already committed."""
+        await db.rollback()
+        if roadmap is not None:
+            _ = await cls._discard(Roadmap.id == roadmap.id, db)
+
+    @staticmethod
+    async def _discard(condition: ColumnElement[bool], db: AsyncSession) -> int:
+        """Delete the roadmaps matching `condition` with their phases and lessons.
+
+        Returns:
+            The number of roadmaps deleted
+        """
+        roadmap_ids = select(Roadmap.id).where(condition)
+        phase_ids = select(Phase.id).where(Phase.roadmap_id.in_(roadmap_ids))
+        lesson_ids = (
+            (await db.execute(select(Lesson.id).where(Lesson.phase_id.in_(phase_ids))))
+            .scalars()
+            .all()
+        )
+        _ = await db.execute(delete(Lesson).where(Lesson.phase_id.in_(phase_ids)))
+        _ = await db.execute(delete(Phase).where(Phase.roadmap_id.in_(roadmap_ids)))
+        result = await db.execute(delete(Roadmap).where(condition))
+        await db.commit()
+        lesson_context_service.invalidate(*lesson_ids)
+        return result.rowcount  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType, reportUnknownVariableType]
 
 
 # Singleton instance
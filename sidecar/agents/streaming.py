@@ -0,0 +1,31 @@
+"""Token channel between streaming agent nodes and the agents that drive them.
+
+Nodes push chunks through LangGraph's custom stream mode rather than callback events, so
+callers receive only what nodes explicitly emit instead of filtering the tracing events
+produced for every chain and node step.
+"""
+
+from collections.abc import AsyncIterator
+from typing import TypedDict, cast
+
+from langgraph.types import StreamWriter
+
+
+class TokenChunk(TypedDict):
+    """A piece of response text for the client."""
+
+    token: str
+
+
+def emit_token(writer: StreamWriter, token: str) -> None:
+    """Send a response token to the caller of the graph."""
+    writer(TokenChunk(token=token))
+
+
+async def iter_tokens(stream: AsyncIterator[object]) -> AsyncIterator[str]:
+    """Extract the tokens from a `stream_mode="custom"` graph stream."""
+    async for chunk in stream:
+        if isinstance(chunk, dict):
+            token = cast(dict[str, object], chunk).get("token")
+            if isinstance(token, str) and token:
+                yield token
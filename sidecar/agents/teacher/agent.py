@@ -1,5 +1,6 @@
 """Teacher Agent - Enforces learning through Socratic method."""
 
+import asyncio
 import logging
 from collections.abc import AsyncIterator
 from typing import TYPE_CHECKING, Any, AsyncContextManager, cast, override
@@ -12,9 +13,16 @@ from langgraph.graph.state import CompiledStateGraph
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from agents.base import BaseAgent
+from agents.streaming import iter_tokens
 from core.config import settings
 
-from .nodes import context_enrichment_node, guardrail_node, socratic_node
+from .nodes import (
+    context_enrichment_node,
+    guardrail_node,
+    socratic_node,
+    speculative_socratic_node,
+    summarize_history,
+)
 from .state import AgentState
 
 if TYPE_CHECKING:
@@ -39,6 +47,9 @@ class TeacherAgent(BaseAgent):
         db_manager: "DBSessionManager",
         lesson_service: "LessonContextService",
         model_name: str = settings.GEMINI_MODEL,
+        speculative_guardrail: bool = settings.TEACHER_SPECULATIVE_GUARDRAIL,
+        history_token_budget: int = settings.TEACHER_HISTORY_TOKEN_BUDGET,
+        guardrail_classifier: bool = settings.GUARDRAIL_CLASSIFIER_ENABLED,
     ) -> None:
         """Initialize teacher agent.
 
@@ -47,9 +58,19 @@ class TeacherAgent(BaseAgent):
             db_manager: Injected database session manager.
             lesson_service: Injected lesson context service.
             model_name: Model name to use.
+            speculative_guardrail: Run the guardrail concurrently with the Socratic stream
+                instead of before it.
+            history_token_budget: Estimated tokens of earlier turns sent verbatim per turn.
+            guardrail_classifier: Settle obvious messages with the local classifier instead
+                of the LLM guardrail.
         """
         super().__init__(gemini_service, db_manager, lesson_service)
         self.model_name: str = model_name
+        self.speculative_guardrail: bool = speculative_guardrail
+        self.history_token_budget: int = history_token_budget
+        self.guardrail_classifier: bool = guardrail_classifier
+        # Pending background summary folds, by thread
+        self._history_folds: dict[str, asyncio.Task[None]] = {}
 
     def _create_builder(self) -> StateGraph[AgentState, Any, Any, Any]:  # pyright: ignore[reportExplicitAny]
         """Create LangGraph builder for teaching.
@@ -59,6 +80,15 @@ class TeacherAgent(BaseAgent):
         """
         workflow = StateGraph(AgentState)
 
+        if self.speculative_guardrail:
+            # The guardrail runs inside the socratic node, overlapping the stream
+            _ = workflow.add_node("enrichment", context_enrichment_node)  # pyright: ignore[reportUnknownMemberType]
+            _ = workflow.add_node("socratic", speculative_socratic_node)  # pyright: ignore[reportUnknownMemberType]
+            _ = workflow.set_entry_point("enrichment")
+            _ = workflow.add_edge("enrichment", "socratic")
+            _ = workflow.add_edge("socratic", END)
+            return workflow
+
         # Add nodes
         _ = workflow.add_node("enrichment", context_enrichment_node)  # pyright: ignore[reportUnknownMemberType]
         _ = workflow.add_node("guardrail", guardrail_node)  # pyright: ignore[reportUnknownMemberType]
@@ -107,14 +137,91 @@ class TeacherAgent(BaseAgent):
             )
         return self._workflow
 
+    def _run_config(
+        self, thread_id: str, db: AsyncSession, system_context: str | None
+    ) -> RunnableConfig:
+        """Runtime config carrying checkpointing, injected dependencies and per-turn context.
+
+        Delegation context goes here rather than into the state, so it reaches the prompt
+        without being checkpointed with the conversation.
+        """
+        return cast(
+            RunnableConfig,
+            cast(
+                object,
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "gemini_service": self.gemini_service,
+                        "lesson_service": self.lesson_service,
+                        "db_session": db,
+                        "model_name": self.model_name,
+                        "history_token_budget": self.history_token_budget,
+                        "guardrail_classifier": self.guardrail_classifier,
+                        "delegation_context": system_context or "",
+                    }
+                },
+            ),
+        )
+
+    def _schedule_history_fold(self, thread_id: str) -> None:
+        """Fold overflowing history into the summary in the background.
+
+        Summarization is a separate model call, so it runs after the response is sent
+        instead of delaying the end of the stream. The summary lives in the checkpoint,
+        so there is nothing to fold without a checkpointer.
+        """
+        if self._checkpointer is None or self.history_token_budget <= 0:
+            return
+
+        task = asyncio.create_task(self._fold_history(thread_id))
+        self._history_folds[thread_id] = task
+
+        def forget(done: asyncio.Task[None]) -> None:
+            if self._history_folds.get(thread_id) is done:
+                del self._history_folds[thread_id]
+
+        task.add_done_callback(forget)
+
+    async def _wait_for_history_fold(self, thread_id: str) -> None:
+        """Let a pending fold finish so the next turn sees the updated summary."""
+        task = self._history_folds.get(thread_id)
+        if task is not None:
+            _ = await asyncio.wait({task})
+
+    async def _fold_history(self, thread_id: str) -> None:
+        config = cast(
+            RunnableConfig,
+            cast(
+                object,
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "gemini_service": self.gemini_service,
+                        "history_token_budget": self.history_token_budget,
+                    }
+                },
+            ),
+        )
+        try:
+            snapshot = await self.workflow.aget_state(config)
+            update = await summarize_history(cast(AgentState, snapshot.values), config)
+            if update:
+                _ = await self.workflow.aupdate_state(config, update, as_node="socratic")
+        except Exception as e:
+            logger.error(f"History fold failed for thread {thread_id}: {e}")
+
     @override
-    async def chat(self, thread_id: str, message: str, db: AsyncSession) -> str:
+    async def chat(
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
+    ) -> str:
         """Chat with teacher agent.
 
         Args:
             thread_id: Current lesson ID (also thread_id for memory)
             message: User's message
             db: Database session
+            system_context: Delegating agent's instructions for this turn
 
         Returns:
             Teacher's response
@@ -133,23 +240,11 @@ class TeacherAgent(BaseAgent):
             }
 
             # Run workflow with checkpointing and dependency injection
-            config = cast(
-                RunnableConfig,
-                cast(
-                    object,
-                    {
-                        "configurable": {
-                            "thread_id": thread_id,
-                            "gemini_service": self.gemini_service,
-                            "lesson_service": self.lesson_service,
-                            "db_session": db,
-                            "model_name": self.model_name,
-                        }
-                    },
-                ),
-            )
+            config = self._run_config(thread_id, db, system_context)
 
+            await self._wait_for_history_fold(thread_id)
             result = await self.workflow.ainvoke(state, config=config)  # pyright: ignore[reportUnknownMemberType]
+            self._schedule_history_fold(thread_id)
 
             # Extract response
             messages = result.get("messages", [])  # pyright: ignore[reportAny]
@@ -165,7 +260,7 @@ class TeacherAgent(BaseAgent):
 
     @override
     async def chat_stream(
-        self, thread_id: str, message: str, db: AsyncSession
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
     ) -> AsyncIterator[str]:
         """Chat with teacher agent (streaming).
 
@@ -173,6 +268,7 @@ class TeacherAgent(BaseAgent):
             thread_id: Current Lesson ID
             message: User's message
             db: Database session
+            system_context: Delegating agent's instructions for this turn
 
         Yields:
             Response chunks
@@ -191,33 +287,14 @@ class TeacherAgent(BaseAgent):
             }
 
             # Run workflow with checkpointing and dependency injection
-            config = cast(
-                RunnableConfig,
-                cast(
-                    object,
-                    {
-                        "configurable": {
-                            "thread_id": thread_id,
-                            "gemini_service": self.gemini_service,
-                            "lesson_service": self.lesson_service,
-                            "db_session": db,
-                            "model_name": self.model_name,
-                        }
-                    },
-                ),
-            )
-
-            # Use astream to stream events from the graph
-            async for event in self.workflow.astream_events(state, config=config, version="v2"):
-                kind = event.get("event")
+            config = self._run_config(thread_id, db, system_context)
 
-                # Intercept custom token events from the socratic node
-                if kind == "on_custom_event" and event.get("name") == "socratic_token":
-                    data = event.get("data", {})
-                    if data:
-                        token = data.get("token")
-                        if token:
-                            yield str(token)  # pyright: ignore[reportAny]
+            await self._wait_for_history_fold(thread_id)
+            # Only the tokens written by the socratic node travel on the custom stream
+            stream = self.workflow.astream(state, config=config, stream_mode="custom")  # pyright: ignore[reportUnknownMemberType]
+            async for token in iter_tokens(stream):
+                yield token
+            self._schedule_history_fold(thread_id)
 
         except Exception as e:
             logger.error(f"Teacher agent streaming error: {e}")
@@ -226,6 +303,11 @@ class TeacherAgent(BaseAgent):
     @override
     async def close(self) -> None:
         """Cleanup checkpointer connection."""
+        folds = list(self._history_folds.values())
+        for task in folds:
+            _ = task.cancel()
+        _ = await asyncio.gather(*folds, return_exceptions=True)
+
         if self._checkpointer_cm is not None:
             try:
                 _ = await self._checkpointer_cm.__aexit__(None, None, None)
@@ -1,5 +1,13 @@
 from .context import context_enrichment_node
 from .guardrails import guardrail_node
+from .history import summarize_history
 from .socratic import socratic_node
+from .speculative import speculative_socratic_node
 
-__all__ = ["context_enrichment_node", "guardrail_node", "socratic_node"]
+__all__ = [
+    "context_enrichment_node",
+    "guardrail_node",
+    "socratic_node",
+    "speculative_socratic_node",
+    "summarize_history",
+]
@@ -1,41 +1,49 @@
-import json
+from collections.abc import Sequence
 
+from langchain_core.messages import BaseMessage
 from langchain_core.runnables import RunnableConfig
 
+from agents.guardrail_classifier import (
+    GuardrailClassifier,
+    GuardrailVerdict,
+    get_guardrail_classifier,
+)
 from agents.prompts import GUARDRAIL_SYSTEM, GUARDRAIL_USER_TEMPLATE
 from agents.teacher.state import AgentState, PartialTeacherState
+from schemas.domain import GuardrailStructure
 from services.gemini_service import GeminiService
+from services.rate_limiter import RequestPriority
 
 
-async def guardrail_node(state: AgentState, config: RunnableConfig) -> PartialTeacherState:
-    """Node that detects if the student is trying to bypass the Socratic method.
+async def evaluate_guardrail(
+    messages: Sequence[BaseMessage],
+    gemini_service: GeminiService,
+    classifier: GuardrailClassifier | None = None,
+) -> bool:
+    """Ask the LLM whether the recent conversation tries to bypass the Socratic method.
 
     Args:
-        state: Current conversation state
-        config: Runtime configuration containing dependencies.
+        messages: Conversation history, most recent last.
+        gemini_service: Service used for the evaluation call.
+        classifier: Local classifier that settles obvious cases without the call.
 
     Returns:
-        Update to state with guardrail_triggered status
+        True if the guardrail fired. Evaluation failures fail open (False).
     """
-    messages = state.get("messages", [])
     if not messages:
-        return {"guardrail_triggered": False}
-
-    # Extract gemini_service from config
-    configurable = config.get("configurable", {})
-    gemini_service: GeminiService | None = configurable.get("gemini_service")
+        return False
 
-    if not gemini_service:
-        from logging import getLogger
-
-        getLogger(__name__).error("No gemini_service found in config['configurable']")
-        raise RuntimeError("gemini_service dependency is required")
+    # Obvious cases are settled locally without spending a Gemini call
+    if classifier is not None:
+        result = classifier.classify(str(messages[-1].content))
+        if result.verdict != GuardrailVerdict.ESCALATE:
+            return result.verdict == GuardrailVerdict.BLOCK
 
     # Get last few messages for context (last 5 messages)
     relevant_messages = messages[-5:]
     conversation_summary = ""
     for msg in relevant_messages:
-        content = str(msg.content)  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType]
+        content = str(msg.content)
         role = msg.type
 
         conversation_summary += f"{role}: {content}\n"
@@ -45,21 +53,45 @@ async def guardrail_node(state: AgentState, config: RunnableConfig) -> PartialTe
 
     try:
         # Generate evaluation using structured output
-        response: str = await gemini_service.generate_content(
+        verdict = await gemini_service.generate_structured(
             prompt=prompt,
+            schema=GuardrailStructure,
             system_instruction=GUARDRAIL_SYSTEM,
-            response_mime_type="application/json",
+            priority=RequestPriority.GUARDRAIL,
         )
-
-        # Parse JSON response
-        data = json.loads(response)  # pyright: ignore[reportAny]
-        triggered = bool(data.get("triggered", False))  # pyright: ignore[reportAny]
-
-        return {"guardrail_triggered": triggered}
+        return verdict.triggered
     except Exception as e:
         # Fallback to safe state if evaluation fails
         # In a real app, we might log this to a monitoring service
         from logging import getLogger
 
         getLogger(__name__).error(f"Guardrail evaluation failed: {e}")
+        return False
+
+
+async def guardrail_node(state: AgentState, config: RunnableConfig) -> PartialTeacherState:
+    """Node that detects if the student is trying to bypass the Socratic method.
+
+    Args:
+        state: Current conversation state
+        config: Runtime configuration containing dependencies.
+
+    Returns:
+        Update to state with guardrail_triggered status
+    """
+    messages = state.get("messages", [])
+    if not messages:
         return {"guardrail_triggered": False}
+
+    # Extract gemini_service from config
+    configurable = config.get("configurable", {})
+    gemini_service: GeminiService | None = configurable.get("gemini_service")
+
+    if not gemini_service:
+        from logging import getLogger
+
+        getLogger(__name__).error("No gemini_service found in config['configurable']")
+        raise RuntimeError("gemini_service dependency is required")
+
+    triggered = await evaluate_guardrail(messages, gemini_service, get_guardrail_classifier(config))
+    return {"guardrail_triggered": triggered}
@@ -0,0 +1,128 @@
+"""Token-budgeted conversation history with an incrementally maintained summary."""
+
+import logging
+from collections.abc import Sequence
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+
+from agents.prompt_templates import PromptTemplates
+from agents.prompts import HISTORY_SUMMARY_SYSTEM, HISTORY_SUMMARY_USER_TEMPLATE
+from agents.teacher.state import AgentState, PartialTeacherState
+from core.config import settings
+from core.tokens import estimate_tokens
+from services.gemini_service import GeminiService
+from services.rate_limiter import RequestPriority
+
+logger = logging.getLogger(__name__)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Estimated prompt tokens for one formatted history line."""
+    return estimate_tokens(PromptTemplates.format_conversation_history([message]))
+
+
+def get_history_budget(config: RunnableConfig) -> int:
+    """Token budget for verbatim history, from the runtime config or settings."""
+    configurable = config.get("configurable", {})
+    budget: int | None = configurable.get("history_token_budget")
+    return budget if budget is not None else settings.TEACHER_HISTORY_TOKEN_BUDGET
+
+
+def select_recent(messages: Sequence[BaseMessage], budget: int) -> list[BaseMessage]:
+    """Return the longest suffix of `messages` whose estimated size fits in `budget`."""
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = message_tokens(messages[start - 1])
+        if used + cost > budget:
+            break
+        used += cost
+        start -= 1
+    return list(messages[start:])
+
+
+def plan_fold(messages: Sequence[BaseMessage], summarized_count: int, budget: int) -> int:
+    """Decide how many leading messages should be covered by the summary.
+
+    Nothing is folded while the unsummarized tail fits in the budget. Once it overflows,
+    the oldest messages are folded until the tail fits in half the budget, so the summary
+    is refreshed in occasional batches rather than on every turn.
+
+    Returns:
+        The new summarized_count (unchanged when no fold is needed).
+    """
+    tail = messages[summarized_count:]
+    sizes = [message_tokens(m) for m in tail]
+    total = sum(sizes)
+    if total <= budget:
+        return summarized_count
+
+    target = budget // 2
+    folded = 0
+    # Always keep the latest exchange verbatim
+    while folded < len(tail) - 2 and total > target:
+        total -= sizes[folded]
+        folded += 1
+    return summarized_count + folded
+
+
+async def fold_into_summary(
+    gemini_service: GeminiService,
+    summary: str,
+    messages: Sequence[BaseMessage],
+    max_words: int,
+) -> str:
+    """Merge `messages` into the existing rolling summary."""
+    prompt = HISTORY_SUMMARY_USER_TEMPLATE.format(
+        summary=summary or "(none yet)",
+        turns=PromptTemplates.format_conversation_history(list(messages)),
+    )
+    response = await gemini_service.generate_content(
+        prompt=prompt,
+        system_instruction=HISTORY_SUMMARY_SYSTEM.format(max_words=max_words),
+        priority=RequestPriority.BACKGROUND,
+    )
+    return response.strip()
+
+
+async def summarize_history(state: AgentState, config: RunnableConfig) -> PartialTeacherState:
+    """Fold turns that no longer fit the history budget into the rolling summary.
+
+    Not a graph node: the agent runs it in the background once a response has been sent,
+    so summarization never delays the stream, and waits for it before the thread's next
+    turn. Failures leave the summary unchanged; the prompt builder still trims history to
+    the budget, so only the oldest context is lost until the next successful fold.
+    """
+    messages = state.get("messages", [])
+    summarized_count = min(state.get("summarized_count", 0), len(messages))
+    budget = get_history_budget(config)
+    if budget <= 0:
+        return {}
+
+    fold_until = plan_fold(messages, summarized_count, budget)
+    if fold_until == summarized_count:
+        return {}
+
+    configurable = config.get("configurable", {})
+    gemini_service: GeminiService | None = configurable.get("gemini_service")
+    if not gemini_service:
+        logger.error("No gemini_service found in config['configurable']")
+        raise RuntimeError("gemini_service dependency is required")
+
+    try:
+        summary = await fold_into_summary(
+            gemini_service,
+            state.get("history_summary", ""),
+            messages[summarized_count:fold_until],
+            max_words=settings.TEACHER_SUMMARY_MAX_WORDS,
+        )
+    except Exception as e:
+        logger.error(f"History summarization failed: {e}")
+        return {}
+
+    if not summary:
+        logger.warning("History summarization returned an empty summary; keeping the old one")
+        return {}
+
+    return {"history_summary": summary, "summarized_count": fold_until}
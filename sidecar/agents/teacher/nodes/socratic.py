@@ -1,20 +1,19 @@
-from langchain_core.callbacks.manager import adispatch_custom_event
 from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
+from langgraph.types import StreamWriter
 
+from agents.prompt_templates import PromptTemplates
 from agents.prompts import TEACHER_SYSTEM
+from agents.streaming import emit_token
 from agents.teacher.state import AgentState, PartialTeacherState
 from services.gemini_service import GeminiService
+from services.rate_limiter import RequestPriority
 
+from .history import get_history_budget, select_recent
 
-async def socratic_node(state: AgentState, config: RunnableConfig) -> PartialTeacherState:
-    """Socratic Reasoning node that generates pedagogical responses with streaming.
 
-    This node implements the Socratic method by asking discovery questions
-    instead of providing direct code solutions. It emits tokens via custom events
-    to support real-time UI updates while maintaining state integrity.
-    """
-    # Extract gemini_service from config
+def get_gemini_service(config: RunnableConfig) -> GeminiService:
+    """Extract the injected gemini_service from the runtime config."""
     configurable = config.get("configurable", {})
     gemini_service: GeminiService | None = configurable.get("gemini_service")
 
@@ -24,10 +23,35 @@ async def socratic_node(state: AgentState, config: RunnableConfig) -> PartialTea
         getLogger(__name__).error("No gemini_service found in config['configurable']")
         raise RuntimeError("gemini_service dependency is required")
 
+    return gemini_service
+
+
+def get_delegation_context(config: RunnableConfig) -> str:
+    """System-level instructions passed in by a delegating agent for this turn only."""
+    configurable = config.get("configurable", {})
+    context: str | None = configurable.get("delegation_context")
+    return context or ""
+
+
+def build_socratic_prompt(
+    state: AgentState,
+    guardrail_triggered: bool,
+    history_budget: int = 0,
+    delegation_context: str = "",
+) -> tuple[str, str]:
+    """Build the (prompt, system_instruction) pair for the Socratic response.
+
+    Args:
+        state: Current execution state.
+        guardrail_triggered: Whether to build the refusal prompt instead of guidance.
+        history_budget: Estimated tokens of earlier turns to include verbatim. Turns
+            already folded into the rolling summary are represented by the summary.
+        delegation_context: Delegating agent's instructions, appended to the system
+            instruction so they never enter the checkpointed message history.
+    """
     messages = state.get("messages", [])
     lesson_name = state.get("lesson_name", "Unknown Lesson")
     objectives = state.get("objectives", [])
-    guardrail_triggered = state.get("guardrail_triggered", False)
     lesson_context = state.get("lesson_context", "")
 
     # Format objectives as a bulleted list for the prompt
@@ -37,6 +61,8 @@ async def socratic_node(state: AgentState, config: RunnableConfig) -> PartialTea
     system_instruction = TEACHER_SYSTEM.format(
         lesson_name=lesson_name, objectives=formatted_objectives
     )
+    if delegation_context:
+        system_instruction += "\n\nDELEGATION CONTEXT:\n" + delegation_context
 
     # Get the last user message for processing
     user_message = ""
@@ -59,19 +85,58 @@ async def socratic_node(state: AgentState, config: RunnableConfig) -> PartialTea
         # Use delimiters to isolate user input
         prompt = (
             f"LESSON CONTEXT:\n{lesson_context}\n\n"
-            "INSTRUCTION: Provide a pedagogical response following the Socratic method. "
-            "Ask questions to lead them to the answer. Do not provide full code.\n\n"
-            f'STUDENT MESSAGE TO RESPOND TO:\n"""\n{user_message}\n"""'
+            + format_history(state, history_budget)
+            + "INSTRUCTION: Provide a pedagogical response following the Socratic method. "
+            + "Ask questions to lead them to the answer. Do not provide full code.\n\n"
+            + f'STUDENT MESSAGE TO RESPOND TO:\n"""\n{user_message}\n"""'
         )
 
+    return prompt, system_instruction
+
+
+def format_history(state: AgentState, budget: int) -> str:
+    """Render the rolling summary and the recent turns that fit in `budget`."""
+    messages = state.get("messages", [])
+    summarized_count = min(state.get("summarized_count", 0), max(len(messages) - 1, 0))
+    # The last message is the one being answered and is rendered separately
+    recent = select_recent(messages[summarized_count:-1], budget) if budget > 0 else []
+    summary = state.get("history_summary", "")
+
+    sections = ""
+    if summary:
+        sections += f"CONVERSATION SUMMARY:\n{summary}\n\n"
+    if recent:
+        history = PromptTemplates.format_conversation_history(recent)
+        sections += f"RECENT CONVERSATION:\n{history}\n\n"
+    return sections
+
+
+async def socratic_node(
+    state: AgentState, config: RunnableConfig, writer: StreamWriter
+) -> PartialTeacherState:
+    """Socratic Reasoning node that generates pedagogical responses with streaming.
+
+    This node implements the Socratic method by asking discovery questions
+    instead of providing direct code solutions. It emits tokens on the custom
+    stream to support real-time UI updates while maintaining state integrity.
+    """
+    gemini_service = get_gemini_service(config)
+
+    guardrail_triggered = state.get("guardrail_triggered", False)
+    prompt, system_instruction = build_socratic_prompt(
+        state, guardrail_triggered, get_history_budget(config), get_delegation_context(config)
+    )
+
     # Generate streaming response via Gemini
     full_response = ""
     async for chunk in gemini_service.generate_content_stream(
-        prompt=prompt, system_instruction=system_instruction
+        prompt=prompt,
+        system_instruction=system_instruction,
+        priority=RequestPriority.INTERACTIVE,
     ):
         full_response += chunk
-        # Emit token event for real-time UI
-        await adispatch_custom_event("socratic_token", {"token": chunk}, config=config)
+        # Emit token for real-time UI
+        emit_token(writer, chunk)
 
     # Return the full message to be appended to the state history
     # This triggers the LangGraph checkpointer persistence
@@ -0,0 +1,138 @@
+"""Speculative Socratic generation that overlaps the guardrail round trip."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import StreamWriter
+
+from agents.guardrail_classifier import get_guardrail_classifier
+from agents.streaming import emit_token
+from agents.teacher.state import AgentState, PartialTeacherState
+from services.rate_limiter import RequestPriority
+
+from .guardrails import evaluate_guardrail
+from .history import get_history_budget
+from .socratic import build_socratic_prompt, get_delegation_context, get_gemini_service
+
+logger = logging.getLogger(__name__)
+
+
+async def speculative_socratic_node(
+    state: AgentState, config: RunnableConfig, writer: StreamWriter
+) -> PartialTeacherState:
+    """Run the guardrail and the Socratic stream concurrently.
+
+    The Socratic response is generated optimistically while the guardrail evaluates the
+    conversation. Tokens are held back until the guardrail allows the message, at which
+    point the buffer is flushed and the rest of the stream passes straight through. If
+    the guardrail fires, the speculative stream is discarded and the refusal response is
+    streamed instead, so no unapproved token ever reaches the student.
+    """
+    gemini_service = get_gemini_service(config)
+    messages = state.get("messages", [])
+
+    delegation_context = get_delegation_context(config)
+
+    guardrail_task = asyncio.create_task(
+        evaluate_guardrail(messages, gemini_service, get_guardrail_classifier(config))
+    )
+
+    prompt, system_instruction = build_socratic_prompt(
+        state,
+        guardrail_triggered=False,
+        history_budget=get_history_budget(config),
+        delegation_context=delegation_context,
+    )
+    stream: AsyncIterator[str] = gemini_service.generate_content_stream(
+        prompt=prompt,
+        system_instruction=system_instruction,
+        priority=RequestPriority.INTERACTIVE,
+    )
+
+    held: list[str] = []
+    pending: asyncio.Future[str] | None = None
+    stream_finished = False
+
+    try:
+        # Buffer speculative tokens until the guardrail verdict arrives
+        while not guardrail_task.done() and not stream_finished:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(stream))
+            done, _ = await asyncio.wait(
+                {guardrail_task, pending}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if pending in done:
+                try:
+                    held.append(pending.result())
+                except StopAsyncIteration:
+                    stream_finished = True
+                pending = None
+
+        triggered = await guardrail_task
+    except BaseException:
+        _ = guardrail_task.cancel()
+        await _discard(pending, stream)
+        raise
+
+    if triggered:
+        logger.info("Guardrail fired; discarding speculative response")
+        await _discard(pending, stream)
+        pending = None
+
+        refusal_prompt, refusal_instruction = build_socratic_prompt(
+            state, guardrail_triggered=True, delegation_context=delegation_context
+        )
+        stream = gemini_service.generate_content_stream(
+            prompt=refusal_prompt,
+            system_instruction=refusal_instruction,
+            priority=RequestPriority.INTERACTIVE,
+        )
+        held = []
+        stream_finished = False
+
+    full_response = ""
+    for chunk in held:
+        full_response += chunk
+        emit_token(writer, chunk)
+
+    if pending is not None:
+        try:
+            chunk = await pending
+            full_response += chunk
+            emit_token(writer, chunk)
+        except StopAsyncIteration:
+            stream_finished = True
+
+    if not stream_finished:
+        async for chunk in stream:
+            full_response += chunk
+            emit_token(writer, chunk)
+
+    return {"messages": [AIMessage(content=full_response)], "guardrail_triggered": triggered}
+
+
+async def _discard(pending: asyncio.Future[str] | None, stream: AsyncIterator[str]) -> None:
+    """Cancel an in-flight read of an abandoned stream, wait for it, then close the stream.
+
+    An async generator cannot be closed while `anext` is still running it, so the read
+    must have finished before `aclose`.
+    """
+    if pending is not None:
+        _ = pending.cancel()
+        _ = await asyncio.wait({pending})
+        if not pending.cancelled():
+            _ = pending.exception()
+    await _close(stream)
+
+
+async def _close(stream: AsyncIterator[str]) -> None:
+    """Close an abandoned async generator so its HTTP stream is released."""
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception as e:
+            logger.debug(f"Error closing speculative stream: {e}")
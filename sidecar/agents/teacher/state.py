@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Annotated, TypedDict
+from typing import Annotated, NotRequired, TypedDict
 
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
@@ -16,6 +16,10 @@ class AgentState(TypedDict):
     objectives: list[str]
     guardrail_triggered: bool
     suggested_docs: list[str]
+    # Rolling summary of messages[:summarized_count], maintained by summarize_history.
+    # Not part of the per-turn input so the checkpointed values carry over.
+    history_summary: NotRequired[str]
+    summarized_count: NotRequired[int]
 
 
 class PartialTeacherState(TypedDict, total=False):
@@ -28,3 +32,5 @@ class PartialTeacherState(TypedDict, total=False):
     objectives: list[str]
     guardrail_triggered: bool
     suggested_docs: list[str]
+    history_summary: str
+    summarized_count: int
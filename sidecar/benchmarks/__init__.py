@@ -0,0 +1 @@
+"""Micro-benchmarks for latency-sensitive paths. Run with `python -m benchmarks.<name>`."""
@@ -0,0 +1,135 @@
+"""Wall time and commits of reviewing many submissions one by one vs as a batch.
+
+- one by one: `ReviewService.submit_review` for each submission in turn
+- batch: `ReviewService.submit_batch` with detached reviews, at several concurrencies
+
+Runs the reviewer graph against an in-memory database and a fake Gemini service with
+fixed round trips. Every submission is distinct and the review cache is off, so each
+one costs a full review.
+
+Usage:
+    python -m benchmarks.batch_review [--items N] [--round-trip S] [--first-token S]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import cast
+from unittest.mock import MagicMock
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from agents.code_reviewer.agent import CodeReviewerAgent
+from agents.manager import agent_manager
+from core.types import AgentID
+from database.models import Base
+from services.gemini_service import GeminiService
+from services.lesson_service import LessonContextService
+from services.review_service import BatchItem, ReviewService
+
+from .fakes import FakeGeminiService, FakeLessonService
+
+FINDINGS = {
+    "findings": [
+        {
+            "line_number": 1,
+            "category": "Best Practices",
+            "observation": "Index-based loop",
+            "socratic_question": "Could you iterate over the items directly?",
+        }
+    ]
+}
+
+
+def respond(prompt: str) -> str:
+    """Return analysis JSON for analysis prompts and a passing verdict otherwise."""
+    if "specific areas for improvement" in prompt:
+        return json.dumps(FINDINGS)
+    return '{"triggered": false}'
+
+
+def submissions(count: int) -> list[BatchItem]:
+    return [
+        BatchItem(
+            "bench",
+            f"def total_{i}(items):\n    result = 0\n"
+            + "    for i in range(len(items)):\n        result += items[i]\n    return result\n",
+            "python",
+        )
+        for i in range(count)
+    ]
+
+
+def build_agent(gemini: FakeGeminiService) -> CodeReviewerAgent:
+    agent = CodeReviewerAgent(
+        gemini_service=cast(GeminiService, cast(object, gemini)),
+        db_manager=MagicMock(),
+        lesson_service=cast(LessonContextService, cast(object, FakeLessonService())),
+        model_name="benchmark",
+    )
+    # No checkpointer: each review is an independent thread
+    agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+    return agent
+
+
+async def one_by_one(service: ReviewService, items: list[BatchItem], db: AsyncSession) -> None:
+    for item in items:
+        async for _token in service.submit_review(item.lesson_id, item.code, item.language, db):
+            pass
+
+
+async def batch(
+    service: ReviewService, items: list[BatchItem], db: AsyncSession, concurrency: int
+) -> None:
+    async for _event in service.submit_batch(items, db, concurrency):
+        pass
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--items", type=int, default=20)
+    _ = parser.add_argument("--round-trip", type=float, default=0.2)
+    _ = parser.add_argument("--first-token", type=float, default=0.15)
+    args = parser.parse_args()
+    items = submissions(cast(int, args.items))
+    round_trip = cast(float, args.round_trip)
+    first_token = cast(float, args.first_token)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    service = ReviewService(cache_enabled=False, incremental=False)
+
+    print(f"Reviewing {len(items)} submissions (json={round_trip}s, ttft={first_token}s)")
+    runs: list[tuple[str, int | None]] = [("one by one", None)]
+    runs += [(f"batch, {n} at once", n) for n in (1, 4, 8)]
+    for label, concurrency in runs:
+        gemini = FakeGeminiService(round_trip=round_trip, first_token=first_token, respond=respond)
+        agent_manager._agent_instances[AgentID.REVIEWER] = build_agent(gemini)  # pyright: ignore[reportPrivateUsage]
+        commits = 0
+
+        def count_commit(_session: Session) -> None:
+            nonlocal commits
+            commits += 1
+
+        async with session_factory() as db:
+            event.listen(db.sync_session, "after_commit", count_commit)
+            start = time.perf_counter()
+            if concurrency is None:
+                await one_by_one(service, items, db)
+            else:
+                await batch(service, items, db, concurrency)
+            elapsed = time.perf_counter() - start
+        print(
+            f"  {label:<18} total={elapsed * 1000:8.1f}ms  "
+            + f"per item={elapsed / len(items) * 1000:7.1f}ms  commits={commits}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
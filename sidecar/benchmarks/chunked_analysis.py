@@ -0,0 +1,117 @@
+"""Analysis latency for a large submission: one whole-file call vs map-reduce chunks.
+
+Runs the analysis node on a generated Python file of --lines lines. The fake Gemini
+service adds prefill time per prompt token, so a single call grows with the file while
+concurrent chunk calls each stay small.
+
+Usage:
+    python -m benchmarks.chunked_analysis [--lines N] [--chunk-tokens N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import cast
+
+from langchain_core.runnables import RunnableConfig
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from agents.code_reviewer.nodes import code_analysis_node
+from agents.code_reviewer.state import CodeReviewerState
+from database.models import Base, CodeReview
+
+from .fakes import FakeGeminiService, summarize
+
+
+def make_code(lines: int) -> str:
+    return "".join(
+        f"def step_{i}(values):\n    total = 0\n    for v in values:\n        total += v * {i}\n"
+        + "    return total\n\n"
+        for i in range(lines // 6)
+    )
+
+
+def respond(prompt: str) -> str:
+    finding = {
+        "line_number": 1,
+        "category": "Best Practices",
+        "observation": "Repeated loop",
+        "socratic_question": "Could these functions share code?",
+    }
+    return json.dumps({"findings": [finding]}) if "specific areas" in prompt else "{}"
+
+
+async def analyze(
+    db: AsyncSession, gemini: FakeGeminiService, code: str, chunk_tokens: int, concurrency: int
+) -> float:
+    review = CodeReview(id=str(uuid.uuid4()), lesson_id="bench", code_content=code, language="x")
+    db.add(review)
+    await db.commit()
+    state: CodeReviewerState = {
+        "messages": [],
+        "lesson_id": "bench",
+        "review_id": review.id,
+        "code_content": code,
+        "language": "python",
+        "lesson_name": "Loops",
+        "objectives": ["Write a for loop"],
+        "findings": [],
+        "guardrail_triggered": False,
+    }
+    config: RunnableConfig = {
+        "configurable": {
+            "gemini_service": gemini,
+            "db_session": db,
+            "analysis_chunk_tokens": chunk_tokens,
+            "analysis_concurrency": concurrency,
+        }
+    }
+    start = time.perf_counter()
+    _ = await code_analysis_node(state, config)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--lines", type=int, default=2000)
+    _ = parser.add_argument("--chunk-tokens", type=int, default=3000)
+    _ = parser.add_argument("--concurrency", type=int, default=4)
+    _ = parser.add_argument("--runs", type=int, default=5)
+    _ = parser.add_argument("--per-token", type=float, default=0.00005)
+    args = parser.parse_args()
+    code = make_code(cast(int, args.lines))
+    chunk_tokens = cast(int, args.chunk_tokens)
+    concurrency = cast(int, args.concurrency)
+    runs = cast(int, args.runs)
+    per_token = cast(float, args.per_token)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    print(
+        f"Analysis of a {code.count(chr(10))}-line file over {runs} runs "
+        + f"({per_token * 1e6:.0f}us prefill per token)"
+    )
+    layouts = (
+        ("whole file", 0, 1),
+        ("one chunk", chunk_tokens, 1),  # single chunk latency, as the lower bound
+        (f"chunked x{concurrency}", chunk_tokens, concurrency),
+    )
+    async with session_factory() as db:
+        for label, tokens, limit in layouts:
+            gemini = FakeGeminiService(round_trip=0.4, respond=respond, per_prompt_token=per_token)
+            sample_code = code if label != "one chunk" else code[: chunk_tokens * 4 - 200]
+            samples = [await analyze(db, gemini, sample_code, tokens, limit) for _ in range(runs)]
+            print(
+                f"  {label:<12} {summarize(samples)}  calls={gemini.calls / runs:.0f}  "
+                + f"prompt tokens={gemini.prompt_tokens / runs:,.0f}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""Checkpoint bytes and prompt tokens per teacher turn, inline vs structured delegation.
+
+"inline" reproduces the old orchestrator behaviour: the delegation prompt (which also
+quoted the request) was prepended to the user message and checkpointed as a
+HumanMessage. "structured" sends the clean message and passes the delegation prompt as
+system_context. Every Gemini call is recorded, including the guardrail and summaries.
+
+Usage:
+    python -m benchmarks.delegation_footprint [--turns N]
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import cast
+from unittest.mock import MagicMock
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agents.agent_registry import agent_registry
+from agents.prompt_templates import PromptTemplates
+from agents.teacher.agent import TeacherAgent
+from services.gemini_service import GeminiService
+from services.lesson_service import LessonContextService
+
+from .fakes import FakeGeminiService, FakeLessonService
+
+QUESTIONS = (
+    "Why does my for loop skip the last item?",
+    "I changed range(len(items) - 1) to range(len(items)), is that right?",
+    "What happens if the list is empty?",
+    "Should I use enumerate here instead?",
+)
+
+
+def latest_checkpoint_bytes(db_path: Path, thread_id: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        row = cast(
+            tuple[int] | None,
+            conn.execute(
+                "SELECT length(checkpoint) + length(metadata) FROM checkpoints "
+                + "WHERE thread_id = ? AND checkpoint_ns = '' "
+                + "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id,),
+            ).fetchone(),
+        )
+    return row[0] if row else 0
+
+
+async def run(structured: bool, turns: int, db_path: Path) -> list[tuple[int, int]]:
+    """Return (checkpoint bytes, prompt tokens) after each turn."""
+    gemini = FakeGeminiService(round_trip=0, first_token=0, inter_token=0)
+    agent = TeacherAgent(
+        gemini_service=cast(GeminiService, cast(object, gemini)),
+        db_manager=MagicMock(),
+        lesson_service=cast(LessonContextService, cast(object, FakeLessonService())),
+        model_name="benchmark",
+        # Keep the LLM guardrail on the path so its prompt is counted every turn
+        guardrail_classifier=False,
+    )
+    system_prompt = PromptTemplates.generate_delegation_prompt(agent_registry.get_config("teacher"))
+    # A placeholder session: the fake lesson service never uses it
+    db = cast(AsyncSession, cast(object, MagicMock()))
+
+    samples: list[tuple[int, int]] = []
+    async with AsyncSqliteSaver.from_conn_string(str(db_path)) as checkpointer:
+        # History summaries run in the background and are counted with the next turn,
+        # which waits for them
+        agent._checkpointer = checkpointer  # pyright: ignore[reportPrivateUsage]
+        agent._workflow = agent._create_builder().compile(checkpointer=checkpointer)  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+        for turn in range(turns):
+            question = QUESTIONS[turn % len(QUESTIONS)]
+            before = gemini.prompt_tokens
+            if structured:
+                stream = agent.chat_stream("bench", question, db, system_context=system_prompt)
+            else:
+                legacy_prompt = system_prompt.replace(
+                    "for their next message.", f"for the following task:\n        {question}"
+                )
+                stream = agent.chat_stream(
+                    "bench", f"{legacy_prompt}\n\nUser request: {question}", db
+                )
+            async for _token in stream:
+                pass
+            samples.append(
+                (latest_checkpoint_bytes(db_path, "bench"), gemini.prompt_tokens - before)
+            )
+        await agent.close()
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    turns = cast(int, args.turns)
+
+    print(f"Teacher footprint over {turns} delegated turns")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, structured in (("inline", False), ("structured", True)):
+            samples = await run(structured, turns, Path(tmp) / f"{label}.db")
+            final_bytes = samples[-1][0]
+            growth = (final_bytes - samples[0][0]) / max(turns - 1, 1)
+            tokens = [t for _, t in samples]
+            print(
+                f"  {label:<10} checkpoint={final_bytes:>7,} B (+{growth:,.0f} B/turn)  "
+                + f"prompt tokens/turn: mean={sum(tokens) / len(tokens):,.0f} "
+                + f"last={tokens[-1]:,}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""Deterministic stand-ins for external services used by the benchmarks."""
+
+import asyncio
+import statistics
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Protocol, TypeVar, override
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.tokens import estimate_tokens
+from schemas.lesson import LessonContext
+from services.rate_limiter import RequestPriority
+
+StructuredT = TypeVar("StructuredT", bound=BaseModel)
+
+
+class GeminiBackend(Protocol):
+    """The calls the agents make on GeminiService."""
+
+    async def generate_content(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        search: bool = False,
+        response_mime_type: str | None = None,
+        use_cache: bool = True,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+        response_schema: type[BaseModel] | None = None,
+    ) -> str: ...
+
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: type[StructuredT],
+        system_instruction: str | None = None,
+        use_cache: bool = True,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+    ) -> StructuredT: ...
+
+    def generate_content_stream(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        search: bool = False,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        response_schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]: ...
+
+
+class LessonContextSource(Protocol):
+    """The call the agents make on LessonContextService."""
+
+    async def get_context(
+        self, lesson_id: str, db: AsyncSession, source: str = "db"
+    ) -> LessonContext: ...
+
+
+class FakeGeminiService(GeminiBackend):
+    """Gemini stand-in with fixed latencies so runs are comparable.
+
+    Args:
+        round_trip: Seconds taken by a non-streaming call.
+        first_token: Seconds before the first streamed chunk.
+        inter_token: Seconds between subsequent streamed chunks.
+        chunks: Chunks yielded by every stream.
+        respond: Maps a prompt to the non-streaming response text.
+        per_prompt_token: Extra seconds per estimated input token, modelling prefill time.
+        per_output_token: Extra seconds per estimated token of a non-streaming response,
+            modelling decode time.
+
+    Estimated input and output tokens of every call are accumulated in `prompt_tokens`
+    and `output_tokens`.
+    """
+
+    def __init__(
+        self,
+        round_trip: float = 0.4,
+        first_token: float = 0.3,
+        inter_token: float = 0.01,
+        chunks: Sequence[str] = ("Why ", "do ", "you ", "think ", "that?"),
+        respond: Callable[[str], str] | None = None,
+        per_prompt_token: float = 0.0,
+        per_output_token: float = 0.0,
+    ) -> None:
+        self.round_trip: float = round_trip
+        self.first_token: float = first_token
+        self.inter_token: float = inter_token
+        self.chunks: list[str] = list(chunks)
+        self.respond: Callable[[str], str] = respond or (lambda _prompt: '{"triggered": false}')
+        self.per_prompt_token: float = per_prompt_token
+        self.per_output_token: float = per_output_token
+        self.calls: int = 0
+        self.stream_calls: int = 0
+        self.prompt_tokens: int = 0
+        self.output_tokens: int = 0
+
+    @override
+    async def generate_content(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        search: bool = False,
+        response_mime_type: str | None = None,
+        use_cache: bool = True,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+        response_schema: type[BaseModel] | None = None,
+    ) -> str:
+        self.calls += 1
+        tokens = estimate_tokens(prompt) + estimate_tokens(system_instruction)
+        self.prompt_tokens += tokens
+        response = self.respond(prompt)
+        output = estimate_tokens(response)
+        self.output_tokens += output
+        await asyncio.sleep(
+            self.round_trip + tokens * self.per_prompt_token + output * self.per_output_token
+        )
+        return response
+
+    @override
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: type[StructuredT],
+        system_instruction: str | None = None,
+        use_cache: bool = True,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+    ) -> StructuredT:
+        response = await self.generate_content(prompt, system_instruction, priority=priority)
+        return schema.model_validate_json(response)
+
+    @override
+    async def generate_content_stream(
+        self,
+        prompt: str,
+        system_instruction: str | None = None,
+        search: bool = False,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        response_schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]:
+        self.stream_calls += 1
+        tokens = estimate_tokens(prompt) + estimate_tokens(system_instruction)
+        self.prompt_tokens += tokens
+        await asyncio.sleep(self.first_token + tokens * self.per_prompt_token)
+        for index, chunk in enumerate(self.chunks):
+            if index:
+                await asyncio.sleep(self.inter_token)
+            self.output_tokens += estimate_tokens(chunk)
+            yield chunk
+
+
+class FakeLessonService(LessonContextSource):
+    """Lesson context service that never touches the database."""
+
+    @override
+    async def get_context(
+        self, lesson_id: str, db: AsyncSession, source: str = "db"
+    ) -> LessonContext:
+        return LessonContext(
+            lesson_id=lesson_id,
+            name="Loops",
+            description="Iterating over collections with for and while.",
+            objectives=["Write a for loop", "Use range()"],
+        )
+
+
+def summarize(samples: Sequence[float]) -> str:
+    """Format latency samples (seconds) as a one-line millisecond summary."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"median={statistics.median(ordered) * 1000:7.1f}ms "
+        + f"p95={p95 * 1000:7.1f}ms "
+        + f"min={ordered[0] * 1000:7.1f}ms (n={len(ordered)})"
+    )
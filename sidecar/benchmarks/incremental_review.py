@@ -0,0 +1,96 @@
+"""Re-review cost of a small edit to a large file: full review vs incremental review.
+
+A file of --lines lines is reviewed once; then one line is edited and the revision is
+reviewed again, either from scratch or against the diff with the first review. The
+fake Gemini service adds prefill time per prompt token, so latency follows prompt size.
+
+Usage:
+    python -m benchmarks.incremental_review [--lines N] [--runs N] [--per-token S]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import cast
+from unittest.mock import MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from agents.code_reviewer.agent import CodeReviewerAgent
+from agents.code_reviewer.incremental import ReviewDiff, diff_code
+from database.models import Base, CodeReview
+from services.gemini_service import GeminiService
+from services.lesson_service import LessonContextService
+
+from .fakes import FakeGeminiService, FakeLessonService, summarize
+
+
+def make_code(lines: int) -> str:
+    functions = [f"def step_{i}(value):\n    return value + {i}\n\n" for i in range(lines // 3)]
+    return "".join(functions)
+
+
+def respond(prompt: str) -> str:
+    if "specific areas for improvement" in prompt:
+        return json.dumps({"findings": []})
+    return '{"triggered": false}'
+
+
+async def review(
+    agent: CodeReviewerAgent, db: AsyncSession, code: str, baseline: ReviewDiff | None
+) -> float:
+    review = CodeReview(id=str(uuid.uuid4()), lesson_id="bench", code_content=code, language="py")
+    db.add(review)
+    await db.commit()
+    start = time.perf_counter()
+    async for _token in agent.review(review.id, "bench", code, "py", db, baseline=baseline):
+        pass
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--lines", type=int, default=2000)
+    _ = parser.add_argument("--runs", type=int, default=5)
+    _ = parser.add_argument("--per-token", type=float, default=0.00005)
+    args = parser.parse_args()
+    lines = cast(int, args.lines)
+    runs = cast(int, args.runs)
+    per_token = cast(float, args.per_token)
+
+    original = make_code(lines)
+    revised = original.replace("return value + 7\n", "return value * 7\n")
+    baseline = diff_code(original, revised, [])
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    print(
+        f"Re-review of a one-line edit to a {original.count(chr(10))}-line file "
+        + f"over {runs} runs ({per_token * 1e6:.0f}us prefill per token)"
+    )
+    async with session_factory() as db:
+        for label, diff in (("full", None), ("incremental", baseline)):
+            gemini = FakeGeminiService(
+                round_trip=0.2, first_token=0.2, respond=respond, per_prompt_token=per_token
+            )
+            agent = CodeReviewerAgent(
+                gemini_service=cast(GeminiService, cast(object, gemini)),
+                db_manager=MagicMock(),
+                lesson_service=cast(LessonContextService, cast(object, FakeLessonService())),
+                model_name="benchmark",
+                guardrail_classifier=False,
+            )
+            agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+            samples = [await review(agent, db, revised, diff) for _ in range(runs)]
+            print(f"  {label:<12} total {summarize(samples)}")
+            print(f"  {'':<12} prompt tokens={gemini.prompt_tokens / runs:,.0f}/review")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""Code review latency and token usage across the reviewer pipeline layouts.
+
+- sequential: guardrail, then analysis, then the streamed review (three calls)
+- parallel: guardrail and analysis concurrently, then the review (three calls)
+- fused: one structured guardrail-plus-analysis call, then the review (two calls)
+
+Runs the reviewer graph against an in-memory database and a fake Gemini service with
+fixed round trips. The local guardrail classifier is disabled so every review pays for
+the LLM guardrail call. Token counts are local estimates of prompt and response size.
+
+Usage:
+    python -m benchmarks.review_latency [--runs N] [--round-trip S] [--first-token S]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import cast
+from unittest.mock import MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from agents.code_reviewer.agent import CodeReviewerAgent
+from database.models import Base, CodeReview
+from services.gemini_service import GeminiService
+from services.lesson_service import LessonContextService
+
+from .fakes import FakeGeminiService, FakeLessonService, summarize
+
+CODE = """def total(items=[]):
+    result = 0
+    for i in range(len(items)):
+        result += items[i]
+    return result
+"""
+
+FINDINGS = {
+    "findings": [
+        {
+            "line_number": 1,
+            "category": "Best Practices",
+            "observation": "Mutable default argument",
+            "socratic_question": "What happens to `items` between calls?",
+        }
+    ]
+}
+
+
+def respond(prompt: str) -> str:
+    """Return analysis or triage JSON for those prompts and a passing verdict otherwise."""
+    if "specific areas for improvement" in prompt and "Student lesson:" not in prompt:
+        return json.dumps(FINDINGS)
+    if prompt.startswith("Student lesson:"):
+        return json.dumps({"triggered": False, **FINDINGS})
+    return '{"triggered": false}'
+
+
+def build_agent(gemini: FakeGeminiService, layout: str) -> CodeReviewerAgent:
+    agent = CodeReviewerAgent(
+        gemini_service=cast(GeminiService, cast(object, gemini)),
+        db_manager=MagicMock(),
+        lesson_service=cast(LessonContextService, cast(object, FakeLessonService())),
+        model_name="benchmark",
+        parallel_guardrail=layout == "parallel",
+        fused_analysis=layout == "fused",
+        guardrail_classifier=False,
+    )
+    # No checkpointer: each review is an independent thread
+    agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+    return agent
+
+
+async def measure(
+    agent: CodeReviewerAgent, db: AsyncSession, runs: int
+) -> tuple[list[float], list[float]]:
+    """Return (time-to-first-token, total time) samples for `runs` reviews."""
+    ttft: list[float] = []
+    total: list[float] = []
+    for _ in range(runs):
+        review = CodeReview(
+            id=str(uuid.uuid4()), lesson_id="bench", code_content=CODE, language="python"
+        )
+        db.add(review)
+        await db.commit()
+
+        start = time.perf_counter()
+        first: float | None = None
+        async for _token in agent.review(review.id, "bench", CODE, "python", db):
+            if first is None:
+                first = time.perf_counter() - start
+        total.append(time.perf_counter() - start)
+        ttft.append(first if first is not None else total[-1])
+    return ttft, total
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--runs", type=int, default=20)
+    _ = parser.add_argument("--round-trip", type=float, default=0.4)
+    _ = parser.add_argument("--first-token", type=float, default=0.3)
+    args = parser.parse_args()
+    runs = cast(int, args.runs)
+    round_trip = cast(float, args.round_trip)
+    first_token = cast(float, args.first_token)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    print(f"Code review latency over {runs} reviews (json={round_trip}s, ttft={first_token}s)")
+    async with session_factory() as db:
+        for layout in ("sequential", "parallel", "fused"):
+            gemini = FakeGeminiService(
+                round_trip=round_trip, first_token=first_token, respond=respond
+            )
+            ttft, total = await measure(build_agent(gemini, layout), db, runs)
+            calls = (gemini.calls + gemini.stream_calls) / runs
+            print(f"  {layout:<12} ttft  {summarize(ttft)}")
+            print(f"  {'':<12} total {summarize(total)}")
+            print(
+                f"  {'':<12} calls={calls:.1f}/review  "
+                + f"prompt tokens={gemini.prompt_tokens / runs:,.0f}/review  "
+                + f"output tokens={gemini.output_tokens / runs:,.0f}/review"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""Commits and write time per stored code review.
+
+- pipeline: commits and write statements per review through ReviewService and the
+  reviewer graph (fake Gemini service, no latency)
+- writes only: storing a review's findings and feedback with the earlier per-node
+  pattern (one ORM add per finding and a commit, then a SELECT of the review, an update
+  and a second commit) vs `save_review` (one multi-row INSERT, one UPDATE, one commit)
+
+Runs against a temporary SQLite file in WAL mode, like the sidecar database, so commits
+pay for real journal writes.
+
+Usage:
+    python -m benchmarks.review_persistence [--reviews N] [--findings N]
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import cast
+from unittest.mock import MagicMock
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import ConnectionPoolEntry
+
+from agents.code_reviewer.agent import CodeReviewerAgent
+from agents.code_reviewer.persistence import save_review
+from agents.code_reviewer.state import CodeReviewerFinding
+from agents.manager import agent_manager
+from core.types import AgentID, CodeReviewStatus
+from database.models import Base, CodeReview, CodeReviewFinding
+from services.gemini_service import GeminiService
+from services.lesson_service import LessonContextService
+from services.review_service import ReviewService
+
+from .fakes import FakeGeminiService, FakeLessonService
+
+
+def make_findings(count: int) -> list[CodeReviewerFinding]:
+    return [
+        CodeReviewerFinding(
+            line_number=i + 1,
+            category="Best Practices",
+            observation=f"Observation {i}",
+            socratic_question=f"Question {i}?",
+        )
+        for i in range(count)
+    ]
+
+
+async def legacy_save(
+    db: AsyncSession, review_id: str, findings: list[CodeReviewerFinding], feedback: str
+) -> None:
+    """The write pattern the analysis and reviewer nodes used before `save_review`."""
+    for f in findings:
+        db.add(CodeReviewFinding(review_id=review_id, **f))
+    await db.commit()
+    result = await db.execute(select(CodeReview).where(CodeReview.id == review_id))
+    review = result.scalar_one()
+    review.feedback = feedback
+    review.status = CodeReviewStatus.COMPLETED
+    await db.commit()
+
+
+class Counter:
+    """Counts commits and INSERT/UPDATE/DELETE statements on a session."""
+
+    def __init__(self, db: AsyncSession, engine: AsyncEngine) -> None:
+        self.commits: int = 0
+        self.writes: int = 0
+        event.listen(db.sync_session, "after_commit", self._commit)
+        event.listen(engine.sync_engine, "before_cursor_execute", self._execute)
+
+    def _commit(self, _session: object) -> None:
+        self.commits += 1
+
+    def _execute(self, _conn: object, _cursor: object, statement: str, *_args: object) -> None:
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            self.writes += 1
+
+
+async def measure_pipeline(engine: AsyncEngine, reviews: int) -> None:
+    findings = {"findings": make_findings(3)}
+    gemini = FakeGeminiService(
+        round_trip=0,
+        first_token=0,
+        inter_token=0,
+        respond=lambda p: json.dumps(findings) if "findings" in p else '{"triggered": false}',
+    )
+    agent = CodeReviewerAgent(
+        gemini_service=cast(GeminiService, cast(object, gemini)),
+        db_manager=MagicMock(),
+        lesson_service=cast(LessonContextService, cast(object, FakeLessonService())),
+        model_name="benchmark",
+    )
+    agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+    agent_manager._agent_instances[AgentID.REVIEWER] = agent  # pyright: ignore[reportPrivateUsage]
+    service = ReviewService(cache_enabled=False, incremental=False)
+
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    async with factory() as db:
+        counter = Counter(db, engine)
+        for i in range(reviews):
+            async for _token in service.submit_review("bench", f"x_{i} = {i}\n", "python", db):
+                pass
+    print(
+        f"  pipeline     commits={counter.commits / reviews:.1f}/review  "
+        + f"writes={counter.writes / reviews:.1f}/review"
+    )
+
+
+async def measure_writes(engine: AsyncEngine, reviews: int, finding_count: int) -> None:
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    findings = make_findings(finding_count)
+    for label, save in (("per node", legacy_save), ("save_review", save_review)):
+        async with factory() as db:
+            ids = [str(uuid.uuid4()) for _ in range(reviews)]
+            db.add_all(
+                CodeReview(id=i, lesson_id="bench", code_content="x", language="python")
+                for i in ids
+            )
+            await db.commit()
+
+            counter = Counter(db, engine)
+            start = time.perf_counter()
+            for review_id in ids:
+                await save(db, review_id, findings, "Why a loop?")
+            elapsed = time.perf_counter() - start
+        print(
+            f"  {label:<12} {elapsed / reviews * 1000:6.2f}ms/review  "
+            + f"commits={counter.commits / reviews:.1f}/review  "
+            + f"writes={counter.writes / reviews:.1f}/review"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--reviews", type=int, default=200)
+    _ = parser.add_argument("--findings", type=int, default=5)
+    args = parser.parse_args()
+    reviews = cast(int, args.reviews)
+    finding_count = cast(int, args.findings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_sqlite_pragma(
+            dbapi_connection: sqlite3.Connection, _connection_record: ConnectionPoolEntry
+        ):
+            cursor = dbapi_connection.cursor()
+            _ = cursor.execute("PRAGMA journal_mode=WAL")
+            _ = cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        print(f"Review persistence over {reviews} reviews ({finding_count} findings each)")
+        await measure_pipeline(engine, reviews)
+        await measure_writes(engine, reviews, finding_count)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+"""Time to generate and store a roadmap: one request vs an outline and parallel phases.
+
+The fake Gemini service charges a fixed round trip plus a fixed time per output token,
+so a response takes as long as it is long.
+
+- single: `create_roadmap` with the whole roadmap generated in one request
+- expanded: `create_roadmap` with the outline generated first, then the lessons of each
+  phase, at most N phases at a time (1 expands them one after the other)
+- first phase: time until `stream_roadmap` with phase expansion has stored a phase
+
+Usage:
+    python -m benchmarks.roadmap_expansion [--phases N] [--lessons N] [--runs N]
+        [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from typing import cast
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from agents.roadmap_creator import RoadmapCreatorAgent
+from database.models import Base
+
+from .fakes import FakeGeminiService, summarize
+
+ROUND_TRIP = 0.3
+PER_OUTPUT_TOKEN = 0.004  # 250 tokens/s
+REQUEST = ("Learn Python for Data Science", "Some scripting", "Hands-on")
+
+
+def lessons_of(phase: int, lessons: int) -> list[dict[str, object]]:
+    return [
+        {
+            "name": f"Lesson {phase}.{n}",
+            "description": "What the student will learn in this lesson.",
+            "objectives": [f"Objective {i}" for i in range(3)],
+        }
+        for n in range(lessons)
+    ]
+
+
+def single_fake(phases: int, lessons: int) -> FakeGeminiService:
+    roadmap = json.dumps(
+        {
+            "name": "Python for Data Science",
+            "description": "From the language basics to production data pipelines.",
+            "phases": [
+                {"name": f"Phase {p}", "lessons": lessons_of(p, lessons)} for p in range(phases)
+            ],
+        }
+    )
+    return FakeGeminiService(
+        round_trip=ROUND_TRIP, per_output_token=PER_OUTPUT_TOKEN, respond=lambda _p: roadmap
+    )
+
+
+def expansion_fake(phases: int, lessons: int) -> FakeGeminiService:
+    outline = json.dumps(
+        {
+            "name": "Python for Data Science",
+            "description": "From the language basics to production data pipelines.",
+            "phases": [
+                {"name": f"Phase {p}", "summary": "Topics covered by this phase."}
+                for p in range(phases)
+            ],
+        }
+    )
+
+    def respond(prompt: str) -> str:
+        match = re.search(r"Write the lessons of phase (\d+)", prompt)
+        if match is None:
+            return outline
+        return json.dumps({"lessons": lessons_of(int(match.group(1)), lessons)})
+
+    return FakeGeminiService(
+        round_trip=ROUND_TRIP, per_output_token=PER_OUTPUT_TOKEN, respond=respond
+    )
+
+
+async def time_create(
+    agent: RoadmapCreatorAgent, gemini: FakeGeminiService, db: AsyncSession, runs: int
+) -> list[float]:
+    timings: list[float] = []
+    with patch("agents.roadmap_creator.gemini_service", gemini):
+        for _ in range(runs):
+            start = time.perf_counter()
+            _ = await agent.create_roadmap(*REQUEST, db=db)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def time_first_phase(
+    agent: RoadmapCreatorAgent, gemini: FakeGeminiService, db: AsyncSession, runs: int
+) -> list[float]:
+    timings: list[float] = []
+    with patch("agents.roadmap_creator.gemini_service", gemini):
+        for _ in range(runs):
+            start = time.perf_counter()
+            first: float | None = None
+            async for event in agent.stream_roadmap(*REQUEST, db=db):
+                if event["event"] == "phase" and first is None:
+                    first = time.perf_counter() - start
+                    timings.append(first)
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--phases", type=int, default=5)
+    _ = parser.add_argument("--lessons", type=int, default=5)
+    _ = parser.add_argument("--runs", type=int, default=3)
+    _ = parser.add_argument("--concurrency", type=int, default=5)
+    args = parser.parse_args()
+    phases = cast(int, args.phases)
+    lessons = cast(int, args.lessons)
+    runs = cast(int, args.runs)
+    concurrency = cast(int, args.concurrency)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+
+    print(f"Roadmap of {phases} phases x {lessons} lessons, {runs} runs")
+    async with factory() as db:
+        gemini = single_fake(phases, lessons)
+        timings = await time_create(RoadmapCreatorAgent(phase_expansion=False), gemini, db, runs)
+        print(
+            f"  single             {summarize(timings)}  "
+            + f"output={gemini.output_tokens // runs} tokens"
+        )
+        for limit in (1, concurrency):
+            gemini = expansion_fake(phases, lessons)
+            agent = RoadmapCreatorAgent(phase_expansion=True, phase_concurrency=limit)
+            timings = await time_create(agent, gemini, db, runs)
+            print(
+                f"  expanded, {limit:<2} at once {summarize(timings)}  "
+                + f"output={gemini.output_tokens // runs} tokens"
+            )
+        agent = RoadmapCreatorAgent(phase_expansion=True, phase_concurrency=concurrency)
+        timings = await time_first_phase(agent, expansion_fake(phases, lessons), db, runs)
+        print(f"  first phase        {summarize(timings)}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""Latency and output tokens of editing one part of a roadmap vs regenerating all of it.
+
+The fake Gemini service charges a fixed round trip plus a fixed time per output token.
+
+- create: `create_roadmap`, the only way to change a roadmap before partial regeneration
+- phase: `regenerate_phase` of one phase, with the rest of the roadmap as context
+- objectives: `regenerate_objectives` of one lesson
+
+Usage:
+    python -m benchmarks.roadmap_regeneration [--phases N] [--lessons N] [--runs N]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from typing import cast
+from unittest.mock import patch
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from agents.roadmap_creator import RoadmapCreatorAgent
+from database.models import Base, Lesson, Phase
+
+from .fakes import FakeGeminiService, summarize
+
+ROUND_TRIP = 0.3
+PER_OUTPUT_TOKEN = 0.004  # 250 tokens/s
+REQUEST = ("Learn Python for Data Science", "Some scripting", "Hands-on")
+
+
+def lessons_of(phase: int, lessons: int) -> list[dict[str, object]]:
+    return [
+        {
+            "name": f"Lesson {phase}.{n}",
+            "description": "What the student will learn in this lesson.",
+            "objectives": [f"Objective {i}" for i in range(3)],
+        }
+        for n in range(lessons)
+    ]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--phases", type=int, default=5)
+    _ = parser.add_argument("--lessons", type=int, default=5)
+    _ = parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    phases = cast(int, args.phases)
+    lessons = cast(int, args.lessons)
+    runs = cast(int, args.runs)
+
+    roadmap = json.dumps(
+        {
+            "name": "Python for Data Science",
+            "description": "From the language basics to production data pipelines.",
+            "phases": [
+                {"name": f"Phase {p}", "lessons": lessons_of(p, lessons)} for p in range(phases)
+            ],
+        }
+    )
+    phase = json.dumps({"lessons": lessons_of(0, lessons)})
+    objectives = json.dumps({"objectives": [f"New objective {i}" for i in range(3)]})
+
+    def respond(prompt: str) -> str:
+        if "Rewrite the lessons of phase" in prompt:
+            return phase
+        if "Rewrite the objectives" in prompt:
+            return objectives
+        return roadmap
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    agent = RoadmapCreatorAgent(phase_expansion=False)
+
+    print(f"Roadmap of {phases} phases x {lessons} lessons, {runs} runs")
+    async with factory() as db:
+        with patch(
+            "agents.roadmap_creator.gemini_service",
+            FakeGeminiService(round_trip=0, respond=respond),
+        ):
+            _ = await agent.create_roadmap(*REQUEST, db=db)
+        # `respond` rewrites the first phase with its own lesson names, so they are kept in
+        # place; the objectives are edited on a lesson of the last phase, which stays as is
+        phase_ids = (await db.execute(select(Phase.id).order_by(Phase.order_num))).scalars().all()
+        phase_id = phase_ids[0]
+        lesson_id = (
+            await db.execute(
+                select(Lesson.id)
+                .where(Lesson.phase_id == phase_ids[-1])
+                .order_by(Lesson.order_num)
+                .limit(1)
+            )
+        ).scalar_one()
+
+        operations: list[tuple[str, Callable[[], Awaitable[object]]]] = [
+            ("create", lambda: agent.create_roadmap(*REQUEST, db=db)),
+            ("phase", lambda: agent.regenerate_phase(phase_id, db)),
+            ("objectives", lambda: agent.regenerate_objectives(lesson_id, db)),
+        ]
+        for label, operation in operations:
+            gemini = FakeGeminiService(
+                round_trip=ROUND_TRIP, per_output_token=PER_OUTPUT_TOKEN, respond=respond
+            )
+            timings: list[float] = []
+            with patch("agents.roadmap_creator.gemini_service", gemini):
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    _ = await operation()
+                    timings.append(time.perf_counter() - start)
+            print(
+                f"  {label:<11} {summarize(timings)}  "
+                + f"output={gemini.output_tokens // runs} tokens"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""Time until a new roadmap's first phase is stored: blocking vs streaming generation.
+
+`create_roadmap` stores nothing until the whole response has been generated;
+`stream_roadmap` stores each phase as soon as its JSON closes. The fake Gemini service
+emits the same roadmap at a fixed rate in both cases, so the difference is only when
+the first phase becomes readable.
+
+Usage:
+    python -m benchmarks.roadmap_stream [--phases N] [--lessons N] [--runs N]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import cast
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from agents.roadmap_creator import RoadmapCreatorAgent
+from database.models import Base
+
+from .fakes import FakeGeminiService, summarize
+
+CHARS_PER_CHUNK = 16
+FIRST_TOKEN = 0.3
+INTER_TOKEN = 0.002
+
+
+def roadmap_json(phases: int, lessons: int) -> str:
+    return json.dumps(
+        {
+            "name": "Python for Data Science",
+            "description": "From the language basics to production data pipelines.",
+            "phases": [
+                {
+                    "name": f"Phase {p}",
+                    "lessons": [
+                        {
+                            "name": f"Lesson {p}.{n}",
+                            "description": "What the student will learn in this lesson.",
+                            "objectives": [f"Objective {i}" for i in range(3)],
+                        }
+                        for n in range(lessons)
+                    ],
+                }
+                for p in range(phases)
+            ],
+        },
+        indent=2,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--phases", type=int, default=5)
+    _ = parser.add_argument("--lessons", type=int, default=5)
+    _ = parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    runs = cast(int, args.runs)
+
+    text = roadmap_json(cast(int, args.phases), cast(int, args.lessons))
+    chunks = [text[i : i + CHARS_PER_CHUNK] for i in range(0, len(text), CHARS_PER_CHUNK)]
+    gemini = FakeGeminiService(
+        # A blocking call takes as long as the full stream
+        round_trip=FIRST_TOKEN + (len(chunks) - 1) * INTER_TOKEN,
+        first_token=FIRST_TOKEN,
+        inter_token=INTER_TOKEN,
+        chunks=chunks,
+        respond=lambda _prompt: text,
+    )
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    agent = RoadmapCreatorAgent(phase_expansion=False)
+    request = ("Learn Python for Data Science", "Some scripting", "Hands-on")
+
+    blocking: list[float] = []
+    first_phase: list[float] = []
+    streamed: list[float] = []
+    with patch("agents.roadmap_creator.gemini_service", gemini):
+        for _ in range(runs):
+            async with factory() as db:
+                start = time.perf_counter()
+                _ = await agent.create_roadmap(*request, db=db)
+                blocking.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                first: float | None = None
+                async for event in agent.stream_roadmap(*request, db=db):
+                    if event["event"] == "phase" and first is None:
+                        first = time.perf_counter() - start
+                        first_phase.append(first)
+                streamed.append(time.perf_counter() - start)
+    await engine.dispose()
+
+    print(f"Roadmap of {len(text)} chars in {len(chunks)} chunks")
+    print(f"  create_roadmap, first phase  {summarize(blocking)}")
+    print(f"  stream_roadmap, first phase  {summarize(first_phase)}")
+    print(f"  stream_roadmap, complete     {summarize(streamed)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
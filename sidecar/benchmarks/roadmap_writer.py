@@ -0,0 +1,156 @@
+"""Time to store a generated roadmap, from 10 to 5,000 lessons.
+
+- orm: the earlier pattern, one `Phase` and `Lesson` object per row added to the session,
+  a commit (the unit of work flushes them) and a refresh of the roadmap
+- core: `insert_roadmap` (three executemany INSERTs) and a commit, with no refresh
+
+Runs against a temporary SQLite file in WAL mode, like the sidecar database.
+
+Usage:
+    python -m benchmarks.roadmap_writer [--phases N] [--sizes N ...] [--runs N]
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import cast
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import ConnectionPoolEntry
+
+from core.types import LessonStatus, RoadmapStatus
+from database.models import Base, Lesson, Phase, Roadmap
+from schemas.domain import RoadmapStructure
+from services.roadmap_writer import insert_roadmap
+
+from .fakes import summarize
+
+
+def make_structure(phases: int, lessons: int) -> RoadmapStructure:
+    per_phase = [lessons // phases + (1 if p < lessons % phases else 0) for p in range(phases)]
+    return RoadmapStructure.model_validate(
+        {
+            "name": "Python for Data Science",
+            "description": "From the language basics to production data pipelines.",
+            "phases": [
+                {
+                    "name": f"Phase {p}",
+                    "lessons": [
+                        {
+                            "name": f"Lesson {p}.{n}",
+                            "description": "What the student will learn in this lesson.",
+                            "objectives": [f"Objective {i}" for i in range(3)],
+                        }
+                        for n in range(count)
+                    ],
+                }
+                for p, count in enumerate(per_phase)
+                if count
+            ],
+        }
+    )
+
+
+async def orm_save(db: AsyncSession, structure: RoadmapStructure) -> None:
+    """The write pattern `create_roadmap` used before `insert_roadmap`."""
+    roadmap = Roadmap(
+        id=str(uuid.uuid4()),
+        name=structure.name,
+        description=structure.description,
+        goal="bench",
+        status=RoadmapStatus.ACTIVE,
+    )
+    db.add(roadmap)
+    for phase_idx, phase_data in enumerate(structure.phases):
+        phase_id = str(uuid.uuid4())
+        db.add(
+            Phase(
+                id=phase_id,
+                roadmap_id=roadmap.id,
+                name=phase_data.name,
+                order_num=phase_idx + 1,
+                status=LessonStatus.NOT_STARTED,
+                lessons=[
+                    Lesson(
+                        id=str(uuid.uuid4()),
+                        phase_id=phase_id,
+                        name=lesson_data.name,
+                        description=lesson_data.description,
+                        objectives=lesson_data.objectives,
+                        order_num=lesson_idx + 1,
+                        status=LessonStatus.NOT_STARTED,
+                        metadata_json={},
+                    )
+                    for lesson_idx, lesson_data in enumerate(phase_data.lessons)
+                ],
+            )
+        )
+    await db.commit()
+    await db.refresh(roadmap)
+
+
+async def core_save(db: AsyncSession, structure: RoadmapStructure) -> None:
+    _ = await insert_roadmap(db, structure, goal="bench")
+    await db.commit()
+
+
+async def measure(
+    engine: AsyncEngine, structure: RoadmapStructure, runs: int
+) -> dict[str, list[float]]:
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    timings: dict[str, list[float]] = {"orm": [], "core": []}
+    for _ in range(runs):
+        for label, save in (("orm", orm_save), ("core", core_save)):
+            async with factory() as db:
+                start = time.perf_counter()
+                await save(db, structure)
+                timings[label].append(time.perf_counter() - start)
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--phases", type=int, default=10)
+    _ = parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    _ = parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    phases = cast(int, args.phases)
+    sizes = cast(list[int], args.sizes)
+    runs = cast(int, args.runs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_sqlite_pragma(
+            dbapi_connection: sqlite3.Connection, _connection_record: ConnectionPoolEntry
+        ):
+            cursor = dbapi_connection.cursor()
+            _ = cursor.execute("PRAGMA journal_mode=WAL")
+            _ = cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        print(f"Storing a roadmap of up to {phases} phases, {runs} runs per size")
+        for lessons in sizes:
+            structure = make_structure(min(phases, lessons), lessons)
+            timings = await measure(engine, structure, runs)
+            print(f"  {lessons:>5} lessons")
+            for label, values in timings.items():
+                print(f"    {label:<5} {summarize(values)}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
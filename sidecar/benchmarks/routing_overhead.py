@@ -0,0 +1,95 @@
+"""Per-request routing overhead of the orchestrator: LangGraph routing vs direct dispatch.
+
+The delegated agents are replaced by an instant stub, so each sample is the time from
+calling OrchestratorAgent.chat_stream to receiving the stub's only token, i.e. routing
+plus delegation prompt construction.
+
+Usage:
+    python -m benchmarks.routing_overhead [--requests N]
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from typing import cast
+from unittest.mock import MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import override
+
+from agents.agent_registry import agent_registry
+from agents.base import BaseAgent
+from agents.manager import agent_manager
+from agents.orchestrator.agent import OrchestratorAgent
+from services.gemini_service import GeminiService
+from services.lesson_service import LessonContextService
+
+from .fakes import summarize
+
+MESSAGES = ("How do I loop over a list?", "/review def add(a, b): return a + b")
+
+
+class StubAgent(BaseAgent):
+    """Delegate that answers instantly so only orchestrator overhead is timed."""
+
+    agent_id: str = "stub"
+
+    @override
+    async def initialize(self) -> None:
+        pass
+
+    @override
+    async def chat(
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
+    ) -> str:
+        return "ok"
+
+    @override
+    async def chat_stream(
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
+    ) -> AsyncIterator[str]:
+        yield "ok"
+
+    @override
+    async def close(self) -> None:
+        pass
+
+
+async def measure(orchestrator: OrchestratorAgent, requests: int) -> list[float]:
+    # A placeholder session: the stub agents never use it
+    db = cast(AsyncSession, cast(object, MagicMock()))
+    samples: list[float] = []
+    for i in range(requests):
+        start = time.perf_counter()
+        tokens = [t async for t in orchestrator.chat_stream("bench", MESSAGES[i % 2], db)]
+        samples.append(time.perf_counter() - start)
+        assert tokens == ["ok"], tokens
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    requests = cast(int, args.requests)
+
+    agent_registry.discover_agents()
+    gemini = cast(GeminiService, cast(object, MagicMock()))
+    lessons = cast(LessonContextService, cast(object, MagicMock()))
+    for agent_id in agent_registry.get_all_agent_ids():
+        stub = StubAgent(gemini, MagicMock(), lessons)
+        agent_manager._agent_instances[agent_id] = stub  # pyright: ignore[reportPrivateUsage]
+
+    print(f"Routing {requests} streaming requests through the orchestrator")
+    for label, graph_routing in (("graph routing", True), ("direct dispatch", False)):
+        orchestrator = OrchestratorAgent(gemini, MagicMock(), lessons, graph_routing=graph_routing)
+        await orchestrator.initialize()
+        _ = await measure(orchestrator, 50)  # warm-up
+        samples = await measure(orchestrator, requests)
+        mean_us = sum(samples) / len(samples) * 1e6
+        print(f"  {label:<16} mean={mean_us:8.1f}us/request  {summarize(samples)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
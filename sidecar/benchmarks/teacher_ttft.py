@@ -0,0 +1,78 @@
+"""Time-to-first-token for the teacher graph, sequential vs speculative guardrail.
+
+The local guardrail classifier is disabled unless --with-classifier is given, so every
+turn exercises the LLM guardrail path the speculative mode is designed to hide.
+
+Usage:
+    python -m benchmarks.teacher_ttft [--runs N] [--round-trip S] [--first-token S]
+        [--with-classifier]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import cast
+from unittest.mock import MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agents.teacher.agent import TeacherAgent
+from services.gemini_service import GeminiService
+from services.lesson_service import LessonContextService
+
+from .fakes import FakeGeminiService, FakeLessonService, summarize
+
+
+async def measure(agent: TeacherAgent, runs: int) -> tuple[list[float], list[float]]:
+    """Return (time-to-first-token, total time) samples for `runs` chat turns."""
+    # A placeholder session: the fake lesson service never uses it
+    db = cast(AsyncSession, cast(object, MagicMock()))
+    ttft: list[float] = []
+    total: list[float] = []
+    for run in range(runs):
+        start = time.perf_counter()
+        first: float | None = None
+        async for _token in agent.chat_stream(f"bench-{run}", "How do I loop?", db):
+            if first is None:
+                first = time.perf_counter() - start
+        total.append(time.perf_counter() - start)
+        ttft.append(first if first is not None else total[-1])
+    return ttft, total
+
+
+def build_agent(gemini: FakeGeminiService, speculative: bool, classifier: bool) -> TeacherAgent:
+    agent = TeacherAgent(
+        gemini_service=cast(GeminiService, cast(object, gemini)),
+        db_manager=MagicMock(),
+        lesson_service=cast(LessonContextService, cast(object, FakeLessonService())),
+        model_name="benchmark",
+        speculative_guardrail=speculative,
+        guardrail_classifier=classifier,
+    )
+    # No checkpointer: each run is an independent thread
+    agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType]
+    return agent
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--runs", type=int, default=20)
+    _ = parser.add_argument("--round-trip", type=float, default=0.4)
+    _ = parser.add_argument("--first-token", type=float, default=0.3)
+    _ = parser.add_argument("--with-classifier", action="store_true")
+    args = parser.parse_args()
+    classifier = cast(bool, args.with_classifier)
+    runs = cast(int, args.runs)
+    round_trip = cast(float, args.round_trip)
+    first_token = cast(float, args.first_token)
+
+    print(f"Teacher TTFT over {runs} turns (guardrail={round_trip}s, ttft={first_token}s)")
+    for label, speculative in (("sequential", False), ("speculative", True)):
+        gemini = FakeGeminiService(round_trip=round_trip, first_token=first_token)
+        ttft, total = await measure(build_agent(gemini, speculative, classifier), runs)
+        print(f"  {label:<12} ttft  {summarize(ttft)}")
+        print(f"  {'':<12} total {summarize(total)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
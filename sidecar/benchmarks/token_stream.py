@@ -0,0 +1,106 @@
+"""Per-token overhead of astream_events(v2) callbacks versus the custom stream mode.
+
+Both variants run the same three-node graph shape as the teacher agent with a socratic
+node that emits tokens as fast as possible, so the numbers isolate streaming overhead.
+
+Usage:
+    python -m benchmarks.token_stream [--tokens N] [--runs N]
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypedDict, cast
+
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, StateGraph
+from langgraph.graph.state import CompiledStateGraph
+from langgraph.types import StreamWriter
+
+from agents.streaming import emit_token, iter_tokens
+
+from .fakes import summarize
+
+
+class BenchState(TypedDict):
+    count: int
+
+
+def passthrough(state: BenchState) -> dict[str, int]:
+    return {"count": state["count"]}
+
+
+def build_graph(
+    socratic: Callable[..., Awaitable[dict[str, int]]],
+) -> CompiledStateGraph[BenchState, Any, Any, Any]:  # pyright: ignore[reportExplicitAny]
+    workflow = StateGraph(BenchState)
+    for name in ("enrichment", "guardrail"):
+        _ = workflow.add_node(name, passthrough)  # pyright: ignore[reportUnknownMemberType]
+    _ = workflow.add_node("socratic", socratic)  # pyright: ignore[reportUnknownMemberType]
+    _ = workflow.set_entry_point("enrichment")
+    _ = workflow.add_edge("enrichment", "guardrail")
+    _ = workflow.add_edge("guardrail", "socratic")
+    _ = workflow.add_edge("socratic", END)
+    return workflow.compile()  # pyright: ignore[reportUnknownMemberType]
+
+
+async def legacy_socratic(state: BenchState, config: RunnableConfig) -> dict[str, int]:
+    for _ in range(state["count"]):
+        await adispatch_custom_event("socratic_token", {"token": "tok "}, config=config)
+    return {}
+
+
+async def custom_socratic(state: BenchState, writer: StreamWriter) -> dict[str, int]:
+    for _ in range(state["count"]):
+        emit_token(writer, "tok ")
+    return {}
+
+
+async def legacy_tokens(graph: CompiledStateGraph[BenchState, Any, Any, Any], n: int) -> int:  # pyright: ignore[reportExplicitAny]
+    received = 0
+    async for event in graph.astream_events({"count": n}, version="v2"):  # pyright: ignore[reportUnknownMemberType]
+        if event["event"] == "on_custom_event" and event["name"] == "socratic_token":
+            received += 1
+    return received
+
+
+async def custom_tokens(graph: CompiledStateGraph[BenchState, Any, Any, Any], n: int) -> int:  # pyright: ignore[reportExplicitAny]
+    received = 0
+    stream = cast(AsyncIterator[object], graph.astream({"count": n}, stream_mode="custom"))  # pyright: ignore[reportUnknownMemberType]
+    async for _token in iter_tokens(stream):
+        received += 1
+    return received
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--tokens", type=int, default=2000)
+    _ = parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    tokens = cast(int, args.tokens)
+    runs = cast(int, args.runs)
+
+    variants = (
+        ("astream_events v2", build_graph(legacy_socratic), legacy_tokens),
+        ("custom stream", build_graph(custom_socratic), custom_tokens),
+    )
+    print(f"Streaming {tokens} tokens through the teacher graph shape, {runs} runs")
+    for label, graph, consume in variants:
+        _ = await consume(graph, 10)  # warm-up
+        samples: list[float] = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            received = await consume(graph, tokens)
+            samples.append(time.perf_counter() - start)
+            assert received == tokens, f"{label}: received {received}/{tokens} tokens"
+        best = min(samples)
+        print(
+            f"  {label:<18} {tokens / best:>10,.0f} tokens/s "
+            + f"{best / tokens * 1e6:7.2f} us/token  {summarize(samples)}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -16,6 +16,19 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = Field(default="")
     GEMINI_MODEL: str = Field(default="gemini-3-pro-preview")
 
+    # Rate Limiting Settings (0 disables a limit)
+    GEMINI_REQUESTS_PER_MINUTE: int = 60
+    GEMINI_TOKENS_PER_MINUTE: int = 250_000
+
+    # Retry and Circuit Breaker Settings
+    GEMINI_MAX_RETRIES: int = 3
+    GEMINI_RETRY_BASE_DELAY: float = 1.0
+    GEMINI_RETRY_MAX_DELAY: float = 30.0
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    GEMINI_CIRCUIT_RESET_SECONDS: float = 30.0
+    # Extra generations when a structured response fails schema validation
+    GEMINI_STRUCTURED_RETRIES: int = 1
+
     # Safety Settings
     SAFETY_SETTINGS: list[types.SafetySetting] = [
         types.SafetySetting(
@@ -42,6 +55,69 @@ class Settings(BaseSettings):
     ENV_FILE_PATH: Path = BASE_DIR / ".env"
     DATABASE_URL: str = f"sqlite+aiosqlite:///{BASE_DIR}/gemini_sensei.db"
     CHECKPOINT_DB_PATH: str = "checkpoints.db"
+    REVIEW_CHECKPOINT_DB_PATH: str = "code_reviewer_checkpoints.db"
+
+    # Checkpoint Compaction Settings (0 disables each limit)
+    CHECKPOINT_KEEP_LATEST: int = 5
+    CHECKPOINT_RETENTION_DAYS: float = 30
+    CHECKPOINT_COMPACTION_INTERVAL_HOURS: float = 6
+
+    # Response Cache Settings
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_PERSISTENT_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_DB_PATH: str = "response_cache.db"
+
+    # Lesson Context Cache Settings (0 disables the cache)
+    LESSON_CONTEXT_CACHE_MAX_ENTRIES: int = 256
+
+    # Guardrail Classifier Settings
+    # Local pre-classifier confidence that a message is legitimate needed to skip the
+    # LLM guardrail call
+    GUARDRAIL_CLASSIFIER_ENABLED: bool = True
+    GUARDRAIL_CLASSIFIER_THRESHOLD: float = 0.9
+
+    # Orchestrator Settings
+    # Route streaming requests through the LangGraph workflow instead of the direct
+    # dispatcher; only needed for routing policies that depend on graph state
+    ORCHESTRATOR_GRAPH_ROUTING: bool = False
+
+    # Teacher Agent Settings
+    # Start the Socratic stream while the guardrail runs, holding tokens until it passes
+    TEACHER_SPECULATIVE_GUARDRAIL: bool = True
+    # Estimated tokens of verbatim history sent per turn; older turns are summarized
+    TEACHER_HISTORY_TOKEN_BUDGET: int = 2000
+    TEACHER_SUMMARY_MAX_WORDS: int = 250
+
+    # Roadmap Creator Settings
+    # Generate an outline of the phases first, then the lessons of each phase with at
+    # most ROADMAP_PHASE_CONCURRENCY requests in flight, instead of one large request
+    ROADMAP_PHASE_EXPANSION: bool = True
+    ROADMAP_PHASE_CONCURRENCY: int = 5
+
+    # Code Reviewer Settings
+    # Run the guardrail and the analysis concurrently, discarding the analysis if the
+    # guardrail fires
+    REVIEW_PARALLEL_GUARDRAIL: bool = True
+    # Replace the guardrail and analysis calls with one structured-output call
+    REVIEW_FUSED_ANALYSIS: bool = False
+    # Analyze code above this estimated size in chunks of about this many tokens,
+    # with at most REVIEW_ANALYSIS_CONCURRENCY chunk requests in flight (0 disables)
+    REVIEW_ANALYSIS_CHUNK_TOKENS: int = 3000
+    REVIEW_ANALYSIS_CONCURRENCY: int = 4
+    # Replay earlier reviews of the same normalized code for the same lesson and language
+    REVIEW_CACHE_ENABLED: bool = True
+    REVIEW_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    # Re-review revisions by analyzing only the lines changed since the last review
+    REVIEW_INCREMENTAL_ENABLED: bool = True
+    # Reviews of one batch request running at once, and the most items a batch may hold
+    REVIEW_BATCH_CONCURRENCY: int = 4
+    REVIEW_BATCH_MAX_ITEMS: int = 200
+    # Background review jobs running at once, and how many times an interrupted job is
+    # started before it is marked failed
+    REVIEW_JOB_WORKERS: int = 2
+    REVIEW_JOB_MAX_ATTEMPTS: int = 2
 
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -19,6 +19,10 @@ class ExternalAPIError(BaseAppException):
         super().__init__(message=message, code="EXTERNAL_API_ERROR", details=details)
 
 
+class StructuredOutputError(ExternalAPIError):
+    """Raised when a schema-constrained response cannot be validated against its schema."""
+
+
 class QuotaExceededError(BaseAppException):
     """Raised when an API quota is exceeded."""
 
@@ -26,6 +30,17 @@ class QuotaExceededError(BaseAppException):
         super().__init__(message=message, code="QUOTA_EXCEEDED", details=details)
 
 
+class ServiceUnavailableError(BaseAppException):
+    """Raised when an external API is temporarily unavailable (e.g. circuit open)."""
+
+    def __init__(
+        self,
+        message: str = "Service temporarily unavailable",
+        details: dict[str, object] | None = None,
+    ):
+        super().__init__(message=message, code="SERVICE_UNAVAILABLE", details=details)
+
+
 class LessonError(Exception):
     """Base exception for lesson-related errors."""
 
@@ -36,3 +51,9 @@ class LessonNotFoundError(LessonError):
     """Raised when a lesson is not found."""
 
     pass
+
+
+class ReviewJobNotFoundError(Exception):
+    """Raised when a review job is not found."""
+
+    pass
@@ -0,0 +1,155 @@
+"""Pick complete values out of a JSON document while it is still streaming in.
+
+Model output arrives a few tokens at a time. `JSONStreamParser` scans each chunk once and
+reports values as soon as they are closed, so callers can act on the first items of an
+array long before the document ends. Text before the first `{` or `[` (e.g. a markdown
+fence) and after the end of the document is ignored.
+"""
+
+import json
+from dataclasses import dataclass
+
+JSONPath = tuple[str | int, ...]
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",]}" + _WHITESPACE
+
+
+@dataclass
+class _Container:
+    path: JSONPath
+    start: int
+    is_object: bool
+    key: str = ""
+    index: int = 0
+    expects_key: bool = True
+
+    def child(self) -> JSONPath:
+        return self.path + ((self.key if self.is_object else self.index),)
+
+
+class JSONStreamParser:
+    """Incremental scanner for one JSON document.
+
+    Objects and arrays at `max_depth` are reported whole; shallower ones are walked
+    into, and the strings, numbers, booleans and nulls they hold are reported
+    individually. The document itself has depth 0, so with the default depth of 2
+    `{"name": "x", "items": [{...}, {...}]}` reports `("name",)`, `("items", 0)` and
+    `("items", 1)`. Only the text of the value being scanned is kept in memory.
+    """
+
+    def __init__(self, max_depth: int = 2) -> None:
+        self.max_depth: int = max_depth
+        self.done: bool = False
+        self._buffer: str = ""
+        self._offset: int = 0  # Characters dropped from the front of the buffer
+        self._stack: list[_Container] = []
+        self._value_start: int | None = None  # Absolute start of an open string or scalar
+        self._in_string: bool = False
+        self._string_is_key: bool = False
+        self._escape: bool = False
+
+    def feed(self, chunk: str) -> list[tuple[JSONPath, object]]:
+        """Scan `chunk` and return the `(path, value)` of each value it completed.
+
+        Raises:
+            json.JSONDecodeError: If a completed value is not valid JSON.
+        """
+        completed: list[tuple[JSONPath, object]] = []
+        if self.done:
+            return completed
+        scanned = len(self._buffer)
+        self._buffer += chunk
+        i = scanned
+        while i < len(self._buffer) and not self.done:
+            char = self._buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._end_string(i + 1, completed)
+            elif not self._stack:
+                if char in "{[":
+                    self._open(i, char)
+            elif self._value_start is not None:
+                # A number, true, false or null runs until the next delimiter
+                if char in _SCALAR_END:
+                    self._end_scalar(i, completed)
+                    continue
+            elif char == '"':
+                top = self._stack[-1]
+                self._in_string = True
+                self._string_is_key = top.is_object and top.expects_key
+                self._value_start = i + self._offset
+            elif char in "{[":
+                self._open(i, char)
+            elif char in "}]":
+                self._close(i + 1, completed)
+            elif char == ":":
+                self._stack[-1].expects_key = False
+            elif char == ",":
+                top = self._stack[-1]
+                top.expects_key = True
+                top.index += 1
+            elif char not in _WHITESPACE:
+                self._value_start = i + self._offset
+            i += 1
+        self._trim(i)
+        return completed
+
+    def _open(self, index: int, char: str) -> None:
+        path = self._stack[-1].child() if self._stack else ()
+        self._stack.append(_Container(path, index + self._offset, is_object=char == "{"))
+
+    def _close(self, end: int, completed: list[tuple[JSONPath, object]]) -> None:
+        container = self._stack.pop()
+        if not self._stack:
+            self.done = True
+        if len(container.path) == self.max_depth:
+            self._report(container.path, container.start, end, completed)
+
+    def _end_string(self, end: int, completed: list[tuple[JSONPath, object]]) -> None:
+        start = self._value_start
+        assert start is not None
+        self._value_start = None
+        top = self._stack[-1]
+        if self._string_is_key:
+            top.key = json.loads(self._buffer[start - self._offset : end])
+        elif len(top.path) < self.max_depth:
+            self._report(top.child(), start, end, completed)
+
+    def _end_scalar(self, end: int, completed: list[tuple[JSONPath, object]]) -> None:
+        start = self._value_start
+        assert start is not None
+        self._value_start = None
+        top = self._stack[-1]
+        if len(top.path) < self.max_depth:
+            self._report(top.child(), start, end, completed)
+
+    def _report(
+        self,
+        path: JSONPath,
+        start: int,
+        end: int,
+        completed: list[tuple[JSONPath, object]],
+    ) -> None:
+        """Decode buffer[start:end], where `start` is absolute and `end` is relative."""
+        value: object = json.loads(self._buffer[start - self._offset : end])  # pyright: ignore[reportAny]
+        completed.append((path, value))
+
+    def _trim(self, scanned: int) -> None:
+        """Drop scanned text that no open value still needs."""
+        keep = scanned + self._offset
+        if self._value_start is not None:
+            keep = self._value_start
+        for container in self._stack:
+            if len(container.path) == self.max_depth:
+                keep = min(keep, container.start)
+                break
+        drop = keep - self._offset
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._offset = keep
@@ -0,0 +1,13 @@
+"""Local token estimation helpers."""
+
+# Gemini tokenizes English prose and code at roughly four characters per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str | list[str] | None) -> int:
+    """Cheaply estimate the number of tokens in a prompt without calling the API."""
+    if not text:
+        return 0
+    if isinstance(text, list):
+        return sum(estimate_tokens(part) for part in text)
+    return len(text) // CHARS_PER_TOKEN + 1
@@ -3,6 +3,7 @@ from typing import NamedTuple, TypedDict
 
 
 class RoadmapStatus(str, Enum):
+    GENERATING = "generating"
     ACTIVE = "active"
     ARCHIVED = "archived"
     COMPLETED = "completed"
@@ -20,6 +21,13 @@ class CodeReviewStatus(str, Enum):
     FAILED = "failed"
 
 
+class ReviewJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class AgentID(str, Enum):
     TEACHER = "teacher"
     REVIEWER = "reviewer"
@@ -61,3 +69,9 @@ class RoadmapValidationError(RoadmapError):
     """Exception raised when the generated roadmap fails validation."""
 
     pass
+
+
+class RoadmapNotFoundError(RoadmapError):
+    """Exception raised when the phase or lesson to regenerate does not exist."""
+
+    pass
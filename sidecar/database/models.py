@@ -6,7 +6,7 @@ from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.ext.mutable import MutableDict, MutableList
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
-from core.types import CodeReviewStatus, LessonStatus, RoadmapStatus
+from core.types import CodeReviewStatus, LessonStatus, ReviewJobStatus, RoadmapStatus
 
 
 class Base(DeclarativeBase):
@@ -86,6 +86,9 @@ class CodeReview(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # Review cache key: hash of the normalized code, valid for one prompt fingerprint
+    code_hash: Mapped[str | None] = mapped_column(String, index=True)
+    prompt_fingerprint: Mapped[str | None] = mapped_column(String)
 
     lesson: Mapped["Lesson"] = relationship("Lesson")
     findings: Mapped[list["CodeReviewFinding"]] = relationship(
@@ -93,6 +96,27 @@ class CodeReview(Base):
     )
 
 
+class ReviewJob(Base):
+    """A code review run by the background job queue, independently of any client."""
+
+    __tablename__: str = "review_jobs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    review_id: Mapped[str] = mapped_column(ForeignKey("code_reviews.id"), unique=True)
+    status: Mapped[ReviewJobStatus] = mapped_column(
+        SQLEnum(ReviewJobStatus), default=ReviewJobStatus.QUEUED, index=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    review: Mapped["CodeReview"] = relationship("CodeReview")
+
+
 class CodeReviewFinding(Base):
     __tablename__: str = "code_review_findings"
 
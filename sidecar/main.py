@@ -13,11 +13,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from agents.manager import agent_manager
+from agents.roadmap_creator import roadmap_creator
 from core.config import settings
-from core.exceptions import BaseAppException, ExternalAPIError, QuotaExceededError
+from core.exceptions import (
+    BaseAppException,
+    ExternalAPIError,
+    QuotaExceededError,
+    ServiceUnavailableError,
+)
 from database.migrations import run_migrations
 from database.session import dbsessionmanager
-from routers import agents, app_settings, chat, review, roadmap
+from routers import agents, app_settings, chat, maintenance, metrics, review, roadmap
+from services.checkpoint_maintenance import checkpoint_compactor
+from services.review_jobs import review_job_queue
 
 # Configure logging
 logging.basicConfig(
@@ -71,6 +79,13 @@ async def lifespan(_app: FastAPI):
         logger.warning("Skipping agent initialization - API key not configured.")
         logger.info("Please configure API key through the Welcome screen to enable AI features.")
 
+    # Roadmaps still generating were left behind by streams the last shutdown cut off
+    try:
+        async with dbsessionmanager.session() as db:
+            _ = await roadmap_creator.discard_unfinished(db)
+    except Exception as e:
+        logger.warning(f"Could not delete unfinished roadmaps: {e}")
+
     # Log initial stats
     try:
         from sqlalchemy import func, select
@@ -84,10 +99,28 @@ async def lifespan(_app: FastAPI):
     except Exception as e:
         logger.warning(f"Could not fetch roadmap count: {e}")
 
+    # Keep checkpoint databases bounded in the background
+    compaction_task: asyncio.Task[None] | None = None
+    if settings.CHECKPOINT_COMPACTION_INTERVAL_HOURS > 0:
+        compaction_task = asyncio.create_task(
+            checkpoint_compactor.run_periodically(
+                settings.CHECKPOINT_COMPACTION_INTERVAL_HOURS * 3600
+            )
+        )
+
+    # Run review jobs in the background, resuming those interrupted by the last shutdown
+    try:
+        await review_job_queue.start()
+    except Exception as e:
+        logger.error(f"Could not start the review job queue: {e}")
+
     logger.info("Database initialized. Sidecar is ready.")
     yield
     # Clean up on shutdown
     logger.info("Shutting down...")
+    if compaction_task is not None:
+        _ = compaction_task.cancel()
+    await review_job_queue.stop()
     await agent_manager.close_all()
     await dbsessionmanager.close()
     logger.info("Shutdown complete.")
@@ -116,6 +149,8 @@ async def app_exception_handler(_request: Request, exc: BaseAppException):
     status_code = 500
     if isinstance(exc, QuotaExceededError):
         status_code = 429
+    elif isinstance(exc, ServiceUnavailableError):
+        status_code = 503
     elif isinstance(exc, ExternalAPIError):
         status_code = 502
 
@@ -149,6 +184,7 @@ app.add_middleware(
     allow_credentials=False,  # Credentials not needed for token auth
     allow_methods=["*"],
     allow_headers=["Content-Type", "Authorization", "X-Sidecar-Token"],
+    expose_headers=["X-Review-Cache", "X-Review-Job"],
 )
 
 # API Router with Authentication
@@ -159,6 +195,8 @@ api_router.include_router(chat.router)
 api_router.include_router(review.router)
 api_router.include_router(agents.router)
 api_router.include_router(app_settings.router)
+api_router.include_router(metrics.router)
+api_router.include_router(maintenance.router)
 
 app.include_router(api_router)
 
@@ -0,0 +1,33 @@
+"""Add code review cache key
+
+Revision ID: 3f2a9c41d7e8
+Revises: cc1cb51cd170
+Create Date: 2026-10-17 10:12:31.508214
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2a9c41d7e8"
+down_revision: str | Sequence[str] | None = "cc1cb51cd170"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("code_reviews", sa.Column("code_hash", sa.String(), nullable=True))
+    op.add_column("code_reviews", sa.Column("prompt_fingerprint", sa.String(), nullable=True))
+    op.create_index(op.f("ix_code_reviews_code_hash"), "code_reviews", ["code_hash"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_code_reviews_code_hash"), table_name="code_reviews")
+    with op.batch_alter_table("code_reviews") as batch_op:
+        batch_op.drop_column("prompt_fingerprint")
+        batch_op.drop_column("code_hash")
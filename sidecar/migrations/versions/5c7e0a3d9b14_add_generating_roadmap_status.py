@@ -0,0 +1,39 @@
+"""Add generating roadmap status
+
+Revision ID: 5c7e0a3d9b14
+Revises: 8d4e1b7c2a90
+Create Date: 2026-10-17 16:41:08.532917
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c7e0a3d9b14"
+down_revision: str | Sequence[str] | None = "8d4e1b7c2a90"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+OLD_STATUS = sa.Enum("ACTIVE", "ARCHIVED", "COMPLETED", name="roadmapstatus")
+NEW_STATUS = sa.Enum("GENERATING", "ACTIVE", "ARCHIVED", "COMPLETED", name="roadmapstatus")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("roadmaps") as batch_op:
+        batch_op.alter_column(
+            "status", existing_type=OLD_STATUS, type_=NEW_STATUS, existing_nullable=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Roadmaps interrupted mid-generation are kept, but only as archived
+    _ = op.execute("UPDATE roadmaps SET status = 'ARCHIVED' WHERE status = 'GENERATING'")
+    with op.batch_alter_table("roadmaps") as batch_op:
+        batch_op.alter_column(
+            "status", existing_type=NEW_STATUS, type_=OLD_STATUS, existing_nullable=False
+        )
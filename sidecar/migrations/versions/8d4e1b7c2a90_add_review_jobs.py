@@ -0,0 +1,50 @@
+"""Add review jobs
+
+Revision ID: 8d4e1b7c2a90
+Revises: 3f2a9c41d7e8
+Create Date: 2026-10-17 14:03:52.119406
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d4e1b7c2a90"
+down_revision: str | Sequence[str] | None = "3f2a9c41d7e8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "review_jobs",  # pyright: ignore[reportUnusedCallResult]
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("review_id", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("QUEUED", "RUNNING", "COMPLETED", "FAILED", name="reviewjobstatus"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["review_id"],
+            ["code_reviews.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("review_id"),
+    )
+    op.create_index(op.f("ix_review_jobs_status"), "review_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_review_jobs_status"), table_name="review_jobs")
+    op.drop_table("review_jobs")
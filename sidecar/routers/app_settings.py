@@ -9,7 +9,9 @@ from core.config import settings
 from core.exceptions import QuotaExceededError
 from database.migrations import run_migrations
 from database.session import dbsessionmanager
+from services.gemini_service import gemini_service
 from services.key_manager import key_manager
+from services.lesson_service import lesson_context_service
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
@@ -99,14 +101,19 @@ async def reset_application(include_key: Annotated[bool, Query()] = False):
         if vector_store_path.exists():
             shutil.rmtree(vector_store_path)
 
-        # 4. (Optional) Wipe API Key
+        # 4. Drop cached AI responses and lesson contexts, which may contain user content
+        if gemini_service.cache is not None:
+            await gemini_service.cache.clear()
+        lesson_context_service.clear()
+
+        # 5. (Optional) Wipe API Key
         if include_key:
             env_path = settings.ENV_FILE_PATH
             if env_path.exists():
                 env_path.unlink()
             settings.GEMINI_API_KEY = ""
 
-        # 5. Re-initialize DB
+        # 6. Re-initialize DB
         # Re-post init to recreate engine/sessionmaker
         dbsessionmanager.model_post_init(None)
         await asyncio.to_thread(run_migrations)
@@ -0,0 +1,30 @@
+"""Administrative maintenance endpoints."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from services.checkpoint_maintenance import checkpoint_compactor
+
+router = APIRouter(prefix="/api/maintenance", tags=["maintenance"])
+
+
+@router.post("/checkpoints/compact")
+async def compact_checkpoints(
+    keep_latest: Annotated[int | None, Query(ge=0)] = None,
+    retention_days: Annotated[float | None, Query(ge=0)] = None,
+) -> dict[str, object]:
+    """Trim checkpoint history, expire idle threads and vacuum the checkpoint databases.
+
+    Args:
+        keep_latest: Checkpoints kept per thread (defaults to CHECKPOINT_KEEP_LATEST).
+        retention_days: Idle days before a thread is deleted (defaults to
+            CHECKPOINT_RETENTION_DAYS).
+    """
+    reports = await checkpoint_compactor.compact(
+        keep_latest=keep_latest, retention_days=retention_days
+    )
+    return {
+        "reclaimed_bytes": sum(r.reclaimed_bytes for r in reports),
+        "databases": [r.as_dict() for r in reports],
+    }
@@ -0,0 +1,41 @@
+"""Runtime metrics endpoint."""
+
+from fastapi import APIRouter
+
+from agents.guardrail_classifier import guardrail_classifier
+from services.checkpoint_maintenance import checkpoint_compactor
+from services.gemini_service import gemini_service
+from services.lesson_service import lesson_context_service
+from services.review_jobs import review_job_queue
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics() -> dict[str, object]:
+    """Report counters for the in-process performance subsystems."""
+    cache = gemini_service.cache
+    return {
+        "response_cache": cache.stats.as_dict() if cache is not None else None,
+        "scheduler": (
+            gemini_service.scheduler.metrics() if gemini_service.scheduler is not None else None
+        ),
+        "resilience": {
+            **gemini_service.resilience_stats.as_dict(),
+            "circuit": (
+                gemini_service.circuit_breaker.metrics()
+                if gemini_service.circuit_breaker is not None
+                else None
+            ),
+        },
+        "structured_output": gemini_service.structured_stats.as_dict(),
+        "lesson_context_cache": {
+            **lesson_context_service.stats.as_dict(),
+            "size": lesson_context_service.size,
+        },
+        "guardrail_classifier": (
+            guardrail_classifier.stats.as_dict() if guardrail_classifier is not None else None
+        ),
+        "checkpoint_compaction": checkpoint_compactor.metrics(),
+        "review_jobs": review_job_queue.metrics(),
+    }
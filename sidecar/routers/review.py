@@ -1,16 +1,21 @@
 """Review API endpoint."""
 
+import json
 import logging
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
+from core.exceptions import ReviewJobNotFoundError
 from database.session import get_db
-from services.review_service import ReviewService
+from schemas.domain import ReviewJobRead
+from services.review_jobs import review_job_queue
+from services.review_service import BatchItem, ReviewService
 
 logger = logging.getLogger(__name__)
 
@@ -25,22 +30,104 @@ class ReviewRequest(BaseModel):
     language: str
 
 
+class BatchReviewRequest(BaseModel):
+    items: list[ReviewRequest] = Field(min_length=1, max_length=settings.REVIEW_BATCH_MAX_ITEMS)
+    # Reviews running at once; defaults to REVIEW_BATCH_CONCURRENCY
+    concurrency: int | None = Field(default=None, ge=1)
+
+
 @router.post("/submit")
 async def submit_review(request: ReviewRequest, db: db_dep):
-    """Submit code for review (streaming)."""
+    """Submit code for review (streaming).
+
+    The `X-Review-Cache` header is `hit` when an earlier review of equivalent code for
+    the same lesson and language is replayed, and `miss` otherwise. While the job queue
+    is running the review runs as a background job, which completes even if the client
+    disconnects; its id is in the `X-Review-Job` header for re-attaching.
+    """
     service = ReviewService()
+    lookup = await service.lookup(request.lesson_id, request.code, request.language, db)
+    headers = {"X-Review-Cache": "hit" if lookup.hit else "miss"}
+
+    if review_job_queue.running:
+        job = await review_job_queue.submit(
+            request.lesson_id, request.code, request.language, db, lookup
+        )
+        headers["X-Review-Job"] = job.id
+        tokens = review_job_queue.subscribe(job.id, db)
+    else:
+        tokens = service.submit_review(
+            lesson_id=request.lesson_id,
+            code=request.code,
+            language=request.language,
+            db=db,
+            lookup=lookup,
+        )
 
     async def event_generator() -> AsyncGenerator[str, None]:
         try:
-            async for token in service.submit_review(
-                lesson_id=request.lesson_id,
-                code=request.code,
-                language=request.language,
-                db=db,
-            ):
+            async for token in tokens:
                 yield f"data: {token}\n\n"
         except Exception as e:
             logger.error(f"Review streaming error: {e}")
             yield f"data: [ERROR] {str(e)}\n\n"
 
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=headers)
+
+
+@router.post("/jobs", response_model=ReviewJobRead, status_code=202)
+async def submit_review_job(request: ReviewRequest, db: db_dep):
+    """Queue code for review without streaming it; follow it with the job endpoints."""
+    job = await review_job_queue.submit(request.lesson_id, request.code, request.language, db)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=ReviewJobRead)
+async def get_review_job(job_id: str, db: db_dep):
+    """Report the status of a review job."""
+    try:
+        return await review_job_queue.get(job_id, db)
+    except ReviewJobNotFoundError:
+        raise HTTPException(status_code=404, detail="Review job not found")
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_review_job(job_id: str, db: db_dep):
+    """Stream a review job's feedback from the beginning (re-attaching is allowed)."""
+    try:
+        job = await review_job_queue.get(job_id, db)
+    except ReviewJobNotFoundError:
+        raise HTTPException(status_code=404, detail="Review job not found")
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        try:
+            async for token in review_job_queue.subscribe(job.id, db):
+                yield f"data: {token}\n\n"
+        except Exception as e:
+            logger.error(f"Review job streaming error: {e}")
+            yield f"data: [ERROR] {str(e)}\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+@router.post("/batch")
+async def submit_batch(request: BatchReviewRequest, db: db_dep):
+    """Review several submissions concurrently (streaming).
+
+    Each SSE event is a JSON object with the `index` of its item and an `event` of
+    `queued`, `started`, `token`, `completed` or `failed`. A final `done` event carries
+    the totals once every result is stored.
+    """
+    service = ReviewService()
+    items = [BatchItem(item.lesson_id, item.code, item.language) for item in request.items]
+    concurrency = request.concurrency or settings.REVIEW_BATCH_CONCURRENCY
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        try:
+            async for event in service.submit_batch(items, db, concurrency):
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"Batch review error: {e}")
+            yield f"data: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+
     return StreamingResponse(event_generator(), media_type="text/event-stream")
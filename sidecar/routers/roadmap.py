@@ -1,22 +1,29 @@
 """Roadmap API endpoint"""
 
+import json
 import logging
+from collections.abc import AsyncGenerator
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from agents.roadmap_creator import roadmap_creator
+from core.types import RoadmapNotFoundError, RoadmapStatus
 from database.models import Phase, Roadmap
 from database.session import get_db
 from schemas.domain import (
+    LessonRead,
+    PhaseReadDetailed,
     RoadmapCreateRequest,
     RoadmapCreateResult,
     RoadmapListItem,
     RoadmapListResponse,
     RoadmapReadDetailed,
+    RoadmapRegenerateRequest,
     RoadmapResponse,
 )
 
@@ -31,7 +38,12 @@ router = APIRouter(prefix="/api/roadmap", tags=["roadmap"])
 async def list_roadmaps(db: db_dep):
     """List all available roadmaps."""
     try:
-        result = await db.execute(select(Roadmap).order_by(Roadmap.created_at.desc()))
+        # Roadmaps still being generated are only complete once their stream is done
+        result = await db.execute(
+            select(Roadmap)
+            .where(Roadmap.status != RoadmapStatus.GENERATING)
+            .order_by(Roadmap.created_at.desc())
+        )
         roadmaps = result.scalars().all()
 
         items = [RoadmapListItem(id=r.id, name=r.name, created_at=r.created_at) for r in roadmaps]
@@ -68,6 +80,88 @@ async def create_roadmap(request: RoadmapCreateRequest, db: db_dep):
         )
 
 
+@router.post("/create/stream")
+async def stream_roadmap(request: RoadmapCreateRequest, db: db_dep):
+    """Create a new learning roadmap, streaming each phase as it is stored.
+
+    Each SSE event is a JSON object whose `event` is `roadmap`, then `phase` once per
+    phase, then `done`. A failure ends the stream with an `error` event, and nothing
+    of the roadmap is kept.
+    """
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        try:
+            async for event in roadmap_creator.stream_roadmap(
+                goal=request.goal,
+                background=request.background,
+                preferences=request.preferences,
+                db=db,
+            ):
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"Failed to stream roadmap: {e}")
+            yield f"data: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+@router.post("/phase/{phase_id}/regenerate", response_model=PhaseReadDetailed)
+async def regenerate_phase(
+    phase_id: str, db: db_dep, request: RoadmapRegenerateRequest | None = None
+):
+    """Regenerate the lessons of one phase in place.
+
+    Lessons that keep their name keep their id and progress.
+
+    Args:
+        phase_id: Phase ID
+        db: Database session
+        request: Optional instructions for the new lessons
+
+    Returns:
+        The phase with its new lessons
+    """
+    try:
+        return await roadmap_creator.regenerate_phase(
+            phase_id, db, instructions=request.instructions if request else None
+        )
+    except RoadmapNotFoundError:
+        raise HTTPException(status_code=404, detail="Phase not found")
+    except Exception as e:
+        logger.error(f"Failed to regenerate phase: {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error occurred while regenerating phase"
+        )
+
+
+@router.post("/lesson/{lesson_id}/objectives/regenerate", response_model=LessonRead)
+async def regenerate_objectives(
+    lesson_id: str, db: db_dep, request: RoadmapRegenerateRequest | None = None
+):
+    """Regenerate the objectives of one lesson in place.
+
+    Args:
+        lesson_id: Lesson ID
+        db: Database session
+        request: Optional instructions for the new objectives
+
+    Returns:
+        The lesson with its new objectives
+    """
+    try:
+        return await roadmap_creator.regenerate_objectives(
+            lesson_id, db, instructions=request.instructions if request else None
+        )
+    except RoadmapNotFoundError:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    except Exception as e:
+        logger.error(f"Failed to regenerate lesson objectives: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error occurred while regenerating lesson objectives",
+        )
+
+
 @router.get("/{roadmap_id}", response_model=RoadmapReadDetailed)
 async def get_roadmap(roadmap_id: str, db: db_dep):
     """Get roadmap details with all phases and lessons.
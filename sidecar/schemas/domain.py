@@ -94,11 +94,60 @@ class RoadmapStructure(BaseModel):
     )
 
 
+class PhaseOutlineStructure(BaseModel):
+    name: str = Field(description="The name of the phase")
+    summary: str = Field(default="", description="Topics the phase covers, in one sentence")
+
+
+class RoadmapOutlineStructure(BaseModel):
+    name: str = Field(description="The title of the roadmap")
+    description: str = Field(description="Brief 2-3 sentence description of the roadmap")
+    phases: list[PhaseOutlineStructure] = Field(
+        description="Phases of the roadmap, in order, without their lessons", default_factory=list
+    )
+
+
+class PhaseLessonsStructure(BaseModel):
+    lessons: list[LessonStructure] = Field(
+        description="List of lessons included in the phase", default_factory=list
+    )
+
+
+class LessonObjectivesStructure(BaseModel):
+    objectives: list[str] = Field(
+        description="List of specific objectives in the lesson", default_factory=list
+    )
+
+
 class RoadmapCreateResult(BaseModel):
     roadmap_id: str = Field(description="Unique identifier for the created roadmap")
     roadmap: RoadmapStructure = Field(description="The structure of the created roadmap")
 
 
+class ReviewFindingStructure(BaseModel):
+    line_number: int | None = Field(default=None, description="Line the finding refers to")
+    category: str = Field(description="Security, Performance or Best Practices")
+    observation: str = Field(description="What is wrong with the code")
+    socratic_question: str = Field(description="Question that leads the student to the issue")
+
+
+class ReviewAnalysisStructure(BaseModel):
+    findings: list[ReviewFindingStructure] = Field(
+        description="Areas for improvement in the submission", default_factory=list
+    )
+
+
+class GuardrailStructure(BaseModel):
+    triggered: bool = Field(description="Whether the student is bypassing the learning process")
+
+
+class ReviewTriageStructure(BaseModel):
+    triggered: bool = Field(description="Whether the submission bypasses the learning process")
+    findings: list[ReviewFindingStructure] = Field(
+        description="Areas for improvement; empty when triggered", default_factory=list
+    )
+
+
 class RoadmapCreateRequest(BaseModel):
     goal: str = Field(
         ...,
@@ -114,6 +163,14 @@ class RoadmapCreateRequest(BaseModel):
     )
 
 
+class RoadmapRegenerateRequest(BaseModel):
+    instructions: str | None = Field(
+        default=None,
+        max_length=1000,
+        description="What to change (e.g., 'More focus on testing')",
+    )
+
+
 class RoadmapResponse(BaseModel):
     roadmap_id: str
     message: str
@@ -127,3 +184,14 @@ class RoadmapListItem(BaseModel):
 
 class RoadmapListResponse(BaseModel):
     roadmaps: list[RoadmapListItem]
+
+
+class ReviewJobRead(AppBaseModel):
+    id: str
+    review_id: str
+    status: str
+    attempts: int
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
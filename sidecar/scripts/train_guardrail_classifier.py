@@ -0,0 +1,234 @@
+"""Train the local guardrail classifier and write it to resources/guardrail_classifier.json.
+
+The model is a logistic regression over word unigrams and bigrams, trained with plain
+gradient descent on the labelled seed set below so the output is reproducible without
+any ML dependencies. The held-out validation set is never trained on; the script
+reports how the written classifier decides it, in particular any false refusals of
+legitimate questions. Re-run after editing the seed set or patterns:
+
+    python scripts/train_guardrail_classifier.py
+"""
+
+import json
+import math
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add the sidecar directory to the path so we can import the feature extractor
+sidecar_dir = Path(__file__).parent.parent
+sys.path.append(str(sidecar_dir))
+
+from agents.guardrail_classifier import (  # noqa: E402
+    GuardrailClassifier,
+    GuardrailModel,
+    GuardrailVerdict,
+    extract_features,
+)
+from core.config import settings  # noqa: E402
+
+OUTPUT_PATH = sidecar_dir / "resources" / "guardrail_classifier.json"
+
+# Whole-message small talk that never needs an LLM opinion
+ALLOW_PATTERNS = [
+    r"^(hi|hello|hey|yo|hiya|good (morning|afternoon|evening))( there)?[\s!.?]*$",
+    r"^(thanks|thank you|thx|ty|cheers|much appreciated)( (so|very) much)?[\s!.?]*$",
+    r"^(ok|okay|k|got it|i see|makes sense|cool|great|nice|sure|yes|no|yep|nope)[\s!.?]*$",
+    r"^(bye|goodbye|see you|see ya)[\s!.?]*$",
+]
+
+# Unambiguous attempts to skip the Socratic process
+BLOCK_PATTERNS = [
+    r"\b(just|simply|please just)\s+(give|show|tell|send|write)\s+me\s+(the\s+)?"
+    + r"(full\s+|complete\s+|whole\s+|final\s+)?(code|answer|solution)\b",
+    r"\b(write|do|solve|finish|complete)\s+(it|this|the\s+(whole\s+)?"
+    + r"(assignment|exercise|homework|task|lesson))\s+for\s+me\b",
+    r"\b(stop|quit)\s+asking\s+(me\s+)?(questions|question)\b",
+    r"\bno\s+more\s+questions\b",
+    r"\bi\s+don'?t\s+want\s+to\s+(learn|think|understand)\b",
+]
+
+# (text, label) with label 1 meaning the student is bypassing the process
+SEED: list[tuple[str, int]] = [
+    ("give me the code", 1),
+    ("can you just write the function for me", 1),
+    ("write the whole program", 1),
+    ("i need the answer now", 1),
+    ("just tell me the answer", 1),
+    ("show me the solution please", 1),
+    ("paste the full solution", 1),
+    ("what is the answer", 1),
+    ("skip the questions and give me the code", 1),
+    ("i don't care, just the code", 1),
+    ("send the complete implementation", 1),
+    ("do my homework", 1),
+    ("solve it for me", 1),
+    ("finish this exercise for me", 1),
+    ("i'm not going to answer your questions", 1),
+    ("stop with the questions", 1),
+    ("enough questions, write it", 1),
+    ("give me the final code", 1),
+    ("provide the full code now", 1),
+    ("write the code", 1),
+    ("just the solution", 1),
+    ("i just want the answer", 1),
+    ("tell me what to type", 1),
+    ("give me something i can copy paste", 1),
+    ("write it all for me", 1),
+    ("complete the code for me", 1),
+    ("i don't want hints, give the answer", 1),
+    ("no hints just code", 1),
+    ("fix it for me and send the code", 1),
+    ("rewrite my code so it works, don't explain", 1),
+    ("why is my loop not ending", 0),
+    ("i think i should use a for loop here", 0),
+    ("how does range work", 0),
+    ("what does this error mean", 0),
+    ("can you explain recursion", 0),
+    ("i tried using a list but it fails", 0),
+    ("is a dictionary better here", 0),
+    ("why do we need a base case", 0),
+    ("i'm confused about scope", 0),
+    ("could you give me a hint", 0),
+    ("what should i think about first", 0),
+    ("i changed the condition and now it works", 0),
+    ("does the order of arguments matter", 0),
+    ("what is the difference between a list and a tuple", 0),
+    ("my function returns none, why", 0),
+    ("i wrote this, is it on the right track", 0),
+    ("how can i test this", 0),
+    ("is there a simpler way to think about it", 0),
+    ("i believe the problem is the index", 0),
+    ("what would happen if the list is empty", 0),
+    ("i understand now, the counter was wrong", 0),
+    ("can you check my reasoning", 0),
+    ("what concept should i review", 0),
+    ("i am stuck on the second objective", 0),
+    ("why does python use indentation", 0),
+    ("i guess i need to return inside the loop", 0),
+    ("let me try again", 0),
+    ("here is my attempt", 0),
+    ("what is a good name for this variable", 0),
+    ("how do i read the traceback", 0),
+    ("here is my code, what do you think", 0),
+    ("why does my code crash on empty input", 0),
+    ("please review my code", 0),
+    ("is my code readable", 0),
+    ("what is wrong with this code", 0),
+    ("my solution works but feels slow", 0),
+    ("is my answer correct", 0),
+    ("can you give me feedback on my solution", 0),
+    ("i wrote the function myself, can you check it", 0),
+    ("show me where my logic breaks", 0),
+]
+
+# Held-out (text, label) pairs, never trained on. Mostly ordinary learner questions that
+# share words with bypass attempts, which a local block would wrongly refuse.
+VALIDATION: list[tuple[str, int]] = [
+    ("what is the answer to question 2 in the quiz?", 0),
+    ("show me the code for a for loop", 0),
+    ("can you show me an example of a while loop", 0),
+    ("what does the code in the lesson do", 0),
+    ("is the answer to this exercise a list or a dict", 0),
+    ("how do i write a function that takes two arguments", 0),
+    ("what is the solution space of this problem", 0),
+    ("could you explain the solution you hinted at", 0),
+    ("why does my code give the wrong answer", 0),
+    ("give me a hint about the base case", 0),
+    ("what is the difference between return and print", 0),
+    ("how would you approach this task", 0),
+    ("i wrote the code but the answer is off by one", 0),
+    ("can you tell me what a generator is", 0),
+    ("what should my function return when the list is empty", 0),
+    ("just give me the answer", 1),
+    ("write the function for me", 1),
+    ("i don't want to think, send the code", 1),
+    ("give me the full solution now", 1),
+    ("stop asking questions and tell me", 1),
+]
+
+EPOCHS = 400
+LEARNING_RATE = 0.5
+L2 = 0.1
+MIN_WEIGHT = 0.05
+
+
+def sigmoid(z: float) -> float:
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def train() -> tuple[dict[str, float], float]:
+    samples = [(Counter(extract_features(text)), label) for text, label in SEED]
+    weights: dict[str, float] = {}
+    bias = 0.0
+
+    for _ in range(EPOCHS):
+        grad: dict[str, float] = {}
+        grad_bias = 0.0
+        for features, label in samples:
+            z = bias + sum(weights.get(f, 0.0) * n for f, n in features.items())
+            error = sigmoid(z) - label
+            grad_bias += error
+            for feature, count in features.items():
+                grad[feature] = grad.get(feature, 0.0) + error * count
+
+        scale = LEARNING_RATE / len(samples)
+        for feature in set(weights) | set(grad):
+            weight = weights.get(feature, 0.0)
+            weights[feature] = weight - scale * (grad.get(feature, 0.0) + L2 * weight)
+        bias -= scale * grad_bias
+
+    pruned = {f: round(w, 4) for f, w in sorted(weights.items()) if abs(w) >= MIN_WEIGHT}
+    return pruned, round(bias, 4)
+
+
+def validate(model: GuardrailModel) -> None:
+    """Report how the classifier decides the held-out set.
+
+    A false refusal is a legitimate question blocked locally; a missed block is a bypass
+    attempt allowed locally. Everything else goes to the LLM guardrail.
+    """
+    classifier = GuardrailClassifier(model, threshold=settings.GUARDRAIL_CLASSIFIER_THRESHOLD)
+    false_refusals: list[str] = []
+    missed_blocks: list[str] = []
+    for text, label in VALIDATION:
+        verdict = classifier.classify(text).verdict
+        if label == 0 and verdict == GuardrailVerdict.BLOCK:
+            false_refusals.append(text)
+        elif label == 1 and verdict == GuardrailVerdict.ALLOW:
+            missed_blocks.append(text)
+
+    benign = sum(1 for _, label in VALIDATION if label == 0)
+    stats = classifier.stats.as_dict()
+    print(
+        f"Validation: {len(VALIDATION)} messages, "
+        + f"{stats['allowed']} allowed, {stats['blocked']} blocked, "
+        + f"{stats['escalated']} escalated to the LLM"
+    )
+    print(f"  false refusals: {len(false_refusals)}/{benign}")
+    for text in false_refusals:
+        print(f"    {text}")
+    print(f"  missed blocks:  {len(missed_blocks)}/{len(VALIDATION) - benign}")
+    for text in missed_blocks:
+        print(f"    {text}")
+
+
+def main() -> None:
+    weights, bias = train()
+    model: GuardrailModel = {
+        "version": 1,
+        "allow_patterns": ALLOW_PATTERNS,
+        "block_patterns": BLOCK_PATTERNS,
+        "bias": bias,
+        "weights": weights,
+    }
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(model, f, indent=2)
+        _ = f.write("\n")
+
+    print(f"✅ Wrote {len(weights)} weights to {OUTPUT_PATH}")
+    validate(model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Compaction and retention for the LangGraph SQLite checkpoint databases."""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import Generator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import cast
+
+from langgraph.checkpoint.base.id import UUID as CheckpointUUID
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Offset between the UUID epoch (1582-10-15) and the Unix epoch, in 100ns ticks
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+# Auto-vacuum mode that lets free pages be released with PRAGMA incremental_vacuum
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class CompactionReport:
+    """Outcome of compacting one checkpoint database."""
+
+    db_path: str
+    checkpoints_deleted: int = 0
+    writes_deleted: int = 0
+    threads_expired: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    error: str | None = None
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return max(self.bytes_before - self.bytes_after, 0)
+
+    def as_dict(self) -> dict[str, object]:
+        return {**asdict(self), "reclaimed_bytes": self.reclaimed_bytes}
+
+
+def checkpoint_created_at(checkpoint_id: str) -> float | None:
+    """Unix timestamp encoded in a LangGraph checkpoint id (a time-ordered UUIDv6)."""
+    try:
+        checkpoint_uuid = CheckpointUUID(checkpoint_id)
+    except ValueError:
+        return None
+    if checkpoint_uuid.version != 6:
+        return None
+    return (checkpoint_uuid.time - _UUID_EPOCH_OFFSET) / 10_000_000
+
+
+def _file_size(path: Path) -> int:
+    """Size of the database including its write-ahead log."""
+    wal = path.with_name(path.name + "-wal")
+    return sum(p.stat().st_size for p in (path, wal) if p.exists())
+
+
+@contextmanager
+def _connect(path: Path) -> Generator[sqlite3.Connection]:
+    # The agents keep their own connections open, so wait for their locks
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _has_checkpoint_tables(conn: sqlite3.Connection) -> bool:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('checkpoints', 'writes')"
+    ).fetchall()
+    return len(rows) == 2
+
+
+def _expire_threads(conn: sqlite3.Connection, cutoff: float) -> tuple[int, int]:
+    """Delete threads whose latest checkpoint is older than `cutoff`.
+
+    Returns:
+        (threads expired, checkpoints deleted)
+    """
+    # UUIDv6 ids sort by creation time, so MAX() is the latest checkpoint
+    latest = cast(
+        list[tuple[str, str]],
+        conn.execute(
+            "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+        ).fetchall(),
+    )
+    expired = [
+        (thread_id,)
+        for thread_id, checkpoint_id in latest
+        if (created_at := checkpoint_created_at(checkpoint_id)) is not None and created_at < cutoff
+    ]
+    if not expired:
+        return 0, 0
+
+    before = conn.total_changes
+    _ = conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", expired)
+    deleted = conn.total_changes - before
+    _ = conn.executemany("DELETE FROM writes WHERE thread_id = ?", expired)
+    return len(expired), deleted
+
+
+def _trim_history(conn: sqlite3.Connection, keep_latest: int) -> int:
+    """Keep only the newest `keep_latest` checkpoints of each thread and namespace."""
+    cursor = conn.execute(
+        """
+        DELETE FROM checkpoints WHERE rowid IN (
+            SELECT rowid FROM (
+                SELECT rowid, ROW_NUMBER() OVER (
+                    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                ) AS rank
+                FROM checkpoints
+            ) WHERE rank > ?
+        )
+        """,
+        (keep_latest,),
+    )
+    return cursor.rowcount
+
+
+def _drop_orphan_writes(conn: sqlite3.Connection) -> int:
+    cursor = conn.execute(
+        """
+        DELETE FROM writes WHERE NOT EXISTS (
+            SELECT 1 FROM checkpoints c
+            WHERE c.thread_id = writes.thread_id
+              AND c.checkpoint_ns = writes.checkpoint_ns
+              AND c.checkpoint_id = writes.checkpoint_id
+        )
+        """
+    )
+    return cursor.rowcount
+
+
+def _release_free_pages(conn: sqlite3.Connection) -> None:
+    """Return free pages to the filesystem with an incremental vacuum.
+
+    Databases created by the saver use the default auto_vacuum=NONE, which needs a one-off
+    full VACUUM to switch modes. Afterwards only the cheap incremental form is used.
+    """
+    mode = cast(tuple[int], conn.execute("PRAGMA auto_vacuum").fetchone())[0]
+    if mode != _AUTO_VACUUM_INCREMENTAL:
+        _ = conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        _ = conn.execute("VACUUM")
+    _ = conn.execute("PRAGMA incremental_vacuum")
+    _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def compact_checkpoint_db(path: Path, keep_latest: int, retention_days: float) -> CompactionReport:
+    """Apply retention and history limits to one checkpoint database (blocking).
+
+    Args:
+        path: SQLite file written by AsyncSqliteSaver.
+        keep_latest: Checkpoints kept per thread. 0 keeps all.
+        retention_days: Threads idle for longer are deleted. 0 keeps all.
+    """
+    report = CompactionReport(db_path=str(path))
+    if not path.exists():
+        return report
+
+    report.bytes_before = _file_size(path)
+    try:
+        with _connect(path) as conn:
+            if not _has_checkpoint_tables(conn):
+                report.bytes_after = report.bytes_before
+                return report
+
+            with conn:
+                if retention_days > 0:
+                    cutoff = time.time() - retention_days * 86_400
+                    report.threads_expired, expired = _expire_threads(conn, cutoff)
+                    report.checkpoints_deleted += expired
+                if keep_latest > 0:
+                    report.checkpoints_deleted += _trim_history(conn, keep_latest)
+                report.writes_deleted = _drop_orphan_writes(conn)
+
+            _release_free_pages(conn)
+    except sqlite3.Error as e:
+        logger.error(f"Checkpoint compaction failed for {path}: {e}")
+        report.error = str(e)
+
+    report.bytes_after = _file_size(path)
+    return report
+
+
+def delete_checkpoint_threads(path: Path, thread_ids: Sequence[str]) -> int:
+    """Delete every checkpoint and pending write of `thread_ids` (blocking).
+
+    Returns:
+        The number of checkpoints deleted
+    """
+    if not thread_ids or not path.exists():
+        return 0
+    params = [(thread_id,) for thread_id in thread_ids]
+    try:
+        with _connect(path) as conn:
+            if not _has_checkpoint_tables(conn):
+                return 0
+            with conn:
+                before = conn.total_changes
+                _ = conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", params)
+                deleted = conn.total_changes - before
+                _ = conn.executemany("DELETE FROM writes WHERE thread_id = ?", params)
+    except sqlite3.Error as e:
+        logger.error(f"Failed to delete checkpoint threads from {path}: {e}")
+        return 0
+    return deleted
+
+
+class CheckpointCompactor:
+    """Runs checkpoint compaction on demand and on a schedule.
+
+    Args:
+        paths: Checkpoint databases to maintain.
+        keep_latest: Default number of checkpoints kept per thread.
+        retention_days: Default idle time after which whole threads are deleted.
+    """
+
+    def __init__(self, paths: Sequence[Path], keep_latest: int, retention_days: float) -> None:
+        self.paths: list[Path] = list(paths)
+        self.keep_latest: int = keep_latest
+        self.retention_days: float = retention_days
+        self.last_run: list[CompactionReport] = []
+        self.total_reclaimed_bytes: int = 0
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def compact(
+        self, keep_latest: int | None = None, retention_days: float | None = None
+    ) -> list[CompactionReport]:
+        """Compact every database, overriding the default limits if given."""
+        keep = self.keep_latest if keep_latest is None else keep_latest
+        retention = self.retention_days if retention_days is None else retention_days
+
+        # Overlapping runs would only contend for the same write locks
+        async with self._lock:
+            reports = [
+                await asyncio.to_thread(compact_checkpoint_db, path, keep, retention)
+                for path in self.paths
+            ]
+
+        self.last_run = reports
+        reclaimed = sum(r.reclaimed_bytes for r in reports)
+        self.total_reclaimed_bytes += reclaimed
+        logger.info(f"Checkpoint compaction reclaimed {reclaimed} bytes")
+        return reports
+
+    async def delete_threads(self, thread_ids: Sequence[str]) -> int:
+        """Delete the conversations of `thread_ids` from every database (e.g. the chats of
+        deleted lessons).
+
+        Returns:
+            The number of checkpoints deleted
+        """
+        async with self._lock:
+            deleted = [
+                await asyncio.to_thread(delete_checkpoint_threads, path, thread_ids)
+                for path in self.paths
+            ]
+        return sum(deleted)
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Compact every `interval_seconds` until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                _ = await self.compact()
+            except Exception as e:
+                logger.error(f"Periodic checkpoint compaction failed: {e}")
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "total_reclaimed_bytes": self.total_reclaimed_bytes,
+            "last_run": [r.as_dict() for r in self.last_run],
+        }
+
+
+def build_checkpoint_compactor() -> CheckpointCompactor:
+    """Create the compactor for the teacher and reviewer checkpoint databases."""
+    return CheckpointCompactor(
+        paths=[
+            settings.BASE_DIR / settings.CHECKPOINT_DB_PATH,
+            settings.BASE_DIR / settings.REVIEW_CHECKPOINT_DB_PATH,
+        ],
+        keep_latest=settings.CHECKPOINT_KEEP_LATEST,
+        retention_days=settings.CHECKPOINT_RETENTION_DAYS,
+    )
+
+
+# Singleton instance
+checkpoint_compactor = build_checkpoint_compactor()
@@ -1,27 +1,86 @@
 """Gemini API service for all interactions."""
 
+import asyncio
+import json
 import logging
 from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
+from typing import TypeVar
 
 import google.genai as genai
 from google.genai import errors, types
+from pydantic import BaseModel, ValidationError
 
 from core.config import settings
-from core.exceptions import ExternalAPIError, QuotaExceededError
+from core.exceptions import (
+    BaseAppException,
+    ExternalAPIError,
+    QuotaExceededError,
+    ServiceUnavailableError,
+    StructuredOutputError,
+)
+from core.tokens import estimate_tokens
+from services.rate_limiter import RateLimitScheduler, RequestPriority, build_scheduler
+from services.resilience import (
+    CircuitBreaker,
+    ResilienceStats,
+    RetryPolicy,
+    build_circuit_breaker,
+    build_retry_policy,
+    counts_as_outage,
+    is_retryable,
+)
+from services.response_cache import ResponseCache, build_response_cache
 
 logger = logging.getLogger(__name__)
 
+StructuredT = TypeVar("StructuredT", bound=BaseModel)
+
+
+@dataclass
+class StructuredOutputStats:
+    """Counters for schema-constrained calls whose output failed validation."""
+
+    requests: int = 0
+    parse_failures: int = 0
+    retries: int = 0
+    exhausted: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
 
 class GeminiService:
     """Service for interacting with Gemini API using the google-genai SDK."""
 
-    def __init__(self, model_name: str = settings.GEMINI_MODEL) -> None:
+    def __init__(
+        self,
+        model_name: str = settings.GEMINI_MODEL,
+        cache: ResponseCache | None = None,
+        scheduler: RateLimitScheduler | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        structured_retries: int = settings.GEMINI_STRUCTURED_RETRIES,
+    ) -> None:
         """Initialize Gemini service.
 
         Args:
             model_name: Gemini model to use.
+            cache: Optional response cache for non-streaming calls.
+            scheduler: Optional rate limiter that admits requests by priority.
+            retry_policy: Optional backoff policy for transient failures.
+            circuit_breaker: Optional breaker that fails fast while the API is degraded.
+            structured_retries: Extra generations allowed when a structured response
+                does not validate against its schema.
         """
         self.model_name: str = model_name
+        self.cache: ResponseCache | None = cache
+        self.scheduler: RateLimitScheduler | None = scheduler
+        self.retry_policy: RetryPolicy | None = retry_policy
+        self.circuit_breaker: CircuitBreaker | None = circuit_breaker
+        self.resilience_stats: ResilienceStats = ResilienceStats()
+        self.structured_retries: int = max(structured_retries, 0)
+        self.structured_stats: StructuredOutputStats = StructuredOutputStats()
         self._client: genai.Client | None = None
         # Don't initialize client here if API key is missing to avoid crash at import time
         if settings.GEMINI_API_KEY:
@@ -55,125 +114,337 @@ class GeminiService:
             logger.error(f"Failed to initialize Gemini client with new key: {e}")
             raise ExternalAPIError(message=f"Invalid API key: {str(e)}")
 
+    async def _acquire(
+        self,
+        priority: RequestPriority,
+        prompt: str | list[str],
+        system_instruction: str | None,
+    ) -> int:
+        """Wait for the scheduler to admit a request and return its token estimate."""
+        estimated = estimate_tokens(prompt) + estimate_tokens(system_instruction)
+        if self.scheduler is not None:
+            await self.scheduler.acquire(priority, estimated)
+        return estimated
+
+    def _record_usage(
+        self, estimated: int, usage: types.GenerateContentResponseUsageMetadata | None
+    ) -> None:
+        """Report the real token usage of a request back to the scheduler."""
+        if self.scheduler is None or usage is None:
+            return
+        total = usage.total_token_count
+        if isinstance(total, int):
+            self.scheduler.record_usage(estimated, total)
+
+    def _build_config(
+        self,
+        system_instruction: str | None,
+        search: bool,
+        response_mime_type: str | None = None,
+        response_schema: type[BaseModel] | None = None,
+    ) -> types.GenerateContentConfig:
+        """Create the generation config for a single request."""
+        tools: types.ToolListUnion = [types.Tool(google_search=types.GoogleSearch())]
+        return types.GenerateContentConfig(
+            temperature=0.7,
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=8192,
+            system_instruction=system_instruction,
+            tools=tools if search else None,
+            response_mime_type=response_mime_type,
+            response_schema=response_schema,
+            safety_settings=settings.SAFETY_SETTINGS,
+        )
+
+    def _before_attempt(self) -> None:
+        """Ask the circuit breaker for permission to call the API."""
+        if self.circuit_breaker is None:
+            return
+        try:
+            self.circuit_breaker.before_call()
+        except ServiceUnavailableError:
+            self.resilience_stats.short_circuited += 1
+            raise
+
+    def _record_outcome(self, error: Exception | None) -> None:
+        """Feed the result of an attempt to the circuit breaker."""
+        if self.circuit_breaker is None:
+            return
+        if error is not None and counts_as_outage(error):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float | None:
+        """Return the backoff before the next attempt, or None if the error is final."""
+        if self.retry_policy is None:
+            return None
+        delay = self.retry_policy.delay_for(error, attempt)
+        if delay is None:
+            if is_retryable(error):
+                self.resilience_stats.exhausted += 1
+            return None
+        self.resilience_stats.retries += 1
+        logger.warning(
+            f"Gemini call failed ({error}); retry {attempt + 1}/"
+            + f"{self.retry_policy.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    def _translate_error(self, error: Exception) -> BaseAppException:
+        """Convert an SDK error into the application's exception hierarchy."""
+        if isinstance(error, errors.ClientError):
+            logger.error(f"Gemini API Client Error: {error}")
+            if error.code == 429:
+                return QuotaExceededError(
+                    message="Gemini API Quota Exceeded", details={"original_error": str(error)}
+                )
+            return ExternalAPIError(
+                message=f"Gemini API Error: {error.message}",
+                details={"original_error": str(error)},
+            )
+        if isinstance(error, errors.ServerError):
+            logger.error(f"Gemini API Server Error: {error}")
+            return ExternalAPIError(
+                message="Gemini API Server Error. Please try again later.",
+                details={"original_error": str(error)},
+            )
+        logger.error(f"Gemini API unexpected error: {error}")
+        return ExternalAPIError(
+            message="An unexpected error occurred while contacting Gemini",
+            details={"original_error": str(error)},
+        )
+
     async def generate_content(
         self,
         prompt: str | list[str],
         system_instruction: str | None = None,
         search: bool = False,
         response_mime_type: str | None = None,
+        use_cache: bool = True,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+        response_schema: type[BaseModel] | None = None,
     ) -> str:
         """Generate content using Gemini API.
 
+        Transient failures are retried with backoff according to the retry policy.
+
         Args:
             prompt: User prompt (string or list of strings)
             system_instruction: System instruction for the model
             search: Whether to use Google Search
             response_mime_type: MIME type for the response (e.g. "application/json")
+            use_cache: Whether the response cache may serve or store this call.
+                Search-grounded calls are never cached since their answers go stale.
+            priority: Scheduling class used when the rate limiter is saturated.
+            response_schema: Pydantic model the JSON response must conform to. Requires
+                response_mime_type="application/json"; callers still validate the text,
+                which `generate_structured` does for them.
 
         Returns:
             Generated text response
         """
-        try:
-            # Create config for this specific request to include system_instruction
-            tools: types.ToolListUnion = [types.Tool(google_search=types.GoogleSearch())]
-            config = types.GenerateContentConfig(
-                temperature=0.7,
-                top_p=0.95,
-                top_k=40,
-                max_output_tokens=8192,
-                system_instruction=system_instruction,
-                tools=tools if search else None,
-                response_mime_type=response_mime_type,
-                safety_settings=settings.SAFETY_SETTINGS,
+        cache = self.cache if use_cache and not search else None
+        cache_key = ""
+        if cache is not None:
+            cache_key = self._cache_key(
+                prompt, system_instruction, response_mime_type, search, response_schema
             )
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        text = await self._generate(
+            prompt, system_instruction, search, response_mime_type, priority, response_schema
+        )
+        if cache is not None and text:
+            await cache.set(cache_key, text)
+        return text
+
+    async def generate_structured(
+        self,
+        prompt: str | list[str],
+        schema: type[StructuredT],
+        system_instruction: str | None = None,
+        use_cache: bool = True,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
+    ) -> StructuredT:
+        """Generate a JSON response constrained to `schema` and return it validated.
+
+        A response that does not validate is generated again, up to `structured_retries`
+        times. Only valid responses are cached, and a cached response that no longer
+        validates is regenerated.
+
+        Args:
+            prompt: User prompt (string or list of strings)
+            schema: Pydantic model passed to the API as the response schema.
+            system_instruction: System instruction for the model
+            use_cache: Whether the response cache may serve or store this call.
+            priority: Scheduling class used when the rate limiter is saturated.
+
+        Returns:
+            The response parsed into `schema`
 
-            response = await self.client.aio.models.generate_content(  # pyright: ignore[reportUnknownMemberType]
-                model=self.model_name, contents=prompt, config=config
+        Raises:
+            StructuredOutputError: If no generation produced a valid response.
+        """
+        self.structured_stats.requests += 1
+        mime_type = "application/json"
+        cache = self.cache if use_cache else None
+        cache_key = ""
+        if cache is not None:
+            cache_key = self._cache_key(prompt, system_instruction, mime_type, False, schema)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                try:
+                    return schema.model_validate_json(cached)
+                except ValidationError:
+                    logger.warning(f"Cached {schema.__name__} response is no longer valid")
+
+        attempt = 0
+        while True:
+            text = await self._generate(
+                prompt, system_instruction, False, mime_type, priority, schema
             )
+            try:
+                result = schema.model_validate_json(text)
+            except ValidationError as e:
+                self.structured_stats.parse_failures += 1
+                if attempt >= self.structured_retries:
+                    self.structured_stats.exhausted += 1
+                    logger.error(f"Gemini response did not match {schema.__name__}: {e}")
+                    raise StructuredOutputError(
+                        message=f"Gemini returned an invalid {schema.__name__}",
+                        details={"validation_error": str(e)},
+                    ) from e
+                self.structured_stats.retries += 1
+                attempt += 1
+                logger.warning(
+                    f"Gemini response did not match {schema.__name__}; regenerating "
+                    + f"({attempt}/{self.structured_retries})"
+                )
+                continue
+
+            if cache is not None:
+                await cache.set(cache_key, text)
+            return result
+
+    def _cache_key(
+        self,
+        prompt: str | list[str],
+        system_instruction: str | None,
+        response_mime_type: str | None,
+        search: bool,
+        response_schema: type[BaseModel] | None,
+    ) -> str:
+        schema_key = (
+            json.dumps(response_schema.model_json_schema(), sort_keys=True)
+            if response_schema is not None
+            else None
+        )
+        return ResponseCache.make_key(
+            self.model_name, prompt, system_instruction, response_mime_type, search, schema_key
+        )
 
-            text = response.text
-            if text is None:
-                return ""
-            return text
-        except errors.ClientError as e:
-            logger.error(f"Gemini API Client Error: {e}")
-            if e.code == 429:
-                raise QuotaExceededError(
-                    message="Gemini API Quota Exceeded", details={"original_error": str(e)}
+    async def _generate(
+        self,
+        prompt: str | list[str],
+        system_instruction: str | None,
+        search: bool,
+        response_mime_type: str | None,
+        priority: RequestPriority,
+        response_schema: type[BaseModel] | None,
+    ) -> str:
+        """Make one uncached generation call, retrying transient failures."""
+        # Create config for this specific request to include system_instruction
+        config = self._build_config(system_instruction, search, response_mime_type, response_schema)
+
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                estimated = await self._acquire(priority, prompt, system_instruction)
+                response = await self.client.aio.models.generate_content(  # pyright: ignore[reportUnknownMemberType]
+                    model=self.model_name, contents=prompt, config=config
                 )
-            raise ExternalAPIError(
-                message=f"Gemini API Error: {e.message}", details={"original_error": str(e)}
-            )
-        except errors.ServerError as e:
-            logger.error(f"Gemini API Server Error: {e}")
-            raise ExternalAPIError(
-                message="Gemini API Server Error. Please try again later.",
-                details={"original_error": str(e)},
-            )
-        except Exception as e:
-            logger.error(f"Gemini API unexpected error: {e}")
-            raise ExternalAPIError(
-                message="An unexpected error occurred while contacting Gemini",
-                details={"original_error": str(e)},
-            )
+            except Exception as e:
+                self._record_outcome(e)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise self._translate_error(e) from e
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self._record_outcome(None)
+            self._record_usage(estimated, response.usage_metadata)
+            return response.text or ""
 
     async def generate_content_stream(
         self,
         prompt: str | list[str],
         system_instruction: str | None = None,
         search: bool = False,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        response_schema: type[BaseModel] | None = None,
     ) -> AsyncIterator[str]:
         """Generate streaming content using Gemini API.
 
+        A failed stream is only retried if no text has been yielded yet, so callers
+        never see duplicated output.
+
         Args:
             prompt: User prompt (string or list of strings)
             system_instruction: System instruction for the model
+            search: Whether to use Google Search
+            priority: Scheduling class used when the rate limiter is saturated.
+            response_schema: Pydantic model the streamed JSON must conform to. The
+                chunks are raw JSON text; callers validate what they parse from it.
 
         Yields:
             Text chunks as they're generated
         """
-        try:
-            tools: types.ToolListUnion = [types.Tool(google_search=types.GoogleSearch())]
-            config = types.GenerateContentConfig(
-                temperature=0.7,
-                top_p=0.95,
-                top_k=40,
-                max_output_tokens=8192,
-                system_instruction=system_instruction,
-                tools=tools if search else None,
-                safety_settings=settings.SAFETY_SETTINGS,
-            )
+        mime_type = "application/json" if response_schema is not None else None
+        config = self._build_config(system_instruction, search, mime_type, response_schema)
 
-            # In v2 SDK, generate_content_stream returns an async iterator directly
-            async_stream = await self.client.aio.models.generate_content_stream(  # pyright: ignore[reportUnknownMemberType]
-                model=self.model_name, contents=prompt, config=config
-            )
-            async for chunk in async_stream:
-                chunk_text = chunk.text
-                if chunk_text:
-                    yield chunk_text
-        except errors.ClientError as e:
-            logger.error(f"Gemini API Client Error: {e}")
-            if e.code == 429:
-                raise QuotaExceededError(
-                    message="Gemini API Quota Exceeded", details={"original_error": str(e)}
+        attempt = 0
+        while True:
+            self._before_attempt()
+            emitted = False
+            try:
+                estimated = await self._acquire(priority, prompt, system_instruction)
+
+                # In v2 SDK, generate_content_stream returns an async iterator directly
+                async_stream = await self.client.aio.models.generate_content_stream(  # pyright: ignore[reportUnknownMemberType]
+                    model=self.model_name, contents=prompt, config=config
                 )
-            raise ExternalAPIError(
-                message=f"Gemini API Error: {e.message}", details={"original_error": str(e)}
-            )
-        except errors.ServerError as e:
-            logger.error(f"Gemini API Server Error: {e}")
-            raise ExternalAPIError(
-                message="Gemini API Server Error. Please try again later.",
-                details={"original_error": str(e)},
-            )
-        except Exception as e:
-            logger.error(f"Gemini API streaming error: {e}")
-            raise ExternalAPIError(
-                message="An unexpected error occurred while contacting Gemini",
-                details={"original_error": str(e)},
-            )
+                usage: types.GenerateContentResponseUsageMetadata | None = None
+                async for chunk in async_stream:
+                    # Usage is cumulative, so the last chunk carries the total
+                    usage = chunk.usage_metadata or usage
+                    chunk_text = chunk.text
+                    if chunk_text:
+                        emitted = True
+                        yield chunk_text
+            except Exception as e:
+                self._record_outcome(e)
+                delay = None if emitted else self._retry_delay(e, attempt)
+                if delay is None:
+                    raise self._translate_error(e) from e
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self._record_outcome(None)
+            self._record_usage(estimated, usage)
+            return
 
 
 # Instance
-gemini_service = GeminiService()
+gemini_service = GeminiService(
+    cache=build_response_cache(),
+    scheduler=build_scheduler(),
+    retry_policy=build_retry_policy(),
+    circuit_breaker=build_circuit_breaker(),
+)
@@ -1,19 +1,61 @@
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import cast
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from core.exceptions import LessonError, LessonNotFoundError
 from database.models import Lesson
 from schemas.lesson import LessonContext
 
 
+@dataclass
+class LessonCacheStats:
+    """Counters for the lesson context cache."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
 class LessonContextService:
     """
     Unified service for loading lesson context.
     Intended to be injected into agents.
+
+    Contexts are immutable, so loaded ones are kept in a bounded LRU keyed by lesson_id.
+    Code that changes lessons must call `invalidate` (or `clear`) after committing.
     """
 
+    def __init__(self, max_entries: int = 0) -> None:
+        """
+        Args:
+            max_entries: Maximum number of cached contexts. 0 disables caching.
+        """
+        self.max_entries: int = max_entries
+        self.stats: LessonCacheStats = LessonCacheStats()
+        self._cache: OrderedDict[str, LessonContext] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        """Number of contexts currently cached."""
+        return len(self._cache)
+
     async def get_context(
         self, lesson_id: str, db: AsyncSession, source: str = "db"
     ) -> LessonContext:
@@ -23,6 +65,35 @@ class LessonContextService:
         if source != "db":
             raise LessonError(f"Unsupported source: {source}")
 
+        if self.max_entries > 0:
+            cached = self._cache.get(lesson_id)
+            if cached is not None:
+                self._cache.move_to_end(lesson_id)
+                self.stats.hits += 1
+                return cached
+            self.stats.misses += 1
+
+        context = await self._load(lesson_id, db)
+
+        if self.max_entries > 0:
+            self._cache[lesson_id] = context
+            while len(self._cache) > self.max_entries:
+                _ = self._cache.popitem(last=False)
+
+        return context
+
+    def invalidate(self, *lesson_ids: str) -> None:
+        """Drop cached contexts for lessons that were created, changed or deleted."""
+        for lesson_id in lesson_ids:
+            if self._cache.pop(lesson_id, None) is not None:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every cached context (e.g. after the database is wiped)."""
+        self.stats.invalidations += len(self._cache)
+        self._cache.clear()
+
+    async def _load(self, lesson_id: str, db: AsyncSession) -> LessonContext:
         try:
             stmt = select(Lesson).where(Lesson.id == lesson_id)
             result = await db.execute(stmt)
@@ -52,3 +123,7 @@ class LessonContextService:
             raise
         except Exception as e:
             raise LessonError(f"Unexpected error loading lesson context: {str(e)}")
+
+
+# Singleton instance shared by all agents
+lesson_context_service = LessonContextService(max_entries=settings.LESSON_CONTEXT_CACHE_MAX_ENTRIES)
@@ -0,0 +1,179 @@
+"""Client-side rate limiting and priority scheduling for Gemini traffic.
+
+Every Gemini request acquires capacity from a pair of token buckets (requests/min and
+tokens/min) before it is sent. When capacity runs out, waiting requests are released in
+priority order so interactive streams are never stuck behind background jobs.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+
+from core.config import settings
+
+
+class RequestPriority(IntEnum):
+    """Scheduling classes for Gemini requests. Lower values are served first."""
+
+    INTERACTIVE = 0  # Streams the student is actively watching
+    GUARDRAIL = 1  # Short checks that block an interactive response
+    BACKGROUND = 2  # Long-running jobs such as roadmap creation
+
+
+class TokenBucket:
+    """Continuously refilling token bucket."""
+
+    def __init__(self, capacity: float, refill_per_second: float) -> None:
+        self.capacity: float = capacity
+        self.refill_per_second: float = refill_per_second
+        self.level: float = capacity
+        self._updated_at: float = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self.level = min(self.capacity, self.level + elapsed * self.refill_per_second)
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until ``amount`` can be consumed (0 if available now)."""
+        self._refill()
+        # Oversized requests only need a full bucket, otherwise they could never run
+        needed = min(amount, self.capacity) - self.level
+        if needed <= 0:
+            return 0.0
+        return needed / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Correct the level after the real cost of a request becomes known."""
+        self._refill()
+        self.level = min(self.capacity, self.level - delta)
+
+
+@dataclass
+class PriorityStats:
+    """Queue metrics for a single priority class."""
+
+    queue_depth: int = 0
+    dispatched: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        avg = self.total_wait_seconds / self.dispatched if self.dispatched else 0.0
+        return {
+            "queue_depth": self.queue_depth,
+            "dispatched": self.dispatched,
+            "avg_wait_seconds": avg,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+
+class RateLimitScheduler:
+    """Admits Gemini requests within quota, highest priority first."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            requests_per_minute: Request quota. 0 disables the request limit.
+            tokens_per_minute: Token quota. 0 disables the token limit.
+        """
+        self.request_bucket: TokenBucket | None = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60)
+            if requests_per_minute > 0
+            else None
+        )
+        self.token_bucket: TokenBucket | None = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+            if tokens_per_minute > 0
+            else None
+        )
+        self.stats: dict[RequestPriority, PriorityStats] = {
+            p: PriorityStats() for p in RequestPriority
+        }
+        self._waiters: list[tuple[int, int]] = []
+        self._counter: itertools.count[int] = itertools.count()
+        self._condition: asyncio.Condition = asyncio.Condition()
+
+    def _delay_for(self, tokens: int) -> float:
+        delay = 0.0
+        if self.request_bucket is not None:
+            delay = max(delay, self.request_bucket.delay_for(1))
+        if self.token_bucket is not None:
+            delay = max(delay, self.token_bucket.delay_for(tokens))
+        return delay
+
+    def _consume(self, tokens: int) -> None:
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None:
+            self.token_bucket.consume(tokens)
+
+    async def acquire(self, priority: RequestPriority, tokens: int = 0) -> None:
+        """Wait until a request of ``tokens`` estimated tokens may be sent."""
+        stats = self.stats[priority]
+        enqueued_at = time.monotonic()
+        entry = (int(priority), next(self._counter))
+
+        async with self._condition:
+            heapq.heappush(self._waiters, entry)
+            stats.queue_depth += 1
+            try:
+                while True:
+                    if self._waiters[0] != entry:
+                        _ = await self._condition.wait()
+                        continue
+
+                    delay = self._delay_for(tokens)
+                    if delay <= 0:
+                        _ = heapq.heappop(self._waiters)
+                        self._consume(tokens)
+                        break
+
+                    # Sleep until capacity refills, but wake early if a more urgent
+                    # request arrives and takes over the head of the queue.
+                    try:
+                        _ = await asyncio.wait_for(self._condition.wait(), timeout=delay)
+                    except TimeoutError:
+                        pass
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                raise
+            finally:
+                stats.queue_depth -= 1
+                self._condition.notify_all()
+
+        waited = time.monotonic() - enqueued_at
+        stats.dispatched += 1
+        stats.total_wait_seconds += waited
+        stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Reconcile the token bucket with the usage reported by the API."""
+        if self.token_bucket is not None:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "queue_depth": len(self._waiters),
+            "priorities": {p.name.lower(): s.as_dict() for p, s in self.stats.items()},
+        }
+
+
+def build_scheduler() -> RateLimitScheduler | None:
+    """Create the scheduler configured in settings, or None if unlimited."""
+    if settings.GEMINI_REQUESTS_PER_MINUTE <= 0 and settings.GEMINI_TOKENS_PER_MINUTE <= 0:
+        return None
+    return RateLimitScheduler(
+        requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+    )
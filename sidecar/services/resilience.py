@@ -0,0 +1,226 @@
+"""Retry, backoff and circuit breaking for Gemini calls."""
+
+import logging
+import random
+import re
+import time
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import cast
+
+import httpx
+from google.genai import errors
+
+from core.config import settings
+from core.exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)s$")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2.0**attempt))
+
+    def delay_for(self, error: Exception, attempt: int) -> float | None:
+        """Return how long to wait before retrying, or None if the call must fail now."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+
+        delay = self.backoff(attempt)
+        if isinstance(error, errors.APIError):
+            retry_after = retry_after_seconds(error)
+            if retry_after is not None:
+                # The server told us when to come back; waiting longer than our
+                # budget would stall the user, so give up instead.
+                if retry_after > self.max_delay:
+                    return None
+                delay = max(delay, retry_after)
+        return delay
+
+
+@dataclass
+class ResilienceStats:
+    """Counters for retried and short-circuited calls."""
+
+    retries: int = 0
+    exhausted: int = 0
+    short_circuited: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient server errors and rate limits are retried; other client errors are not."""
+    if isinstance(error, errors.ServerError):
+        return True
+    if isinstance(error, errors.ClientError):
+        return error.code in (408, 429)
+    return False
+
+
+def retry_after_seconds(error: errors.APIError) -> float | None:
+    """Extract the server-requested retry delay from a Gemini API error.
+
+    Checks the HTTP ``Retry-After`` header first, then the ``RetryInfo`` detail that
+    Gemini attaches to 429 responses.
+    """
+    response = cast(object, error.response)
+    headers = cast(object, getattr(response, "headers", None))
+    header: str | None = None
+    if isinstance(headers, Mapping):
+        header_map = cast(Mapping[str, str], headers)
+        header = header_map.get("retry-after") or header_map.get("Retry-After")
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(header)
+                return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    details = cast(object, error.details)
+    if isinstance(details, dict):
+        body = cast(dict[str, object], details)
+        error_body = body.get("error", body)
+        entries = (
+            cast(dict[str, object], error_body).get("details")
+            if isinstance(error_body, dict)
+            else None
+        )
+        if isinstance(entries, list):
+            for entry in cast(list[object], entries):
+                if not isinstance(entry, dict):
+                    continue
+                match = RETRY_DELAY_PATTERN.match(
+                    str(cast(dict[str, object], entry).get("retryDelay", ""))
+                )
+                if match:
+                    return float(match.group(1))
+    return None
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast while the upstream API is degraded.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls are
+    rejected for ``reset_timeout`` seconds. It then goes half-open and lets a limited
+    number of probe calls through: a successful probe closes the circuit, a failed
+    one opens it again.
+    """
+
+    def __init__(
+        self, failure_threshold: int, reset_timeout: float, half_open_max_calls: int = 1
+    ) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.half_open_max_calls: int = half_open_max_calls
+        self.state: CircuitState = CircuitState.CLOSED
+        self.consecutive_failures: int = 0
+        self.times_opened: int = 0
+        self._opened_at: float = 0.0
+        self._half_open_since: float = 0.0
+        self._half_open_calls: int = 0
+
+    def before_call(self) -> None:
+        """Reserve permission for a call.
+
+        Raises:
+            ServiceUnavailableError: If the circuit is open.
+        """
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise ServiceUnavailableError(
+                    message="Gemini API is temporarily unavailable. Please try again shortly.",
+                    details={"circuit_state": self.state.value},
+                )
+            logger.info("Gemini circuit half-open, probing for recovery")
+            self.state = CircuitState.HALF_OPEN
+            self._half_open_since = time.monotonic()
+            self._half_open_calls = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            # A probe that never reported back (e.g. an abandoned stream) must not
+            # wedge the circuit, so probe slots are released after another timeout.
+            if time.monotonic() - self._half_open_since >= self.reset_timeout:
+                self._half_open_since = time.monotonic()
+                self._half_open_calls = 0
+            if self._half_open_calls >= self.half_open_max_calls:
+                raise ServiceUnavailableError(
+                    message="Gemini API is recovering. Please try again shortly.",
+                    details={"circuit_state": self.state.value},
+                )
+            self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        if self.state != CircuitState.CLOSED:
+            logger.info("Gemini circuit closed after successful probe")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != CircuitState.OPEN:
+                logger.warning(
+                    f"Gemini circuit opened after {self.consecutive_failures} consecutive failures"
+                )
+                self.times_opened += 1
+            self.state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+        }
+
+
+def counts_as_outage(error: Exception) -> bool:
+    """Whether an error indicates the upstream API is degraded: a server error, a timeout
+    or a failed connection. Bad requests and local failures (e.g. no API key) are not."""
+    return isinstance(
+        error, (errors.ServerError, httpx.TransportError, TimeoutError, ConnectionError)
+    )
+
+
+def build_retry_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_retries=settings.GEMINI_MAX_RETRIES,
+        base_delay=settings.GEMINI_RETRY_BASE_DELAY,
+        max_delay=settings.GEMINI_RETRY_MAX_DELAY,
+    )
+
+
+def build_circuit_breaker() -> CircuitBreaker | None:
+    if settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD <= 0:
+        return None
+    return CircuitBreaker(
+        failure_threshold=settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.GEMINI_CIRCUIT_RESET_SECONDS,
+    )
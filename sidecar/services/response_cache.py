@@ -0,0 +1,280 @@
+"""Two-tier response cache for Gemini calls.
+
+The first tier is an in-process LRU with size and TTL eviction. The second tier is a
+small SQLite database in ``settings.BASE_DIR`` so answers survive sidecar restarts.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Generator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol, cast
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a response cache."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    persistent_hits: int = 0
+    stores: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class ResponseCacheTier(Protocol):
+    """A single storage tier of the response cache."""
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def get_entry(self, key: str) -> tuple[str, float] | None:
+        """The value with the seconds left until it expires."""
+        ...
+
+    async def set(self, key: str, value: str, ttl_seconds: float | None = None) -> None:
+        """Store `value` for `ttl_seconds`, or the tier's own TTL when None."""
+        ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryCacheTier:
+    """In-process LRU tier with size and TTL eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries: int = max_entries
+        self.ttl_seconds: float = ttl_seconds
+        # Values keyed by cache key, with their monotonic expiry time
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> str | None:
+        entry = await self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    async def get_entry(self, key: str) -> tuple[str, float] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        remaining = expires_at - time.monotonic()
+        if remaining < 0:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value, remaining
+
+    async def set(self, key: str, value: str, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _ = self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class SqliteCacheTier:
+    """Persistent tier stored in a standalone SQLite file.
+
+    All blocking sqlite3 work runs in a worker thread so the event loop is never stalled.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int, ttl_seconds: float) -> None:
+        self.db_path: Path = db_path
+        self.max_entries: int = max_entries
+        self.ttl_seconds: float = ttl_seconds
+        self._initialized: bool = False
+
+    @contextlib.contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection]:
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                if not self._initialized:
+                    self._create_schema(conn)
+                yield conn
+        finally:
+            conn.close()
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        _ = conn.execute("PRAGMA journal_mode=WAL")
+        _ = conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            + "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        _ = conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_created_at ON response_cache (created_at)"
+        )
+        self._initialized = True
+
+    def _get_entry_sync(self, key: str) -> tuple[str, float] | None:
+        with self._connect() as conn:
+            row = cast(
+                tuple[str, float] | None,
+                conn.execute(
+                    "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone(),
+            )
+            if row is None:
+                return None
+            value, created_at = row
+            remaining = created_at + self.ttl_seconds - time.time()
+            if remaining < 0:
+                _ = conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            return value, remaining
+
+    def _set_sync(self, key: str, value: str, ttl_seconds: float | None) -> None:
+        created_at = time.time()
+        if ttl_seconds is not None:
+            # Rows only record their creation time, so a shorter lifetime is stored as an
+            # earlier creation
+            created_at -= self.ttl_seconds - ttl_seconds
+        with self._connect() as conn:
+            _ = conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            # Evict expired rows, then the oldest rows above the size limit
+            _ = conn.execute(
+                "DELETE FROM response_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            _ = conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                + "SELECT key FROM response_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _clear_sync(self) -> None:
+        with self._connect() as conn:
+            _ = conn.execute("DELETE FROM response_cache")
+
+    async def get(self, key: str) -> str | None:
+        entry = await self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    async def get_entry(self, key: str) -> tuple[str, float] | None:
+        return await asyncio.to_thread(self._get_entry_sync, key)
+
+    async def set(self, key: str, value: str, ttl_seconds: float | None = None) -> None:
+        await asyncio.to_thread(self._set_sync, key, value, ttl_seconds)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear_sync)
+
+
+class ResponseCache:
+    """Read-through cache composed of a memory tier and an optional persistent tier."""
+
+    def __init__(
+        self, memory: ResponseCacheTier, persistent: ResponseCacheTier | None = None
+    ) -> None:
+        self.memory: ResponseCacheTier = memory
+        self.persistent: ResponseCacheTier | None = persistent
+        self.stats: CacheStats = CacheStats()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str | list[str],
+        system_instruction: str | None,
+        response_mime_type: str | None,
+        search: bool,
+        response_schema: str | None = None,
+    ) -> str:
+        """Build a stable cache key from the request parameters."""
+        parts: list[object] = [model, prompt, system_instruction, response_mime_type, search]
+        # Only schema-constrained calls include the schema, so existing keys stay valid
+        if response_schema is not None:
+            parts.append(response_schema)
+        payload = json.dumps(parts, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> str | None:
+        value = await self.memory.get(key)
+        if value is not None:
+            self.stats.hits += 1
+            self.stats.memory_hits += 1
+            return value
+
+        if self.persistent is not None:
+            try:
+                entry = await self.persistent.get_entry(key)
+            except Exception as e:
+                logger.warning(f"Persistent response cache read failed: {e}")
+                entry = None
+
+            if entry is not None:
+                value, remaining = entry
+                self.stats.hits += 1
+                self.stats.persistent_hits += 1
+                # Promote to the memory tier for subsequent lookups, expiring with the row
+                await self.memory.set(key, value, ttl_seconds=remaining)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        self.stats.stores += 1
+        await self.memory.set(key, value)
+        if self.persistent is not None:
+            try:
+                await self.persistent.set(key, value)
+            except Exception as e:
+                logger.warning(f"Persistent response cache write failed: {e}")
+
+    async def clear(self) -> None:
+        await self.memory.clear()
+        if self.persistent is not None:
+            try:
+                await self.persistent.clear()
+            except Exception as e:
+                logger.warning(f"Persistent response cache clear failed: {e}")
+
+
+def build_response_cache() -> ResponseCache | None:
+    """Create the response cache configured in settings, or None if disabled."""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+
+    memory = MemoryCacheTier(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    )
+    persistent: SqliteCacheTier | None = None
+    if settings.RESPONSE_CACHE_DB_PATH:
+        persistent = SqliteCacheTier(
+            db_path=settings.BASE_DIR / settings.RESPONSE_CACHE_DB_PATH,
+            max_entries=settings.RESPONSE_CACHE_PERSISTENT_MAX_ENTRIES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    return ResponseCache(memory=memory, persistent=persistent)
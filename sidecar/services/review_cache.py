@@ -0,0 +1,163 @@
+"""Content-addressed cache of completed code reviews.
+
+Reviews are keyed by a hash of the normalized code plus the lesson and language, and
+are only replayed while the reviewer's prompt fingerprint is unchanged. The cache lives
+in the ``code_reviews`` table itself: a hit is the latest completed review with the same
+key, within ``REVIEW_CACHE_TTL_SECONDS``.
+"""
+
+import ast
+import hashlib
+from collections.abc import Collection
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from core.types import CodeReviewStatus
+from database.models import CodeReview
+
+# Full-line comment markers per language. Unknown languages keep their comments, as
+# stripping the wrong marker (e.g. "#" in C) would merge different programs.
+LINE_COMMENT_MARKERS: dict[str, tuple[str, ...]] = {
+    "python": ("#",),
+    "ruby": ("#",),
+    "shell": ("#",),
+    "bash": ("#",),
+    "r": ("#",),
+    "javascript": ("//",),
+    "typescript": ("//",),
+    "java": ("//",),
+    "c": ("//",),
+    "cpp": ("//",),
+    "c++": ("//",),
+    "csharp": ("//",),
+    "c#": ("//",),
+    "go": ("//",),
+    "rust": ("//",),
+    "kotlin": ("//",),
+    "swift": ("//",),
+    "php": ("//", "#"),
+    "sql": ("--",),
+    "lua": ("--",),
+    "haskell": ("--",),
+}
+
+
+def _normalize_text(code: str, language: str) -> str:
+    """Drop trailing whitespace and full-line comments, keeping the line numbering."""
+    markers = LINE_COMMENT_MARKERS.get(language, ())
+    lines: list[str] = []
+    for line in code.splitlines():
+        line = line.rstrip()
+        if markers and line.lstrip().startswith(markers):
+            line = ""
+        lines.append(line)
+    return "\n".join(lines).rstrip("\n")
+
+
+def _normalize_python(code: str) -> str | None:
+    """Canonical form of Python code: its AST plus the line of every statement.
+
+    Comments and formatting within a line do not change the result. Statement lines do,
+    since replayed findings refer to line numbers.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    lines = [str(node.lineno) for node in ast.walk(tree) if isinstance(node, ast.stmt)]
+    return ast.dump(tree) + "\n" + ",".join(lines)
+
+
+def normalize_code(code: str, language: str) -> str:
+    """Normalize a submission so cosmetic edits map to the same cache key (blocking)."""
+    language = language.lower()
+    code = code.replace("\r\n", "\n")
+    if language == "python":
+        canonical = _normalize_python(code)
+        if canonical is not None:
+            return canonical
+    return _normalize_text(code, language)
+
+
+def code_hash(code: str, language: str) -> str:
+    """Cache key component for a submission (blocking; parses Python code)."""
+    return hashlib.sha256(normalize_code(code, language).encode()).hexdigest()
+
+
+async def find_cached_review(
+    db: AsyncSession,
+    lesson_id: str,
+    language: str,
+    code_hash: str,
+    prompt_fingerprint: str,
+    ttl_seconds: float,
+) -> CodeReview | None:
+    """Latest completed review with this key and fingerprint, with its findings loaded."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    stmt = (
+        select(CodeReview)
+        .options(selectinload(CodeReview.findings))
+        .where(
+            CodeReview.code_hash == code_hash,
+            CodeReview.lesson_id == lesson_id,
+            CodeReview.language == language,
+            CodeReview.prompt_fingerprint == prompt_fingerprint,
+            CodeReview.status == CodeReviewStatus.COMPLETED,
+            CodeReview.feedback.is_not(None),
+            CodeReview.created_at >= cutoff,
+        )
+        .order_by(CodeReview.created_at.desc())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def find_previous_review(
+    db: AsyncSession, lesson_id: str, language: str, prompt_fingerprint: str
+) -> CodeReview | None:
+    """Latest completed, still cacheable review for the lesson, with its findings loaded.
+
+    This is the baseline an incremental re-review diffs against. Invalidated reviews are
+    skipped, as their findings may no longer match the lesson.
+    """
+    stmt = (
+        select(CodeReview)
+        .options(selectinload(CodeReview.findings))
+        .where(
+            CodeReview.lesson_id == lesson_id,
+            CodeReview.language == language,
+            CodeReview.prompt_fingerprint == prompt_fingerprint,
+            CodeReview.code_hash.is_not(None),
+            CodeReview.status == CodeReviewStatus.COMPLETED,
+        )
+        .order_by(CodeReview.created_at.desc())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def invalidate_review_cache(
+    db: AsyncSession, lesson_ids: Collection[str] | None = None
+) -> int:
+    """Stop replaying stored reviews, for the given lessons or all of them.
+
+    The reviews themselves are kept; only their cache key is cleared, which also stops
+    them being used as incremental baselines. Call this when a lesson's name or
+    objectives change, since both are part of the review prompt.
+
+    Returns:
+        The number of reviews removed from the cache.
+    """
+    if lesson_ids is not None and not lesson_ids:
+        return 0
+    stmt = update(CodeReview).where(CodeReview.code_hash.is_not(None)).values(code_hash=None)
+    if lesson_ids is not None:
+        stmt = stmt.where(CodeReview.lesson_id.in_(lesson_ids))
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType, reportUnknownVariableType]
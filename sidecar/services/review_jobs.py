@@ -0,0 +1,313 @@
+"""Durable queue of code review jobs run by in-process workers.
+
+Every review submitted here is stored as a `ReviewJob` next to its `CodeReview` row and
+runs to completion in a worker, whether or not a client is still listening. Clients
+follow a job with `subscribe` and may re-attach at any time: the tokens streamed so far
+are replayed first, and finished jobs replay their stored feedback.
+
+On start, jobs left queued by the previous process are queued again, and jobs that were
+running are retried until they have been started REVIEW_JOB_MAX_ATTEMPTS times, then
+marked failed. A job whose review was already stored is completed without another run.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from core.config import settings
+from core.exceptions import ReviewJobNotFoundError
+from core.types import CodeReviewStatus, ReviewJobStatus
+from database.models import ReviewJob
+from database.session import dbsessionmanager
+from services.review_service import ReviewLookup, ReviewService
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+@dataclass
+class ReviewJobStats:
+    """Counters for the review job queue."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    resumed: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class _JobStream:
+    """Tokens of a job run in this process, kept so late subscribers can catch up."""
+
+    tokens: list[str] = field(default_factory=list)
+    done: bool = False
+    error: str | None = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def push(self, token: str) -> None:
+        self.tokens.append(token)
+        self._notify()
+
+    def close(self, error: str | None = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def wait(self) -> None:
+        """Wait for the next token or the end of the job."""
+        _ = await self._changed.wait()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class ReviewJobQueue:
+    """Runs review jobs in a pool of asyncio workers.
+
+    Args:
+        session_factory: Opens the database session each job runs on.
+        workers: Number of reviews running at once.
+        max_attempts: Runs a job may start before an interruption fails it.
+        review_service: Service used to look up, create and run reviews.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory | None = None,
+        workers: int = settings.REVIEW_JOB_WORKERS,
+        max_attempts: int = settings.REVIEW_JOB_MAX_ATTEMPTS,
+        review_service: ReviewService | None = None,
+    ) -> None:
+        self.session_factory: SessionFactory = session_factory or dbsessionmanager.session
+        self.workers: int = max(workers, 1)
+        self.max_attempts: int = max(max_attempts, 1)
+        self.review_service: ReviewService = review_service or ReviewService()
+        self.stats: ReviewJobStats = ReviewJobStats()
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._streams: dict[str, _JobStream] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Recover jobs left over by the previous process and start the workers."""
+        if self._tasks:
+            return
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers. Interrupted jobs stay running and resume on the next start."""
+        for task in self._tasks:
+            _ = task.cancel()
+        _ = await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(
+        self,
+        lesson_id: str,
+        code: str,
+        language: str,
+        db: AsyncSession,
+        lookup: ReviewLookup | None = None,
+    ) -> ReviewJob:
+        """Store a review job and queue it.
+
+        A cache hit is recorded as an already completed job that replays the cached
+        review. The job and its review row are committed together.
+        """
+        if lookup is None:
+            lookup = await self.review_service.lookup(lesson_id, code, language, db)
+
+        if lookup.cached is not None:
+            job = ReviewJob(
+                review=self.review_service.replay_record(lookup.cached, code),
+                status=ReviewJobStatus.COMPLETED,
+                finished_at=datetime.now(timezone.utc),
+            )
+        else:
+            job = ReviewJob(
+                review=self.review_service.pending_record(lesson_id, code, language, lookup),
+                status=ReviewJobStatus.QUEUED,
+            )
+        db.add(job)
+        await db.commit()
+
+        self.stats.submitted += 1
+        if job.status == ReviewJobStatus.QUEUED:
+            self._enqueue(job.id)
+        return job
+
+    async def subscribe(self, job_id: str, db: AsyncSession) -> AsyncGenerator[str, None]:
+        """Stream a job's feedback from the beginning, until the job ends.
+
+        Raises:
+            ReviewJobNotFoundError: If no job has this id.
+        """
+        stream = self._streams.get(job_id)
+        if stream is None:
+            job = await self.get(job_id, db)
+            if job.status == ReviewJobStatus.COMPLETED:
+                yield job.review.feedback or ""
+                return
+            if job.status == ReviewJobStatus.FAILED:
+                yield f"[ERROR] {job.error or 'Review failed'}"
+                return
+            if job.status == ReviewJobStatus.RUNNING:
+                # Interrupted mid-run; it resumes when the queue next starts
+                yield "[ERROR] Review job was interrupted"
+                return
+            # Queued while the queue is stopped; it is recovered on the next start
+            stream = self._streams.setdefault(job_id, _JobStream())
+
+        sent = 0
+        while True:
+            while sent < len(stream.tokens):
+                yield stream.tokens[sent]
+                sent += 1
+            if stream.done:
+                if stream.error is not None:
+                    yield f"[ERROR] {stream.error}"
+                return
+            await stream.wait()
+
+    async def get(self, job_id: str, db: AsyncSession) -> ReviewJob:
+        """Load a job with its review.
+
+        Raises:
+            ReviewJobNotFoundError: If no job has this id.
+        """
+        job = await db.get(
+            ReviewJob,
+            job_id,
+            options=[selectinload(ReviewJob.review)],
+            populate_existing=True,
+        )
+        if job is None:
+            raise ReviewJobNotFoundError(f"Review job with ID {job_id} not found")
+        return job
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            **self.stats.as_dict(),
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize(),
+            "streaming": len(self._streams),
+        }
+
+    def _enqueue(self, job_id: str) -> None:
+        _ = self._streams.setdefault(job_id, _JobStream())
+        self._queue.put_nowait(job_id)
+
+    async def _recover(self) -> None:
+        async with self.session_factory() as db:
+            stmt = (
+                select(ReviewJob)
+                .options(selectinload(ReviewJob.review))
+                .where(ReviewJob.status.in_([ReviewJobStatus.QUEUED, ReviewJobStatus.RUNNING]))
+                .order_by(ReviewJob.created_at)
+            )
+            jobs = (await db.execute(stmt)).scalars().all()
+            queued: list[str] = []
+            for job in jobs:
+                if job.status == ReviewJobStatus.RUNNING:
+                    if job.attempts >= self.max_attempts:
+                        self._finish(job, ReviewJobStatus.FAILED, "Interrupted too many times")
+                        continue
+                    job.status = ReviewJobStatus.QUEUED
+                    self.stats.resumed += 1
+                queued.append(job.id)
+            await db.commit()
+
+        if jobs:
+            logger.info(f"Recovered {len(queued)} review job(s), failed {len(jobs) - len(queued)}")
+        for job_id in queued:
+            self._enqueue(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Review job {job_id} could not be recorded: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        stream = self._streams.setdefault(job_id, _JobStream())
+        error: str | None = None
+        try:
+            async with self.session_factory() as db:
+                job = await db.get(ReviewJob, job_id, options=[selectinload(ReviewJob.review)])
+                if job is None or job.status != ReviewJobStatus.QUEUED:
+                    return
+
+                if job.review.status == CodeReviewStatus.COMPLETED:
+                    # Stored before an interruption; it is never paid for twice
+                    self._finish(job, ReviewJobStatus.COMPLETED)
+                    await db.commit()
+                    stream.push(job.review.feedback or "")
+                    return
+
+                review = job.review
+
+                job.status = ReviewJobStatus.RUNNING
+                job.attempts += 1
+                job.started_at = datetime.now(timezone.utc)
+                await db.commit()
+
+                try:
+                    lookup = await self.review_service.lookup(
+                        review.lesson_id, review.code_content, review.language, db
+                    )
+                    async for token in self.review_service.run_review(review, db, lookup.previous):
+                        stream.push(token)
+                except Exception as e:
+                    logger.error(f"Review job {job_id} failed: {e}")
+                    await db.rollback()
+                    await db.refresh(job)
+                    await db.refresh(review)
+                    error = str(e)
+                    self._finish(job, ReviewJobStatus.FAILED, error)
+                else:
+                    await db.refresh(review)
+                    if review.status != CodeReviewStatus.COMPLETED:
+                        # The reviewer answered without a review, e.g. a guardrail refusal
+                        review.feedback = "".join(stream.tokens)
+                    self._finish(job, ReviewJobStatus.COMPLETED)
+                await db.commit()
+        finally:
+            # Shutdown cancels mid-run jobs without finishing them; they resume on restart
+            stream.close(error)
+            _ = self._streams.pop(job_id, None)
+
+    def _finish(self, job: ReviewJob, status: ReviewJobStatus, error: str | None = None) -> None:
+        """Record the end of a job. Its review is failed unless it was stored complete."""
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+        if job.review.status != CodeReviewStatus.COMPLETED:
+            job.review.status = CodeReviewStatus.FAILED
+        if status == ReviewJobStatus.COMPLETED:
+            self.stats.completed += 1
+        else:
+            self.stats.failed += 1
+
+
+# Singleton instance
+review_job_queue = ReviewJobQueue()
@@ -1,28 +1,139 @@
+import asyncio
+import logging
 import uuid
-from collections.abc import AsyncGenerator, AsyncIterator
-from typing import Protocol, cast
+from collections import defaultdict
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Sequence
+from typing import NamedTuple, Protocol, cast
 
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from agents.code_reviewer.incremental import MAX_CHANGED_RATIO, ReviewDiff, diff_code
+from agents.code_reviewer.persistence import finding_rows as review_finding_rows
+from agents.code_reviewer.state import CodeReviewerFinding, ReviewOutcome
+from core.config import settings
 from core.types import AgentID, CodeReviewStatus
-from database.models import CodeReview
+from database.models import CodeReview, CodeReviewFinding
+from schemas.lesson import LessonContext
+from services.lesson_service import LessonContextService
+from services.review_cache import code_hash, find_cached_review, find_previous_review
+
+logger = logging.getLogger(__name__)
 
 
 class ReviewableAgent(Protocol):
     """Protocol for agents that support the review method."""
 
     def review(
-        self, review_id: str, lesson_id: str, code: str, language: str, db: AsyncSession
+        self,
+        review_id: str,
+        lesson_id: str,
+        code: str,
+        language: str,
+        db: AsyncSession,
+        baseline: ReviewDiff | None = None,
     ) -> AsyncIterator[str]:
         """Specific method for code review streaming."""
         ...
 
 
+class BatchReviewableAgent(Protocol):
+    """Protocol for agents that can review without a database session."""
+
+    lesson_service: LessonContextService
+
+    async def review_detached(
+        self,
+        review_id: str,
+        lesson: LessonContext,
+        code: str,
+        language: str,
+        on_token: Callable[[str], None] | None = None,
+    ) -> ReviewOutcome:
+        """Run one review and return its outcome without persisting it."""
+        ...
+
+
+class BatchItem(NamedTuple):
+    """One submission of a batch review."""
+
+    lesson_id: str
+    code: str
+    language: str
+
+
+# Events streamed by `ReviewService.submit_batch`
+BatchEvent = dict[str, object]
+
+
+class ReviewLookup(NamedTuple):
+    """Result of checking the review cache for a submission."""
+
+    code_hash: str | None = None  # None when the cache is disabled
+    prompt_fingerprint: str | None = None
+    cached: CodeReview | None = None
+    previous: CodeReview | None = None  # Baseline for an incremental re-review
+
+    @property
+    def hit(self) -> bool:
+        return self.cached is not None
+
+
 class ReviewService:
     """Service for handling code review submissions."""
 
+    def __init__(
+        self,
+        cache_enabled: bool = settings.REVIEW_CACHE_ENABLED,
+        cache_ttl_seconds: float = settings.REVIEW_CACHE_TTL_SECONDS,
+        incremental: bool = settings.REVIEW_INCREMENTAL_ENABLED,
+    ) -> None:
+        self.cache_enabled: bool = cache_enabled
+        self.cache_ttl_seconds: float = cache_ttl_seconds
+        self.incremental: bool = incremental
+
+    async def lookup(
+        self,
+        lesson_id: str,
+        code: str,
+        language: str,
+        db: AsyncSession,
+        with_previous: bool = True,
+    ) -> ReviewLookup:
+        """Check the review cache for an equivalent earlier submission.
+
+        On a miss, also find the previous review of the lesson to diff against, unless
+        `with_previous` is False. Earlier
+        reviews are only reused when they came from the same prompts, so agents that do
+        not expose a `prompt_fingerprint` are never cached or reviewed incrementally.
+        """
+        from agents.manager import agent_manager
+
+        if not self.cache_enabled and not self.incremental:
+            return ReviewLookup()
+
+        fingerprint = getattr(agent_manager.get_agent(AgentID.REVIEWER), "prompt_fingerprint", None)
+        if not isinstance(fingerprint, str):
+            return ReviewLookup()
+
+        key = await asyncio.to_thread(code_hash, code, language)
+        cached = None
+        if self.cache_enabled:
+            cached = await find_cached_review(
+                db, lesson_id, language, key, fingerprint, self.cache_ttl_seconds
+            )
+        previous = None
+        if cached is None and self.incremental and with_previous:
+            previous = await find_previous_review(db, lesson_id, language, fingerprint)
+        return ReviewLookup(key, fingerprint, cached, previous)
+
     async def submit_review(
-        self, lesson_id: str, code: str, language: str, db: AsyncSession
+        self,
+        lesson_id: str,
+        code: str,
+        language: str,
+        db: AsyncSession,
+        lookup: ReviewLookup | None = None,
     ) -> AsyncGenerator[str, None]:
         """
         Submits code for review, persists the record, and streams the AI response.
@@ -32,43 +143,356 @@ class ReviewService:
             code: The code content.
             language: Programming language.
             db: Database session.
+            lookup: Result of `lookup` for this submission, if the caller already has it.
 
         Yields:
-            Chunks of the review feedback.
+            Chunks of the review feedback. A cache hit replays the stored review.
         """
-        from agents.manager import agent_manager
+        if lookup is None:
+            lookup = await self.lookup(lesson_id, code, language, db)
+        if lookup.cached is not None:
+            async for chunk in self._replay(lookup.cached, code, db):
+                yield chunk
+            return
 
         # 1. Create DB record
-        review_id = str(uuid.uuid4())
-        review_record = CodeReview(
-            id=review_id,
+        review_record = self.pending_record(lesson_id, code, language, lookup)
+        db.add(review_record)
+        await db.commit()
+
+        # 2. Stream Response
+        async for chunk in self.run_review(review_record, db, lookup.previous):
+            yield chunk
+
+    def pending_record(
+        self, lesson_id: str, code: str, language: str, lookup: ReviewLookup
+    ) -> CodeReview:
+        """New review row for a submission that will run through the reviewer."""
+        return CodeReview(
+            id=str(uuid.uuid4()),
             lesson_id=lesson_id,
             code_content=code,
             language=language,
             status=CodeReviewStatus.PENDING,
+            code_hash=lookup.code_hash,
+            prompt_fingerprint=lookup.prompt_fingerprint,
         )
-        db.add(review_record)
-        await db.commit()
-        await db.refresh(review_record)
 
-        # 2. Get Agent
+    def replay_record(self, cached: CodeReview, code: str) -> CodeReview:
+        """New review row recording a submission as a copy of a cached review.
+
+        The copy is newer than the original, so a review that keeps being resubmitted
+        stays in the cache while unused ones expire.
+        """
+        return CodeReview(
+            id=str(uuid.uuid4()),
+            lesson_id=cached.lesson_id,
+            code_content=code,
+            language=cached.language,
+            feedback=cached.feedback,
+            status=CodeReviewStatus.COMPLETED,
+            code_hash=cached.code_hash,
+            prompt_fingerprint=cached.prompt_fingerprint,
+            findings=[
+                CodeReviewFinding(
+                    line_number=f.line_number,
+                    category=f.category,
+                    observation=f.observation,
+                    socratic_question=f.socratic_question,
+                )
+                for f in cached.findings
+            ],
+        )
+
+    async def run_review(
+        self, review: CodeReview, db: AsyncSession, previous: CodeReview | None = None
+    ) -> AsyncGenerator[str, None]:
+        """Run the reviewer on a stored, pending review and stream its feedback.
+
+        The agent persists the feedback and findings through `db`. With a `previous`
+        review of the lesson, only the lines changed since then are analyzed.
+        """
+        from agents.manager import agent_manager
+
         agent = agent_manager.get_agent(AgentID.REVIEWER)
 
-        # 3. Stream Response
-        # Note: In a real scenario, we might want to update the review record with the feedback
-        # status after completion, but for now we follow the existing pattern.
         # We use a Protocol to avoid direct dependency on CodeReviewerAgent class
         if not hasattr(agent, "review"):
             yield f"[ERROR] Agent '{AgentID.REVIEWER}' does not support review method"
             return
 
         review_agent = cast(ReviewableAgent, cast(object, agent))
+        baseline = await self._baseline(previous, review.code_content)
 
         async for chunk in review_agent.review(
-            review_id=review_id,
-            lesson_id=lesson_id,
-            code=code,
-            language=language,
+            review_id=review.id,
+            lesson_id=review.lesson_id,
+            code=review.code_content,
+            language=review.language,
             db=db,
+            baseline=baseline,
         ):
             yield chunk
+
+    async def submit_batch(
+        self,
+        items: Sequence[BatchItem],
+        db: AsyncSession,
+        concurrency: int = settings.REVIEW_BATCH_CONCURRENCY,
+    ) -> AsyncGenerator[BatchEvent, None]:
+        """Review several submissions, at most `concurrency` at a time.
+
+        Yields events tagged with the item's `index`: `queued` (with the review id) for
+        every item up front, then `started`, `token`, `completed` (feedback and findings)
+        or `failed` as each review progresses, and a final `done` once all results are
+        stored. Cache hits complete immediately, and identical submissions in the batch
+        are reviewed once.
+
+        Reviews run detached from `db`, so the session is only used here: one commit
+        for all new review rows, and one for all feedback and findings at the end. If the
+        consumer stops early, the reviews still running are cancelled and marked failed.
+        """
+        from agents.manager import agent_manager
+
+        agent = agent_manager.get_agent(AgentID.REVIEWER)
+        if not hasattr(agent, "review_detached"):
+            raise RuntimeError(f"Agent '{AgentID.REVIEWER}' does not support batch reviews")
+        reviewer = cast(BatchReviewableAgent, cast(object, agent))
+
+        # 1. Cache lookups and lesson contexts, sequentially on the shared session
+        lookups = [
+            await self.lookup(item.lesson_id, item.code, item.language, db, with_previous=False)
+            for item in items
+        ]
+        lessons: dict[str, LessonContext] = {}
+        for lesson_id in dict.fromkeys(item.lesson_id for item in items):
+            lessons[lesson_id] = await self._lesson_context(reviewer, lesson_id, db)
+
+        # 2. One review per distinct submission; duplicates share its outcome
+        review_ids = [str(uuid.uuid4()) for _ in items]
+        primaries: dict[tuple[str, str, str], int] = {}
+        duplicates: defaultdict[int, list[int]] = defaultdict(list)
+        for index, (item, lookup) in enumerate(zip(items, lookups)):
+            if lookup.cached is not None:
+                continue
+            key = (item.lesson_id, item.language, lookup.code_hash or item.code)
+            primary = primaries.setdefault(key, index)
+            if primary != index:
+                duplicates[primary].append(index)
+
+        # 3. Every review row, and the findings of replayed ones, in one transaction
+        review_rows: list[dict[str, object]] = []
+        finding_rows: list[dict[str, object]] = []
+        for index, (item, lookup) in enumerate(zip(items, lookups)):
+            row: dict[str, object] = {
+                "id": review_ids[index],
+                "lesson_id": item.lesson_id,
+                "code_content": item.code,
+                "language": item.language,
+                "status": CodeReviewStatus.PENDING,
+                "code_hash": lookup.code_hash,
+                "prompt_fingerprint": lookup.prompt_fingerprint,
+            }
+            if lookup.cached is not None:
+                row["feedback"] = lookup.cached.feedback
+                row["status"] = CodeReviewStatus.COMPLETED
+                finding_rows.extend(
+                    {
+                        "review_id": review_ids[index],
+                        "line_number": f.line_number,
+                        "category": f.category,
+                        "observation": f.observation,
+                        "socratic_question": f.socratic_question,
+                    }
+                    for f in lookup.cached.findings
+                )
+            review_rows.append(row)
+        if review_rows:
+            _ = await db.execute(insert(CodeReview), review_rows)
+        if finding_rows:
+            _ = await db.execute(insert(CodeReviewFinding), finding_rows)
+        await db.commit()
+
+        for index, lookup in enumerate(lookups):
+            yield {
+                "index": index,
+                "event": "queued",
+                "review_id": review_ids[index],
+                "cached": lookup.hit,
+            }
+        for index, lookup in enumerate(lookups):
+            if lookup.cached is not None:
+                yield {
+                    "index": index,
+                    "event": "completed",
+                    "review_id": review_ids[index],
+                    "feedback": lookup.cached.feedback or "",
+                    "findings": [
+                        CodeReviewerFinding(
+                            line_number=f.line_number,
+                            category=f.category,
+                            observation=f.observation,
+                            socratic_question=f.socratic_question,
+                        )
+                        for f in lookup.cached.findings
+                    ],
+                    "cached": True,
+                }
+
+        # 4. Fan out the misses; events from all reviews are merged through one queue
+        queue: asyncio.Queue[BatchEvent | None] = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        outcomes: dict[int, ReviewOutcome] = {}
+        failed: set[int] = set()
+
+        async def run(index: int) -> None:
+            item = items[index]
+            async with semaphore:
+                queue.put_nowait({"index": index, "event": "started"})
+                try:
+                    outcome = await reviewer.review_detached(
+                        review_ids[index],
+                        lessons[item.lesson_id],
+                        item.code,
+                        item.language,
+                        on_token=lambda token: queue.put_nowait(
+                            {"index": index, "event": "token", "token": token}
+                        ),
+                    )
+                except Exception as e:
+                    logger.error(f"Batch review {review_ids[index]} failed: {e}")
+                    for target in (index, *duplicates[index]):
+                        failed.add(target)
+                        queue.put_nowait({"index": target, "event": "failed", "error": str(e)})
+                    return
+            for target in (index, *duplicates[index]):
+                outcomes[target] = outcome
+                queue.put_nowait(
+                    {
+                        "index": target,
+                        "event": "completed",
+                        "review_id": review_ids[target],
+                        "feedback": outcome.feedback,
+                        "findings": outcome.findings,
+                        "cached": False,
+                    }
+                )
+
+        async def run_all() -> None:
+            try:
+                _ = await asyncio.gather(*(run(index) for index in primaries.values()))
+            finally:
+                queue.put_nowait(None)
+
+        runner = asyncio.create_task(run_all())
+        finished = False
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+            finished = True
+        finally:
+            if not finished:
+                # The client disconnected mid-batch: stop reviews nobody will read, keep
+                # the results so far and fail the rest, so no row is left pending
+                _ = runner.cancel()
+                _ = await asyncio.wait({runner})
+                unfinished = {
+                    index
+                    for index, lookup in enumerate(lookups)
+                    if lookup.cached is None and index not in outcomes
+                }
+                await self._store_batch(db, review_ids, outcomes, failed | unfinished)
+
+        # 5. Feedback, status and findings of every reviewed item in one transaction
+        await self._store_batch(db, review_ids, outcomes, failed)
+        yield {
+            "event": "done",
+            "completed": len(outcomes) + sum(lookup.hit for lookup in lookups),
+            "failed": len(failed),
+            "cached": sum(lookup.hit for lookup in lookups),
+        }
+
+    async def _lesson_context(
+        self, reviewer: BatchReviewableAgent, lesson_id: str, db: AsyncSession
+    ) -> LessonContext:
+        """The lesson for a batch item, or a placeholder as the enrichment node would use."""
+        try:
+            return await reviewer.lesson_service.get_context(lesson_id, db)
+        except Exception as e:
+            logger.error(f"Enrichment error: {e}")
+            return LessonContext(lesson_id=lesson_id, name="Unknown", description="")
+
+    async def _store_batch(
+        self,
+        db: AsyncSession,
+        review_ids: list[str],
+        outcomes: dict[int, ReviewOutcome],
+        failed: set[int],
+    ) -> None:
+        """Write the results of a batch with one executemany per table and one commit.
+
+        Reviews that ended without feedback (e.g. a guardrail refusal) are marked
+        failed, as are reviews whose run raised.
+        """
+        updates: list[dict[str, object]] = []
+        finding_rows: list[dict[str, object]] = []
+        for index, outcome in outcomes.items():
+            updates.append(
+                {
+                    "id": review_ids[index],
+                    "feedback": outcome.feedback,
+                    "status": CodeReviewStatus.COMPLETED
+                    if outcome.completed
+                    else CodeReviewStatus.FAILED,
+                }
+            )
+            finding_rows.extend(review_finding_rows(review_ids[index], outcome.findings))
+        updates.extend(
+            {"id": review_ids[index], "feedback": None, "status": CodeReviewStatus.FAILED}
+            for index in failed
+        )
+
+        if updates:
+            _ = await db.execute(update(CodeReview), updates)
+        if finding_rows:
+            _ = await db.execute(insert(CodeReviewFinding), finding_rows)
+        await db.commit()
+
+    async def _baseline(self, previous: CodeReview | None, code: str) -> ReviewDiff | None:
+        """Diff against the previous review, unless the code changed too much to be worth it."""
+        if previous is None:
+            return None
+
+        findings = [
+            CodeReviewerFinding(
+                line_number=f.line_number,
+                category=f.category,
+                observation=f.observation,
+                socratic_question=f.socratic_question,
+            )
+            for f in previous.findings
+        ]
+        diff = await asyncio.to_thread(diff_code, previous.code_content, code, findings)
+        if diff.changed_ratio > MAX_CHANGED_RATIO:
+            logger.info(
+                f"Full review: {diff.changed_lines}/{diff.total_lines} lines changed "
+                + f"since review {previous.id}"
+            )
+            return None
+
+        logger.info(
+            f"Incremental review against {previous.id}: {diff.changed_lines}/"
+            + f"{diff.total_lines} lines changed, {len(diff.carried_findings)} findings carried"
+        )
+        return diff
+
+    async def _replay(
+        self, cached: CodeReview, code: str, db: AsyncSession
+    ) -> AsyncGenerator[str, None]:
+        """Record the submission as a copy of the cached review and stream its feedback."""
+        review = self.replay_record(cached, code)
+        db.add(review)
+        await db.commit()
+        logger.info(f"Review cache hit: replaying review {cached.id} as {review.id}")
+
+        yield cached.feedback or ""
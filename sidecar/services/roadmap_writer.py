@@ -0,0 +1,108 @@
+"""Write generated roadmap trees with Core INSERTs.
+
+A roadmap is stored in at most three statements (the roadmap row, every phase, every
+lesson) rather than through the unit of work. Ids are generated up front, so children
+reference their parents without a flush, and nothing is read back afterwards. Callers
+own the transaction: the writers only execute, they never commit.
+"""
+
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import NamedTuple, cast
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.types import LessonStatus, RoadmapStatus
+from database.models import Lesson, Phase, Roadmap
+from schemas.domain import PhaseStructure, RoadmapStructure
+
+Row = dict[str, object]
+
+# Core tables, so the inserts skip the ORM's per-row bulk handling
+_ROADMAPS = cast(Table, Roadmap.__table__)
+_PHASES = cast(Table, Phase.__table__)
+_LESSONS = cast(Table, Lesson.__table__)
+
+
+class RoadmapRows(NamedTuple):
+    """Rows inserted for a roadmap's phases and lessons, in insertion order."""
+
+    phases: list[Row]
+    lessons: list[Row]
+
+    @property
+    def lesson_ids(self) -> list[str]:
+        return [str(row["id"]) for row in self.lessons]
+
+
+def phase_rows(
+    roadmap_id: str, phases: Sequence[PhaseStructure], first_order: int = 1
+) -> RoadmapRows:
+    """Build the insert parameters of `phases` and their lessons."""
+    rows = RoadmapRows(phases=[], lessons=[])
+    for phase_idx, phase_data in enumerate(phases):
+        phase_id = str(uuid.uuid4())
+        rows.phases.append(
+            {
+                "id": phase_id,
+                "roadmap_id": roadmap_id,
+                "name": phase_data.name,
+                "order_num": first_order + phase_idx,
+                "status": LessonStatus.NOT_STARTED,
+            }
+        )
+        rows.lessons.extend(
+            {
+                "id": str(uuid.uuid4()),
+                "phase_id": phase_id,
+                "name": lesson_data.name,
+                "description": lesson_data.description,
+                "objectives": list(lesson_data.objectives),
+                "order_num": lesson_idx + 1,
+                "status": LessonStatus.NOT_STARTED,
+                "time_spent": 0,
+                "metadata_json": {},
+            }
+            for lesson_idx, lesson_data in enumerate(phase_data.lessons)
+        )
+    return rows
+
+
+async def insert_phases(
+    db: AsyncSession, roadmap_id: str, phases: Sequence[PhaseStructure], first_order: int = 1
+) -> RoadmapRows:
+    """Insert `phases` and their lessons under an existing roadmap, numbering the phases
+    from `first_order`."""
+    rows = phase_rows(roadmap_id, phases, first_order)
+    if rows.phases:
+        _ = await db.execute(insert(_PHASES), rows.phases)
+    if rows.lessons:
+        _ = await db.execute(insert(_LESSONS), rows.lessons)
+    return rows
+
+
+async def insert_roadmap(
+    db: AsyncSession,
+    structure: RoadmapStructure,
+    goal: str | None,
+    status: RoadmapStatus = RoadmapStatus.ACTIVE,
+) -> tuple[str, RoadmapRows]:
+    """Insert a roadmap with all of its phases and lessons.
+
+    Returns:
+        The new roadmap's id and the rows of its phases and lessons
+    """
+    roadmap_id = str(uuid.uuid4())
+    _ = await db.execute(
+        insert(_ROADMAPS).values(
+            id=roadmap_id,
+            name=structure.name,
+            description=structure.description,
+            goal=goal,
+            status=status,
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+    return roadmap_id, await insert_phases(db, roadmap_id, structure.phases)
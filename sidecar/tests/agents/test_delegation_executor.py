@@ -70,3 +70,11 @@ async def test_delegation_context_formatting():
         assert "User: Hello AI" in context
         assert "Assistant: Hello human!" in context
         assert "User: Tell me about python" in context
+
+        # The prompt is passed separately instead of being prepended to the message
+        mock_agent.chat.assert_awaited_once_with(
+            thread_id="thread1",
+            message="Tell me about python",
+            db=state["db"],
+            system_context="System instructions",
+        )
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from agents.orchestrator.agent import OrchestratorAgent
+from agents.orchestrator.routing import resolve_route
 
 
 @pytest.mark.asyncio
@@ -124,3 +125,63 @@ async def test_orchestrator_chat_stream():
 
                 assert chunks == ["chunk1", "chunk2"]
                 mock_get_agent.assert_called_with("teacher")
+
+
+def test_resolve_route_command_and_fallback():
+    mock_class = MagicMock()
+    mock_class.agent_id = "reviewer"
+
+    with patch(
+        "agents.agent_registry.agent_registry.get_agent_by_command",
+        side_effect={"review": mock_class}.get,
+    ):
+        route = resolve_route("/review my code")
+        assert route.agent_id == "reviewer"
+        assert route.command == "review"
+        assert route.clean_message == "my code"
+        assert route.notice is None
+
+        unknown = resolve_route("/dance now")
+        assert unknown.agent_id == "teacher"
+        assert unknown.notice is not None and "/dance" in unknown.notice
+
+    plain = resolve_route("hello")
+    assert plain == ("teacher", None, "hello", None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("graph_routing", [False, True])
+async def test_orchestrator_chat_stream_routing_modes(graph_routing: bool):
+    orchestrator = OrchestratorAgent(
+        MagicMock(), MagicMock(), MagicMock(), graph_routing=graph_routing
+    )
+    await orchestrator.initialize()
+
+    async def mock_async_generator(*_args: Any, **_kwargs: Any):
+        yield "reviewed"
+
+    mock_reviewer = MagicMock()
+    mock_reviewer.chat_stream.side_effect = mock_async_generator
+    mock_class = MagicMock()
+    mock_class.agent_id = "reviewer"
+
+    with (
+        patch("agents.manager.agent_manager.get_agent", return_value=mock_reviewer) as get_agent,
+        patch("agents.agent_registry.agent_registry.get_agent_by_command", return_value=mock_class),
+        patch.object(
+            orchestrator.streaming_graph,
+            "ainvoke",
+            wraps=orchestrator.streaming_graph.ainvoke,
+        ) as graph_invoke,
+    ):
+        stream = orchestrator.chat_stream("thread1", "/review x = 1", MagicMock())
+        chunks = [c async for c in stream]
+
+    assert chunks == ["reviewed"]
+    get_agent.assert_called_with("reviewer")
+    # The graph only runs when graph routing is enabled
+    assert graph_invoke.called is graph_routing
+    sent = mock_reviewer.chat_stream.call_args.kwargs
+    assert sent["message"] == "x = 1"
+    assert "Reviewer" in sent["system_context"]
+    assert "Conversation context" not in sent["system_context"]
@@ -1,10 +1,15 @@
+import asyncio
 from typing import Any
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from agents.code_reviewer.agent import CodeReviewerAgent
+from database.models import CodeReview, CodeReviewFinding
+from schemas.lesson import LessonContext
 from services.lesson_service import LessonContextService
 
 
@@ -16,11 +21,11 @@ async def test_reviewer_agent_review(mock_gemini_service: MagicMock, db_session:
         lesson_service=MagicMock(spec=LessonContextService),
     )
 
-    async def mock_events(*_args: Any, **_kwargs: Any) -> Any:
-        yield {"event": "on_custom_event", "name": "review_token", "data": {"token": "Feedback"}}
+    async def mock_stream(*_args: Any, **_kwargs: Any) -> Any:
+        yield {"token": "Feedback"}
 
     mock_workflow = MagicMock()
-    mock_workflow.astream_events.side_effect = mock_events
+    mock_workflow.astream.side_effect = mock_stream
     agent._workflow = mock_workflow  # pyright: ignore[reportPrivateUsage]
 
     tokens: list[str] = []
@@ -52,3 +57,89 @@ async def test_reviewer_agent_chat(mock_gemini_service: MagicMock, db_session: A
         response = await agent.chat("t1", "hi", db_session)
         assert response == "token1token2"
         mock_submit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_reviewer_runs_guardrail_and_analysis_in_parallel(db_session: AsyncSession):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def generate_structured(prompt: str, schema: type[BaseModel], **_kwargs: Any) -> Any:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if "findings" in prompt:
+            finding = {"line_number": 1, "category": "Style", "observation": "o"}
+            return schema.model_validate({"findings": [{**finding, "socratic_question": "q"}]})
+        return schema.model_validate({"triggered": True})
+
+    mock_gemini = MagicMock()
+    mock_gemini.generate_structured.side_effect = generate_structured
+    lesson_service = MagicMock(spec=LessonContextService)
+    lesson_service.get_context = AsyncMock(
+        return_value=LessonContext(lesson_id="l1", name="Loops", description="")
+    )
+
+    db_session.add(CodeReview(id="r-par", lesson_id="l1", code_content="x", language="python"))
+    await db_session.commit()
+
+    agent = CodeReviewerAgent(
+        gemini_service=mock_gemini, db_manager=MagicMock(), lesson_service=lesson_service
+    )
+    agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage]
+
+    tokens = [
+        t
+        async for t in agent.review(
+            review_id="r-par", lesson_id="l1", code="x = 1", language="python", db=db_session
+        )
+    ]
+
+    assert max_in_flight == 2
+    assert "can't just give you the answer" in "".join(tokens)
+    # The speculative analysis was discarded by the gate before anything was stored
+    result = await db_session.execute(
+        select(CodeReviewFinding).where(CodeReviewFinding.review_id == "r-par")
+    )
+    assert result.scalars().all() == []
+    mock_gemini.generate_content_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_detached_review_returns_the_outcome_without_a_session():
+    async def generate_structured(prompt: str, schema: type[BaseModel], **_kwargs: Any) -> Any:
+        if "findings" in prompt:
+            finding = {"line_number": 1, "category": "Style", "observation": "o"}
+            return schema.model_validate({"findings": [{**finding, "socratic_question": "q"}]})
+        return schema.model_validate({"triggered": False})
+
+    async def generate_content_stream(**_kwargs: Any) -> Any:
+        yield "Why "
+        yield "a loop?"
+
+    mock_gemini = MagicMock()
+    mock_gemini.generate_structured.side_effect = generate_structured
+    mock_gemini.generate_content_stream.side_effect = generate_content_stream
+    lesson_service = MagicMock(spec=LessonContextService)
+
+    agent = CodeReviewerAgent(
+        gemini_service=mock_gemini, db_manager=MagicMock(), lesson_service=lesson_service
+    )
+    agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage]
+
+    streamed: list[str] = []
+    outcome = await agent.review_detached(
+        "r-detached",
+        LessonContext(lesson_id="l1", name="Loops", description=""),
+        "x = 1",
+        "python",
+        on_token=streamed.append,
+    )
+
+    assert outcome.feedback == "Why a loop?"
+    assert streamed == ["Why ", "a loop?"]
+    assert [f["observation"] for f in outcome.findings] == ["o"]
+    assert outcome.completed
+    lesson_service.get_context.assert_not_called()
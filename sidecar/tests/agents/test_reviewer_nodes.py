@@ -1,17 +1,23 @@
-import json
+import asyncio
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from langchain_core.runnables import RunnableConfig
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from agents.code_reviewer.nodes.analysis import code_analysis_node
 from agents.code_reviewer.nodes.enrichment import context_enrichment_node
+from agents.code_reviewer.nodes.gate import guardrail_gate_node
 from agents.code_reviewer.nodes.socratic import socratic_review_node
+from agents.code_reviewer.nodes.static import static_analysis_node
+from agents.code_reviewer.nodes.triage import triage_node
 from agents.code_reviewer.state import CodeReviewerState
+from core.exceptions import StructuredOutputError
 from core.types import CodeReviewStatus
-from database.models import CodeReview, Lesson, Phase, Roadmap
+from database.models import CodeReview, CodeReviewFinding, Lesson, Phase, Roadmap
+from schemas.domain import ReviewAnalysisStructure, ReviewTriageStructure
 
 
 def create_test_state(overrides: dict[str, Any] | None = None) -> CodeReviewerState:
@@ -62,7 +68,7 @@ async def test_reviewer_enrichment_node(db_session: AsyncSession):
 @pytest.mark.asyncio
 async def test_code_analysis_node(db_session: AsyncSession):
     mock_gemini = AsyncMock()
-    mock_gemini.generate_content.return_value = json.dumps(
+    mock_gemini.generate_structured.return_value = ReviewAnalysisStructure.model_validate(
         {
             "findings": [
                 {
@@ -98,6 +104,75 @@ async def test_code_analysis_node(db_session: AsyncSession):
     assert findings[0]["category"] == "Style"
 
 
+@pytest.mark.asyncio
+async def test_static_analysis_node_runs_for_python_only():
+    code = "def f(items=[]):\n    return items\n"
+
+    result = await static_analysis_node(create_test_state({"code_content": code}))
+    assert result.get("syntax_error") is False
+    assert [f["line_number"] for f in result.get("static_findings", [])] == [1]
+
+    other = create_test_state({"code_content": code, "language": "javascript"})
+    assert await static_analysis_node(other) == {}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("node", [code_analysis_node, triage_node])
+async def test_syntax_error_skips_the_llm(node: Any):
+    mock_gemini = AsyncMock()
+    state = create_test_state({"code_content": "def f(:\n"})
+    state.update(await static_analysis_node(state))
+    config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
+
+    result = await node(state, config)
+
+    mock_gemini.generate_structured.assert_not_called()
+    assert [f["category"] for f in result.get("findings", [])] == ["Syntax"]
+
+
+@pytest.mark.asyncio
+async def test_syntax_error_keeps_carried_findings():
+    mock_gemini = AsyncMock()
+    state = create_test_state(
+        {
+            "code_content": "def f(:\n",
+            "changed_hunks": "@@ lines 1-1 @@\n+ 1 | def f(:",
+            "carried_findings": [TRIAGE_FINDING],
+        }
+    )
+    state.update(await static_analysis_node(state))
+    config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
+
+    result = await code_analysis_node(state, config)
+
+    mock_gemini.generate_structured.assert_not_called()
+    assert [f["category"] for f in result.get("findings", [])] == ["Style", "Syntax"]
+
+
+@pytest.mark.asyncio
+async def test_code_analysis_node_merges_static_findings(db_session: AsyncSession):
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured.return_value = ReviewAnalysisStructure.model_validate(
+        {"findings": [TRIAGE_FINDING]}
+    )
+    review = CodeReview(id="rev-merge", lesson_id="l-1", code_content="...", language="python")
+    db_session.add(review)
+    await db_session.commit()
+
+    state = create_test_state({"review_id": "rev-merge", "code_content": "import os\n"})
+    state.update(await static_analysis_node(state))
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "db_session": db_session}
+    }
+
+    result = await code_analysis_node(state, config)
+
+    prompt = mock_gemini.generate_structured.call_args.kwargs["prompt"]
+    assert "`os` is imported but never used" in prompt
+    assert "up to 2 other specific areas" in prompt
+    assert [f["line_number"] for f in result.get("findings", [])] == [1, 2]
+
+
 @pytest.mark.asyncio
 async def test_reviewer_socratic_node(db_session: AsyncSession):
     mock_gemini = MagicMock()
@@ -125,17 +200,249 @@ async def test_reviewer_socratic_node(db_session: AsyncSession):
         }
     }
 
-    with patch(
-        "agents.code_reviewer.nodes.socratic.adispatch_custom_event",
-        new_callable=AsyncMock,
-    ) as mock_dispatch:
-        result = await socratic_review_node(state, config)
-        # Type safe access
-        messages = result.get("messages", [])
-        assert "Review result" in str(messages[0].content)
-        assert mock_dispatch.call_count == 1
+    writer = MagicMock()
+    result = await socratic_review_node(state, config, writer)
+    # Type safe access
+    messages = result.get("messages", [])
+    assert "Review result" in str(messages[0].content)
+    writer.assert_called_once_with({"token": "Review result"})
 
     # Check DB update
     await db_session.refresh(review)
     assert review.status == CodeReviewStatus.COMPLETED
     assert review.feedback == "Review result"
+
+
+@pytest.mark.asyncio
+async def test_reviewer_socratic_node_stores_a_refusal(db_session: AsyncSession):
+    mock_gemini = MagicMock()
+    db_session.add(CodeReview(id="rev-refused", lesson_id="l-1", code_content="...", language="py"))
+    await db_session.commit()
+
+    state = create_test_state({"review_id": "rev-refused", "guardrail_triggered": True})
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "db_session": db_session}
+    }
+    result = await socratic_review_node(state, config, MagicMock())
+
+    mock_gemini.generate_content_stream.assert_not_called()
+    review = await db_session.get(CodeReview, "rev-refused", populate_existing=True)
+    assert review is not None
+    assert review.status == CodeReviewStatus.FAILED
+    assert review.feedback == result.get("messages", [])[0].content
+
+
+@pytest.mark.asyncio
+async def test_reviewer_socratic_node_stores_findings_with_the_feedback(
+    db_session: AsyncSession,
+):
+    mock_gemini = MagicMock()
+
+    async def mock_async_iterator():
+        yield "Review result"
+
+    mock_gemini.generate_content_stream.return_value = mock_async_iterator()
+    db_session.add(CodeReview(id="rev-save", lesson_id="l-1", code_content="...", language="py"))
+    await db_session.commit()
+
+    commits = 0
+
+    def count_commit(_session: Any) -> None:
+        nonlocal commits
+        commits += 1
+
+    event.listen(db_session.sync_session, "after_commit", count_commit)
+    state = create_test_state({"review_id": "rev-save", "findings": [TRIAGE_FINDING] * 2})
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "db_session": db_session}
+    }
+    _ = await socratic_review_node(state, config, MagicMock())
+    event.remove(db_session.sync_session, "after_commit", count_commit)
+
+    assert commits == 1
+    review = await db_session.get(CodeReview, "rev-save", populate_existing=True)
+    assert review is not None
+    assert review.feedback == "Review result"
+    assert review.status == CodeReviewStatus.COMPLETED
+    rows = await db_session.execute(
+        select(CodeReviewFinding).where(CodeReviewFinding.review_id == "rev-save")
+    )
+    assert len(rows.scalars().all()) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_socratic_review_is_marked_failed_and_keeps_the_findings(
+    db_session: AsyncSession,
+):
+    mock_gemini = MagicMock()
+    mock_gemini.generate_content_stream.side_effect = RuntimeError("stream failed")
+    db_session.add(CodeReview(id="rev-err", lesson_id="l-1", code_content="...", language="py"))
+    await db_session.commit()
+
+    state = create_test_state({"review_id": "rev-err", "findings": [TRIAGE_FINDING]})
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "db_session": db_session}
+    }
+    result = await socratic_review_node(state, config, MagicMock())
+
+    assert "review_completed" not in result
+    review = await db_session.get(CodeReview, "rev-err", populate_existing=True)
+    assert review is not None
+    assert review.status == CodeReviewStatus.FAILED
+    assert review.feedback is None
+    rows = await db_session.execute(
+        select(CodeReviewFinding).where(CodeReviewFinding.review_id == "rev-err")
+    )
+    assert len(rows.scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_guardrail_gate_discards_findings_when_triggered():
+    finding = {"line_number": 1, "category": "Style", "observation": "o", "socratic_question": "q"}
+
+    allowed = create_test_state({"findings": [finding]})
+    assert await guardrail_gate_node(allowed) == {}
+
+    blocked = create_test_state({"findings": [finding], "guardrail_triggered": True})
+    assert await guardrail_gate_node(blocked) == {"findings": []}
+
+
+TRIAGE_FINDING = {
+    "line_number": 2,
+    "category": "Style",
+    "observation": "Unused variable",
+    "socratic_question": "Where is x used?",
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("response", "triggered", "stored"),
+    [
+        ({"triggered": False, "findings": [TRIAGE_FINDING]}, False, 1),
+        ({"triggered": True, "findings": []}, True, 0),
+        (StructuredOutputError("Gemini returned an invalid ReviewTriageStructure"), False, 0),
+    ],
+)
+async def test_triage_node(
+    response: dict[str, Any] | StructuredOutputError, triggered: bool, stored: int
+):
+    mock_gemini = AsyncMock()
+    if isinstance(response, StructuredOutputError):
+        mock_gemini.generate_structured.side_effect = response
+    else:
+        mock_gemini.generate_structured.return_value = ReviewTriageStructure.model_validate(
+            response
+        )
+
+    state = create_test_state({"code_content": "x = 1\nprint(x)"})
+    config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
+
+    result = await triage_node(state, config)
+
+    assert result.get("guardrail_triggered") is triggered
+    assert len(result.get("findings", [])) == stored
+    assert mock_gemini.generate_structured.call_args.kwargs["schema"] is ReviewTriageStructure
+
+
+@pytest.mark.asyncio
+async def test_code_analysis_node_reviews_only_changed_hunks(db_session: AsyncSession):
+    carried = {**TRIAGE_FINDING, "line_number": 40, "observation": "Carried"}
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured.return_value = ReviewAnalysisStructure.model_validate(
+        {"findings": [TRIAGE_FINDING]}
+    )
+    review = CodeReview(id="rev-incr", lesson_id="l-1", code_content="...", language="python")
+    db_session.add(review)
+    await db_session.commit()
+
+    state = create_test_state(
+        {
+            "review_id": "rev-incr",
+            "code_content": "FULL FILE",
+            "changed_hunks": "@@ lines 1-3 @@\n+ 2 | x = 1",
+            "carried_findings": [carried],
+            "revisited_findings": [{**TRIAGE_FINDING, "observation": "Was unused"}],
+        }
+    )
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "db_session": db_session}
+    }
+
+    result = await code_analysis_node(state, config)
+
+    prompt = mock_gemini.generate_structured.call_args.kwargs["prompt"]
+    assert "+ 2 | x = 1" in prompt
+    assert "- line 2 (Style): Was unused" in prompt
+    assert "FULL FILE" not in prompt
+    assert [f["observation"] for f in result.get("findings", [])] == [
+        "Carried",
+        "Unused variable",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_code_analysis_node_skips_the_llm_without_changes(db_session: AsyncSession):
+    mock_gemini = AsyncMock()
+    db_session.add(CodeReview(id="rev-same", lesson_id="l-1", code_content="...", language="py"))
+    await db_session.commit()
+
+    state = create_test_state(
+        {"review_id": "rev-same", "changed_hunks": "", "carried_findings": [TRIAGE_FINDING]}
+    )
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "db_session": db_session}
+    }
+
+    result = await code_analysis_node(state, config)
+
+    mock_gemini.generate_structured.assert_not_called()
+    assert result.get("findings") == [TRIAGE_FINDING]
+
+
+@pytest.mark.asyncio
+async def test_code_analysis_node_maps_chunks_concurrently(db_session: AsyncSession):
+    code = "".join(f"def f{i}(x):\n    return x + {i}\n\n" for i in range(90))
+    in_flight = max_in_flight = 0
+
+    async def analyze(prompt: str, **_kwargs: Any) -> ReviewAnalysisStructure:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        first_line = int(prompt.split("Lines ", 1)[1].split("-", 1)[0])
+        findings = [
+            # File numbering, relative numbering, and a duplicate across chunks
+            {**TRIAGE_FINDING, "line_number": first_line, "observation": f"At {first_line}"},
+            {**TRIAGE_FINDING, "line_number": 2, "observation": "Second line of chunk"},
+            {**TRIAGE_FINDING, "line_number": None, "observation": "No docstrings"},
+        ]
+        return ReviewAnalysisStructure.model_validate({"findings": findings})
+
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured.side_effect = analyze
+    db_session.add(CodeReview(id="rev-chunk", lesson_id="l-1", code_content="...", language="py"))
+    await db_session.commit()
+
+    state = create_test_state({"review_id": "rev-chunk", "code_content": code})
+    config: RunnableConfig = {
+        "configurable": {
+            "gemini_service": mock_gemini,
+            "db_session": db_session,
+            "analysis_chunk_tokens": 100,
+            "analysis_concurrency": 2,
+        }
+    }
+
+    result = await code_analysis_node(state, config)
+
+    calls = mock_gemini.generate_structured.call_count
+    assert calls > 2
+    assert max_in_flight == 2
+    findings = result.get("findings", [])
+    assert len(findings) == 8
+    lines = [f["line_number"] for f in findings if f["observation"].startswith("At ")]
+    assert lines[0] == 1
+    assert all(code.split("\n")[line - 1].startswith("def f") for line in lines if line)
+    assert [f["observation"] for f in findings].count("No docstrings") == 1
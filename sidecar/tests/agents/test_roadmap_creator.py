@@ -1,11 +1,33 @@
+import asyncio
 import json
+import re
+from collections.abc import AsyncIterator
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from agents.roadmap_creator import RoadmapCreatorAgent
-from core.types import RoadmapAIError, RoadmapError, RoadmapValidationError
+from core.exceptions import StructuredOutputError
+from core.types import (
+    CodeReviewStatus,
+    LessonStatus,
+    RoadmapAIError,
+    RoadmapError,
+    RoadmapNotFoundError,
+    RoadmapStatus,
+    RoadmapValidationError,
+)
+from database.models import CodeReview, CodeReviewFinding, Lesson, Phase, Roadmap
+from schemas.domain import (
+    LessonObjectivesStructure,
+    LessonStructure,
+    PhaseLessonsStructure,
+    RoadmapOutlineStructure,
+    RoadmapStructure,
+)
 
 
 @pytest.mark.asyncio
@@ -21,10 +43,12 @@ async def test_roadmap_creator_success(db_session: AsyncSession):
             }
         ],
     }
-    mock_gemini.generate_content.return_value = json.dumps(mock_roadmap_data)
+    mock_gemini.generate_structured.return_value = RoadmapStructure.model_validate(
+        mock_roadmap_data
+    )
 
     with patch("agents.roadmap_creator.gemini_service", mock_gemini):
-        agent = RoadmapCreatorAgent()
+        agent = RoadmapCreatorAgent(phase_expansion=False)
         result = await agent.create_roadmap(
             goal="Learn Python for Data",
             background="Beginner",
@@ -34,6 +58,7 @@ async def test_roadmap_creator_success(db_session: AsyncSession):
 
         assert result.roadmap.name == "Python Mastery"
         assert result.roadmap_id is not None
+        assert mock_gemini.generate_structured.call_args.kwargs["schema"] is RoadmapStructure
 
 
 @pytest.mark.asyncio
@@ -47,34 +72,469 @@ async def test_roadmap_creator_invalid_input(db_session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_roadmap_creator_no_delimiters(db_session: AsyncSession):
+async def test_roadmap_creator_validation_error(db_session: AsyncSession):
     mock_gemini = AsyncMock()
-    mock_gemini.generate_content.return_value = "No JSON here"
+    mock_gemini.generate_structured.side_effect = StructuredOutputError(
+        "Gemini returned an invalid RoadmapStructure",
+        details={"validation_error": "phases: Field required"},
+    )
 
     with patch("agents.roadmap_creator.gemini_service", mock_gemini):
-        agent = RoadmapCreatorAgent()
-        with pytest.raises(RoadmapAIError, match="Failed to find JSON structure"):
+        agent = RoadmapCreatorAgent(phase_expansion=False)
+        with pytest.raises(RoadmapValidationError, match="phases: Field required"):
             _ = await agent.create_roadmap("Learn Python for Data", "Beginner", "Pref", db_session)
 
+    assert (await db_session.execute(select(Roadmap))).scalars().all() == []
+
+
+def stream_of(text: str, size: int = 16, fail_after: int | None = None):
+    """A `generate_content_stream` replacement yielding `text` in fixed-size chunks."""
+
+    async def generate_content_stream(*_args: Any, **_kwargs: Any) -> AsyncIterator[str]:
+        for start in range(0, len(text), size):
+            if fail_after is not None and start >= fail_after:
+                raise RuntimeError("stream dropped")
+            yield text[start : start + size]
+
+    return generate_content_stream
+
+
+STREAMED_ROADMAP = {
+    "name": "Python Mastery",
+    "description": "Desc",
+    "phases": [
+        {
+            "name": f"Phase {i}",
+            "lessons": [{"name": f"L{i}", "description": "...", "objectives": ["O1"]}],
+        }
+        for i in range(3)
+    ],
+}
+
 
 @pytest.mark.asyncio
-async def test_roadmap_creator_malformed_json(db_session: AsyncSession):
+async def test_stream_roadmap_stores_phases_as_they_arrive(db_session: AsyncSession):
     mock_gemini = AsyncMock()
-    mock_gemini.generate_content.return_value = "{ 'name': 'invalid' "  # Unclosed
+    mock_gemini.generate_content_stream = stream_of(json.dumps(STREAMED_ROADMAP))
 
+    agent = RoadmapCreatorAgent(phase_expansion=False)
+    events: list[dict[str, Any]] = []
     with patch("agents.roadmap_creator.gemini_service", mock_gemini):
-        agent = RoadmapCreatorAgent()
-        # The logic finds no delimiters if they are unbalanced or missing
-        with pytest.raises(RoadmapAIError, match="Failed to find JSON structure"):
-            _ = await agent.create_roadmap("Learn Python for Data", "Beginner", "Pref", db_session)
+        async for event in agent.stream_roadmap(
+            "Learn Python for Data", "Beginner", "Practical", db_session
+        ):
+            events.append(event)
+            if event["event"] == "phase" and events[-1]["phase"]["order_num"] == 1:
+                # The first phase is readable while the rest is still being generated
+                phases = (await db_session.execute(select(Phase))).scalars().all()
+                assert [p.name for p in phases] == ["Phase 0"]
+                roadmap = await db_session.get(Roadmap, events[-1]["roadmap_id"])
+                assert roadmap is not None
+                assert roadmap.status == RoadmapStatus.GENERATING
+
+    assert [e["event"] for e in events] == ["roadmap", "phase", "phase", "phase", "done"]
+    assert events[1]["phase"]["lessons"][0]["name"] == "L0"
+    assert events[-1] == {
+        "event": "done",
+        "roadmap_id": events[0]["roadmap_id"],
+        "phases": 3,
+        "lessons": 3,
+    }
+    roadmap = await db_session.get(Roadmap, events[0]["roadmap_id"], populate_existing=True)
+    assert roadmap is not None
+    assert roadmap.status == RoadmapStatus.ACTIVE
 
 
 @pytest.mark.asyncio
-async def test_roadmap_creator_validation_error(db_session: AsyncSession):
+async def test_stream_roadmap_discards_a_failed_roadmap(db_session: AsyncSession):
+    text = json.dumps(STREAMED_ROADMAP)
     mock_gemini = AsyncMock()
-    mock_gemini.generate_content.return_value = json.dumps({"name": "Missing Phases"})
+    mock_gemini.generate_content_stream = stream_of(text, fail_after=len(text) // 2)
 
+    agent = RoadmapCreatorAgent(phase_expansion=False)
+    events: list[dict[str, Any]] = []
     with patch("agents.roadmap_creator.gemini_service", mock_gemini):
-        agent = RoadmapCreatorAgent()
-        with pytest.raises(RoadmapValidationError):
-            _ = await agent.create_roadmap("Learn Python for Data", "Beginner", "Pref", db_session)
+        with pytest.raises(RoadmapError, match="stream dropped"):
+            async for event in agent.stream_roadmap(
+                "Learn Python for Data", "Beginner", "Practical", db_session
+            ):
+                events.append(event)
+
+    assert [e["event"] for e in events] == ["roadmap", "phase"]
+    assert (await db_session.execute(select(Roadmap))).scalars().all() == []
+    assert (await db_session.execute(select(Phase))).scalars().all() == []
+    assert (await db_session.execute(select(Lesson))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_stream_roadmap_rejects_an_incomplete_response(db_session: AsyncSession):
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_content_stream = stream_of(json.dumps(STREAMED_ROADMAP)[:-2])
+
+    agent = RoadmapCreatorAgent(phase_expansion=False)
+    with patch("agents.roadmap_creator.gemini_service", mock_gemini):
+        with pytest.raises(RoadmapAIError, match="incomplete roadmap"):
+            async for _event in agent.stream_roadmap(
+                "Learn Python for Data", "Beginner", "Practical", db_session
+            ):
+                pass
+
+    assert (await db_session.execute(select(Roadmap))).scalars().all() == []
+
+
+OUTLINE = RoadmapOutlineStructure.model_validate(
+    {
+        "name": "Python Mastery",
+        "description": "Desc",
+        "phases": [{"name": f"Phase {i}", "summary": f"Topics {i}"} for i in range(3)],
+    }
+)
+
+
+class FakeExpansion:
+    """A `generate_structured` replacement returning `OUTLINE`, then one lesson per phase.
+
+    Phase number n (from 1) takes `delays[n - 1]` seconds; `fail` names a phase whose
+    lessons come back invalid.
+    """
+
+    def __init__(self, delays: list[float], fail: int | None = None) -> None:
+        self.delays: list[float] = delays
+        self.fail: int | None = fail
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+
+    async def generate(self, prompt: str, schema: type[object], **_kwargs: Any) -> object:
+        if schema is RoadmapOutlineStructure:
+            return OUTLINE
+        match = re.search(r"Write the lessons of phase (\d+): (.+)", prompt)
+        assert match is not None
+        number = int(match.group(1))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays[number - 1])
+        finally:
+            self.in_flight -= 1
+        if number == self.fail:
+            raise StructuredOutputError(
+                "Gemini returned an invalid PhaseLessonsStructure",
+                details={"validation_error": "lessons: Field required"},
+            )
+        return PhaseLessonsStructure(
+            lessons=[LessonStructure(name=f"L{number}", description="...", objectives=["O1"])]
+        )
+
+
+@pytest.mark.asyncio
+async def test_roadmap_creator_expands_phases_concurrently(db_session: AsyncSession):
+    expansion = FakeExpansion(delays=[0.03, 0.01, 0.02])
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured = AsyncMock(side_effect=expansion.generate)
+
+    with patch("agents.roadmap_creator.gemini_service", mock_gemini):
+        agent = RoadmapCreatorAgent(phase_concurrency=2)
+        result = await agent.create_roadmap(
+            "Learn Python for Data", "Beginner", "Practical", db_session
+        )
+
+    assert expansion.max_in_flight == 2
+    assert [p.name for p in result.roadmap.phases] == ["Phase 0", "Phase 1", "Phase 2"]
+    assert [p.lessons[0].name for p in result.roadmap.phases] == ["L1", "L2", "L3"]
+    # Every phase prompt carries the whole outline
+    phase_prompt = mock_gemini.generate_structured.call_args_list[1].kwargs["prompt"]
+    assert "3. Phase 2: Topics 2" in phase_prompt
+
+    phases = (await db_session.execute(select(Phase).order_by(Phase.order_num))).scalars().all()
+    assert [(p.name, p.order_num) for p in phases] == [
+        ("Phase 0", 1),
+        ("Phase 1", 2),
+        ("Phase 2", 3),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_roadmap_creator_cancels_the_other_phases_when_one_fails(
+    db_session: AsyncSession,
+):
+    expansion = FakeExpansion(delays=[0.01, 0.5, 0.5], fail=1)
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured = AsyncMock(side_effect=expansion.generate)
+
+    with patch("agents.roadmap_creator.gemini_service", mock_gemini):
+        agent = RoadmapCreatorAgent(phase_concurrency=3)
+        with pytest.raises(RoadmapValidationError, match="phase 'Phase 0'"):
+            _ = await agent.create_roadmap(
+                "Learn Python for Data", "Beginner", "Practical", db_session
+            )
+
+    # The slower phases were cancelled rather than left running
+    assert expansion.max_in_flight == 3
+    assert expansion.in_flight == 0
+    assert (await db_session.execute(select(Roadmap))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_stream_roadmap_stores_expanded_phases_as_they_complete(
+    db_session: AsyncSession,
+):
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured = AsyncMock(
+        side_effect=FakeExpansion(delays=[0.03, 0.01, 0.02]).generate
+    )
+
+    agent = RoadmapCreatorAgent(phase_concurrency=3)
+    events: list[dict[str, Any]] = []
+    with patch("agents.roadmap_creator.gemini_service", mock_gemini):
+        async for event in agent.stream_roadmap(
+            "Learn Python for Data", "Beginner", "Practical", db_session
+        ):
+            events.append(event)
+
+    assert [e["event"] for e in events] == ["roadmap", "phase", "phase", "phase", "done"]
+    assert events[0]["name"] == "Python Mastery"
+    assert [e["phase"]["order_num"] for e in events[1:4]] == [2, 3, 1]
+    assert [e["phase"]["lessons"][0]["name"] for e in events[1:4]] == ["L2", "L3", "L1"]
+    assert events[-1]["phases"] == 3
+    roadmap = await db_session.get(Roadmap, events[0]["roadmap_id"], populate_existing=True)
+    assert roadmap is not None
+    assert roadmap.status == RoadmapStatus.ACTIVE
+
+
+@pytest.mark.asyncio
+async def test_stream_roadmap_discards_a_roadmap_whose_phase_fails(db_session: AsyncSession):
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured = AsyncMock(
+        side_effect=FakeExpansion(delays=[0.01, 0.02, 0.03], fail=2).generate
+    )
+
+    agent = RoadmapCreatorAgent()
+    events: list[dict[str, Any]] = []
+    with patch("agents.roadmap_creator.gemini_service", mock_gemini):
+        with pytest.raises(RoadmapValidationError, match="phase 'Phase 1'"):
+            async for event in agent.stream_roadmap(
+                "Learn Python for Data", "Beginner", "Practical", db_session
+            ):
+                events.append(event)
+
+    assert [e["event"] for e in events] == ["roadmap", "phase"]
+    assert (await db_session.execute(select(Roadmap))).scalars().all() == []
+    assert (await db_session.execute(select(Phase))).scalars().all() == []
+    assert (await db_session.execute(select(Lesson))).scalars().all() == []
+
+
+async def stored_roadmap(db: AsyncSession) -> Roadmap:
+    """A roadmap with two phases; lesson "Loops" is in progress and has a cached review,
+    and lesson "Sets" has a review with a finding."""
+    roadmap = Roadmap(id="r-1", name="Python Mastery", description="Desc", goal="Learn Python")
+    roadmap.phases = [
+        Phase(
+            id="p-1",
+            name="Basics",
+            order_num=1,
+            lessons=[
+                Lesson(id="l-1", name="Variables", objectives=["O1"], order_num=1),
+                Lesson(
+                    id="l-2",
+                    name="Loops",
+                    description="for and while",
+                    objectives=["O1"],
+                    order_num=2,
+                    status=LessonStatus.IN_PROGRESS,
+                    time_spent=300,
+                    metadata_json={"notes": "kept"},
+                ),
+                Lesson(id="l-3", name="Sets", objectives=["O1"], order_num=3),
+            ],
+        ),
+        Phase(
+            id="p-2",
+            name="Projects",
+            order_num=2,
+            lessons=[
+                Lesson(id="l-4", name="CLI tool", objectives=["O1"], order_num=1),
+            ],
+        ),
+    ]
+    db.add(roadmap)
+    db.add(
+        CodeReview(
+            id="cr-1",
+            lesson_id="l-2",
+            code_content="for x in y: pass",
+            language="python",
+            code_hash="h",
+            status=CodeReviewStatus.COMPLETED,
+        )
+    )
+    db.add(
+        CodeReview(
+            id="cr-3",
+            lesson_id="l-3",
+            code_content="s = set()",
+            language="python",
+            status=CodeReviewStatus.COMPLETED,
+            findings=[CodeReviewFinding(category="Style", observation="o", socratic_question="q")],
+        )
+    )
+    await db.commit()
+    return roadmap
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("phase_expansion", [False, True])
+async def test_stream_roadmap_discards_an_abandoned_roadmap(
+    db_session: AsyncSession, phase_expansion: bool
+):
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_content_stream = stream_of(json.dumps(STREAMED_ROADMAP))
+    mock_gemini.generate_structured = AsyncMock(
+        side_effect=FakeExpansion(delays=[0.01, 0.02, 0.03]).generate
+    )
+
+    agent = RoadmapCreatorAgent(phase_expansion=phase_expansion)
+    with patch("agents.roadmap_creator.gemini_service", mock_gemini):
+        events = agent.stream_roadmap("Learn Python for Data", "Beginner", "Practical", db_session)
+        async for event in events:
+            if event["event"] == "phase":
+                # The client disconnects once the first phase is stored
+                break
+        await events.aclose()
+
+    assert (await db_session.execute(select(Roadmap))).scalars().all() == []
+    assert (await db_session.execute(select(Phase))).scalars().all() == []
+    assert (await db_session.execute(select(Lesson))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_discard_unfinished_keeps_finished_roadmaps(db_session: AsyncSession):
+    finished = await stored_roadmap(db_session)
+    db_session.add(
+        Roadmap(
+            id="rm-2",
+            name="Half written",
+            goal="G",
+            status=RoadmapStatus.GENERATING,
+            phases=[
+                Phase(
+                    id="p-9",
+                    name="P",
+                    order_num=1,
+                    lessons=[Lesson(id="l-9", name="L", objectives=[], order_num=1)],
+                )
+            ],
+        )
+    )
+    await db_session.commit()
+
+    with patch("agents.roadmap_creator.lesson_context_service") as mock_contexts:
+        assert await RoadmapCreatorAgent().discard_unfinished(db_session) == 1
+
+    # Deleted lessons leave the context cache too
+    mock_contexts.invalidate.assert_called_once_with("l-9")
+
+    roadmaps = (await db_session.execute(select(Roadmap))).scalars().all()
+    assert [r.id for r in roadmaps] == [finished.id]
+    assert await db_session.get(Phase, "p-9") is None
+
+
+@pytest.mark.asyncio
+async def test_regenerate_phase_replaces_lessons_in_place(db_session: AsyncSession):
+    _ = await stored_roadmap(db_session)
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured.return_value = PhaseLessonsStructure(
+        lessons=[
+            LessonStructure(name=" loops ", description="Iteration", objectives=["Use range()"]),
+            LessonStructure(name="Variables", description="Naming values", objectives=["O1"]),
+            LessonStructure(name="Functions", description="def", objectives=["Write one"]),
+        ]
+    )
+
+    with (
+        patch("agents.roadmap_creator.gemini_service", mock_gemini),
+        patch("agents.roadmap_creator.lesson_context_service") as mock_contexts,
+        patch("agents.roadmap_creator.checkpoint_compactor") as mock_compactor,
+    ):
+        mock_compactor.delete_threads = AsyncMock(return_value=0)
+        commits = 0
+
+        def count_commit(_session: Any) -> None:
+            nonlocal commits
+            commits += 1
+
+        event.listen(db_session.sync_session, "after_commit", count_commit)
+        result = await RoadmapCreatorAgent().regenerate_phase(
+            "p-1", db_session, instructions="Add functions"
+        )
+        event.remove(db_session.sync_session, "after_commit", count_commit)
+
+    prompt = mock_gemini.generate_structured.call_args.kwargs["prompt"]
+    assert "2. Projects: CLI tool" in prompt
+    assert "INSTRUCTIONS: Add functions" in prompt
+
+    assert [lesson.name for lesson in result.lessons] == [" loops ", "Variables", "Functions"]
+    loops, variables, functions = result.lessons
+    # Matched by name: same ids and progress, new content and position
+    assert loops.id == "l-2"
+    assert (loops.status, loops.time_spent, loops.metadata_json) == (
+        "in_progress",
+        300,
+        {"notes": "kept"},
+    )
+    assert (loops.order_num, loops.objectives) == (1, ["Use range()"])
+    assert variables.id == "l-1"
+    assert functions.id not in {"l-1", "l-2", "l-3"}
+    assert functions.status == "not_started"
+
+    lessons = (await db_session.execute(select(Lesson))).scalars().all()
+    assert {lesson.id for lesson in lessons} == {"l-1", "l-2", "l-4", functions.id}
+
+    # Variables kept its name and objectives but gained a description
+    invalidated = {i for c in mock_contexts.invalidate.call_args_list for i in c.args}
+    assert invalidated == {"l-1", "l-2", "l-3", functions.id}
+    # The lessons, then every invalidated review at once
+    assert commits == 2
+    review = await db_session.get(CodeReview, "cr-1", populate_existing=True)
+    assert review is not None
+    assert review.code_hash is None
+
+    # The deleted lesson takes its reviews and chat history with it
+    reviews = (await db_session.execute(select(CodeReview.id))).scalars().all()
+    assert reviews == ["cr-1"]
+    assert (await db_session.execute(select(CodeReviewFinding))).scalars().all() == []
+    mock_compactor.delete_threads.assert_awaited_once_with(["l-3", "cr-3"])
+
+
+@pytest.mark.asyncio
+async def test_regenerate_objectives_keeps_the_lesson(db_session: AsyncSession):
+    _ = await stored_roadmap(db_session)
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured.return_value = LessonObjectivesStructure(
+        objectives=["Write a while loop", "Use break"]
+    )
+
+    with patch("agents.roadmap_creator.gemini_service", mock_gemini):
+        result = await RoadmapCreatorAgent().regenerate_objectives("l-2", db_session)
+
+    prompt = mock_gemini.generate_structured.call_args.kwargs["prompt"]
+    assert "Rewrite the objectives of the lesson: Loops" in prompt
+    assert "- Sets" in prompt
+    assert result.id == "l-2"
+    assert result.objectives == ["Write a while loop", "Use break"]
+    assert (result.status, result.time_spent) == ("in_progress", 300)
+
+    lesson = await db_session.get(Lesson, "l-2", populate_existing=True)
+    assert lesson is not None
+    assert lesson.objectives == ["Write a while loop", "Use break"]
+    review = await db_session.get(CodeReview, "cr-1", populate_existing=True)
+    assert review is not None
+    assert review.code_hash is None
+
+
+@pytest.mark.asyncio
+async def test_regenerate_unknown_phase_or_lesson(db_session: AsyncSession):
+    agent = RoadmapCreatorAgent()
+    with pytest.raises(RoadmapNotFoundError):
+        _ = await agent.regenerate_phase("missing", db_session)
+    with pytest.raises(RoadmapNotFoundError):
+        _ = await agent.regenerate_objectives("missing", db_session)
@@ -1,11 +1,17 @@
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from langchain_core.messages import AIMessage
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from agents.teacher.agent import TeacherAgent
+from schemas.domain import GuardrailStructure
+from schemas.lesson import LessonContext
 from services.lesson_service import LessonContextService
 
 
@@ -35,16 +41,107 @@ async def test_teacher_agent_chat_stream(mock_gemini_service: MagicMock, db_sess
         lesson_service=MagicMock(spec=LessonContextService),
     )
 
-    # Mock workflow.astream_events
-    async def mock_events(*_args: Any, **_kwargs: Any) -> Any:
-        yield {"event": "on_custom_event", "name": "socratic_token", "data": {"token": "Hi"}}
+    # Mock workflow.astream in custom stream mode
+    async def mock_stream(*_args: Any, **_kwargs: Any) -> Any:
+        yield {"token": "Hi"}
+        yield {"unrelated": "chunk"}
 
     mock_workflow = MagicMock()
-    mock_workflow.astream_events.side_effect = mock_events
+    mock_workflow.astream.side_effect = mock_stream
     agent._workflow = mock_workflow  # pyright: ignore[reportPrivateUsage]
 
     tokens: list[str] = []
-    async for token in agent.chat_stream(thread_id="l1", message="Hi", db=db_session):
+    async for token in agent.chat_stream(
+        thread_id="l1", message="Hi", db=db_session, system_context="You're Teacher."
+    ):
         tokens.append(token)
 
     assert tokens == ["Hi"]
+    call = mock_workflow.astream.call_args
+    assert call.kwargs["stream_mode"] == "custom"
+    # Delegation context travels in the config, so only the user's text is checkpointed
+    assert call.kwargs["config"]["configurable"]["delegation_context"] == "You're Teacher."
+    assert [m.content for m in call.args[0]["messages"]] == ["Hi"]
+
+
+@pytest.mark.asyncio
+async def test_teacher_agent_chat_stream_through_graph(db_session: AsyncSession):
+    mock_gemini = MagicMock()
+    mock_gemini.generate_structured = AsyncMock(return_value=GuardrailStructure(triggered=False))
+
+    async def mock_tokens():
+        yield "What "
+        yield "have you tried?"
+
+    mock_gemini.generate_content_stream.return_value = mock_tokens()
+    lesson_service = MagicMock(spec=LessonContextService)
+    lesson_service.get_context = AsyncMock(
+        return_value=LessonContext(lesson_id="l1", name="Loops", description="")
+    )
+
+    agent = TeacherAgent(
+        gemini_service=mock_gemini,
+        db_manager=MagicMock(),
+        lesson_service=lesson_service,
+        speculative_guardrail=False,
+    )
+    agent._workflow = agent._create_builder().compile()  # pyright: ignore[reportPrivateUsage]
+
+    tokens = [t async for t in agent.chat_stream(thread_id="l1", message="Hi", db=db_session)]
+
+    assert tokens == ["What ", "have you tried?"]
+
+
+@pytest.mark.asyncio
+async def test_teacher_agent_summarizes_history_after_the_stream(
+    db_session: AsyncSession, tmp_path: Path
+):
+    release = asyncio.Event()
+
+    async def summarize(**_kwargs: Any) -> str:
+        _ = await release.wait()
+        return "Knows range()."
+
+    def reply(**_kwargs: Any) -> AsyncIterator[str]:
+        async def tokens():
+            yield "What " + "x" * 200
+
+        return tokens()
+
+    mock_gemini = MagicMock()
+    mock_gemini.generate_structured = AsyncMock(return_value=GuardrailStructure(triggered=False))
+    mock_gemini.generate_content = AsyncMock(side_effect=summarize)
+    mock_gemini.generate_content_stream.side_effect = reply
+    lesson_service = MagicMock(spec=LessonContextService)
+    lesson_service.get_context = AsyncMock(
+        return_value=LessonContext(lesson_id="l1", name="Loops", description="")
+    )
+
+    agent = TeacherAgent(
+        gemini_service=mock_gemini,
+        db_manager=MagicMock(),
+        lesson_service=lesson_service,
+        speculative_guardrail=False,
+        history_token_budget=100,
+    )
+
+    async def turn() -> list[str]:
+        return [t async for t in agent.chat_stream(thread_id="l1", message="Hi", db=db_session)]
+
+    async with AsyncSqliteSaver.from_conn_string(str(tmp_path / "checkpoints.db")) as saver:
+        agent._checkpointer = saver  # pyright: ignore[reportPrivateUsage]
+        agent._workflow = agent._create_builder().compile(checkpointer=saver)  # pyright: ignore[reportPrivateUsage]
+
+        # Streams end while the summary of the overflowing turns is still pending
+        async with asyncio.timeout(1):
+            _ = await turn()
+            _ = await turn()
+        assert mock_gemini.generate_content_stream.call_count == 2
+
+        release.set()
+        _ = await turn()
+
+    # The next turn waited for the fold and answered with the summary
+    prompt = mock_gemini.generate_content_stream.call_args.kwargs["prompt"]
+    assert "CONVERSATION SUMMARY:\nKnows range()." in prompt
+    await agent.close()
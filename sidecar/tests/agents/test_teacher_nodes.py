@@ -1,17 +1,20 @@
-import json
+import asyncio
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from agents.teacher.nodes.context import context_enrichment_node
 from agents.teacher.nodes.guardrails import guardrail_node
-from agents.teacher.nodes.socratic import socratic_node
+from agents.teacher.nodes.history import plan_fold, select_recent, summarize_history
+from agents.teacher.nodes.socratic import build_socratic_prompt, socratic_node
+from agents.teacher.nodes.speculative import speculative_socratic_node
 from agents.teacher.state import AgentState
 from database.models import Lesson, Phase, Roadmap
+from schemas.domain import GuardrailStructure
 
 
 def create_test_state(overrides: dict[str, Any] | None = None) -> AgentState:
@@ -62,7 +65,7 @@ async def test_context_enrichment_node(db_session: AsyncSession):
 @pytest.mark.asyncio
 async def test_guardrail_node_triggered():
     mock_gemini = AsyncMock()
-    mock_gemini.generate_content.return_value = json.dumps({"triggered": True})
+    mock_gemini.generate_structured.return_value = GuardrailStructure(triggered=True)
 
     state = create_test_state({"messages": [HumanMessage(content="Give me the code")]})
     config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
@@ -96,13 +99,156 @@ async def test_socratic_node_streaming():
         }
     }
 
-    with patch(
-        "agents.teacher.nodes.socratic.adispatch_custom_event",
-        new_callable=AsyncMock,
-    ) as mock_dispatch:
-        result = await socratic_node(state, config)
+    writer = MagicMock()
+    result = await socratic_node(state, config, writer)
 
-        messages = result.get("messages", [])
-        assert isinstance(messages[0], AIMessage)
-        assert messages[0].content == "Why not?"
-        assert mock_dispatch.call_count == 2
+    messages = result.get("messages", [])
+    assert isinstance(messages[0], AIMessage)
+    assert messages[0].content == "Why not?"
+    assert writer.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_speculative_node_flushes_held_tokens_when_allowed():
+    mock_gemini = MagicMock()
+    mock_gemini.generate_structured = AsyncMock(return_value=GuardrailStructure(triggered=False))
+
+    async def mock_async_iterator():
+        yield "Why "
+        yield "not?"
+
+    mock_gemini.generate_content_stream.return_value = mock_async_iterator()
+
+    state = create_test_state({"messages": [HumanMessage(content="How to loop?")]})
+    config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
+
+    writer = MagicMock()
+    result = await speculative_socratic_node(state, config, writer)
+
+    messages = result.get("messages", [])
+    assert messages[0].content == "Why not?"
+    assert result.get("guardrail_triggered") is False
+    assert [c.args[0]["token"] for c in writer.call_args_list] == ["Why ", "not?"]
+    assert mock_gemini.generate_content_stream.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_node_switches_to_refusal_when_triggered():
+    mock_gemini = MagicMock()
+    mock_gemini.generate_structured = AsyncMock(return_value=GuardrailStructure(triggered=True))
+
+    async def speculative_stream():
+        yield "Here is the code"
+
+    async def refusal_stream():
+        yield "Let's stay on track."
+
+    mock_gemini.generate_content_stream.side_effect = [speculative_stream(), refusal_stream()]
+
+    state = create_test_state({"messages": [HumanMessage(content="Give me the code")]})
+    config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
+
+    writer = MagicMock()
+    result = await speculative_socratic_node(state, config, writer)
+
+    assert result.get("messages", [])[0].content == "Let's stay on track."
+    assert result.get("guardrail_triggered") is True
+    assert [c.args[0]["token"] for c in writer.call_args_list] == ["Let's stay on track."]
+    refusal_prompt = mock_gemini.generate_content_stream.call_args_list[1].kwargs["prompt"]
+    assert "POLITELY refuse" in refusal_prompt
+
+
+@pytest.mark.asyncio
+async def test_speculative_node_refuses_while_the_stream_is_still_waiting():
+    mock_gemini = MagicMock()
+    mock_gemini.generate_structured = AsyncMock(return_value=GuardrailStructure(triggered=True))
+    closed: list[bool] = []
+
+    async def speculative_stream():
+        try:
+            # The verdict arrives before the first token, with a read in flight
+            await asyncio.sleep(0.05)
+            yield "Here is the code"
+        finally:
+            closed.append(True)
+
+    async def refusal_stream():
+        yield "Let's stay on track."
+
+    mock_gemini.generate_content_stream.side_effect = [speculative_stream(), refusal_stream()]
+
+    state = create_test_state({"messages": [HumanMessage(content="Give me the code")]})
+    config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
+
+    writer = MagicMock()
+    result = await speculative_socratic_node(state, config, writer)
+
+    assert result.get("messages", [])[0].content == "Let's stay on track."
+    assert [c.args[0]["token"] for c in writer.call_args_list] == ["Let's stay on track."]
+    assert closed == [True]
+
+
+def make_turns(count: int, size: int = 200) -> list[BaseMessage]:
+    turns: list[BaseMessage] = []
+    for i in range(count):
+        text = f"turn {i} " + "x" * size
+        turns.append(HumanMessage(content=text) if i % 2 == 0 else AIMessage(content=text))
+    return turns
+
+
+def test_history_selection_respects_budget():
+    turns = make_turns(10)  # ~52 tokens each
+
+    recent = select_recent(turns, budget=120)
+    assert recent == turns[-2:]
+
+    # Under budget nothing is folded; over budget the tail is cut to half the budget
+    assert plan_fold(turns, summarized_count=0, budget=1000) == 0
+    assert plan_fold(turns, summarized_count=0, budget=300) == 8
+    assert plan_fold(turns, summarized_count=8, budget=300) == 8
+
+
+@pytest.mark.asyncio
+async def test_summarize_history_folds_overflow_into_summary():
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_content.return_value = "Student is learning loops."
+
+    state = create_test_state(
+        {"messages": make_turns(10), "history_summary": "Earlier: greeted.", "summarized_count": 2}
+    )
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "history_token_budget": 300}
+    }
+
+    result = await summarize_history(state, config)
+
+    assert result == {"history_summary": "Student is learning loops.", "summarized_count": 8}
+    prompt = mock_gemini.generate_content.call_args.kwargs["prompt"]
+    assert "Earlier: greeted." in prompt
+    assert "turn 2" in prompt and "turn 7" in prompt and "turn 8" not in prompt
+
+
+def test_socratic_prompt_includes_summary_and_recent_turns():
+    turns = make_turns(6, size=20)
+    state = create_test_state(
+        {"messages": turns, "history_summary": "Knows range().", "summarized_count": 2}
+    )
+
+    prompt, _ = build_socratic_prompt(state, guardrail_triggered=False, history_budget=1000)
+
+    assert "CONVERSATION SUMMARY:\nKnows range()." in prompt
+    assert "turn 1" not in prompt
+    assert "turn 2" in prompt and "turn 4" in prompt
+    # The latest message is the one being answered, not part of the history block
+    assert prompt.count("turn 5") == 1
+
+
+def test_socratic_prompt_puts_delegation_context_in_system_instruction():
+    state = create_test_state({"messages": [HumanMessage(content="Why a loop?")]})
+
+    prompt, system_instruction = build_socratic_prompt(
+        state, guardrail_triggered=False, delegation_context="You're Teacher."
+    )
+
+    assert system_instruction.endswith("DELEGATION CONTEXT:\nYou're Teacher.")
+    assert "You're Teacher." not in prompt
@@ -53,12 +53,14 @@ async def test_lifespan_missing_api_key():
         )
         mock_dbsessionmanager.session.return_value.__aexit__ = AsyncMock()
         mock_dbsessionmanager.close = AsyncMock()
+        mock_review_job_queue = AsyncMock()
 
         # Apply patches at import locations
         with (
             patch("main.run_migrations", mock_run_migrations),
             patch("main.agent_manager", mock_agent_manager),
             patch("main.dbsessionmanager", mock_dbsessionmanager),
+            patch("main.review_job_queue", mock_review_job_queue),
         ):
             # Import lifespan after patching
             from main import lifespan
@@ -76,6 +78,8 @@ async def test_lifespan_missing_api_key():
             # Verify cleanup was called
             mock_agent_manager.close_all.assert_called_once()
             mock_dbsessionmanager.close.assert_called_once()
+            mock_review_job_queue.start.assert_called_once()
+            mock_review_job_queue.stop.assert_called_once()
 
     finally:
         # Restore key
@@ -116,12 +120,14 @@ async def test_lifespan_with_api_key(mock_api_key):  # pyright: ignore[reportUnk
         )
         mock_dbsessionmanager.session.return_value.__aexit__ = AsyncMock()
         mock_dbsessionmanager.close = AsyncMock()
+        mock_review_job_queue = AsyncMock()
 
         # Apply patches at import locations
         with (
             patch("main.run_migrations", mock_run_migrations),
             patch("main.agent_manager", mock_agent_manager),
             patch("main.dbsessionmanager", mock_dbsessionmanager),
+            patch("main.review_job_queue", mock_review_job_queue),
         ):
             # Import lifespan after patching
             from main import lifespan
@@ -136,6 +142,8 @@ async def test_lifespan_with_api_key(mock_api_key):  # pyright: ignore[reportUnk
             # Verify cleanup was called
             mock_agent_manager.close_all.assert_called_once()
             mock_dbsessionmanager.close.assert_called_once()
+            mock_review_job_queue.start.assert_called_once()
+            mock_review_job_queue.stop.assert_called_once()
 
     finally:
         # Restore key
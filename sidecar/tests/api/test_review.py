@@ -1,14 +1,21 @@
-from collections.abc import AsyncIterator
-from typing import Any
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Any, cast
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from agents.code_reviewer.agent import CodeReviewerAgent
-from database.models import CodeReview
+from agents.code_reviewer.state import CodeReviewerFinding, ReviewOutcome
+from core.types import CodeReviewStatus, ReviewJobStatus
+from database.models import CodeReview, CodeReviewFinding
+from schemas.lesson import LessonContext
+from services.review_jobs import ReviewJobQueue
+from services.review_service import BatchItem, ReviewService
 
 
 @pytest.mark.asyncio
@@ -38,3 +45,241 @@ async def test_submit_review_api(client: AsyncClient, db_session: AsyncSession):
         review = res.scalar_one()
         assert review.language == "python"
         assert review.code_content == "def f(): pass"
+
+
+@pytest.mark.asyncio
+async def test_resubmitted_code_replays_the_cached_review(
+    client: AsyncClient, db_session: AsyncSession
+):
+    async def mock_review_stream(review_id: str, db: AsyncSession, **_kwargs: Any):
+        review = await db.get(CodeReview, review_id)
+        assert review is not None
+        review.feedback = "Why a loop?"
+        review.status = CodeReviewStatus.COMPLETED
+        db.add(
+            CodeReviewFinding(
+                review_id=review_id, category="Style", observation="o", socratic_question="q"
+            )
+        )
+        await db.commit()
+        yield "Why a loop?"
+
+    with patch("agents.manager.agent_manager.get_agent") as mock_get_agent:
+        mock_agent = AsyncMock(spec=CodeReviewerAgent)
+        mock_agent.prompt_fingerprint = "fp"
+        mock_agent.review.side_effect = mock_review_stream
+        mock_get_agent.return_value = mock_agent
+
+        submissions = ["x = 1\nprint(x)\n", "x = 1  # one\nprint(x)   \n"]
+        responses = [
+            await client.post(
+                "/api/review/submit",
+                json={"lesson_id": "l-1", "code": code, "language": "python"},
+            )
+            for code in submissions
+        ]
+
+    assert [r.headers["X-Review-Cache"] for r in responses] == ["miss", "hit"]
+    assert [r.text for r in responses] == ["data: Why a loop?\n\n"] * 2
+    mock_agent.review.assert_called_once()
+
+    res = await db_session.execute(select(CodeReview).order_by(CodeReview.created_at))
+    reviews = res.scalars().all()
+    assert [r.code_content for r in reviews] == submissions
+    replay = await db_session.execute(
+        select(CodeReviewFinding).where(CodeReviewFinding.review_id == reviews[1].id)
+    )
+    assert len(replay.scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_revised_code_is_reviewed_incrementally(client: AsyncClient):
+    async def mock_review_stream(review_id: str, db: AsyncSession, **_kwargs: Any):
+        review = await db.get(CodeReview, review_id)
+        assert review is not None
+        review.feedback = "Feedback"
+        review.status = CodeReviewStatus.COMPLETED
+        db.add(
+            CodeReviewFinding(
+                review_id=review_id,
+                line_number=30,
+                category="Style",
+                observation="o",
+                socratic_question="q",
+            )
+        )
+        await db.commit()
+        yield "Feedback"
+
+    original = "".join(f"x{i} = {i}\n" for i in range(40))
+    revised = original.replace("x3 = 3", "x3 = 3.0")
+    with patch("agents.manager.agent_manager.get_agent") as mock_get_agent:
+        mock_agent = AsyncMock(spec=CodeReviewerAgent)
+        mock_agent.prompt_fingerprint = "fp"
+        mock_agent.review.side_effect = mock_review_stream
+        mock_get_agent.return_value = mock_agent
+
+        for code in (original, revised, "print('unrelated')\n"):
+            response = await client.post(
+                "/api/review/submit",
+                json={"lesson_id": "l-1", "code": code, "language": "python"},
+            )
+            assert response.headers["X-Review-Cache"] == "miss"
+
+    first, second, third = (c.kwargs["baseline"] for c in mock_agent.review.call_args_list)
+    assert first is None
+    assert "+  4 | x3 = 3.0" in second.hunks
+    assert [f["line_number"] for f in second.carried_findings] == [30]
+    # Mostly different code gets a full review
+    assert third is None
+
+
+@pytest.mark.asyncio
+async def test_batch_review_runs_distinct_submissions_concurrently(
+    client: AsyncClient, db_session: AsyncSession
+):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def mock_review_detached(
+        _review_id: str,
+        lesson: LessonContext,
+        code: str,
+        _language: str,
+        on_token: Callable[[str], None] | None = None,
+    ) -> ReviewOutcome:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if "boom" in code:
+            raise RuntimeError("model unavailable")
+        assert on_token is not None
+        on_token(f"Review of {lesson.name}")
+        finding = CodeReviewerFinding(
+            line_number=1, category="Style", observation="o", socratic_question="q"
+        )
+        return ReviewOutcome(f"Review of {lesson.name}", [finding], True)
+
+    with patch("agents.manager.agent_manager.get_agent") as mock_get_agent:
+        mock_agent = AsyncMock(spec=CodeReviewerAgent)
+        mock_agent.prompt_fingerprint = "fp"
+        mock_agent.review_detached.side_effect = mock_review_detached
+        mock_agent.lesson_service = AsyncMock()
+        mock_agent.lesson_service.get_context.return_value = LessonContext(
+            lesson_id="l-1", name="Loops", description=""
+        )
+        mock_get_agent.return_value = mock_agent
+
+        codes = ["x = 1\n", "x = 1  # same\n", "y = 2\n", "z = 3\n", "boom = 4\n"]
+        response = await client.post(
+            "/api/review/batch",
+            json={
+                "items": [{"lesson_id": "l-1", "code": c, "language": "python"} for c in codes],
+                "concurrency": 2,
+            },
+        )
+
+    assert response.status_code == 200
+    events = [
+        cast(dict[str, Any], json.loads(line[6:]))
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    completed = {e["index"]: e for e in events if e["event"] == "completed"}
+    assert sorted(completed) == [0, 1, 2, 3]
+    assert completed[1]["feedback"] == "Review of Loops"
+    assert [e["index"] for e in events if e["event"] == "failed"] == [4]
+    assert events[-1] == {"event": "done", "completed": 4, "failed": 1, "cached": 0}
+
+    # The duplicate shares one review; at most two ran at once
+    assert mock_agent.review_detached.call_count == 4
+    assert max_in_flight == 2
+    mock_agent.lesson_service.get_context.assert_called_once()
+
+    reviews = (await db_session.execute(select(CodeReview))).scalars().all()
+    statuses = sorted(r.status for r in reviews)
+    assert statuses == [CodeReviewStatus.COMPLETED] * 4 + [CodeReviewStatus.FAILED]
+    findings = (await db_session.execute(select(CodeReviewFinding))).scalars().all()
+    assert len(findings) == 4
+
+
+@pytest.mark.asyncio
+async def test_batch_review_fails_unfinished_reviews_on_disconnect(db_session: AsyncSession):
+    async def mock_review_detached(
+        _review_id: str, _lesson: LessonContext, code: str, _language: str, **_kwargs: Any
+    ) -> ReviewOutcome:
+        if "slow" in code:
+            await asyncio.sleep(10)
+        return ReviewOutcome("Why a loop?", [], True)
+
+    with patch("agents.manager.agent_manager.get_agent") as mock_get_agent:
+        mock_agent = AsyncMock(spec=CodeReviewerAgent)
+        mock_agent.prompt_fingerprint = "fp"
+        mock_agent.review_detached.side_effect = mock_review_detached
+        mock_agent.lesson_service = AsyncMock()
+        mock_agent.lesson_service.get_context.return_value = LessonContext(
+            lesson_id="l-1", name="Loops", description=""
+        )
+        mock_get_agent.return_value = mock_agent
+
+        items = [BatchItem("l-1", code, "python") for code in ("x = 1\n", "slow = 2\n")]
+        events = ReviewService(cache_enabled=False).submit_batch(items, db_session)
+        async for event in events:
+            if event["event"] == "completed":
+                break
+        # The client goes away while the slow review is still running
+        await events.aclose()
+
+    reviews = (await db_session.execute(select(CodeReview))).scalars().all()
+    statuses = {r.code_content: r.status for r in reviews}
+    assert statuses == {
+        "x = 1\n": CodeReviewStatus.COMPLETED,
+        "slow = 2\n": CodeReviewStatus.FAILED,
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_review_rejects_an_empty_batch(client: AsyncClient):
+    response = await client.post("/api/review/batch", json={"items": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_submit_runs_as_a_resumable_job(client: AsyncClient, test_engine: AsyncEngine):
+    async def mock_review_stream(review_id: str, db: AsyncSession, **_kwargs: Any):
+        review = await db.get(CodeReview, review_id)
+        assert review is not None
+        review.feedback = "Feedback"
+        review.status = CodeReviewStatus.COMPLETED
+        await db.commit()
+        yield "Feedback"
+
+    factory = async_sessionmaker(bind=test_engine, expire_on_commit=False, autoflush=False)
+    queue = ReviewJobQueue(session_factory=factory)
+    with (
+        patch("agents.manager.agent_manager.get_agent") as mock_get_agent,
+        patch("routers.review.review_job_queue", queue),
+    ):
+        mock_agent = AsyncMock(spec=CodeReviewerAgent)
+        mock_agent.review.side_effect = mock_review_stream
+        mock_get_agent.return_value = mock_agent
+        await queue.start()
+        try:
+            payload = {"lesson_id": "l-1", "code": "def f(): pass", "language": "python"}
+            response = await client.post("/api/review/submit", json=payload)
+            job_id = response.headers["X-Review-Job"]
+
+            # Re-attaching to the finished job replays its feedback
+            reattached = await client.get(f"/api/review/jobs/{job_id}/stream")
+            status = await client.get(f"/api/review/jobs/{job_id}")
+            missing = await client.get("/api/review/jobs/missing")
+        finally:
+            await queue.stop()
+
+    assert response.text == "data: Feedback\n\n"
+    assert reattached.text == "data: Feedback\n\n"
+    assert status.json()["status"] == ReviewJobStatus.COMPLETED
+    assert status.json()["attempts"] == 1
+    assert missing.status_code == 404
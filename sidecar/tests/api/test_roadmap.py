@@ -1,9 +1,15 @@
+import json
+from collections.abc import AsyncIterator
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from schemas.domain import RoadmapCreateResult, RoadmapStructure
+from core.types import RoadmapAIError, RoadmapStatus
+from database.models import Roadmap
+from schemas.domain import LessonRead, RoadmapCreateResult, RoadmapStructure
 
 
 @pytest.mark.asyncio
@@ -31,8 +37,75 @@ async def test_create_roadmap_api(client: AsyncClient):
         assert data["message"] == "Roadmap created successfully"
 
 
+@pytest.mark.asyncio
+async def test_list_roadmaps_skips_generating_ones(client: AsyncClient, db_session: AsyncSession):
+    db_session.add_all(
+        [
+            Roadmap(id="r-1", name="Done", goal="G"),
+            Roadmap(id="r-2", name="Half written", goal="G", status=RoadmapStatus.GENERATING),
+        ]
+    )
+    await db_session.commit()
+
+    response = await client.get("/api/roadmap/list")
+
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()["roadmaps"]] == ["r-1"]
+
+
 @pytest.mark.asyncio
 async def test_get_roadmap_not_found(client: AsyncClient):
     response = await client.get("/api/roadmap/non-existent")
     assert response.status_code == 404
     assert response.json()["detail"] == "Roadmap not found"
+
+
+@pytest.mark.asyncio
+async def test_stream_roadmap_api(client: AsyncClient):
+    async def mock_stream(**_kwargs: Any) -> AsyncIterator[dict[str, object]]:
+        yield {"event": "roadmap", "roadmap_id": "r-1", "name": "Test", "description": "..."}
+        raise RoadmapAIError("AI returned an incomplete roadmap")
+
+    with patch("agents.roadmap_creator.roadmap_creator.stream_roadmap", side_effect=mock_stream):
+        payload = {
+            "goal": "Learn Python Testing in 2026",
+            "background": "Beginner",
+            "preferences": "Hands-on",
+        }
+        response = await client.post("/api/roadmap/create/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")
+    ]
+    assert events == [
+        {"event": "roadmap", "roadmap_id": "r-1", "name": "Test", "description": "..."},
+        {"event": "error", "error": "AI returned an incomplete roadmap"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_regenerate_objectives_api(client: AsyncClient):
+    lesson = LessonRead(
+        id="l-1", phase_id="p-1", name="Loops", order_num=1, objectives=["Use range()"]
+    )
+    with patch(
+        "agents.roadmap_creator.roadmap_creator.regenerate_objectives", new_callable=AsyncMock
+    ) as mock_regenerate:
+        mock_regenerate.return_value = lesson
+        response = await client.post(
+            "/api/roadmap/lesson/l-1/objectives/regenerate",
+            json={"instructions": "Shorter"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["objectives"] == ["Use range()"]
+    assert mock_regenerate.call_args.kwargs["instructions"] == "Shorter"
+
+
+@pytest.mark.asyncio
+async def test_regenerate_phase_not_found(client: AsyncClient):
+    response = await client.post("/api/roadmap/phase/non-existent/regenerate")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Phase not found"
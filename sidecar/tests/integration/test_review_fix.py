@@ -1,4 +1,3 @@
-import json
 from typing import Any, cast
 from unittest.mock import AsyncMock, patch
 
@@ -12,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from agents.code_reviewer.nodes.guardrails import guardrail_node
 from agents.code_reviewer.state import CodeReviewerState
 from database.models import CodeReview, Lesson, Phase, Roadmap
+from schemas.domain import GuardrailStructure
 
 
 @pytest.mark.asyncio
@@ -64,7 +64,7 @@ async def test_chat_creates_review_record(client: AsyncClient, db_session: Async
 async def test_guardrail_checks_code_content():
     """Verify guardrail checks the actual code content, not just the message."""
     mock_gemini = AsyncMock()
-    mock_gemini.generate_content.return_value = json.dumps({"triggered": False})
+    mock_gemini.generate_structured.return_value = GuardrailStructure(triggered=False)
 
     # Setup state with malicious code but innocent message
     state = cast(
@@ -87,7 +87,7 @@ async def test_guardrail_checks_code_content():
     _ = await guardrail_node(state, config)
 
     # Check what was passed to the LLM
-    call_args = mock_gemini.generate_content.call_args
+    call_args = mock_gemini.generate_structured.call_args
     prompt_sent = call_args.kwargs.get("prompt", "")
 
     # This assertion will FAIL if we only check messages[-1].content
@@ -0,0 +1,132 @@
+import sqlite3
+import time
+from operator import add
+from pathlib import Path
+from typing import Annotated, TypedDict
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import END, StateGraph
+
+from services.checkpoint_maintenance import (
+    CheckpointCompactor,
+    checkpoint_created_at,
+    compact_checkpoint_db,
+    delete_checkpoint_threads,
+)
+
+
+class CounterState(TypedDict):
+    steps: Annotated[list[int], add]
+
+
+def step(state: CounterState) -> CounterState:
+    return {"steps": [len(state["steps"])]}
+
+
+async def populate(db_path: Path, threads: dict[str, int]) -> None:
+    """Run a one-node graph `turns` times per thread so checkpoints accumulate."""
+    builder = StateGraph(CounterState)
+    _ = builder.add_node("step", step)
+    _ = builder.set_entry_point("step")
+    _ = builder.add_edge("step", END)
+
+    async with AsyncSqliteSaver.from_conn_string(str(db_path)) as saver:
+        graph = builder.compile(checkpointer=saver)
+        for thread_id, turns in threads.items():
+            for _ in range(turns):
+                _ = await graph.ainvoke(
+                    {"steps": [0]}, config={"configurable": {"thread_id": thread_id}}
+                )
+
+
+def count(db_path: Path, table: str, thread_id: str | None = None) -> int:
+    with sqlite3.connect(db_path) as conn:
+        if thread_id is None:
+            row = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+        else:
+            row = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+    return int(row[0])
+
+
+@pytest.mark.asyncio
+async def test_delete_checkpoint_threads(tmp_path: Path):
+    db_path = tmp_path / "checkpoints.db"
+    await populate(db_path, {"a": 3, "b": 2, "c": 1})
+
+    expected = count(db_path, "checkpoints", "a") + count(db_path, "checkpoints", "c")
+    kept = count(db_path, "checkpoints", "b")
+
+    assert delete_checkpoint_threads(db_path, ["a", "c", "missing"]) == expected
+    assert count(db_path, "checkpoints") == kept
+    assert count(db_path, "writes", "a") == 0
+    assert delete_checkpoint_threads(tmp_path / "absent.db", ["b"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_compaction_keeps_latest_checkpoints_per_thread(tmp_path: Path):
+    db_path = tmp_path / "checkpoints.db"
+    await populate(db_path, {"a": 10, "b": 2})
+
+    report = compact_checkpoint_db(db_path, keep_latest=3, retention_days=0)
+
+    assert report.error is None
+    assert count(db_path, "checkpoints", "a") == 3
+    assert count(db_path, "checkpoints", "b") == 3
+    assert report.checkpoints_deleted > 0
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+@pytest.mark.asyncio
+async def test_compaction_preserves_latest_state(tmp_path: Path):
+    db_path = tmp_path / "checkpoints.db"
+    await populate(db_path, {"a": 4})
+    _ = compact_checkpoint_db(db_path, keep_latest=1, retention_days=0)
+
+    async with AsyncSqliteSaver.from_conn_string(str(db_path)) as saver:
+        checkpoint = await saver.aget_tuple({"configurable": {"thread_id": "a"}})
+
+    assert checkpoint is not None
+    assert len(checkpoint.checkpoint["channel_values"]["steps"]) == 8
+
+
+@pytest.mark.asyncio
+async def test_compaction_expires_idle_threads(tmp_path: Path):
+    db_path = tmp_path / "checkpoints.db"
+    await populate(db_path, {"a": 2, "b": 1})
+
+    with sqlite3.connect(db_path) as conn:
+        checkpoint_id = conn.execute("SELECT MAX(checkpoint_id) FROM checkpoints").fetchone()[0]
+    created_at = checkpoint_created_at(checkpoint_id)
+    assert created_at is not None and abs(created_at - time.time()) < 60
+
+    # Pretend 40 days have passed
+    with patch("services.checkpoint_maintenance.time.time", return_value=time.time() + 40 * 86400):
+        report = compact_checkpoint_db(db_path, keep_latest=0, retention_days=30)
+
+    assert report.threads_expired == 2
+    assert count(db_path, "checkpoints") == 0
+    assert count(db_path, "writes") == 0
+
+
+@pytest.mark.asyncio
+async def test_compact_endpoint_reports_reclaimed_bytes(client: AsyncClient, tmp_path: Path):
+    db_path = tmp_path / "checkpoints.db"
+    await populate(db_path, {"a": 30})
+    compactor = CheckpointCompactor(
+        [db_path, tmp_path / "missing.db"], keep_latest=5, retention_days=0
+    )
+
+    with patch("routers.maintenance.checkpoint_compactor", compactor):
+        response = await client.post("/api/maintenance/checkpoints/compact?keep_latest=1")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["databases"][0]["checkpoints_deleted"] > 0
+    assert data["reclaimed_bytes"] == data["databases"][0]["reclaimed_bytes"]
+    assert compactor.total_reclaimed_bytes == data["reclaimed_bytes"]
@@ -0,0 +1,55 @@
+import pytest
+
+from agents.code_reviewer.chunking import CodeChunk, chunk_code
+
+FUNCTIONS = "import os\n\n" + "".join(
+    f"@decorate\ndef f{i}(x):\n    return x + {i}\n\n" for i in range(60)
+)
+
+
+def assert_covers(chunks: list[CodeChunk], code: str) -> None:
+    assert "\n".join(c.text for c in chunks) == code
+    assert chunks[0].start_line == 1
+    for before, after in zip(chunks, chunks[1:]):
+        assert before.end_line + 1 == after.start_line
+
+
+@pytest.mark.parametrize("language", ["python", "javascript"])
+def test_chunks_cover_the_file_within_budget(language: str):
+    chunks = chunk_code(FUNCTIONS, language, token_budget=100)
+
+    assert_covers(chunks, FUNCTIONS)
+    assert len(chunks) > 1
+    assert all(len(c.text) // 4 <= 100 for c in chunks)
+
+
+def test_python_chunks_start_at_definitions():
+    chunks = chunk_code(FUNCTIONS, "python", token_budget=100)
+
+    # Each later chunk starts at a decorator, never inside a function
+    assert all(c.text.startswith("@decorate\ndef f") for c in chunks[1:])
+
+
+def test_oversized_class_is_split_between_methods():
+    code = "class Big:\n" + "".join(
+        f"    def m{i}(self):\n        return {i}\n" for i in range(100)
+    )
+
+    chunks = chunk_code(code, "python", token_budget=100)
+
+    assert_covers(chunks, code)
+    assert all(c.text.startswith("    def m") for c in chunks[1:])
+
+
+def test_small_or_unparseable_code_is_one_chunk():
+    assert chunk_code("x = 1\n", "python", token_budget=100) == [
+        CodeChunk(start_line=1, end_line=2, text="x = 1\n")
+    ]
+    broken = "def f(:\n" + "x = 1\n" * 200
+    assert_covers(chunk_code(broken, "python", token_budget=100), broken)
+
+
+def test_numbered_uses_file_line_numbers():
+    chunk = CodeChunk(start_line=9, end_line=10, text="a = 1\nb = 2")
+
+    assert chunk.numbered() == " 9 | a = 1\n10 | b = 2"
@@ -5,7 +5,12 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.testclient import TestClient
 
 # Import the actual exceptions and handlers
-from core.exceptions import BaseAppException, ExternalAPIError, QuotaExceededError
+from core.exceptions import (
+    BaseAppException,
+    ExternalAPIError,
+    QuotaExceededError,
+    ServiceUnavailableError,
+)
 from main import (
     app_exception_handler,
     generic_exception_handler,
@@ -34,6 +39,10 @@ def create_test_app():
     def _quota_exceeded_error():  # pyright: ignore [reportUnusedFunction]
         raise QuotaExceededError("Quota exceeded")
 
+    @app.get("/service_unavailable_error")
+    def _service_unavailable_error():
+        raise ServiceUnavailableError("Circuit open")
+
     return app
 
 
@@ -77,3 +86,16 @@ def test_quota_exceeded_error_structure():
 
     assert data["code"] == "QUOTA_EXCEEDED"
     assert data["message"] == "Quota exceeded"
+
+
+def test_service_unavailable_error_structure():
+    app = create_test_app()
+    client = TestClient(app)
+
+    response = client.get("/service_unavailable_error")
+
+    assert response.status_code == 503
+    data = response.json()
+
+    assert data["code"] == "SERVICE_UNAVAILABLE"
+    assert data["message"] == "Circuit open"
@@ -2,7 +2,10 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from core.exceptions import StructuredOutputError
+from schemas.domain import GuardrailStructure
 from services.gemini_service import GeminiService
+from services.response_cache import MemoryCacheTier, ResponseCache
 
 
 @pytest.mark.asyncio
@@ -77,3 +80,53 @@ async def test_generate_content_error():
 
         with pytest.raises(ExternalAPIError, match="unexpected error occurred"):
             _ = await service.generate_content("Hello")
+
+
+def _mock_client_returning(*texts: str) -> MagicMock:
+    client = MagicMock()
+    responses: list[MagicMock] = []
+    for text in texts:
+        response = MagicMock()
+        response.text = text
+        responses.append(response)
+    client.aio.models.generate_content = AsyncMock(side_effect=responses)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_generate_structured_regenerates_invalid_output():
+    cache = ResponseCache(memory=MemoryCacheTier(10, 60))
+    service = GeminiService(cache=cache, structured_retries=1)
+    client = _mock_client_returning('{"verdict": "maybe"}', '{"triggered": true}')
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+
+    first = await service.generate_structured("hi", GuardrailStructure)
+    second = await service.generate_structured("hi", GuardrailStructure)
+
+    assert first == second == GuardrailStructure(triggered=True)
+    config = client.aio.models.generate_content.call_args.kwargs["config"]
+    assert config.response_schema is GuardrailStructure
+    assert config.response_mime_type == "application/json"
+    # Only the valid response was cached, and it served the second call
+    assert client.aio.models.generate_content.call_count == 2
+    assert cache.stats.stores == 1
+    assert service.structured_stats.as_dict() == {
+        "requests": 2,
+        "parse_failures": 1,
+        "retries": 1,
+        "exhausted": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_generate_structured_gives_up_after_retries():
+    service = GeminiService(structured_retries=1)
+    client = _mock_client_returning("not json", '{"triggered": "sometimes"}')
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+
+    with pytest.raises(StructuredOutputError, match="invalid GuardrailStructure"):
+        _ = await service.generate_structured("hi", GuardrailStructure, use_cache=False)
+
+    assert client.aio.models.generate_content.call_count == 2
+    assert service.structured_stats.parse_failures == 2
+    assert service.structured_stats.exhausted == 1
@@ -0,0 +1,93 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+from agents.guardrail_classifier import (
+    DEFAULT_MODEL_PATH,
+    GuardrailClassifier,
+    GuardrailModel,
+    GuardrailVerdict,
+    load_guardrail_classifier,
+)
+from agents.teacher.nodes.guardrails import guardrail_node
+from schemas.domain import GuardrailStructure
+
+
+def make_classifier(threshold: float = 0.9) -> GuardrailClassifier:
+    model: GuardrailModel = {
+        "version": 1,
+        "allow_patterns": [r"^(hi|thanks)[\s!.]*$"],
+        "block_patterns": [r"\bjust give me the code\b"],
+        "bias": 0.0,
+        "weights": {"answer": 4.0, "hint": -4.0, "maybe": 1.0},
+    }
+    return GuardrailClassifier(model, threshold=threshold)
+
+
+def test_patterns_decide_obvious_cases():
+    classifier = make_classifier()
+
+    assert classifier.classify("Thanks!").verdict == GuardrailVerdict.ALLOW
+    assert classifier.classify("ok, just give me the code").verdict == GuardrailVerdict.BLOCK
+    assert classifier.stats.pattern_decisions == 2
+
+
+def test_model_escalates_below_threshold():
+    classifier = make_classifier(threshold=0.9)
+
+    assert classifier.classify("a hint please").verdict == GuardrailVerdict.ALLOW
+    assert classifier.classify("maybe").verdict == GuardrailVerdict.ESCALATE
+    assert classifier.classify("the answer", use_model=False).verdict == GuardrailVerdict.ESCALATE
+    # The model never blocks: a confident bypass score goes to the LLM guardrail
+    assert classifier.classify("the answer").verdict == GuardrailVerdict.ESCALATE
+
+    stats = classifier.stats.as_dict()
+    assert stats["escalated"] == 3
+    assert stats["escalation_rate"] == 0.75
+
+
+def test_shipped_model_loads_and_handles_small_talk():
+    classifier = load_guardrail_classifier(DEFAULT_MODEL_PATH)
+
+    assert classifier is not None
+    assert classifier.classify("hi").verdict == GuardrailVerdict.ALLOW
+    assert classifier.classify("just give me the code").verdict == GuardrailVerdict.BLOCK
+    # Ordinary questions the model scores high are left to the LLM guardrail
+    for question in (
+        "what is the answer to question 2 in the quiz?",
+        "show me the code for a for loop",
+    ):
+        assert classifier.classify(question).verdict == GuardrailVerdict.ESCALATE
+
+
+@pytest.mark.asyncio
+async def test_teacher_guardrail_skips_llm_for_local_decisions(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("agents.guardrail_classifier.guardrail_classifier", make_classifier())
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured.return_value = GuardrailStructure(triggered=True)
+    config: RunnableConfig = {"configurable": {"gemini_service": mock_gemini}}
+
+    result = await guardrail_node({"messages": [HumanMessage(content="thanks")]}, config)  # pyright: ignore[reportArgumentType]
+    assert result.get("guardrail_triggered") is False
+    mock_gemini.generate_structured.assert_not_called()
+
+    result = await guardrail_node({"messages": [HumanMessage(content="maybe")]}, config)  # pyright: ignore[reportArgumentType]
+    assert result.get("guardrail_triggered") is True
+    mock_gemini.generate_structured.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_teacher_guardrail_can_turn_the_classifier_off(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("agents.guardrail_classifier.guardrail_classifier", make_classifier())
+    mock_gemini = AsyncMock()
+    mock_gemini.generate_structured.return_value = GuardrailStructure(triggered=False)
+    config: RunnableConfig = {
+        "configurable": {"gemini_service": mock_gemini, "guardrail_classifier": False}
+    }
+
+    # Small talk the classifier would allow still goes to the LLM
+    result = await guardrail_node({"messages": [HumanMessage(content="thanks")]}, config)  # pyright: ignore[reportArgumentType]
+    assert result.get("guardrail_triggered") is False
+    mock_gemini.generate_structured.assert_awaited_once()
@@ -0,0 +1,62 @@
+from agents.code_reviewer.incremental import diff_code, findings_summary
+from agents.code_reviewer.state import CodeReviewerFinding
+
+OLD = "\n".join(f"line{i}" for i in range(1, 21))
+
+
+def finding(line: int | None, observation: str = "o") -> CodeReviewerFinding:
+    return CodeReviewerFinding(
+        line_number=line, category="Style", observation=observation, socratic_question="q"
+    )
+
+
+def test_findings_on_unchanged_lines_are_remapped():
+    new = OLD.replace("line2\n", "").replace("line10", "changed10")
+    old_findings = [finding(1), finding(5), finding(10), finding(20), finding(None)]
+
+    diff = diff_code(OLD, new, old_findings)
+
+    assert [f["line_number"] for f in diff.carried_findings] == [1, 4, 19, None]
+    assert [f["line_number"] for f in diff.revisited_findings] == [10]
+    assert diff.changed_lines == 2
+    assert diff.total_lines == 20
+
+
+def test_hunks_show_changes_with_new_line_numbers():
+    new = OLD.replace("line5", "line5\ninserted").replace("line15\n", "")
+
+    hunks = diff_code(OLD, new, [], context=1).hunks
+
+    assert hunks.splitlines() == [
+        "@@ lines 5-7 @@",
+        "   5 | line5",
+        "+  6 | inserted",
+        "   7 | line6",
+        "@@ lines 15-16 @@",
+        "  15 | line14",
+        "-    | (1 line(s) removed)",
+        "  16 | line16",
+    ]
+
+
+def test_hunks_scale_with_the_change():
+    old = "\n".join(f"x{i} = {i}" for i in range(2000))
+    new = old.replace("x1000 = 1000", "x1000 = -1")
+
+    diff = diff_code(old, new, [])
+
+    assert diff.changed_ratio == 1 / 2000
+    assert len(diff.hunks.splitlines()) == 6
+
+
+def test_unchanged_code_has_no_hunks():
+    diff = diff_code(OLD, OLD + "\n", [finding(3)])
+
+    assert diff.hunks == ""
+    assert diff.carried_findings == [finding(3)]
+
+
+def test_findings_summary():
+    assert findings_summary([finding(3, "Unused"), finding(None, "No tests")]) == (
+        "- line 3 (Style): Unused\n- line - (Style): No tests"
+    )
@@ -17,12 +17,14 @@ class MockAgent(BaseAgent):
         pass
 
     @override
-    async def chat(self, thread_id: str, message: str, db: AsyncSession) -> str:
+    async def chat(
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
+    ) -> str:
         return ""
 
     @override
     async def chat_stream(
-        self, thread_id: str, message: str, db: AsyncSession
+        self, thread_id: str, message: str, db: AsyncSession, system_context: str | None = None
     ) -> AsyncIterator[str]:
         yield ""
 
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from core.json_stream import JSONStreamParser
+
+PHASES = [{"name": f"P{i}", "lessons": [{"objectives": ["a", "b]}"]}]} for i in range(3)]
+DOCUMENT = {
+    "name": 'Say "hi" \\ ok',
+    "count": -1.5e3,
+    "ok": True,
+    "missing": None,
+    "phases": PHASES,
+}
+
+
+def feed_in_chunks(text: str, size: int) -> tuple[JSONStreamParser, list[tuple[object, ...]]]:
+    parser = JSONStreamParser()
+    completed: list[tuple[object, ...]] = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start : start + size]))
+    return parser, completed
+
+
+@pytest.mark.parametrize("size", [1, 3, 64, 10_000])
+def test_reports_values_whatever_the_chunking(size: int):
+    text = "```json\n" + json.dumps(DOCUMENT, indent=2) + "\n```"
+    parser, completed = feed_in_chunks(text, size)
+
+    assert parser.done
+    assert completed == [
+        (("name",), DOCUMENT["name"]),
+        (("count",), -1500.0),
+        (("ok",), True),
+        (("missing",), None),
+        *((("phases", i), phase) for i, phase in enumerate(PHASES)),
+    ]
+
+
+def test_reports_each_item_as_soon_as_it_closes():
+    parser = JSONStreamParser()
+    assert parser.feed('{"name": "R", "phases": [{"name": "P0"}, {"na') == [
+        (("name",), "R"),
+        (("phases", 0), {"name": "P0"}),
+    ]
+    assert parser.feed('me": "P1"}') == [(("phases", 1), {"name": "P1"})]
+    assert not parser.done
+    assert parser.feed("]}") == []
+    assert parser.done
+
+
+def test_invalid_values_raise():
+    parser = JSONStreamParser()
+    with pytest.raises(json.JSONDecodeError):
+        _ = parser.feed('{"phases": [{"name": nope}]}')
@@ -96,3 +96,55 @@ async def test_get_context_db_error():
     # Act & Assert
     with pytest.raises(LessonError):
         _ = await service.get_context("some-id", mock_db)
+
+
+@pytest.mark.asyncio
+async def test_get_context_serves_repeat_lookups_from_cache():
+    mock_db = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = Lesson(id="l1", name="Cached")
+    mock_db.execute.return_value = mock_result
+
+    service = LessonContextService(max_entries=2)
+
+    first = await service.get_context("l1", mock_db)
+    second = await service.get_context("l1", mock_db)
+
+    assert first is second
+    assert mock_db.execute.call_count == 1
+    assert service.stats.as_dict()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_reload():
+    mock_db = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.side_effect = [
+        Lesson(id="l1", name="Old"),
+        Lesson(id="l1", name="New"),
+    ]
+    mock_db.execute.return_value = mock_result
+
+    service = LessonContextService(max_entries=2)
+    _ = await service.get_context("l1", mock_db)
+    service.invalidate("l1")
+
+    context = await service.get_context("l1", mock_db)
+    assert context.name == "New"
+    assert service.stats.invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded():
+    mock_db = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.side_effect = lambda: Lesson(id="x", name="L")
+    mock_db.execute.return_value = mock_result
+
+    service = LessonContextService(max_entries=2)
+    for lesson_id in ("a", "b", "c"):
+        _ = await service.get_context(lesson_id, mock_db)
+
+    assert service.size == 2
+    _ = await service.get_context("a", mock_db)
+    assert mock_db.execute.call_count == 4
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from services.gemini_service import GeminiService
+from services.rate_limiter import RateLimitScheduler, RequestPriority, TokenBucket
+
+
+def test_token_bucket_delay():
+    bucket = TokenBucket(capacity=10, refill_per_second=5)
+    assert bucket.delay_for(10) == 0
+    bucket.consume(10)
+    assert bucket.delay_for(5) == pytest.approx(1.0, abs=0.05)
+    # Requests larger than the bucket only wait for a full bucket
+    assert bucket.delay_for(100) == pytest.approx(2.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_admits_immediately_with_capacity():
+    scheduler = RateLimitScheduler(requests_per_minute=60, tokens_per_minute=0)
+    await scheduler.acquire(RequestPriority.BACKGROUND)
+
+    stats = scheduler.stats[RequestPriority.BACKGROUND]
+    assert stats.dispatched == 1
+    assert stats.queue_depth == 0
+    assert scheduler.token_bucket is None
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_waiters_by_priority():
+    # 100 requests/second refill keeps the test fast
+    scheduler = RateLimitScheduler(requests_per_minute=6000, tokens_per_minute=0)
+    assert scheduler.request_bucket is not None
+    scheduler.request_bucket.level = 0
+
+    order: list[RequestPriority] = []
+
+    async def request(priority: RequestPriority) -> None:
+        await scheduler.acquire(priority)
+        order.append(priority)
+
+    tasks: list[asyncio.Task[None]] = []
+    for priority in (
+        RequestPriority.BACKGROUND,
+        RequestPriority.GUARDRAIL,
+        RequestPriority.INTERACTIVE,
+    ):
+        tasks.append(asyncio.create_task(request(priority)))
+        await asyncio.sleep(0)
+
+    assert scheduler.metrics()["queue_depth"] == 3
+    _ = await asyncio.gather(*tasks)
+
+    assert order == [
+        RequestPriority.INTERACTIVE,
+        RequestPriority.GUARDRAIL,
+        RequestPriority.BACKGROUND,
+    ]
+    assert scheduler.stats[RequestPriority.BACKGROUND].max_wait_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancelled_waiter_is_removed():
+    scheduler = RateLimitScheduler(requests_per_minute=60, tokens_per_minute=0)
+    assert scheduler.request_bucket is not None
+    scheduler.request_bucket.level = 0
+
+    task = asyncio.create_task(scheduler.acquire(RequestPriority.INTERACTIVE))
+    await asyncio.sleep(0)
+    _ = task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert scheduler.metrics()["queue_depth"] == 0
+    assert scheduler.stats[RequestPriority.INTERACTIVE].queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_generate_content_goes_through_scheduler():
+    scheduler = MagicMock(spec=RateLimitScheduler)
+    scheduler.acquire = AsyncMock()
+    service = GeminiService(scheduler=scheduler)
+
+    response = MagicMock()
+    response.text = "ok"
+    response.usage_metadata.total_token_count = 42
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=response)
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+
+    _ = await service.generate_content("hello", priority=RequestPriority.GUARDRAIL)
+
+    priority, estimated = scheduler.acquire.call_args.args
+    assert priority == RequestPriority.GUARDRAIL
+    scheduler.record_usage.assert_called_once_with(estimated, 42)
@@ -0,0 +1,203 @@
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from google.genai import errors
+
+from core.exceptions import ExternalAPIError, QuotaExceededError, ServiceUnavailableError
+from services.gemini_service import GeminiService
+from services.resilience import CircuitBreaker, CircuitState, RetryPolicy, retry_after_seconds
+
+
+def server_error() -> errors.ServerError:
+    return errors.ServerError(503, {"error": {"message": "unavailable", "status": "UNAVAILABLE"}})
+
+
+def quota_error(retry_delay: str) -> errors.ClientError:
+    return errors.ClientError(
+        429,
+        {
+            "error": {
+                "message": "quota",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [
+                    {
+                        "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                        "retryDelay": retry_delay,
+                    }
+                ],
+            }
+        },
+    )
+
+
+def make_service(**kwargs: object) -> tuple[GeminiService, MagicMock]:
+    service = GeminiService(**kwargs)  # pyright: ignore[reportArgumentType]
+    client = MagicMock()
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+    return service, client
+
+
+def text_response(text: str) -> MagicMock:
+    response = MagicMock()
+    response.text = text
+    return response
+
+
+def test_retry_after_from_retry_info():
+    assert retry_after_seconds(quota_error("7s")) == 7.0
+    assert retry_after_seconds(server_error()) is None
+
+
+def test_retry_after_from_header():
+    response = MagicMock()
+    response.headers = {"retry-after": "3"}
+    error = errors.ServerError(503, {}, response)
+    assert retry_after_seconds(error) == 3.0
+
+
+@pytest.mark.asyncio
+async def test_generate_content_retries_transient_errors():
+    service, client = make_service(retry_policy=RetryPolicy(max_retries=2, base_delay=0))
+    client.aio.models.generate_content = AsyncMock(
+        side_effect=[server_error(), text_response("recovered")]
+    )
+
+    assert await service.generate_content("hi") == "recovered"
+    assert client.aio.models.generate_content.call_count == 2
+    assert service.resilience_stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_content_honors_retry_after():
+    service, client = make_service(retry_policy=RetryPolicy(max_retries=1, base_delay=0))
+    client.aio.models.generate_content = AsyncMock(
+        side_effect=[quota_error("2s"), text_response("ok")]
+    )
+
+    with patch("services.gemini_service.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        assert await service.generate_content("hi") == "ok"
+    mock_sleep.assert_awaited_once_with(2.0)
+
+
+@pytest.mark.asyncio
+async def test_generate_content_gives_up_after_max_retries():
+    service, client = make_service(retry_policy=RetryPolicy(max_retries=1, base_delay=0))
+    client.aio.models.generate_content = AsyncMock(side_effect=quota_error("0s"))
+
+    with pytest.raises(QuotaExceededError):
+        _ = await service.generate_content("hi")
+    assert client.aio.models.generate_content.call_count == 2
+    assert service.resilience_stats.exhausted == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    service, client = make_service(retry_policy=RetryPolicy(max_retries=3, base_delay=0))
+    client.aio.models.generate_content = AsyncMock(
+        side_effect=errors.ClientError(400, {"error": {"message": "bad request"}})
+    )
+
+    with pytest.raises(ExternalAPIError, match="bad request"):
+        _ = await service.generate_content("hi")
+    assert client.aio.models.generate_content.call_count == 1
+
+
+def stream_of(*items: str | Exception) -> AsyncIterator[MagicMock]:
+    async def iterator() -> AsyncIterator[MagicMock]:
+        for item in items:
+            if isinstance(item, Exception):
+                raise item
+            chunk = MagicMock()
+            chunk.text = item
+            yield chunk
+
+    return iterator()
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_token():
+    service, client = make_service(retry_policy=RetryPolicy(max_retries=1, base_delay=0))
+    client.aio.models.generate_content_stream = AsyncMock(
+        side_effect=[stream_of(server_error()), stream_of("a", "b")]
+    )
+
+    chunks = [chunk async for chunk in service.generate_content_stream("hi")]
+    assert chunks == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_stream_does_not_retry_after_first_token():
+    service, client = make_service(retry_policy=RetryPolicy(max_retries=3, base_delay=0))
+    client.aio.models.generate_content_stream = AsyncMock(
+        side_effect=[stream_of("a", server_error()), stream_of("a", "b")]
+    )
+
+    chunks: list[str] = []
+    with pytest.raises(ExternalAPIError):
+        async for chunk in service.generate_content_stream("hi"):
+            chunks.append(chunk)
+    assert chunks == ["a"]
+    assert client.aio.models.generate_content_stream.call_count == 1
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    with pytest.raises(ServiceUnavailableError):
+        breaker.before_call()
+
+    # Once the reset timeout passes, a single probe is let through
+    breaker.reset_timeout = 0
+    breaker.before_call()
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_circuit_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    service, client = make_service(circuit_breaker=breaker)
+    client.aio.models.generate_content = AsyncMock(side_effect=server_error())
+
+    with pytest.raises(ExternalAPIError):
+        _ = await service.generate_content("hi")
+    with pytest.raises(ServiceUnavailableError):
+        _ = await service.generate_content("hi")
+
+    assert client.aio.models.generate_content.call_count == 1
+    assert service.resilience_stats.short_circuited == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_api_key_does_not_open_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    service = GeminiService(circuit_breaker=breaker)
+    service._client = None  # pyright: ignore[reportPrivateUsage]
+
+    with patch("services.gemini_service.settings.GEMINI_API_KEY", ""):
+        for _ in range(3):
+            with pytest.raises(ExternalAPIError):
+                _ = await service.generate_content("hi", use_cache=False)
+    assert breaker.state == CircuitState.CLOSED
+
+    # Once a key is configured, calls go through straight away
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=text_response("ok"))
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+    assert await service.generate_content("hi", use_cache=False) == "ok"
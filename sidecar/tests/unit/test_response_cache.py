@@ -0,0 +1,146 @@
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from schemas.domain import ReviewTriageStructure
+from services.gemini_service import GeminiService
+from services.response_cache import MemoryCacheTier, ResponseCache, SqliteCacheTier
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_lru_eviction():
+    tier = MemoryCacheTier(max_entries=2, ttl_seconds=60)
+    await tier.set("a", "1")
+    await tier.set("b", "2")
+    # Touch "a" so "b" becomes least recently used
+    assert await tier.get("a") == "1"
+    await tier.set("c", "3")
+
+    assert await tier.get("b") is None
+    assert await tier.get("a") == "1"
+    assert await tier.get("c") == "3"
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_ttl_expiry():
+    tier = MemoryCacheTier(max_entries=10, ttl_seconds=5)
+    with patch("services.response_cache.time.monotonic", return_value=100.0):
+        await tier.set("a", "1")
+    with patch("services.response_cache.time.monotonic", return_value=106.0):
+        assert await tier.get("a") is None
+    assert len(tier) == 0
+
+
+@pytest.mark.asyncio
+async def test_persistent_tier_survives_new_instance(tmp_path: Path):
+    db_path = tmp_path / "cache.db"
+    first = ResponseCache(
+        memory=MemoryCacheTier(10, 60),
+        persistent=SqliteCacheTier(db_path, max_entries=10, ttl_seconds=60),
+    )
+    await first.set("key", "value")
+
+    second = ResponseCache(
+        memory=MemoryCacheTier(10, 60),
+        persistent=SqliteCacheTier(db_path, max_entries=10, ttl_seconds=60),
+    )
+    assert await second.get("key") == "value"
+    assert second.stats.persistent_hits == 1
+    # Promoted to memory on the first read
+    assert await second.get("key") == "value"
+    assert second.stats.memory_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_promoted_entry_keeps_the_persistent_expiry(tmp_path: Path):
+    db_path = tmp_path / "cache.db"
+    with patch("services.response_cache.time.time", return_value=1000.0):
+        await SqliteCacheTier(db_path, max_entries=10, ttl_seconds=60).set("key", "value")
+
+    cache = ResponseCache(
+        memory=MemoryCacheTier(10, 60),
+        persistent=SqliteCacheTier(db_path, max_entries=10, ttl_seconds=60),
+    )
+    # Read 50s into the row's 60s lifetime, so the promoted copy has 10s left
+    with (
+        patch("services.response_cache.time.time", return_value=1050.0),
+        patch("services.response_cache.time.monotonic", return_value=100.0),
+    ):
+        assert await cache.get("key") == "value"
+    with patch("services.response_cache.time.monotonic", return_value=109.0):
+        assert await cache.memory.get("key") == "value"
+    with patch("services.response_cache.time.monotonic", return_value=111.0):
+        assert await cache.memory.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_persistent_tier_size_limit(tmp_path: Path):
+    tier = SqliteCacheTier(tmp_path / "cache.db", max_entries=2, ttl_seconds=60)
+    with patch("services.response_cache.time.time", side_effect=[1.0, 1.0, 2.0, 2.0, 3.0, 3.0]):
+        await tier.set("a", "1")
+        await tier.set("b", "2")
+        await tier.set("c", "3")
+
+    with patch("services.response_cache.time.time", return_value=3.0):
+        assert await tier.get("a") is None
+        assert await tier.get("c") == "3"
+
+
+def _mock_client_returning(text: str) -> MagicMock:
+    client = MagicMock()
+    response = MagicMock()
+    response.text = text
+    client.aio.models.generate_content = AsyncMock(return_value=response)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_generate_content_served_from_cache():
+    cache = ResponseCache(memory=MemoryCacheTier(10, 60))
+    service = GeminiService(cache=cache)
+    client = _mock_client_returning('{"triggered": false}')
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+
+    first = await service.generate_content("hi", system_instruction="sys")
+    second = await service.generate_content("hi", system_instruction="sys")
+
+    assert first == second == '{"triggered": false}'
+    client.aio.models.generate_content.assert_called_once()
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_content_cache_opt_out():
+    cache = ResponseCache(memory=MemoryCacheTier(10, 60))
+    service = GeminiService(cache=cache)
+    client = _mock_client_returning("fresh")
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+
+    _ = await service.generate_content("hi", search=True)
+    _ = await service.generate_content("hi", search=True)
+    _ = await service.generate_content("hi", use_cache=False)
+    _ = await service.generate_content("hi", use_cache=False)
+
+    assert client.aio.models.generate_content.call_count == 4
+    assert cache.stats.hits == 0
+    assert cache.stats.stores == 0
+
+
+@pytest.mark.asyncio
+async def test_response_schema_is_sent_and_keys_the_cache():
+    cache = ResponseCache(memory=MemoryCacheTier(10, 60))
+    service = GeminiService(cache=cache)
+    client = _mock_client_returning('{"triggered": false, "findings": []}')
+    service._client = client  # pyright: ignore[reportPrivateUsage]
+
+    _ = await service.generate_content("code", response_mime_type="application/json")
+    _ = await service.generate_content(
+        "code", response_mime_type="application/json", response_schema=ReviewTriageStructure
+    )
+
+    # The schema-constrained call must not be served the unconstrained answer
+    assert client.aio.models.generate_content.call_count == 2
+    config = client.aio.models.generate_content.call_args.kwargs["config"]
+    assert config.response_schema is ReviewTriageStructure
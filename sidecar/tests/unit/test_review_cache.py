@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.types import CodeReviewStatus
+from database.models import CodeReview, CodeReviewFinding
+from services.review_cache import code_hash, find_cached_review, invalidate_review_cache
+
+CODE = "def add(a, b):\n    return a + b\n"
+
+
+@pytest.mark.parametrize(
+    "variant",
+    [
+        "def add(a, b):   \n    return a+b  # sum\n\n",
+        "def add(a, b):\r\n    return (a + b)\r\n",
+        "def add(a, b):  # adds\n    return a + b",
+    ],
+)
+def test_cosmetic_python_edits_share_a_hash(variant: str):
+    assert code_hash(variant, "python") == code_hash(CODE, "python")
+
+
+@pytest.mark.parametrize(
+    "variant",
+    [
+        "def add(a, b):\n    return a - b\n",
+        # Same AST, but the finding line numbers would shift
+        "# Adds two numbers\ndef add(a, b):\n    return a + b\n",
+    ],
+)
+def test_meaningful_python_edits_change_the_hash(variant: str):
+    assert code_hash(variant, "python") != code_hash(CODE, "python")
+
+
+def test_text_normalization_strips_comment_lines_per_language():
+    js = "function f() {\n  // todo\n  return 1;\n}\n"
+    assert code_hash("function f() {  \n  // done\n  return 1;\n}", "JavaScript") == code_hash(
+        js, "javascript"
+    )
+    assert code_hash("// a\nint x;", "c") == code_hash("// b\nint x;", "c")
+    # "#" is not a comment in C
+    assert code_hash("#include <a.h>\nint x;", "c") != code_hash("#include <b.h>\nint x;", "c")
+    # Unparseable Python falls back to text normalization
+    assert code_hash("def f(:  \n# x", "python") == code_hash("def f(:\n# y", "python")
+
+
+async def add_review(
+    db: AsyncSession, review_id: str, age_minutes: float = 0, **overrides: object
+) -> CodeReview:
+    fields: dict[str, object] = {
+        "lesson_id": "l-1",
+        "code_content": CODE,
+        "language": "python",
+        "feedback": "Looks good",
+        "status": CodeReviewStatus.COMPLETED,
+        "code_hash": "h",
+        "prompt_fingerprint": "fp",
+        "created_at": datetime.now(timezone.utc) - timedelta(minutes=age_minutes),
+    }
+    fields.update(overrides)
+    review = CodeReview(id=review_id, **fields)
+    review.findings.append(
+        CodeReviewFinding(line_number=1, category="Style", observation="o", socratic_question="q")
+    )
+    db.add(review)
+    await db.commit()
+    return review
+
+
+@pytest.mark.asyncio
+async def test_find_cached_review_matches_key_fingerprint_and_ttl(db_session: AsyncSession):
+    _ = await add_review(db_session, "old", age_minutes=120)
+    _ = await add_review(db_session, "new", age_minutes=5)
+    _ = await add_review(db_session, "pending", status=CodeReviewStatus.PENDING)
+
+    async def find(fingerprint: str = "fp", ttl: float = 3600, **key: str) -> str | None:
+        params = {"lesson_id": "l-1", "language": "python", "code_hash": "h", **key}
+        review = await find_cached_review(
+            db_session, prompt_fingerprint=fingerprint, ttl_seconds=ttl, **params
+        )
+        return review.id if review else None
+
+    assert await find() == "new"
+    assert await find(ttl=60) is None
+    assert await find(fingerprint="changed") is None
+    assert await find(lesson_id="l-2") is None
+    assert await find(language="javascript") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_review_cache(db_session: AsyncSession):
+    _ = await add_review(db_session, "a")
+    _ = await add_review(db_session, "b", lesson_id="l-2")
+
+    assert await invalidate_review_cache(db_session, ["l-1"]) == 1
+    assert await find_cached_review(db_session, "l-1", "python", "h", "fp", 3600) is None
+    assert await find_cached_review(db_session, "l-2", "python", "h", "fp", 3600) is not None
+
+    assert await invalidate_review_cache(db_session, []) == 0
+    assert await invalidate_review_cache(db_session) == 1
@@ -0,0 +1,153 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from agents.code_reviewer.agent import CodeReviewerAgent
+from core.exceptions import ReviewJobNotFoundError
+from core.types import CodeReviewStatus, ReviewJobStatus
+from database.models import CodeReview, ReviewJob
+from services.review_jobs import ReviewJobQueue
+
+
+def make_queue(test_engine: AsyncEngine, **kwargs: Any) -> ReviewJobQueue:
+    factory = async_sessionmaker(bind=test_engine, expire_on_commit=False, autoflush=False)
+    return ReviewJobQueue(session_factory=factory, **kwargs)
+
+
+def make_agent(release: asyncio.Event | None = None, fail: bool = False) -> AsyncMock:
+    """Reviewer that stores its feedback like the real one, optionally pausing mid-stream."""
+
+    async def review(review_id: str, db: AsyncSession, **_kwargs: Any) -> AsyncIterator[str]:
+        yield "Why "
+        if release is not None:
+            _ = await release.wait()
+        if fail:
+            raise RuntimeError("model unavailable")
+        review = await db.get(CodeReview, review_id)
+        assert review is not None
+        review.feedback = "Why a loop?"
+        review.status = CodeReviewStatus.COMPLETED
+        await db.commit()
+        yield "a loop?"
+
+    agent = AsyncMock(spec=CodeReviewerAgent)
+    agent.review.side_effect = review
+    return agent
+
+
+async def wait_for_status(
+    queue: ReviewJobQueue, job_id: str, db: AsyncSession, status: ReviewJobStatus
+) -> ReviewJob:
+    for _ in range(200):
+        job = await queue.get(job_id, db)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"Job {job_id} never reached {status}")
+
+
+@pytest.mark.asyncio
+async def test_job_completes_without_a_subscriber(
+    test_engine: AsyncEngine, db_session: AsyncSession
+):
+    queue = make_queue(test_engine)
+    release = asyncio.Event()
+    with patch("agents.manager.agent_manager.get_agent", return_value=make_agent(release)):
+        await queue.start()
+        try:
+            job = await queue.submit("l-1", "x = 1", "python", db_session)
+
+            # A subscriber that attaches mid-run first receives the tokens it missed
+            await asyncio.sleep(0.01)
+            tokens = queue.subscribe(job.id, db_session)
+            assert await anext(tokens) == "Why "
+            release.set()
+            assert [t async for t in tokens] == ["a loop?"]
+
+            job = await wait_for_status(queue, job.id, db_session, ReviewJobStatus.COMPLETED)
+        finally:
+            await queue.stop()
+
+    assert job.attempts == 1
+    assert job.review.status == CodeReviewStatus.COMPLETED
+    # Once finished, the job replays its stored feedback
+    assert [t async for t in queue.subscribe(job.id, db_session)] == ["Why a loop?"]
+    assert queue.stats.completed == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_job_fails_its_review(test_engine: AsyncEngine, db_session: AsyncSession):
+    queue = make_queue(test_engine)
+    with patch("agents.manager.agent_manager.get_agent", return_value=make_agent(fail=True)):
+        await queue.start()
+        try:
+            job = await queue.submit("l-1", "x = 1", "python", db_session)
+            tokens = [t async for t in queue.subscribe(job.id, db_session)]
+            job = await wait_for_status(queue, job.id, db_session, ReviewJobStatus.FAILED)
+        finally:
+            await queue.stop()
+
+    assert tokens == ["Why ", "[ERROR] model unavailable"]
+    assert job.error == "model unavailable"
+    assert job.review.status == CodeReviewStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_start_recovers_interrupted_jobs(test_engine: AsyncEngine, db_session: AsyncSession):
+    def interrupted(review_id: str, attempts: int, review_status: CodeReviewStatus) -> ReviewJob:
+        review = CodeReview(
+            id=review_id,
+            lesson_id="l-1",
+            code_content=f"{review_id} = 1",
+            language="python",
+            status=review_status,
+            feedback="Stored" if review_status == CodeReviewStatus.COMPLETED else None,
+        )
+        return ReviewJob(
+            id=f"job-{review_id}", review=review, status=ReviewJobStatus.RUNNING, attempts=attempts
+        )
+
+    db_session.add_all(
+        [
+            interrupted("retried", 1, CodeReviewStatus.PENDING),
+            interrupted("exhausted", 2, CodeReviewStatus.PENDING),
+            interrupted("stored", 1, CodeReviewStatus.COMPLETED),
+        ]
+    )
+    await db_session.commit()
+
+    queue = make_queue(test_engine, max_attempts=2)
+    agent = make_agent()
+    with patch("agents.manager.agent_manager.get_agent", return_value=agent):
+        await queue.start()
+        try:
+            retried = await wait_for_status(
+                queue, "job-retried", db_session, ReviewJobStatus.COMPLETED
+            )
+            stored = await wait_for_status(
+                queue, "job-stored", db_session, ReviewJobStatus.COMPLETED
+            )
+        finally:
+            await queue.stop()
+    exhausted = await queue.get("job-exhausted", db_session)
+
+    assert retried.attempts == 2
+    assert retried.review.feedback == "Why a loop?"
+    assert exhausted.status == ReviewJobStatus.FAILED
+    assert exhausted.review.status == CodeReviewStatus.FAILED
+    # The stored review is not paid for again
+    assert stored.attempts == 1
+    assert stored.review.feedback == "Stored"
+    assert agent.review.call_count == 1
+    assert queue.stats.resumed == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_is_not_found(test_engine: AsyncEngine, db_session: AsyncSession):
+    queue = make_queue(test_engine)
+    with pytest.raises(ReviewJobNotFoundError):
+        _ = await queue.get("missing", db_session)
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import selectinload
+
+from core.types import LessonStatus, RoadmapStatus
+from database.models import Phase, Roadmap
+from schemas.domain import RoadmapStructure
+from services.roadmap_writer import insert_phases, insert_roadmap
+
+STRUCTURE = RoadmapStructure.model_validate(
+    {
+        "name": "Python",
+        "description": "Desc",
+        "phases": [
+            {
+                "name": f"Phase {p}",
+                "lessons": [
+                    {"name": f"L{p}.{n}", "description": "...", "objectives": [f"O{n}"]}
+                    for n in range(3)
+                ],
+            }
+            for p in range(2)
+        ],
+    }
+)
+
+
+@pytest.mark.asyncio
+async def test_insert_roadmap_writes_the_tree_in_three_statements(
+    db_session: AsyncSession, test_engine: AsyncEngine
+):
+    statements: list[str] = []
+
+    def record(_conn: object, _cursor: object, statement: str, *_args: object) -> None:
+        statements.append(statement.split()[0].upper())
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        roadmap_id, rows = await insert_roadmap(db_session, STRUCTURE, goal="Learn Python")
+        await db_session.commit()
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+    assert statements == ["INSERT", "INSERT", "INSERT"]
+    assert len(rows.lesson_ids) == 6
+
+    roadmap = (
+        await db_session.execute(
+            select(Roadmap)
+            .options(selectinload(Roadmap.phases).selectinload(Phase.lessons))
+            .where(Roadmap.id == roadmap_id)
+        )
+    ).scalar_one()
+    assert roadmap.status == RoadmapStatus.ACTIVE
+    assert roadmap.created_at is not None
+    phases = sorted(roadmap.phases, key=lambda p: p.order_num)
+    assert [p.name for p in phases] == ["Phase 0", "Phase 1"]
+    lessons = sorted(phases[1].lessons, key=lambda lesson: lesson.order_num)
+    assert [lesson.name for lesson in lessons] == ["L1.0", "L1.1", "L1.2"]
+    assert lessons[2].objectives == ["O2"]
+    assert lessons[0].status == LessonStatus.NOT_STARTED
+    assert lessons[0].metadata_json == {}
+
+
+@pytest.mark.asyncio
+async def test_insert_phases_continues_the_numbering(db_session: AsyncSession):
+    roadmap_id, _rows = await insert_roadmap(
+        db_session, STRUCTURE.model_copy(update={"phases": []}), goal=None
+    )
+    rows = await insert_phases(db_session, roadmap_id, STRUCTURE.phases[1:], first_order=4)
+    await db_session.commit()
+
+    phases = (await db_session.execute(select(Phase))).scalars().all()
+    assert [(p.name, p.order_num) for p in phases] == [("Phase 1", 4)]
+    assert len(rows.lessons) == 3
@@ -0,0 +1,60 @@
+import pytest
+
+from agents.code_reviewer.static_analysis import (
+    MAX_FINDINGS_PER_RULE,
+    analyze_python,
+    static_findings_block,
+)
+
+
+@pytest.mark.parametrize(
+    ("code", "line", "observation"),
+    [
+        ('API_KEY = "sk-123456"\n', 1, "`API_KEY` is set to a hardcoded string"),
+        ("def f(items=[]):\n    return items\n", 1, "Mutable default argument"),
+        ("try:\n    pass\nexcept:\n    pass\n", 3, "Bare `except:`"),
+        ("import os\n", 1, "`os` is imported but never used"),
+        ("def f():\n    x = 1\n    return 2\n", 2, "`x` is assigned in `f` but never used"),
+        (
+            "for a in b:\n if a:\n  while a:\n   with a:\n    if a:\n     pass\n",
+            5,
+            "Code is nested 5 blocks deep",
+        ),
+    ],
+)
+def test_rules_report_exact_lines(code: str, line: int, observation: str):
+    report = analyze_python(code)
+
+    assert not report.syntax_error
+    assert [(f["line_number"], f["observation"][: len(observation)]) for f in report.findings] == [
+        (line, observation)
+    ]
+
+
+def test_clean_code_has_no_findings():
+    code = 'import os\n__all__ = ["path"]\nfrom os import path\n\n\ndef f(x=None):\n'
+    code += "    _unused = 1\n    return os.getcwd(), x\n"
+
+    assert analyze_python(code).findings == []
+
+
+def test_findings_are_capped_per_rule():
+    code = "".join(f"import m{i}\n" for i in range(10))
+
+    assert len(analyze_python(code).findings) == MAX_FINDINGS_PER_RULE
+
+
+def test_syntax_error_yields_a_single_finding():
+    report = analyze_python("def f(:\n    return 1\n")
+
+    assert report.syntax_error
+    assert len(report.findings) == 1
+    assert report.findings[0]["category"] == "Syntax"
+    assert report.findings[0]["line_number"] == 1
+
+
+def test_findings_block():
+    assert static_findings_block([]) == ""
+    block = static_findings_block(analyze_python("import os\n").findings)
+    assert "Do not repeat them" in block
+    assert "`os` is imported but never used" in block